@@ -7,7 +7,7 @@ import os
 import sys
 import time
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Dict, Optional
 
 from raft_toolkit.core.config import RaftConfig, get_config
 from raft_toolkit.core.raft_engine import RaftEngine
@@ -82,6 +82,45 @@ def create_parser() -> argparse.ArgumentParser:
         "--source-max-file-size", type=int, default=50 * 1024 * 1024, help="Maximum file size in bytes (default: 50MB)"
     )
     parser.add_argument("--source-batch-size", type=int, default=100, help="Batch size for processing source files")
+    parser.add_argument(
+        "--source-max-concurrency",
+        type=int,
+        default=8,
+        help="Maximum concurrent downloads for remote sources (default: 8)",
+    )
+    parser.add_argument(
+        "--source-max-documents",
+        type=int,
+        help="Maximum number of documents to take from the input source (default: no limit)",
+    )
+    parser.add_argument(
+        "--source-delta-state",
+        type=str,
+        help="State file for incremental SharePoint sync; only changed items are processed on later runs",
+    )
+    parser.add_argument(
+        "--source-spill-threshold",
+        type=int,
+        default=32 * 1024 * 1024,
+        help="Downloaded documents larger than this many bytes are parsed from a memory-mapped file (default: 32MB)",
+    )
+    parser.add_argument(
+        "--source-cache-dir",
+        type=str,
+        help="Cache downloaded S3/SharePoint documents here; unchanged documents are not downloaded again",
+    )
+    parser.add_argument(
+        "--source-cache-max-size",
+        type=int,
+        default=10 * 1024 * 1024 * 1024,
+        help="Maximum size of the source cache in bytes; least recently used entries are evicted (default: 10GB)",
+    )
+    parser.add_argument(
+        "--source-walk-workers",
+        type=int,
+        default=1,
+        help="Walk this many top-level directories of a local source in parallel (default: 1, sorted listing)",
+    )
     parser.add_argument(
         "--output-format",
         type=str,
@@ -106,12 +145,48 @@ def create_parser() -> argparse.ArgumentParser:
         default="completion",
         help="Completion column name for completion format",
     )
+    parser.add_argument(
+        "--output-row-group-size",
+        type=int,
+        default=1000,
+        help="Records buffered before each streamed dataset write and Parquet row group (default: 1000)",
+    )
+    parser.add_argument(
+        "--output-exports",
+        type=str,
+        help="Additional exports written in the same pass, as comma-separated format:type (e.g. chat:jsonl,eval:parquet)",
+    )
+    parser.add_argument(
+        "--no-output-arrow",
+        action="store_true",
+        help="Do not write the HuggingFace Arrow dataset, only the exports",
+    )
+    parser.add_argument(
+        "--no-output-stats-tokens",
+        action="store_true",
+        help="Do not count token lengths in the dataset statistics computed after the run",
+    )
+    parser.add_argument(
+        "--output-layout",
+        type=str,
+        default="flat",
+        choices=["flat", "normalized"],
+        help="Dataset layout: flat records, or a chunk table plus QA rows referencing chunk ids (default: flat)",
+    )
+    parser.add_argument(
+        "--append",
+        action="store_true",
+        help="Add new shards to the dataset in --output instead of overwriting it, skipping duplicate QA records",
+    )
 
     # Processing Arguments
     parser.add_argument("--distractors", type=int, default=1, help="Number of distractor documents per data point")
     parser.add_argument("--p", type=float, default=1.0, help="Probability of including oracle document in context")
     parser.add_argument("--questions", type=int, default=5, help="Number of questions to generate per chunk")
     parser.add_argument("--chunk_size", type=int, default=512, help="Size of each chunk in tokens")
+    parser.add_argument(
+        "--chunk-overlap", type=int, default=0, help="Tokens shared by consecutive chunks (fixed/sentence strategies)"
+    )
     parser.add_argument(
         "--doctype",
         type=str,
@@ -127,6 +202,13 @@ def create_parser() -> argparse.ArgumentParser:
         help="Chunking algorithm to use",
     )
     parser.add_argument("--chunking-params", type=str, help="JSON string of extra chunker parameters")
+    parser.add_argument(
+        "--pdf-extractor",
+        type=str,
+        default="pypdf",
+        choices=["pypdf", "pymupdf", "pdfplumber", "pypdfium2"],
+        help="PDF text extraction backend",
+    )
 
     # AI Model Arguments
     parser.add_argument("--openai_key", type=str, help="OpenAI API key (can also use OPENAI_API_KEY env var)")
@@ -144,7 +226,24 @@ def create_parser() -> argparse.ArgumentParser:
     # Performance Arguments
     parser.add_argument("--workers", type=int, default=1, help="Number of worker threads for QA generation")
     parser.add_argument("--embed-workers", type=int, default=1, help="Number of worker threads for embedding/chunking")
-    parser.add_argument("--pace", action="store_true", default=True, help="Pace LLM calls to stay within rate limits")
+    parser.add_argument(
+        "--extraction-cache-dir",
+        type=str,
+        help="Directory for caching extracted PDF/PPTX text between runs",
+    )
+    parser.add_argument(
+        "--pdf-workers",
+        type=int,
+        default=0,
+        help="Number of processes for page-parallel PDF extraction (0 = one per CPU, 1 = in-process)",
+    )
+    parser.add_argument(
+        "--pace",
+        action="store_true",
+        default=True,
+        help="Pace embedding calls to stay within the embedding rate limits (no-op when none are set)",
+    )
+    parser.add_argument("--no-pace", dest="pace", action="store_false", help="Disable embedding request pacing")
     parser.add_argument(
         "--auto-clean-checkpoints", action="store_true", help="Automatically clean checkpoints after completion"
     )
@@ -174,6 +273,12 @@ def create_parser() -> argparse.ArgumentParser:
     parser.add_argument("--rate-limit-requests-per-minute", type=int, help="Maximum requests per minute")
     parser.add_argument("--rate-limit-tokens-per-minute", type=int, help="Maximum tokens per minute")
     parser.add_argument("--rate-limit-max-burst", type=int, help="Maximum burst requests allowed")
+    parser.add_argument(
+        "--embedding-rate-limit-requests-per-minute", type=int, help="Maximum embedding requests per minute"
+    )
+    parser.add_argument(
+        "--embedding-rate-limit-tokens-per-minute", type=int, help="Maximum embedding tokens per minute"
+    )
     parser.add_argument(
         "--rate-limit-max-retries", type=int, default=3, help="Maximum number of retries on rate limit errors"
     )
@@ -197,7 +302,32 @@ def create_parser() -> argparse.ArgumentParser:
 
     # Utility Arguments
     parser.add_argument("--preview", action="store_true", help="Show processing preview without running")
+    parser.add_argument(
+        "--preview-sample-size",
+        type=int,
+        default=30,
+        help="Documents extracted and chunked to forecast the run in --preview (default: 30, 0 = size heuristic)",
+    )
+    parser.add_argument(
+        "--prompt-token-price", type=float, help="Price per 1M prompt tokens for preview cost forecasts"
+    )
+    parser.add_argument(
+        "--completion-token-price", type=float, help="Price per 1M completion tokens for preview cost forecasts"
+    )
+    parser.add_argument(
+        "--embedding-token-price", type=float, help="Price per 1M embedding tokens for preview cost forecasts"
+    )
     parser.add_argument("--validate", action="store_true", help="Validate configuration and inputs only")
+    parser.add_argument(
+        "--dataset-stats",
+        type=str,
+        help="Print statistics of an existing dataset (output directory, JSONL or Parquet file) and exit",
+    )
+    parser.add_argument(
+        "--compact-dataset",
+        type=str,
+        help="Merge the small shards left by --append runs in a dataset directory and exit",
+    )
     parser.add_argument("--env-file", type=str, help="Path to .env file for configuration")
 
     return parser
@@ -234,6 +364,20 @@ def override_config_from_args(config: RaftConfig, args: argparse.Namespace) -> R
         config.source_max_file_size = args.source_max_file_size
     if args.source_batch_size != 100:
         config.source_batch_size = args.source_batch_size
+    if args.source_max_concurrency != 8:
+        config.source_max_concurrency = args.source_max_concurrency
+    if args.source_max_documents:
+        config.source_max_documents = args.source_max_documents
+    if args.source_delta_state:
+        config.source_delta_state = args.source_delta_state
+    if args.source_spill_threshold != 32 * 1024 * 1024:
+        config.source_spill_threshold = args.source_spill_threshold
+    if args.source_cache_dir:
+        config.source_cache_dir = args.source_cache_dir
+    if args.source_cache_max_size != 10 * 1024 * 1024 * 1024:
+        config.source_cache_max_size = args.source_cache_max_size
+    if args.source_walk_workers != 1:
+        config.source_walk_workers = args.source_walk_workers
 
     # Legacy datapath handling - if provided and no source_uri, use it
     if args.datapath and not config.source_uri:
@@ -256,6 +400,18 @@ def override_config_from_args(config: RaftConfig, args: argparse.Namespace) -> R
         config.output_completion_prompt_column = args.output_completion_prompt_column
     if args.output_completion_completion_column != "completion":
         config.output_completion_completion_column = args.output_completion_completion_column
+    if args.output_row_group_size != 1000:
+        config.output_row_group_size = args.output_row_group_size
+    if args.output_exports:
+        config.output_exports = [export.strip() for export in args.output_exports.split(",") if export.strip()]
+    if args.no_output_arrow:
+        config.output_arrow = False
+    if args.no_output_stats_tokens:
+        config.output_stats_tokens = False
+    if args.output_layout != "flat":
+        config.output_layout = args.output_layout
+    if args.append:
+        config.output_append = True
 
     if args.distractors != 1:
         config.distractors = args.distractors
@@ -265,6 +421,8 @@ def override_config_from_args(config: RaftConfig, args: argparse.Namespace) -> R
         config.questions = args.questions
     if args.chunk_size != 512:
         config.chunk_size = args.chunk_size
+    if args.chunk_overlap != 0:
+        config.chunk_overlap = args.chunk_overlap
     if args.doctype != "pdf":
         config.doctype = args.doctype
     if args.chunking_strategy != "semantic":
@@ -275,6 +433,10 @@ def override_config_from_args(config: RaftConfig, args: argparse.Namespace) -> R
         except json.JSONDecodeError as e:
             print(f"Error: Invalid chunking params JSON: {e}")
             sys.exit(1)
+    if args.pdf_extractor != "pypdf":
+        config.pdf_extractor = args.pdf_extractor
+    if args.extraction_cache_dir:
+        config.extraction_cache_dir = args.extraction_cache_dir
 
     if args.openai_key:
         config.openai_key = args.openai_key
@@ -292,6 +454,8 @@ def override_config_from_args(config: RaftConfig, args: argparse.Namespace) -> R
         config.workers = args.workers
     if args.embed_workers != 1:
         config.embed_workers = args.embed_workers
+    if args.pdf_workers != 0:
+        config.pdf_workers = args.pdf_workers
     if not args.pace:  # Only if explicitly disabled
         config.pace = args.pace
     if args.auto_clean_checkpoints:
@@ -312,6 +476,19 @@ def override_config_from_args(config: RaftConfig, args: argparse.Namespace) -> R
         config.rate_limit_max_burst = args.rate_limit_max_burst
     if args.rate_limit_max_retries != 3:
         config.rate_limit_max_retries = args.rate_limit_max_retries
+    if args.embedding_rate_limit_requests_per_minute:
+        config.embedding_rate_limit_requests_per_minute = args.embedding_rate_limit_requests_per_minute
+    if args.embedding_rate_limit_tokens_per_minute:
+        config.embedding_rate_limit_tokens_per_minute = args.embedding_rate_limit_tokens_per_minute
+
+    if args.preview_sample_size != 30:
+        config.preview_sample_size = args.preview_sample_size
+    if args.prompt_token_price is not None:
+        config.prompt_token_price = args.prompt_token_price
+    if args.completion_token_price is not None:
+        config.completion_token_price = args.completion_token_price
+    if args.embedding_token_price is not None:
+        config.embedding_token_price = args.embedding_token_price
 
     if args.templates != "./templates/":
         config.templates = args.templates
@@ -391,6 +568,8 @@ def show_preview(engine: RaftEngine, config: RaftConfig) -> None:
         print(f"Questions per Chunk: {engine.config.questions}")
         print(f"Distractors per Point: {engine.config.distractors}")
         print(f"Chunking Strategy: {preview.get('chunking_strategy', engine.config.chunking_strategy)}")
+        if "estimate" in preview:
+            print_forecast(preview["estimate"])
         print("\nUse --validate to check configuration or run without --preview to start processing.")
         print("=" * 60)
 
@@ -402,6 +581,32 @@ def show_preview(engine: RaftEngine, config: RaftConfig) -> None:
         sys.exit(1)
 
 
+def print_forecast(estimate: Dict[str, Any]) -> None:
+    """Print the sampled run forecast of a preview."""
+
+    def interval(name: str, unit: str = "") -> str:
+        value = estimate[name]
+        return f"{value['estimate']:,}{unit} ({value['low']:,}{unit} - {value['high']:,}{unit})"
+
+    confidence = int(estimate["confidence"] * 100)
+    print(
+        f"\nForecast from {estimate['sampled_documents']} of {estimate['documents']} documents ({confidence}% intervals):"
+    )
+    if estimate["failed_documents"]:
+        print(f"  Unreadable sample documents: {estimate['failed_documents']}")
+    print(f"  Chunks: {interval('chunks')}")
+    print(f"  Chunk Tokens: {interval('chunk_tokens')}")
+    print(f"  QA Points: {interval('qa_points')}")
+    print(f"  LLM Calls: {interval('llm_calls')}")
+    print(f"  Prompt Tokens: {interval('prompt_tokens')}")
+    print(f"  Completion Tokens: {interval('completion_tokens')}")
+    print(f"  Embedding Tokens: {interval('embedding_tokens')}")
+    if estimate["cost_usd"] is not None:
+        cost = estimate["cost_usd"]
+        print(f"  Cost: ${cost['estimate']:,.2f} (${cost['low']:,.2f} - ${cost['high']:,.2f})")
+    print(f"  Duration: {interval('duration_seconds', 's')}, limited by {estimate['bottleneck'].replace('_', ' ')}")
+
+
 def validate_only(engine: RaftEngine, config: RaftConfig) -> None:
     """Validate configuration and inputs only."""
     if logger is not None:
@@ -436,6 +641,64 @@ def validate_only(engine: RaftEngine, config: RaftConfig) -> None:
         sys.exit(1)
 
 
+def print_dataset_stats(stats: Dict[str, Any]) -> None:
+    """Print value counts, length percentiles and the duplicate question rate of a dataset."""
+    print(f"Records: {stats['total_records']:,}")
+    print(f"Duplicate Questions: {stats['duplicate_questions']:,} ({stats['duplicate_question_rate']:.1%})")
+    for column, counts in stats["value_counts"].items():
+        print(f"{column.title()} Counts: " + ", ".join(f"{value}: {count:,}" for value, count in counts.items()))
+    if stats["lengths"]:
+        print(f"Lengths (p50 / p95 / max, tokens by {stats['tokenizer']}):")
+    for column, lengths in stats["lengths"].items():
+        parts = []
+        for unit in ("chars", "tokens"):
+            summary = lengths.get(unit)
+            if summary and summary["count"]:
+                percentiles = summary["percentiles"]
+                parts.append(f"{percentiles['p50']:,} / {percentiles['p95']:,} / {summary['max']:,} {unit}")
+        if parts:
+            print(f"  {column}: " + ", ".join(parts))
+
+
+def show_dataset_stats(path: str) -> None:
+    """Show statistics of an existing dataset."""
+    from raft_toolkit.core.security import SecurityConfig
+    from raft_toolkit.core.services.dataset_stats import compute_dataset_stats
+
+    if not SecurityConfig.validate_file_path(path):
+        raise ValueError(f"Dataset path is unsafe: {path}")
+    if logger is not None:
+        logger.set_progress("STAT")
+        logger.info(f"Computing statistics of {path}")
+
+    stats = compute_dataset_stats(path)
+    print("\n" + "=" * 60)
+    print("RAFT DATASET STATISTICS")
+    print("=" * 60)
+    print_dataset_stats(stats)
+    print("=" * 60)
+
+
+def compact(path: str) -> None:
+    """Compact the shards of a dataset directory."""
+    from raft_toolkit.core.security import SecurityConfig
+    from raft_toolkit.core.services.dataset_compaction import compact_dataset
+
+    if not SecurityConfig.validate_file_path(path):
+        raise ValueError(f"Dataset path is unsafe: {path}")
+    if logger is not None:
+        logger.set_progress("CMPT")
+        logger.info(f"Compacting {path}")
+
+    result = compact_dataset(path)
+    print("\n" + "=" * 60)
+    print("RAFT DATASET COMPACTION")
+    print("=" * 60)
+    for name, counts in result.items():
+        print(f"{name}: {counts['before']} -> {counts['after']} shard(s)")
+    print("=" * 60)
+
+
 def main():
     """Main CLI entry point."""
     # Initialize logging system
@@ -449,6 +712,14 @@ def main():
     args = parser.parse_args()
 
     try:
+        # Inspecting an existing dataset needs no generation configuration
+        if args.dataset_stats:
+            show_dataset_stats(args.dataset_stats)
+            return
+        if args.compact_dataset:
+            compact(args.compact_dataset)
+            return
+
         # Load configuration from environment (and optional .env file)
         logger.info("Loading configuration")
         config = get_config(args.env_file)
@@ -627,6 +898,18 @@ def main():
         print(f"Tokens per Second: {stats['token_usage']['tokens_per_second']:.1f}")
         print(f"Total Tokens Used: {stats['token_usage']['total_tokens']:,}")
 
+        if stats.get("pacing_time"):
+            print(f"Time Spent Pacing: {stats['pacing_time']:.1f}s")
+        if stats.get("duplicates_skipped"):
+            print(f"Duplicates Skipped: {stats['duplicates_skipped']}")
+
+        throughput = stats.get("input_source", {}).get("throughput", {})
+        if throughput.get("documents"):
+            print(
+                f"Download Throughput: {throughput['docs_per_second']:.1f} docs/s, "
+                f"{throughput['mb_per_second']:.2f} MB/s"
+            )
+
         # Display rate limiting statistics if enabled
         rate_stats = stats.get("rate_limiting", {})
         if rate_stats.get("enabled", False):
@@ -639,6 +922,10 @@ def main():
             if rate_stats.get("current_rate_limit"):
                 print(f"  Current Rate Limit: {rate_stats['current_rate_limit']:.1f} req/min")
 
+        if isinstance(stats.get("dataset"), dict):
+            print("Dataset Statistics:")
+            print_dataset_stats(stats["dataset"])
+
         print(f"Output Location: {config.output}")
         print("=" * 60)
 
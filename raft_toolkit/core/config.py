@@ -39,6 +39,12 @@ class RaftConfig:
     output_chat_system_prompt: Optional[str] = None
     output_completion_prompt_column: str = "prompt"
     output_completion_completion_column: str = "completion"
+    output_row_group_size: int = 1000  # Records buffered before each streamed write (one Parquet row group)
+    output_exports: list = field(default_factory=list)  # Additional "format:type" exports, e.g. ["chat:jsonl"]
+    output_arrow: bool = True  # Write the HuggingFace Arrow dataset next to the exports
+    output_layout: str = "flat"  # flat records, or normalized chunk table + QA rows referencing chunk ids
+    output_append: bool = False  # Add new shards to an existing dataset, skipping duplicate QA records
+    output_stats_tokens: bool = True  # Count token lengths in the dataset statistics after each run
 
     # Input Source Configuration
     source_type: str = "local"  # local, s3, sharepoint
@@ -48,19 +54,33 @@ class RaftConfig:
     source_exclude_patterns: list = field(default_factory=list)
     source_max_file_size: int = 50 * 1024 * 1024  # 50MB
     source_batch_size: int = 100
+    source_max_concurrency: int = 8  # Concurrent downloads for remote sources
+    source_max_documents: Optional[int] = None  # Stop listing after this many documents
+    source_delta_state: Optional[str] = None  # SharePoint delta sync state file (enables incremental sync)
+    source_spill_threshold: int = 32 * 1024 * 1024  # In-memory documents above this spill to an mmap file
+    source_cache_dir: Optional[str] = None  # Cache downloaded remote documents here; None disables
+    source_cache_max_size: int = 10 * 1024 * 1024 * 1024  # 10GB, least recently used entries are evicted
+    source_walk_workers: int = 1  # Local top-level subtrees walked in parallel (1 = sorted sequential listing)
 
     # Processing Configuration
     distractors: int = 1
     p: float = 1.0
     questions: int = 5
-    chunk_size: int = 512
+    chunk_size: int = 512  # Chunk budget in tokens
+    chunk_overlap: int = 0  # Tokens shared by consecutive fixed/sentence chunks
     doctype: str = "pdf"
     chunking_strategy: str = "semantic"
     chunking_params: Dict[str, Any] = field(default_factory=dict)
+    pdf_extractor: str = "pypdf"  # pypdf, pymupdf, pdfplumber, pypdfium2
+    pdf_workers: int = 0  # Processes for page-parallel PDF extraction, 0 = one per CPU
+    pdf_parallel_min_pages: int = 16  # Smaller PDFs are extracted in-process
+    extraction_cache_dir: Optional[str] = None  # Cache extracted PDF/PPTX text here; None disables
+    extraction_cache_fingerprint: str = "stat"  # stat (path+mtime+size) or hash (content SHA-256)
 
     # AI Model Configuration
     openai_key: Optional[str] = None
     embedding_model: str = "nomic-embed-text"
+    embedding_dtype: str = "float32"  # float32 or float16 storage for chunk embeddings
     completion_model: str = "llama3.2"
     system_prompt_key: str = "gpt"
 
@@ -71,7 +91,7 @@ class RaftConfig:
     # Performance Configuration
     workers: int = 1
     embed_workers: int = 1
-    pace: bool = True
+    pace: bool = True  # Throttle embedding requests when embedding rate limits are configured
     auto_clean_checkpoints: bool = False
 
     # Rate Limiting Configuration
@@ -86,6 +106,14 @@ class RaftConfig:
     rate_limit_max_retries: int = 3
     rate_limit_base_delay: float = 1.0
     rate_limit_preset: Optional[str] = None
+    embedding_rate_limit_requests_per_minute: Optional[int] = None
+    embedding_rate_limit_tokens_per_minute: Optional[int] = None
+
+    # Preview Forecast Configuration
+    preview_sample_size: int = 30  # Documents extracted and chunked by --preview; 0 uses size heuristics
+    prompt_token_price: Optional[float] = None  # USD per 1M prompt tokens, for preview cost forecasts
+    completion_token_price: Optional[float] = None  # USD per 1M completion tokens
+    embedding_token_price: Optional[float] = None  # USD per 1M embedding tokens
 
     # Template Configuration
     templates: str = "./templates"
@@ -130,12 +158,29 @@ class RaftConfig:
         config.output_completion_completion_column = os.getenv(
             "RAFT_OUTPUT_COMPLETION_COMPLETION_COLUMN", config.output_completion_completion_column
         )
+        config.output_row_group_size = int(os.getenv("RAFT_OUTPUT_ROW_GROUP_SIZE", config.output_row_group_size))
+        output_exports_str = os.getenv("RAFT_OUTPUT_EXPORTS")
+        if output_exports_str:
+            config.output_exports = [export.strip() for export in output_exports_str.split(",") if export.strip()]
+        config.output_arrow = os.getenv("RAFT_OUTPUT_ARROW", "true").lower() in ("true", "1", "yes")
+        config.output_layout = os.getenv("RAFT_OUTPUT_LAYOUT", config.output_layout)
+        config.output_append = os.getenv("RAFT_OUTPUT_APPEND", "false").lower() in ("true", "1", "yes")
+        config.output_stats_tokens = os.getenv("RAFT_OUTPUT_STATS_TOKENS", "true").lower() in ("true", "1", "yes")
 
         # Input Source Configuration
         config.source_type = os.getenv("RAFT_SOURCE_TYPE", config.source_type)
         config.source_uri = os.getenv("RAFT_SOURCE_URI", config.source_uri)
         config.source_max_file_size = int(os.getenv("RAFT_SOURCE_MAX_FILE_SIZE", config.source_max_file_size))
         config.source_batch_size = int(os.getenv("RAFT_SOURCE_BATCH_SIZE", config.source_batch_size))
+        config.source_max_concurrency = int(os.getenv("RAFT_SOURCE_MAX_CONCURRENCY", config.source_max_concurrency))
+        source_max_documents = os.getenv("RAFT_SOURCE_MAX_DOCUMENTS")
+        if source_max_documents:
+            config.source_max_documents = int(source_max_documents)
+        config.source_delta_state = os.getenv("RAFT_SOURCE_DELTA_STATE", config.source_delta_state)
+        config.source_spill_threshold = int(os.getenv("RAFT_SOURCE_SPILL_THRESHOLD", config.source_spill_threshold))
+        config.source_cache_dir = os.getenv("RAFT_SOURCE_CACHE_DIR", config.source_cache_dir)
+        config.source_cache_max_size = int(os.getenv("RAFT_SOURCE_CACHE_MAX_SIZE", config.source_cache_max_size))
+        config.source_walk_workers = int(os.getenv("RAFT_SOURCE_WALK_WORKERS", config.source_walk_workers))
 
         # Parse source credentials from JSON string
         source_credentials_str = os.getenv("RAFT_SOURCE_CREDENTIALS")
@@ -165,6 +210,7 @@ class RaftConfig:
         config.p = float(os.getenv("RAFT_P", config.p))
         config.questions = int(os.getenv("RAFT_QUESTIONS", config.questions))
         config.chunk_size = int(os.getenv("RAFT_CHUNK_SIZE", config.chunk_size))
+        config.chunk_overlap = int(os.getenv("RAFT_CHUNK_OVERLAP", config.chunk_overlap))
         config.doctype = os.getenv("RAFT_DOCTYPE", config.doctype)
         config.chunking_strategy = os.getenv("RAFT_CHUNKING_STRATEGY", config.chunking_strategy)
 
@@ -179,6 +225,7 @@ class RaftConfig:
         # AI Model Configuration
         config.openai_key = os.getenv("OPENAI_API_KEY") or os.getenv("OPENAI_KEY")
         config.embedding_model = os.getenv("RAFT_EMBEDDING_MODEL", config.embedding_model)
+        config.embedding_dtype = os.getenv("RAFT_EMBEDDING_DTYPE", config.embedding_dtype)
         config.completion_model = os.getenv("RAFT_COMPLETION_MODEL", config.completion_model)
         config.system_prompt_key = os.getenv("RAFT_SYSTEM_PROMPT_KEY", config.system_prompt_key)
 
@@ -190,6 +237,13 @@ class RaftConfig:
         config.workers = int(os.getenv("RAFT_WORKERS", config.workers))
         config.embed_workers = int(os.getenv("RAFT_EMBED_WORKERS", config.embed_workers))
         config.pace = os.getenv("RAFT_PACE", "true").lower() in ("true", "1", "yes")
+        config.pdf_extractor = os.getenv("RAFT_PDF_EXTRACTOR", config.pdf_extractor)
+        config.pdf_workers = int(os.getenv("RAFT_PDF_WORKERS", config.pdf_workers))
+        config.pdf_parallel_min_pages = int(os.getenv("RAFT_PDF_PARALLEL_MIN_PAGES", config.pdf_parallel_min_pages))
+        config.extraction_cache_dir = os.getenv("RAFT_EXTRACTION_CACHE_DIR", config.extraction_cache_dir)
+        config.extraction_cache_fingerprint = os.getenv(
+            "RAFT_EXTRACTION_CACHE_FINGERPRINT", config.extraction_cache_fingerprint
+        )
         config.auto_clean_checkpoints = os.getenv("RAFT_AUTO_CLEAN_CHECKPOINTS", "false").lower() in (
             "true",
             "1",
@@ -224,6 +278,21 @@ class RaftConfig:
         config.rate_limit_max_retries = int(os.getenv("RAFT_RATE_LIMIT_MAX_RETRIES", config.rate_limit_max_retries))
         config.rate_limit_base_delay = float(os.getenv("RAFT_RATE_LIMIT_BASE_DELAY", config.rate_limit_base_delay))
 
+        # Embedding pacing limits (applied when pace is enabled)
+        embedding_requests_per_minute = os.getenv("RAFT_EMBEDDING_RATE_LIMIT_REQUESTS_PER_MINUTE")
+        if embedding_requests_per_minute:
+            config.embedding_rate_limit_requests_per_minute = int(embedding_requests_per_minute)
+        embedding_tokens_per_minute = os.getenv("RAFT_EMBEDDING_RATE_LIMIT_TOKENS_PER_MINUTE")
+        if embedding_tokens_per_minute:
+            config.embedding_rate_limit_tokens_per_minute = int(embedding_tokens_per_minute)
+
+        # Preview Forecast Configuration
+        config.preview_sample_size = int(os.getenv("RAFT_PREVIEW_SAMPLE_SIZE", config.preview_sample_size))
+        for price_field in ("prompt_token_price", "completion_token_price", "embedding_token_price"):
+            price = os.getenv(f"RAFT_{price_field.upper()}")
+            if price:
+                setattr(config, price_field, float(price))
+
         # Template Configuration
         config.templates = os.getenv("RAFT_TEMPLATES", config.templates)
         config.embedding_prompt_template = os.getenv("RAFT_EMBEDDING_PROMPT_TEMPLATE")
@@ -270,7 +339,28 @@ class RaftConfig:
         if self.chunking_strategy not in ["semantic", "fixed", "sentence"]:
             raise ValueError(f"Invalid chunking strategy: {self.chunking_strategy}")
 
-        if self.output_chat_system_prompt and self.output_format != "chat":
+        if not 0 <= self.chunk_overlap < self.chunk_size:
+            raise ValueError("chunk_overlap must be non-negative and smaller than chunk_size")
+
+        if self.embedding_dtype not in ["float32", "float16"]:
+            raise ValueError(f"Invalid embedding dtype: {self.embedding_dtype}")
+
+        if self.pdf_extractor not in ["pypdf", "pymupdf", "pdfplumber", "pypdfium2"]:
+            raise ValueError(f"Invalid PDF extractor: {self.pdf_extractor}")
+
+        if self.pdf_workers < 0:
+            raise ValueError("pdf_workers cannot be negative")
+
+        if self.extraction_cache_fingerprint not in ["stat", "hash"]:
+            raise ValueError(f"Invalid extraction cache fingerprint: {self.extraction_cache_fingerprint}")
+
+        for export in self.output_exports:
+            export_format, _, export_type = export.partition(":")
+            if export_format not in ["hf", "completion", "chat", "eval"] or export_type not in ["jsonl", "parquet"]:
+                raise ValueError(f"Invalid output export: {export} (expected format:type, e.g. chat:jsonl)")
+
+        export_formats = {self.output_format} | {export.partition(":")[0] for export in self.output_exports}
+        if self.output_chat_system_prompt and "chat" not in export_formats:
             raise ValueError("output_chat_system_prompt can only be used with chat output format")
 
         # Validate source file size limit
@@ -280,6 +370,33 @@ class RaftConfig:
         if self.source_batch_size <= 0:
             raise ValueError("source_batch_size must be positive")
 
+        if self.source_max_concurrency <= 0:
+            raise ValueError("source_max_concurrency must be positive")
+
+        if self.source_max_documents is not None and self.source_max_documents <= 0:
+            raise ValueError("source_max_documents must be positive")
+
+        if self.source_spill_threshold < 0:
+            raise ValueError("source_spill_threshold must be non-negative")
+
+        if self.source_cache_max_size <= 0:
+            raise ValueError("source_cache_max_size must be positive")
+
+        if self.source_walk_workers <= 0:
+            raise ValueError("source_walk_workers must be positive")
+
+        if self.preview_sample_size < 0:
+            raise ValueError("preview_sample_size must be non-negative")
+
+        if self.output_row_group_size < 1:
+            raise ValueError("output_row_group_size must be positive")
+
+        if self.output_layout not in ("flat", "normalized"):
+            raise ValueError(f"Invalid output layout: {self.output_layout}")
+
+        if self.output_append and self.output_layout != "flat":
+            raise ValueError("Append mode is only supported with the flat output layout")
+
         # Allow demo mode with mock API key
         if not self.openai_key and not self.use_azure_identity:
             raise ValueError("OpenAI API key is required unless using Azure identity")
@@ -0,0 +1,45 @@
+"""
+Text extraction backends for RAFT Toolkit.
+
+This module provides pluggable PDF extraction backends, page-parallel
+extraction for large documents, in-memory document buffers and an on-disk
+extracted-text cache.
+"""
+
+from .base import ExtractorUnavailableError, PdfExtractor
+from .buffer import BufferHandoff, DocumentBuffer, MemoryReader
+from .cache import ExtractionCache, file_fingerprint
+from .pdf import (
+    DEFAULT_PDF_EXTRACTOR,
+    PDF_EXTRACTORS,
+    PdfplumberExtractor,
+    PyMuPDFExtractor,
+    PypdfExtractor,
+    PypdfiumExtractor,
+    available_pdf_extractors,
+    create_pdf_extractor,
+    extract_pdf_text,
+    register_pdf_extractor,
+    shutdown_pdf_process_pool,
+)
+
+__all__ = [
+    "BufferHandoff",
+    "DocumentBuffer",
+    "MemoryReader",
+    "ExtractionCache",
+    "file_fingerprint",
+    "PdfExtractor",
+    "ExtractorUnavailableError",
+    "PypdfExtractor",
+    "PyMuPDFExtractor",
+    "PdfplumberExtractor",
+    "PypdfiumExtractor",
+    "PDF_EXTRACTORS",
+    "DEFAULT_PDF_EXTRACTOR",
+    "available_pdf_extractors",
+    "create_pdf_extractor",
+    "register_pdf_extractor",
+    "extract_pdf_text",
+    "shutdown_pdf_process_pool",
+]
@@ -0,0 +1,62 @@
+"""
+Base classes and interfaces for text extractors.
+"""
+
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import BinaryIO, List, Union
+
+PathLike = Union[str, Path]
+
+# A file path, or a seekable binary stream over in-memory content
+PdfSource = Union[str, Path, BinaryIO]
+
+
+class ExtractorUnavailableError(Exception):
+    """Raised when an extractor backend is unknown or its library is not installed."""
+
+    pass
+
+
+class PdfExtractor(ABC):
+    """
+    Abstract base class for PDF text extraction backends.
+
+    Backends must be stateless and constructible without arguments so that
+    worker processes can rebuild them from their class. Classes that workers
+    cannot import (for example, defined inside a function) are run in-process.
+    """
+
+    #: Registry name of the backend
+    name: str = ""
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """Check whether the backend library is installed."""
+        return True
+
+    @property
+    @abstractmethod
+    def version(self) -> str:
+        """Version of the underlying library, used for cache keys and benchmarks."""
+        pass
+
+    @abstractmethod
+    def page_count(self, path: PdfSource) -> int:
+        """Return the number of pages in the document."""
+        pass
+
+    @abstractmethod
+    def extract_pages(self, path: PdfSource, start: int, end: int) -> List[str]:
+        """
+        Extract text for pages ``[start, end)``.
+
+        Args:
+            path: Path to the PDF file, or a seekable binary stream
+            start: First page index (inclusive)
+            end: Last page index (exclusive)
+
+        Returns:
+            One string per page, in page order
+        """
+        pass
@@ -0,0 +1,196 @@
+"""
+In-memory document buffers for parsing downloaded content without temp files.
+
+Remote documents arrive as bytes. Parsers read them through a zero-copy
+stream over the buffer; payloads above a threshold are spilled once to a
+memory-mapped file so the downloaded bytes can be released and the page
+cache holds the content instead of the Python heap.
+"""
+
+import io
+import logging
+import mmap
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, BinaryIO, Optional, Union, cast
+
+logger = logging.getLogger(__name__)
+
+BufferLike = Union[bytes, bytearray, memoryview, BinaryIO]
+
+# Payloads larger than this are spilled to a memory-mapped file
+DEFAULT_SPILL_THRESHOLD = 32 * 1024 * 1024
+
+
+class MemoryReader(io.RawIOBase):
+    """Read-only, seekable binary stream over a memoryview that never copies the whole buffer."""
+
+    def __init__(self, view: memoryview):
+        super().__init__()
+        self._view = view.cast("B") if view.format != "B" or view.ndim != 1 else view
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = len(self._view) + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        if pos < 0:
+            raise ValueError("Negative seek position")
+        self._pos = pos
+        return pos
+
+    def read(self, size: Optional[int] = -1) -> bytes:
+        end = len(self._view) if size is None or size < 0 else min(self._pos + size, len(self._view))
+        data = self._view[self._pos : end].tobytes() if end > self._pos else b""
+        self._pos = max(self._pos, end)
+        return data
+
+    def readinto(self, buffer: Any) -> int:
+        target = memoryview(buffer).cast("B")
+        count = max(0, min(len(target), len(self._view) - self._pos))
+        target[:count] = self._view[self._pos : self._pos + count]
+        self._pos += count
+        return count
+
+    def close(self) -> None:
+        self._view = memoryview(b"")
+        super().close()
+
+
+class BufferHandoff:
+    """
+    One-shot holder that hands the only reference to downloaded bytes to a
+    :class:`DocumentBuffer`, so that spilled payloads can be freed while the
+    document is still being parsed.
+    """
+
+    def __init__(self, data: BufferLike):
+        self._data: Optional[BufferLike] = data
+
+    def take(self) -> BufferLike:
+        """Return the payload and drop this holder's reference to it."""
+        if self._data is None:
+            raise ValueError("Buffer has already been taken")
+        data, self._data = self._data, None
+        return data
+
+
+class DocumentBuffer:
+    """
+    Document content held in memory, or in a memory-mapped spill file when large.
+
+    Accepts bytes, bytearray, memoryview, a binary file object or a
+    :class:`BufferHandoff`. Small payloads are wrapped without copying;
+    payloads above ``spill_threshold`` are written once to a temporary file
+    that is memory-mapped and removed on :meth:`close`. Once spilled, the
+    buffer holds no reference to the payload, which is freed if the caller
+    passed it in a :class:`BufferHandoff`. Use as a context manager.
+    """
+
+    def __init__(
+        self,
+        data: Union[BufferLike, BufferHandoff],
+        name: str = "<memory>",
+        spill_threshold: int = DEFAULT_SPILL_THRESHOLD,
+        spill_dir: Optional[Union[str, Path]] = None,
+    ):
+        self.name = name
+        self.path: Optional[Path] = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._readers: list = []
+
+        if isinstance(data, BufferHandoff):
+            data = data.take()
+        view = self._as_view(data)
+        del data
+        self.size = view.nbytes
+
+        if self.size > spill_threshold:
+            self._view = self._spill(view, spill_dir)
+            view.release()
+        else:
+            self._view = view
+
+    @staticmethod
+    def _as_view(data: BufferLike) -> memoryview:
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            return memoryview(data).cast("B")
+        if isinstance(data, io.BytesIO):
+            return memoryview(data.getvalue())
+        return memoryview(data.read())
+
+    def _spill(self, view: memoryview, spill_dir: Optional[Union[str, Path]]) -> memoryview:
+        suffix = Path(self.name).suffix
+        fd, temp_path = tempfile.mkstemp(prefix="raft-spill-", suffix=suffix, dir=spill_dir)
+        self.path = Path(temp_path)
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(view)
+            with open(self.path, "rb") as file:
+                self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self.path.unlink(missing_ok=True)
+            raise
+        logger.debug(f"Spilled {self.name} ({self.size} bytes) to {self.path}")
+        return memoryview(self._mmap)
+
+    @property
+    def spilled(self) -> bool:
+        """Whether the content lives in a memory-mapped spill file."""
+        return self.path is not None
+
+    def stream(self) -> BinaryIO:
+        """Return a new seekable binary stream over the content."""
+        reader = MemoryReader(self._view)
+        self._readers.append(reader)
+        return cast(BinaryIO, reader)
+
+    def source(self) -> Union[Path, BinaryIO]:
+        """Return the spill file path if spilled, otherwise a stream (for parsers that accept either)."""
+        return self.path if self.path is not None else self.stream()
+
+    def text(self, encoding: str = "utf-8") -> str:
+        """Decode the content as text."""
+        return str(self._view, encoding)
+
+    def close(self) -> None:
+        """Release the buffer and remove any spill file."""
+        for reader in self._readers:
+            reader.close()
+        self._readers.clear()
+        self._view.release()
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError as e:
+                # A parser still references the mapping; it is unmapped when collected
+                logger.debug(f"Deferred unmapping of {self.name}: {e}")
+            self._mmap = None
+        if self.path is not None:
+            try:
+                self.path.unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Failed to delete spill file {self.path}: {e}")
+
+    def __enter__(self) -> "DocumentBuffer":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
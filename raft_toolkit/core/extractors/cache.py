@@ -0,0 +1,131 @@
+"""
+On-disk cache for extracted document text.
+
+Parsing PDFs and presentations is the slowest local step, while chunking
+parameters are what users iterate on. Extracted text is cached keyed by a
+file fingerprint and the extractor identity, stored zlib-compressed so that
+re-runs with different chunking only pay for splitting.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_MODES = ("stat", "hash")
+
+# Bump when the on-disk layout changes
+CACHE_FORMAT_VERSION = "1"
+
+_HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def file_fingerprint(path: Union[str, Path], mode: str = "stat") -> str:
+    """
+    Fingerprint a file for cache lookups.
+
+    Args:
+        path: File to fingerprint
+        mode: ``stat`` uses resolved path, mtime and size (cheap); ``hash`` uses
+            the SHA-256 of the content (survives moves and touch)
+
+    Returns:
+        Hex digest identifying the file version
+    """
+    if mode not in FINGERPRINT_MODES:
+        raise ValueError(f"Invalid fingerprint mode: {mode}. Use one of {FINGERPRINT_MODES}")
+
+    path = Path(path)
+    if mode == "stat":
+        stat = path.stat()
+        ident = f"{path.resolve()}|{stat.st_mtime_ns}|{stat.st_size}"
+        return hashlib.sha256(ident.encode("utf-8")).hexdigest()
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(_HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """
+    Compressed extracted-text cache keyed by file fingerprint and extractor.
+
+    Entries are written atomically, so concurrent workers and interrupted runs
+    never observe partial files.
+    """
+
+    def __init__(self, cache_dir: Union[str, Path], fingerprint: str = "stat", compression_level: int = 6):
+        if fingerprint not in FINGERPRINT_MODES:
+            raise ValueError(f"Invalid fingerprint mode: {fingerprint}. Use one of {FINGERPRINT_MODES}")
+
+        self.cache_dir = Path(cache_dir)
+        self.fingerprint = fingerprint
+        self.compression_level = compression_level
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, path: Union[str, Path], doctype: str, extractor: str, extractor_version: str) -> str:
+        """Build the cache key for a file and extractor."""
+        parts = [CACHE_FORMAT_VERSION, file_fingerprint(path, self.fingerprint), doctype, extractor, extractor_version]
+        return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.txt.z"
+
+    def get(self, key: str) -> Optional[str]:
+        """Return cached text for ``key``, or None on a miss or unreadable entry."""
+        entry = self._entry_path(key)
+        try:
+            text: Optional[str] = zlib.decompress(entry.read_bytes()).decode("utf-8")
+        except FileNotFoundError:
+            text = None
+        except (OSError, zlib.error, UnicodeDecodeError) as e:
+            logger.warning(f"Discarding unreadable extraction cache entry {entry}: {e}")
+            entry.unlink(missing_ok=True)
+            text = None
+
+        with self._lock:
+            if text is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return text
+
+    def put(self, key: str, text: str) -> None:
+        """Store text for ``key``."""
+        entry = self._entry_path(key)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        data = zlib.compress(text.encode("utf-8"), self.compression_level)
+
+        fd, temp_path = tempfile.mkstemp(dir=entry.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(temp_path, entry)
+        except Exception:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+
+    def clear(self) -> int:
+        """Remove all cache entries and return how many were deleted."""
+        removed = 0
+        for entry in self.cache_dir.glob("*/*.txt.z"):
+            entry.unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+    def get_statistics(self) -> Dict[str, int]:
+        """Get hit/miss counters."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
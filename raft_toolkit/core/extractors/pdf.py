@@ -0,0 +1,367 @@
+"""
+PDF text extraction backends and page-parallel extraction.
+
+pypdf is pure Python and CPU bound, so threads do not help. Large PDFs are
+split into page ranges that are extracted in a shared process pool and
+joined in page order.
+"""
+
+import atexit
+import logging
+import multiprocessing
+import os
+import pickle  # nosec B403 - only used to check that extractor classes can be sent to workers
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from math import ceil
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple, Type, Union, cast
+
+from .base import ExtractorUnavailableError, PdfExtractor, PdfSource
+
+try:
+    import pypdf
+except ImportError:
+    pypdf = None  # type: ignore
+
+try:
+    import pymupdf
+
+    HAS_PYMUPDF = True
+except ImportError:
+    try:
+        import fitz as pymupdf  # type: ignore[no-redef]
+
+        HAS_PYMUPDF = True
+    except ImportError:
+        pymupdf = None  # type: ignore
+        HAS_PYMUPDF = False
+
+try:
+    import pdfplumber
+
+    HAS_PDFPLUMBER = True
+except ImportError:
+    pdfplumber = None  # type: ignore
+    HAS_PDFPLUMBER = False
+
+try:
+    import pypdfium2
+
+    HAS_PYPDFIUM2 = True
+except ImportError:
+    pypdfium2 = None  # type: ignore
+    HAS_PYPDFIUM2 = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PDF_EXTRACTOR = "pypdf"
+
+# Documents with fewer pages are extracted in-process; pool overhead dominates below this
+DEFAULT_PARALLEL_MIN_PAGES = 16
+
+# Lower bound on pages per pool task, so each worker amortizes opening the file
+MIN_PAGES_PER_TASK = 4
+
+
+def is_path(source: PdfSource) -> bool:
+    """Whether ``source`` is a file path rather than a stream."""
+    return isinstance(source, (str, Path))
+
+
+@contextmanager
+def _binary_stream(source: PdfSource) -> Iterator[BinaryIO]:
+    """Open a path, or rewind a stream, for reading."""
+    if is_path(source):
+        with open(cast(Union[str, Path], source), "rb") as file:
+            yield file
+    else:
+        stream: BinaryIO = source  # type: ignore[assignment]
+        stream.seek(0)
+        yield stream
+
+
+def _open_target(source: PdfSource) -> Any:
+    """Argument for libraries that accept a path or a rewound file object."""
+    if is_path(source):
+        return str(source)
+    source.seek(0)  # type: ignore[union-attr]
+    return source
+
+
+class PypdfExtractor(PdfExtractor):
+    """Pure Python backend using pypdf (default)."""
+
+    name = "pypdf"
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return pypdf is not None
+
+    @property
+    def version(self) -> str:
+        return str(getattr(pypdf, "__version__", "unknown"))
+
+    def page_count(self, path: PdfSource) -> int:
+        with _binary_stream(path) as file:
+            return len(pypdf.PdfReader(file).pages)
+
+    def extract_pages(self, path: PdfSource, start: int, end: int) -> List[str]:
+        with _binary_stream(path) as file:
+            reader = pypdf.PdfReader(file)
+            return [reader.pages[i].extract_text() or "" for i in range(start, end)]
+
+
+class PyMuPDFExtractor(PdfExtractor):
+    """MuPDF backend (``pip install pymupdf``)."""
+
+    name = "pymupdf"
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return HAS_PYMUPDF
+
+    @property
+    def version(self) -> str:
+        return str(getattr(pymupdf, "VersionBind", getattr(pymupdf, "__version__", "unknown")))
+
+    @staticmethod
+    def _open(path: PdfSource) -> Any:
+        if is_path(path):
+            return pymupdf.open(str(path))
+        with _binary_stream(path) as stream:
+            return pymupdf.open(stream=stream.read(), filetype="pdf")
+
+    def page_count(self, path: PdfSource) -> int:
+        with self._open(path) as doc:
+            return int(doc.page_count)
+
+    def extract_pages(self, path: PdfSource, start: int, end: int) -> List[str]:
+        with self._open(path) as doc:
+            return [doc[i].get_text() for i in range(start, end)]
+
+
+class PdfplumberExtractor(PdfExtractor):
+    """pdfminer-based backend with better layout handling (``pip install pdfplumber``)."""
+
+    name = "pdfplumber"
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return HAS_PDFPLUMBER
+
+    @property
+    def version(self) -> str:
+        return str(getattr(pdfplumber, "__version__", "unknown"))
+
+    def page_count(self, path: PdfSource) -> int:
+        with pdfplumber.open(_open_target(path)) as pdf:
+            return len(pdf.pages)
+
+    def extract_pages(self, path: PdfSource, start: int, end: int) -> List[str]:
+        with pdfplumber.open(_open_target(path)) as pdf:
+            return [pdf.pages[i].extract_text() or "" for i in range(start, end)]
+
+
+class PypdfiumExtractor(PdfExtractor):
+    """PDFium backend (``pip install pypdfium2``)."""
+
+    name = "pypdfium2"
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return HAS_PYPDFIUM2
+
+    @property
+    def version(self) -> str:
+        return str(getattr(pypdfium2, "__version__", getattr(pypdfium2, "V_PYPDFIUM2", "unknown")))
+
+    def page_count(self, path: PdfSource) -> int:
+        doc = pypdfium2.PdfDocument(_open_target(path))
+        try:
+            return len(doc)
+        finally:
+            doc.close()
+
+    def extract_pages(self, path: PdfSource, start: int, end: int) -> List[str]:
+        doc = pypdfium2.PdfDocument(_open_target(path))
+        try:
+            texts = []
+            for i in range(start, end):
+                textpage = doc[i].get_textpage()
+                texts.append(textpage.get_text_range())
+                textpage.close()
+            return texts
+        finally:
+            doc.close()
+
+
+# Registry of available extractor backends
+PDF_EXTRACTORS: Dict[str, Type[PdfExtractor]] = {
+    PypdfExtractor.name: PypdfExtractor,
+    PyMuPDFExtractor.name: PyMuPDFExtractor,
+    PdfplumberExtractor.name: PdfplumberExtractor,
+    PypdfiumExtractor.name: PypdfiumExtractor,
+}
+
+
+def register_pdf_extractor(extractor_class: Type[PdfExtractor]) -> None:
+    """Register a custom PDF extractor backend under its ``name``."""
+    if not extractor_class.name:
+        raise ValueError("PDF extractor must define a name")
+    PDF_EXTRACTORS[extractor_class.name] = extractor_class
+
+
+def available_pdf_extractors() -> List[str]:
+    """Names of registered backends whose libraries are installed."""
+    return [name for name, cls in PDF_EXTRACTORS.items() if cls.is_available()]
+
+
+def create_pdf_extractor(name: str = DEFAULT_PDF_EXTRACTOR) -> PdfExtractor:
+    """
+    Create a PDF extractor backend by name.
+
+    Raises:
+        ExtractorUnavailableError: If the backend is unknown or not installed
+    """
+    extractor_class = PDF_EXTRACTORS.get(name.lower())
+    if extractor_class is None:
+        raise ExtractorUnavailableError(
+            f"Unknown PDF extractor '{name}'. Available extractors: {list(PDF_EXTRACTORS.keys())}"
+        )
+    if not extractor_class.is_available():
+        raise ExtractorUnavailableError(f"PDF extractor '{name}' is not installed. Install with: pip install {name}")
+    return extractor_class()
+
+
+# Shared process pool, created lazily and reused across documents
+_pool_lock = threading.Lock()
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+
+# Per-process extractor instances used by pool workers
+_worker_extractors: Dict[Type[PdfExtractor], PdfExtractor] = {}
+
+
+def _pool_context() -> multiprocessing.context.BaseContext:
+    # Forking a process that runs thread pools can deadlock; avoid the fork start method
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def get_pdf_process_pool(workers: int) -> ProcessPoolExecutor:
+    """Return the shared extraction pool, recreating it if the worker count changed."""
+    global _pool, _pool_workers
+
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context())
+            _pool_workers = workers
+        return _pool
+
+
+def shutdown_pdf_process_pool() -> None:
+    """Shut down the shared extraction pool, if any."""
+    global _pool, _pool_workers
+
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+            _pool_workers = 0
+
+
+atexit.register(shutdown_pdf_process_pool)
+
+
+def _extract_page_range(extractor_class: Type[PdfExtractor], path: str, start: int, end: int) -> List[str]:
+    """
+    Pool worker entry point: extract one page range with the given backend.
+
+    The class is sent rather than its registry name, since workers are not
+    forked and do not see backends registered in the parent process.
+    """
+    extractor = _worker_extractors.get(extractor_class)
+    if extractor is None:
+        extractor = extractor_class()
+        _worker_extractors[extractor_class] = extractor
+    return extractor.extract_pages(path, start, end)
+
+
+def _is_importable(extractor_class: Type[PdfExtractor]) -> bool:
+    """Whether pool workers can import ``extractor_class`` by its module and qualified name."""
+    try:
+        pickle.dumps(extractor_class)
+    except (pickle.PicklingError, AttributeError, TypeError):
+        return False
+    return True
+
+
+def split_page_ranges(page_count: int, workers: int) -> List[Tuple[int, int]]:
+    """
+    Split ``page_count`` pages into contiguous ranges for ``workers`` processes.
+
+    Produces about two ranges per worker for load balancing, but never ranges
+    smaller than ``MIN_PAGES_PER_TASK`` pages.
+    """
+    if page_count <= 0:
+        return []
+    num_ranges = max(1, min(workers * 2, ceil(page_count / MIN_PAGES_PER_TASK)))
+    size = ceil(page_count / num_ranges)
+    return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+
+def resolve_pdf_workers(workers: int) -> int:
+    """Resolve a configured worker count; values <= 0 mean one per CPU."""
+    if workers > 0:
+        return workers
+    return os.cpu_count() or 1
+
+
+def extract_pdf_text(
+    path: PdfSource,
+    extractor: str = DEFAULT_PDF_EXTRACTOR,
+    workers: int = 1,
+    min_pages: int = DEFAULT_PARALLEL_MIN_PAGES,
+) -> str:
+    """
+    Extract all text from a PDF, in parallel for large documents.
+
+    Args:
+        path: Path to the PDF file, or a seekable binary stream (always
+            extracted in-process, since pool workers cannot share it)
+        extractor: Registered backend name
+        workers: Number of extraction processes (1 disables the pool)
+        min_pages: Minimum page count before the process pool is used
+
+    Returns:
+        Text of all pages concatenated in page order
+    """
+    backend = create_pdf_extractor(extractor)
+    page_count = backend.page_count(path)
+
+    if workers <= 1 or page_count < max(min_pages, 2) or not is_path(path):
+        return "".join(backend.extract_pages(path, 0, page_count))
+
+    if not _is_importable(type(backend)):
+        logger.debug(f"PDF extractor '{backend.name}' cannot be loaded by pool workers, extracting {path} in-process")
+        return "".join(backend.extract_pages(path, 0, page_count))
+
+    ranges = split_page_ranges(page_count, workers)
+    logger.debug(f"Extracting {page_count} pages from {path} in {len(ranges)} ranges with {extractor}")
+
+    try:
+        pool = get_pdf_process_pool(workers)
+        futures = [pool.submit(_extract_page_range, type(backend), str(path), start, end) for start, end in ranges]
+        pages: List[str] = []
+        for future in futures:
+            pages.extend(future.result())
+        return "".join(pages)
+    except BrokenProcessPool as e:
+        logger.warning(f"PDF extraction pool failed ({e}), extracting {path} in-process")
+        shutdown_pdf_process_pool()
+        return "".join(backend.extract_pages(path, 0, page_count))
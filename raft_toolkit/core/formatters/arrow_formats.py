@@ -0,0 +1,132 @@
+"""
+Vectorized output formats on Arrow tables.
+
+These produce the same rows as the Python transforms of the
+``DatasetFormatter`` classes, but with ``pyarrow.compute`` kernels: filter
+masks instead of per-row predicates, element-wise string joins instead of
+concatenation in Python, and string split and regex kernels instead of
+``str.split``.
+Each transform is a single pass over the table.
+
+Kernels missing from the installed pyarrow (older releases, or builds
+without RE2) raise ``pa.ArrowNotImplementedError``; callers fall back to the
+Python transforms then.
+"""
+
+from typing import Callable, Dict, List
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Everything up to the last "<ANSWER>: " marker, as removed by ``extract_final_answer``
+_FINAL_ANSWER_PREFIX = r"(?s)^.*<ANSWER>: "
+
+
+def non_empty(column: "pa.ChunkedArray") -> "pa.ChunkedArray":
+    """Mask of values that are neither null nor empty, like Python truthiness of strings."""
+    return pc.fill_null(pc.greater(pc.binary_length(column), 0), False)
+
+
+def final_answers(column: "pa.ChunkedArray") -> "pa.ChunkedArray":
+    """Vectorized ``extract_final_answer``: text after the last answer marker, null for empty values."""
+    extracted = pc.replace_substring_regex(column, pattern=_FINAL_ANSWER_PREFIX, replacement="")
+    return pc.if_else(non_empty(column), extracted, pa.scalar(None, extracted.type))
+
+
+def contexts(column: "pa.ChunkedArray") -> "pa.ChunkedArray":
+    """Vectorized ``extract_context``: every line but the last, empty for single-line values."""
+    stripped = pc.list_element(pc.split_pattern(column, "\n", max_splits=1, reverse=True), 0)
+    return pc.if_else(pc.match_substring(column, "\n"), stripped, pa.scalar("", stripped.type))
+
+
+def _append(column: "pa.ChunkedArray", suffix: str) -> "pa.ChunkedArray":
+    return pc.binary_join_element_wise(column, pa.scalar(suffix, column.type), "")
+
+
+def _filter(table: "pa.Table", columns: List[str], keep: List[str]) -> "pa.Table":
+    """Rows where every column of ``columns`` is non-empty, with only the ``keep`` columns copied."""
+    mask = non_empty(table[columns[0]])
+    for column in columns[1:]:
+        mask = pc.and_(mask, non_empty(table[column]))
+    table = table.select([column for column in table.column_names if column in keep])
+    if pc.all(mask).as_py() is not False:
+        return table  # Nothing to drop, keep the columns zero-copy
+    return table.filter(mask)
+
+
+def hf_table(table: "pa.Table", params: Dict[str, str]) -> "pa.Table":
+    return table
+
+
+def completion_table(table: "pa.Table", params: Dict[str, str]) -> "pa.Table":
+    prompt_column = params.get("prompt_column", "prompt")
+    completion_column = params.get("completion_column", "completion")
+    stop = params.get("stop", "<STOP>")
+
+    table = _filter(table, ["cot_answer", "instruction"], keep=["cot_answer", "instruction"])
+    return pa.table({prompt_column: table["instruction"], completion_column: _append(table["cot_answer"], stop)})
+
+
+def _messages(roles: List[str], contents: List["pa.Array"]) -> "pa.ListArray":
+    """Interleave per-role content arrays into one ``messages`` list per row."""
+    rows = len(contents[0])
+    width = len(roles)
+    # Contents are concatenated role by role; message i of row r is at i * rows + r
+    order = np.arange(rows * width).reshape(width, rows).T.ravel()
+    content = pa.concat_arrays([array.cast(pa.string()) for array in contents]).take(pa.array(order))
+    role = pa.array(roles, pa.string()).take(pa.array(np.tile(np.arange(width), rows)))
+    offsets = pa.array(np.arange(0, rows * width + 1, width, dtype=np.int32))
+    return pa.ListArray.from_arrays(offsets, pa.StructArray.from_arrays([role, content], names=["role", "content"]))
+
+
+def chat_table(table: "pa.Table", params: Dict[str, str]) -> "pa.Table":
+    stop = params.get("stop", "<STOP>")
+    table = _filter(table, ["cot_answer", "instruction"], keep=["cot_answer", "instruction"])
+
+    roles = ["user", "assistant"]
+    if "system_prompt" in params:
+        roles.insert(0, "system")
+    batches = []
+    # Per record batch, so string offsets of the interleaved contents stay within 32 bits
+    for batch in table.select(["instruction", "cot_answer"]).to_batches():
+        contents = [batch.column(0), _append(batch.column(1), stop)]
+        if "system_prompt" in params:
+            contents.insert(0, pa.repeat(pa.scalar(params["system_prompt"], pa.string()), batch.num_rows))
+        batches.append(pa.record_batch([_messages(roles, contents)], names=["messages"]))
+    if not batches:
+        message = pa.struct([("role", pa.string()), ("content", pa.string())])
+        return pa.table({"messages": pa.array([], pa.list_(message))})
+    return pa.Table.from_batches(batches)
+
+
+def eval_table(table: "pa.Table", params: Dict[str, str]) -> "pa.Table":
+    table = _filter(
+        table, ["cot_answer", "instruction", "context"], keep=["question", "answer", "cot_answer", "instruction"]
+    )
+
+    columns = {"question": table["question"]}
+    if "answer" in table.column_names:
+        columns["answer"] = table["answer"]
+    columns["gold_final_answer"] = final_answers(table["cot_answer"])
+    if "answer" in table.column_names:
+        columns["final_answer"] = final_answers(table["answer"])
+    else:
+        columns["final_answer"] = pa.nulls(table.num_rows, pa.string())
+    columns["context"] = contexts(table["instruction"])
+    return pa.table(columns)
+
+
+ARROW_FORMATS: Dict[str, Callable[["pa.Table", Dict[str, str]], "pa.Table"]] = {
+    "hf": hf_table,
+    "completion": completion_table,
+    "chat": chat_table,
+    "eval": eval_table,
+}
+
+
+def format_table(format: str, table: "pa.Table", params: Dict[str, str]) -> "pa.Table":
+    """Transform an Arrow table of raw records into the given output format."""
+    if format not in ARROW_FORMATS:
+        raise ValueError(f"Output Format {format} is not supported, please select one of {list(ARROW_FORMATS)}")
+    return ARROW_FORMATS[format](table, params)
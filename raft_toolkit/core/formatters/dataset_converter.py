@@ -1,12 +1,22 @@
 import argparse
+import glob
 import logging
+import time
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Literal, Optional
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Literal, Optional
 from typing import get_args as typing_get_args
 
+import pyarrow as pa
+import pyarrow.dataset as pads
+import pyarrow.json as pajson
 from datasets import Dataset, load_dataset
+from datasets.fingerprint import generate_random_fingerprint
+from datasets.table import InMemoryTable
 
 from ..logging.setup import log_setup
+from .arrow_formats import format_table
+from .record_formats import extract_context, extract_final_answer
 
 """
 This file allows to convert raw HuggingFace Datasets into files suitable to fine tune completion and chat models.
@@ -15,12 +25,18 @@ This file allows to convert raw HuggingFace Datasets into files suitable to fine
 OutputDatasetType = Literal["parquet", "jsonl"]
 outputDatasetTypes = list(typing_get_args(OutputDatasetType))
 
-InputDatasetType = Literal["arrow", "jsonl"]
+InputDatasetType = Literal["arrow", "jsonl", "parquet", "normalized"]
 inputDatasetTypes = list(typing_get_args(InputDatasetType))
 
 DatasetFormat = Literal["hf", "completion", "chat", "eval"]
 datasetFormats = list(typing_get_args(DatasetFormat))
 
+logger = logging.getLogger(__name__)
+
+STREAMING_BATCH_SIZE = 10_000
+JSONL_BLOCK_BYTES = 16 * 1024 * 1024
+PROGRESS_INTERVAL = 10.0
+
 
 def get_args() -> argparse.Namespace:
     """
@@ -68,6 +84,35 @@ def get_args() -> argparse.Namespace:
     parser.add_argument(
         "--output-completion-stop", type=str, default="<STOP>", help="The stop keyword to use for the completion format"
     )
+    parser.add_argument(
+        "--num-proc",
+        type=int,
+        default=None,
+        help="Processes for the Python formatters, used when pyarrow lacks a vectorized kernel",
+    )
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Convert in record batches with constant memory instead of loading the whole dataset",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=STREAMING_BATCH_SIZE,
+        help=f"Rows per record batch in streaming mode. Defaults to {STREAMING_BATCH_SIZE}.",
+    )
+    parser.add_argument(
+        "--max-shard-bytes",
+        type=int,
+        default=None,
+        help="Split the output into shards of at most this many bytes, listed in a manifest",
+    )
+    parser.add_argument(
+        "--max-shard-rows",
+        type=int,
+        default=None,
+        help="Split the output into shards of at most this many rows, listed in a manifest",
+    )
 
     args = parser.parse_args()
     return args
@@ -103,14 +148,20 @@ class DatasetConverter:
     formats: Dict[DatasetFormat, DatasetFormatter]
     exporters: Dict[OutputDatasetType, Any]
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        num_proc: Optional[int] = None,
+        max_shard_bytes: Optional[int] = None,
+        max_shard_rows: Optional[int] = None,
+    ) -> None:
         self.formats = {
             "hf": HuggingFaceDatasetFormatter(),
-            "completion": OpenAiCompletionDatasetFormatter(),
-            "chat": OpenAiChatDatasetFormatter(),
-            "eval": EvalDatasetFormatter(),
+            "completion": OpenAiCompletionDatasetFormatter(num_proc=num_proc),
+            "chat": OpenAiChatDatasetFormatter(num_proc=num_proc),
+            "eval": EvalDatasetFormatter(num_proc=num_proc),
         }
-        self.exporters = {"parquet": ParquetDatasetExporter(), "jsonl": JsonlDatasetExporter()}
+        shards = {"max_shard_bytes": max_shard_bytes, "max_shard_rows": max_shard_rows, "num_proc": num_proc}
+        self.exporters = {"parquet": ParquetDatasetExporter(**shards), "jsonl": JsonlDatasetExporter(**shards)}
 
     def convert(
         self,
@@ -131,7 +182,7 @@ class DatasetConverter:
         formatter = self.formats[format]
         newds = formatter.format(ds, params)
         exporter = self.exporters[output_type]
-        exporter.export(newds, output_path)
+        return exporter.export(newds, output_path)
 
 
 class HuggingFaceDatasetFormatter(DatasetFormatter):
@@ -165,125 +216,131 @@ def _remove_all_columns_but(ds: Dataset, keep_columns: List[str]) -> Dataset:
     return ds
 
 
-class OpenAiCompletionDatasetFormatter(DatasetFormatter):
+class ArrowDatasetFormatter(DatasetFormatter):
+    """
+    Base class for formatters with a vectorized ``pyarrow.compute`` implementation.
+    Falls back to the Python implementation, run with ``num_proc`` processes,
+    when the installed pyarrow lacks a kernel or the columns are not strings.
+    """
+
+    format_name: DatasetFormat
+
+    def __init__(self, num_proc: Optional[int] = None) -> None:
+        self.num_proc = num_proc
+
+    def format(self, ds: Dataset, params: Dict[str, str]) -> Dataset:
+        try:
+            table = format_table(self.format_name, ds.with_format("arrow")[:], params)
+        except (pa.ArrowNotImplementedError, pa.ArrowTypeError) as e:
+            logger.warning(f"Vectorized {self.format_name} formatting unavailable ({e}), using the Python formatter")
+            return self.format_python(ds, params)
+        # A random fingerprint, as hashing the whole table for one would cost more than the transform
+        return Dataset(InMemoryTable(table), fingerprint=generate_random_fingerprint())
+
+    @abstractmethod
+    def format_python(self, ds: Dataset, params: Dict[str, str]) -> Dataset:
+        pass
+
+
+class OpenAiCompletionDatasetFormatter(ArrowDatasetFormatter):
     """
     Returns the Dataset in the OpenAI Completion Fine-tuning file format with two fields "prompt" and "completion".
     Field names can be customized because different systems have different expectations.
     https://platform.openai.com/docs/guides/fine-tuning/preparing-your-dataset
     """
 
-    def format(self, ds: Dataset, params: Dict[str, str]) -> Dataset:
+    format_name = "completion"
+
+    def format_python(self, ds: Dataset, params: Dict[str, str]) -> Dataset:
         prompt_column = params.get("prompt_column", "prompt")
         completion_column = params.get("completion_column", "completion")
         stop = params.get("stop", "<STOP>")
 
         newds = ds.filter(
-            lambda example: example["cot_answer"] and example["instruction"], desc="Filter out empty examples"
+            lambda examples: [
+                bool(answer and instruction)
+                for answer, instruction in zip(examples["cot_answer"], examples["instruction"])
+            ],
+            batched=True,
+            num_proc=self.num_proc,
+            desc="Filter out empty examples",
         )
         newds = newds.rename_columns(column_mapping={"instruction": prompt_column})
         newds = newds.map(
             lambda examples: {completion_column: [answer + stop for answer in examples["cot_answer"]]},
             batched=True,
+            num_proc=self.num_proc,
             desc=f"Rename fields and add {stop} token",
         )
         return _remove_all_columns_but(newds, [prompt_column, completion_column])
 
 
-class OpenAiChatDatasetFormatter(DatasetFormatter):
+class OpenAiChatDatasetFormatter(ArrowDatasetFormatter):
     """
     Returns the Dataset in the OpenAI Chat Fine-tuning file format with one field "messages".
     https://platform.openai.com/docs/guides/fine-tuning/preparing-your-dataset
     """
 
-    def format(self, ds: Dataset, params: Dict[str, str]) -> Dataset:
+    format_name = "chat"
+
+    def format_python(self, ds: Dataset, params: Dict[str, str]) -> Dataset:
         # First format as completion dataset
-        completion_formatter = OpenAiCompletionDatasetFormatter()
-        newds = completion_formatter.format(ds, params)
+        completion_formatter = OpenAiCompletionDatasetFormatter(num_proc=self.num_proc)
+        newds = completion_formatter.format_python(ds, params)
 
         prompt_column = params.get("prompt_column", "prompt")
         completion_column = params.get("completion_column", "completion")
+        system = [{"role": "system", "content": params["system_prompt"]}] if "system_prompt" in params else []
 
-        def format_messages(row):
-            messages = []
-            if "system_prompt" in params:
-                system_prompt = params["system_prompt"]
-                messages.append({"role": "system", "content": system_prompt})
-            messages.extend(
-                [
-                    {"role": "user", "content": row[prompt_column]},
-                    {"role": "assistant", "content": row[completion_column]},
+        def format_messages(examples):
+            return {
+                "messages": [
+                    system + [{"role": "user", "content": prompt}, {"role": "assistant", "content": completion}]
+                    for prompt, completion in zip(examples[prompt_column], examples[completion_column])
                 ]
-            )
-            chat_row = {"messages": messages}
-            return chat_row
+            }
 
-        newds = newds.map(format_messages)
+        newds = newds.map(format_messages, batched=True, num_proc=self.num_proc)
         return _remove_all_columns_but(newds, ["messages"])
 
 
-def extract_final_answer(cot_answer: str) -> Optional[str]:
-    """
-    Extracts the final answer from the cot_answer field
-
-    Args:
-        cot_answer (str): The chain-of-thought answer string
-
-    Returns:
-        Optional[str]: The extracted final answer or None if not found
-    """
-    if cot_answer:
-        return cot_answer.split("<ANSWER>: ")[-1]
-    return None
-
-
-def extract_context(instruction: str) -> str:
-    """
-    Extracts the context from the instruction field.
-    Keeps all <DOCUMENTS/> and removes the last line with the question.
-
-    Args:
-        instruction (str): The instruction string
-
-    Returns:
-        str: The extracted context
-    """
-    return "\n".join(instruction.split("\n")[:-1])
-
-
-class EvalDatasetFormatter(DatasetFormatter):
+class EvalDatasetFormatter(ArrowDatasetFormatter):
     """
     Returns the Dataset in a format suitable for evaluation. Extracts final answer separates context from question.
     """
 
-    def format(self, ds: Dataset, params: Dict[str, str]) -> Dataset:
+    format_name = "eval"
+
+    def format_python(self, ds: Dataset, params: Dict[str, str]) -> Dataset:
         newds = ds.filter(
-            lambda example: example["cot_answer"] and example["instruction"] and example["context"],
+            lambda examples: [
+                bool(answer and instruction and context)
+                for answer, instruction, context in zip(
+                    examples["cot_answer"], examples["instruction"], examples["context"]
+                )
+            ],
+            batched=True,
+            num_proc=self.num_proc,
             desc="Filter out empty examples",
         )
         newds = newds.rename_columns({"context": "context_sentences"})
-        newds = newds.map(
-            lambda examples: {"gold_final_answer": [extract_final_answer(answer) for answer in examples["cot_answer"]]},
-            batched=True,
-        )
-        keep_columns = ["question", "gold_final_answer", "context"]
-        if "answer" in newds.column_names:
-            # Add columns to the list without using list comprehension
-            keep_columns.append("answer")
-            keep_columns.append("final_answer")
-
-            newds = newds.map(
-                lambda examples: {"final_answer": [extract_final_answer(answer) for answer in examples["answer"]]},
-                batched=True,
-            )
-        else:
-            # Add a column with empty values initially, using the dataset length to create an empty list
-            newds = newds.add_column("final_answer", [None] * len(newds))
-            keep_columns.append("final_answer")
-
-        newds = newds.map(
-            lambda examples: {"context": [extract_context(instruction) for instruction in examples["instruction"]]},
-            batched=True,
-        )
+        has_answer = "answer" in newds.column_names
+
+        def extract(examples):
+            return {
+                "gold_final_answer": [extract_final_answer(answer) for answer in examples["cot_answer"]],
+                "final_answer": (
+                    [extract_final_answer(answer) for answer in examples["answer"]]
+                    if has_answer
+                    else [None] * len(examples["cot_answer"])
+                ),
+                "context": [extract_context(instruction) for instruction in examples["instruction"]],
+            }
+
+        newds = newds.map(extract, batched=True, num_proc=self.num_proc)
+        keep_columns = ["question", "answer", "gold_final_answer", "final_answer", "context"]
+        if not has_answer:
+            keep_columns.remove("answer")
         return _remove_all_columns_but(newds, keep_columns)
 
 
@@ -313,22 +370,314 @@ def append_extension(path: str, extension: str) -> str:
     return str(path_obj)
 
 
-class JsonlDatasetExporter(DatasetExporter):
+class ShardedDatasetExporter(DatasetExporter):
     """
-    Exports the Dataset to a JSONL file
+    Base class for exporters that can split their output into shards of at
+    most ``max_shard_bytes`` bytes and/or ``max_shard_rows`` rows, named
+    ``<stem>-XXXXX-of-YYYYY.<type>`` and listed with their row counts and
+    SHA-256 checksums in ``<stem>.manifest.json``. Without limits a single
+    file is written.
+
+    Row-bounded shards are written in parallel with ``num_proc`` threads;
+    size-bounded shards are written one after the other since their
+    boundaries are only known once the rows are serialized.
     """
 
+    extension: str
+
+    def __init__(
+        self,
+        max_shard_bytes: Optional[int] = None,
+        max_shard_rows: Optional[int] = None,
+        num_proc: Optional[int] = None,
+    ) -> None:
+        self.max_shard_bytes = max_shard_bytes
+        self.max_shard_rows = max_shard_rows
+        self.num_proc = num_proc
+
+    @property
+    def sharded(self) -> bool:
+        return self.max_shard_bytes is not None or self.max_shard_rows is not None
+
     def export(self, ds: Dataset, output_path: str):
-        ds.to_json(append_extension(output_path, "jsonl"))
+        output_file = append_extension(output_path, self.extension)
+        if not self.sharded:
+            return self.export_file(ds, output_file)
+        return self.export_shards(ds, output_file)
+
+    @abstractmethod
+    def export_file(self, ds: Dataset, output_file: str):
+        pass
+
+    def export_shards(self, ds: Dataset, output_file: str) -> Dict[str, Any]:
+        from ..services.dataset_writer import write_row_shards, write_sharded
+
+        table = ds.with_format("arrow")[:]
+        if self.max_shard_bytes is None and self.max_shard_rows is not None:
+            rows = self.max_shard_rows
+            slices = [table.slice(start, rows) for start in range(0, ds.num_rows, rows)]
+            return write_row_shards(slices, output_file, rows, workers=self.num_proc)
+        return write_sharded(
+            [table], output_file, max_shard_bytes=self.max_shard_bytes, max_shard_rows=self.max_shard_rows
+        )
+
+
+class JsonlDatasetExporter(ShardedDatasetExporter):
+    """
+    Exports the Dataset to a JSONL file
+    """
+
+    extension = "jsonl"
+
+    def export_file(self, ds: Dataset, output_file: str):
+        ds.to_json(output_file, num_proc=self.num_proc)
 
 
-class ParquetDatasetExporter(DatasetExporter):
+class ParquetDatasetExporter(ShardedDatasetExporter):
     """
     Exports the Dataset to a Parquet file
     """
 
-    def export(self, ds: Dataset, output_path: str):
-        ds.to_parquet(append_extension(output_path, "parquet"))
+    extension = "parquet"
+
+    def export_file(self, ds: Dataset, output_file: str):
+        ds.to_parquet(output_file)
+
+
+def materialize_normalized(
+    input_path: str, format: DatasetFormat, output_path: str, output_type: OutputDatasetType, params: Dict[str, str]
+) -> int:
+    """
+    Expands a normalized dataset (chunk table plus QA rows referencing chunk ids)
+    to a flat output format, streaming the QA rows in batches.
+
+    Args:
+        input_path (str): Directory of the normalized dataset
+        format (DatasetFormat): Output format
+        output_path (str): Output file
+        output_type (OutputDatasetType): Output file type
+        params (Dict[str, str]): Format parameters
+
+    Returns:
+        int: The number of records materialized
+    """
+    from pathlib import Path
+
+    from ..services.dataset_writer import ExportTarget, StreamingDatasetWriter
+    from ..services.normalized_dataset import is_normalized_dataset, materialize
+
+    if not is_normalized_dataset(input_path):
+        raise ValueError(f"{input_path} is not a normalized dataset directory")
+
+    output_file = Path(append_extension(output_path, output_type))
+    writer = StreamingDatasetWriter(
+        output_file.parent,
+        exports=[ExportTarget(format, output_type, output_file.name)],
+        params=params,
+        write_arrow=False,
+    )
+    try:
+        count = materialize(input_path, writer)
+    except BaseException:
+        writer.abort()
+        raise
+    writer.close()
+    return count
+
+
+def _input_files(input_path: str) -> List[str]:
+    """
+    Resolves the input files: a file, a glob pattern, or the ``data-*.arrow``
+    shards of a dataset saved with ``save_to_disk``.
+    """
+    path = Path(input_path)
+    if path.is_dir():
+        files = sorted(str(shard) for shard in path.glob("data-*.arrow"))
+    else:
+        files = sorted(glob.glob(input_path)) or [input_path]
+    for file in files:
+        if not Path(file).is_file():
+            raise FileNotFoundError(f"Input file not found: {file}")
+    return files
+
+
+def _iter_jsonl_batches(path: str, batch_size: int, block_bytes: int = JSONL_BLOCK_BYTES) -> Iterator[pa.RecordBatch]:
+    """
+    Parses a JSONL file block by block with the Arrow JSON reader, never
+    holding more than one block of lines in memory.
+    """
+    remainder = b""
+    with open(path, "rb") as file:
+        while True:
+            data = file.read(block_bytes)
+            block = remainder + data
+            if data:
+                # Only parse complete lines; the tail goes with the next block
+                cut = block.rfind(b"\n") + 1
+                block, remainder = block[:cut], block[cut:]
+            if block.strip():
+                try:
+                    table = pajson.read_json(pa.BufferReader(block))
+                except pa.ArrowInvalid:
+                    # A line longer than the reader's block size; parse the lines as one block
+                    options = pajson.ReadOptions(block_size=len(block))
+                    table = pajson.read_json(pa.BufferReader(block), read_options=options)
+                # Columns null throughout a block are strings in RAFT datasets
+                for i, field in enumerate(table.schema):
+                    if pa.types.is_null(field.type):
+                        table = table.set_column(i, field.name, table.column(i).cast(pa.string()))
+                yield from table.to_batches(max_chunksize=batch_size)
+            if not data:
+                return
+
+
+def _iter_arrow_batches(path: str) -> Iterator[pa.RecordBatch]:
+    """Reads an Arrow file as written by HuggingFace datasets (IPC stream format) or in IPC file format."""
+    with pa.memory_map(path) as source:
+        try:
+            reader = pa.ipc.open_stream(source)
+        except pa.ArrowInvalid:
+            source.seek(0)
+            file_reader = pa.ipc.open_file(source)
+            for i in range(file_reader.num_record_batches):
+                yield file_reader.get_batch(i)
+            return
+        yield from reader
+
+
+def iter_input_batches(
+    input_path: str, input_type: InputDatasetType, batch_size: int = STREAMING_BATCH_SIZE
+) -> Iterator[pa.RecordBatch]:
+    """
+    Iterates over the records of a JSONL, Parquet or Arrow input in record
+    batches of at most ``batch_size`` rows.
+
+    Args:
+        input_path (str): Input file, glob pattern or ``save_to_disk`` directory
+        input_type (InputDatasetType): Format of the input
+        batch_size (int): Maximum rows per batch
+
+    Returns:
+        Iterator[pa.RecordBatch]: The record batches
+    """
+    files = _input_files(input_path)
+    if input_type == "parquet":
+        yield from pads.dataset(files, format="parquet").to_batches(batch_size=batch_size)
+    elif input_type == "jsonl":
+        for file in files:
+            yield from _iter_jsonl_batches(file, batch_size)
+    elif input_type == "arrow":
+        for file in files:
+            for batch in _iter_arrow_batches(file):
+                yield from pa.Table.from_batches([batch]).to_batches(max_chunksize=batch_size)
+    else:
+        raise ValueError(f"Input type {input_type} cannot be streamed, please select one of jsonl, parquet, arrow")
+
+
+def stream_convert(
+    input_path: str,
+    input_type: InputDatasetType,
+    format: DatasetFormat,
+    output_path: str,
+    output_type: OutputDatasetType,
+    params: Dict[str, str],
+    batch_size: int = STREAMING_BATCH_SIZE,
+    progress_interval: float = PROGRESS_INTERVAL,
+    max_shard_bytes: Optional[int] = None,
+    max_shard_rows: Optional[int] = None,
+) -> Dict[str, float]:
+    """
+    Converts a dataset in record batches: each batch is read, formatted with
+    the vectorized Arrow transforms and appended to the output before the next
+    one is read, so memory use does not depend on the dataset size. Progress is
+    logged in rows/s every ``progress_interval`` seconds.
+
+    Args:
+        input_path (str): Input file, glob pattern or ``save_to_disk`` directory
+        input_type (InputDatasetType): Format of the input
+        format (DatasetFormat): Output format
+        output_path (str): Output file
+        output_type (OutputDatasetType): Output file type
+        params (Dict[str, str]): Format parameters
+        batch_size (int): Rows per record batch
+        progress_interval (float): Seconds between progress logs
+        max_shard_bytes (Optional[int]): Split the output into shards of at most this many bytes
+        max_shard_rows (Optional[int]): Split the output into shards of at most this many rows
+
+    Returns:
+        Dict[str, float]: Rows read and written, elapsed seconds and rows/s
+    """
+    from ..services.dataset_writer import RECORD_COLUMNS, JsonlStreamWriter, ParquetStreamWriter, ShardedFileWriter
+
+    if format not in datasetFormats:
+        raise Exception(f"Output Format {format} is not supported, pleased select one of {datasetFormats}")
+    if output_type not in outputDatasetTypes:
+        raise Exception(f"Output Type {output_type} is not supported, pleased select one of {outputDatasetTypes}")
+
+    output_file = append_extension(output_path, output_type)
+    sharded = max_shard_bytes is not None or max_shard_rows is not None
+    writer: Any = None
+    if sharded:
+        writer = ShardedFileWriter(output_file, max_shard_bytes=max_shard_bytes, max_shard_rows=max_shard_rows)
+    elif output_type == "jsonl":
+        writer = JsonlStreamWriter(output_file)
+    schema: Optional[pa.Schema] = None
+    rows_read = rows_written = 0
+    start = last_progress = time.perf_counter()
+    try:
+        for batch in iter_input_batches(input_path, input_type, batch_size):
+            table = format_table(format, pa.Table.from_batches([batch]), params)
+            rows_read += batch.num_rows
+            if schema is None:
+                schema = table.schema
+            elif table.schema != schema:
+                table = table.cast(schema)
+
+            if sharded:
+                writer.write_table(table)
+            elif output_type == "jsonl":
+                writer.write(table.to_pylist())
+            else:
+                if writer is None:
+                    writer = ParquetStreamWriter(output_file, schema)
+                for record_batch in table.to_batches():
+                    writer.write_batch(record_batch)
+            rows_written += table.num_rows
+
+            now = time.perf_counter()
+            if now - last_progress >= progress_interval:
+                last_progress = now
+                logger.info(f"Converted {rows_read:,} rows ({rows_read / (now - start):,.0f} rows/s)")
+
+        if schema is None and output_type == "parquet":
+            # No input rows: write an empty Parquet file with the schema of the format
+            empty = pa.table({column: pa.array([], pa.string()) for column in RECORD_COLUMNS})
+            schema = format_table(format, empty, params).schema
+            if sharded:
+                writer.set_schema(schema)
+            else:
+                writer = ParquetStreamWriter(output_file, schema)
+    except BaseException:
+        if sharded:
+            writer.abort()
+            writer = None
+        raise
+    finally:
+        if writer is not None:
+            writer.close()
+
+    seconds = time.perf_counter() - start
+    stats = {
+        "rows_read": rows_read,
+        "rows_written": rows_written,
+        "seconds": seconds,
+        "rows_per_second": rows_read / seconds if seconds else 0.0,
+    }
+    logger.info(
+        f"Converted {rows_read:,} rows to {rows_written:,} {format} rows in {output_file} "
+        f"in {seconds:.1f}s ({stats['rows_per_second']:,.0f} rows/s)"
+    )
+    return stats
 
 
 def main():
@@ -345,10 +694,6 @@ def main():
         input_type = "json"
 
     logger = logging.getLogger("raft")
-    # Load dataset from local files only - not from HuggingFace Hub
-    ds = load_dataset(input_type, data_files={"train": args.input}, trust_remote_code=False)["train"]  # nosec B615
-    logger.info(f"Dataset has {ds.num_rows} rows")
-    formatter = DatasetConverter()
 
     if args.output_chat_system_prompt and args.output_format != "chat":
         raise Exception("Parameter --output-chat-system-prompt can only be used with --output-format chat")
@@ -372,6 +717,30 @@ def main():
         f"Converting {args.input_type} file {args.input} to {args.output_type} {args.output_format} file {args.output}"
     )
 
+    if input_type == "normalized":
+        materialize_normalized(args.input, args.output_format, args.output, args.output_type, format_params)
+        return
+
+    if args.streaming:
+        stream_convert(
+            args.input,
+            args.input_type,
+            args.output_format,
+            args.output,
+            args.output_type,
+            format_params,
+            batch_size=args.batch_size,
+            max_shard_bytes=args.max_shard_bytes,
+            max_shard_rows=args.max_shard_rows,
+        )
+        return
+
+    # Load dataset from local files only - not from HuggingFace Hub
+    ds = load_dataset(input_type, data_files={"train": args.input}, trust_remote_code=False)["train"]  # nosec B615
+    logger.info(f"Dataset has {ds.num_rows} rows")
+    formatter = DatasetConverter(
+        num_proc=args.num_proc, max_shard_bytes=args.max_shard_bytes, max_shard_rows=args.max_shard_rows
+    )
     formatter.convert(
         ds=ds, format=args.output_format, output_path=args.output, output_type=args.output_type, params=format_params
     )
@@ -0,0 +1,126 @@
+"""
+Row-level output formats for raw RAFT records.
+
+These transforms produce the same rows as the ``DatasetFormatter`` classes,
+but on plain record batches instead of ``Dataset`` objects: no ``filter`` or
+``map`` pass, and no Arrow cache files. They let one scan of the records
+feed any number of output formats.
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+Record = Dict[str, Any]
+
+
+def extract_final_answer(cot_answer: str) -> Optional[str]:
+    """
+    Extracts the final answer from the cot_answer field
+
+    Args:
+        cot_answer (str): The chain-of-thought answer string
+
+    Returns:
+        Optional[str]: The extracted final answer or None if not found
+    """
+    if cot_answer:
+        return cot_answer.split("<ANSWER>: ")[-1]
+    return None
+
+
+def extract_context(instruction: str) -> str:
+    """
+    Extracts the context from the instruction field.
+    Keeps all <DOCUMENTS/> and removes the last line with the question.
+
+    Args:
+        instruction (str): The instruction string
+
+    Returns:
+        str: The extracted context
+    """
+    return "\n".join(instruction.split("\n")[:-1])
+
+
+def _hf_rows(records: List[Record], params: Dict[str, str]) -> List[Record]:
+    return records
+
+
+def _completion_rows(records: List[Record], params: Dict[str, str]) -> List[Record]:
+    prompt_column = params.get("prompt_column", "prompt")
+    completion_column = params.get("completion_column", "completion")
+    stop = params.get("stop", "<STOP>")
+    return [
+        {prompt_column: record["instruction"], completion_column: record["cot_answer"] + stop}
+        for record in records
+        if record.get("cot_answer") and record.get("instruction")
+    ]
+
+
+def _chat_rows(records: List[Record], params: Dict[str, str]) -> List[Record]:
+    system = [{"role": "system", "content": params["system_prompt"]}] if "system_prompt" in params else []
+    stop = params.get("stop", "<STOP>")
+    return [
+        {
+            "messages": system
+            + [
+                {"role": "user", "content": record["instruction"]},
+                {"role": "assistant", "content": record["cot_answer"] + stop},
+            ]
+        }
+        for record in records
+        if record.get("cot_answer") and record.get("instruction")
+    ]
+
+
+def _eval_rows(records: List[Record], params: Dict[str, str]) -> List[Record]:
+    return [
+        {
+            "question": record["question"],
+            "answer": record.get("answer"),
+            "gold_final_answer": extract_final_answer(record["cot_answer"]),
+            "final_answer": extract_final_answer(record["answer"]) if record.get("answer") is not None else None,
+            "context": extract_context(record["instruction"]),
+        }
+        for record in records
+        if record.get("cot_answer") and record.get("instruction") and record.get("context")
+    ]
+
+
+RECORD_FORMATS: Dict[str, Callable[[List[Record], Dict[str, str]], List[Record]]] = {
+    "hf": _hf_rows,
+    "completion": _completion_rows,
+    "chat": _chat_rows,
+    "eval": _eval_rows,
+}
+
+
+def format_records(format: str, records: List[Record], params: Dict[str, str]) -> List[Record]:
+    """Transform raw records into rows of the given output format."""
+    if format not in RECORD_FORMATS:
+        raise ValueError(f"Output Format {format} is not supported, please select one of {list(RECORD_FORMATS)}")
+    return RECORD_FORMATS[format](records, params)
+
+
+def format_schema(format: str, params: Dict[str, str], record_schema: "pa.Schema") -> "pa.Schema":
+    """Arrow schema of rows of the given output format."""
+    if format == "hf":
+        return record_schema
+    if format == "completion":
+        return pa.schema(
+            [
+                (params.get("prompt_column", "prompt"), pa.string()),
+                (params.get("completion_column", "completion"), pa.string()),
+            ]
+        )
+    if format == "chat":
+        message = pa.struct([("role", pa.string()), ("content", pa.string())])
+        return pa.schema([("messages", pa.list_(message))])
+    if format == "eval":
+        columns = ["question", "answer", "gold_final_answer", "final_answer", "context"]
+        return pa.schema([(column, pa.string()) for column in columns])
+    raise ValueError(f"Output Format {format} is not supported, please select one of {list(RECORD_FORMATS)}")
@@ -2,12 +2,18 @@
 Data models and types for the RAFT application.
 """
 
+import re
 import uuid
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 from typing import Any, Dict, List, Optional
 
+from .utils.embedding_store import decode_embedding, encode_embedding
+
+# Documents of a rendered QA instruction
+_DOCUMENT_PATTERN = re.compile(r"<DOCUMENT>(.*?)</DOCUMENT>", re.DOTALL)
+
 
 # Enum types
 class DocType(Enum):
@@ -45,14 +51,18 @@ class JobStatus(Enum):
 
 @dataclass
 class DocumentChunk:
-    """Represents a chunk of a document."""
+    """Represents a chunk of a document.
+
+    ``embedding`` is either a plain list of floats or a row view into a shared
+    float32/float16 matrix (see ``utils.embedding_store``).
+    """
 
     id: str
     content: str
     source: str
     metadata: Dict[str, Any]
     created_at: datetime = field(default_factory=datetime.now)
-    embedding: Optional[List[float]] = None
+    embedding: Optional[Any] = None
 
     @classmethod
     def create(
@@ -61,7 +71,7 @@ class DocumentChunk:
         source: str,
         metadata: Optional[Dict[str, Any]] = None,
         chunk_id: Optional[str] = None,
-        embedding: Optional[List[float]] = None,
+        embedding: Optional[Any] = None,
     ) -> "DocumentChunk":
         """Create a new document chunk with generated ID."""
         return cls(
@@ -73,19 +83,22 @@ class DocumentChunk:
         )
 
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for serialization."""
+        """Convert to dictionary for serialization.
+
+        Array embeddings are encoded as base64 raw bytes rather than JSON numbers.
+        """
         return {
             "id": self.id,
             "content": self.content,
             "source": self.source,
             "metadata": self.metadata,
             "created_at": self.created_at.isoformat(),
-            "embedding": self.embedding,
+            "embedding": encode_embedding(self.embedding),
         }
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "DocumentChunk":
-        """Create from dictionary."""
+        """Create from dictionary. Accepts both encoded and list-of-floats embeddings."""
         created_at = datetime.fromisoformat(data["created_at"]) if "created_at" in data else datetime.now()
         return cls(
             id=data["id"],
@@ -93,7 +106,7 @@ class DocumentChunk:
             source=data["source"],
             metadata=data["metadata"],
             created_at=created_at,
-            embedding=data.get("embedding"),
+            embedding=decode_embedding(data.get("embedding")),
         )
 
 
@@ -112,19 +125,74 @@ class Question:
         return cls(id=str(uuid.uuid4()), text=text, chunk_id=chunk_id, metadata=metadata or {})
 
 
-@dataclass
 class QADataPoint:
-    """Represents a question-answer data point with context."""
-
-    id: str
-    type: str
-    question: str
-    context: str  # Changed from Dict to str for simplicity
-    oracle_context: str
-    cot_answer: str
-    instruction: str
-    doctype: str
-    metadata: Dict[str, Any] = field(default_factory=dict)
+    """Represents a question-answer data point with context.
+
+    A point keeps references to its oracle and distractor chunk texts, and
+    their chunk ids when known, instead of copies of them: ``context`` and
+    ``instruction`` are rendered from the chunks when accessed, typically once
+    at serialization. Values passed or assigned explicitly for ``context`` or
+    ``instruction`` are kept as given.
+    """
+
+    __slots__ = (
+        "id",
+        "type",
+        "question",
+        "oracle_context",
+        "distractor_contexts",
+        "cot_answer",
+        "doctype",
+        "oracle_chunk_id",
+        "distractor_chunk_ids",
+        "_context",
+        "_instruction",
+        "_metadata",
+    )
+
+    def __init__(
+        self,
+        id: str,
+        type: str,
+        question: str,
+        context: Optional[str],
+        oracle_context: str,
+        cot_answer: str,
+        instruction: Optional[str],
+        doctype: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        distractor_contexts: Optional[List[str]] = None,
+        oracle_chunk_id: Optional[str] = None,
+        distractor_chunk_ids: Optional[List[str]] = None,
+    ):
+        self.id = id
+        self.type = type
+        self.question = question
+        self.oracle_context = oracle_context
+        self.cot_answer = cot_answer
+        self.doctype = doctype
+        self.oracle_chunk_id = oracle_chunk_id
+        self.distractor_chunk_ids = distractor_chunk_ids
+        self._metadata = metadata
+        self._context = context
+        self._instruction = instruction
+
+        if distractor_contexts is None:
+            # Recover the documents from a rendered instruction, or else from the
+            # blank-line separated context; keep the given strings only where
+            # they differ from what would be rendered
+            documents = _DOCUMENT_PATTERN.findall(instruction or "")
+            if documents[:1] == [oracle_context]:
+                distractor_contexts = documents[1:]
+            else:
+                distractor_contexts = [ctx for ctx in (context or "").split("\n\n") if ctx and ctx != oracle_context]
+            self.distractor_contexts = distractor_contexts
+            if context == self.render_context(oracle_context, distractor_contexts):
+                self._context = None
+            if instruction == self.render_instruction(question, oracle_context, distractor_contexts):
+                self._instruction = None
+        else:
+            self.distractor_contexts = distractor_contexts
 
     @classmethod
     def create(
@@ -135,43 +203,81 @@ class QADataPoint:
         cot_answer: str,
         doctype: str,
         metadata: Optional[Dict[str, Any]] = None,
+        oracle_chunk_id: Optional[str] = None,
+        distractor_chunk_ids: Optional[List[str]] = None,
     ) -> "QADataPoint":
-        """Create a new QA data point."""
-        # Combine oracle and distractor contexts into single string
-        context_parts = [oracle_context]
-        if distractor_contexts:
-            context_parts.extend(distractor_contexts)
-        context = "\n\n".join(context_parts)
-
-        # Build instruction format with documents
-        instruction_parts = []
-        docs = [oracle_context] + distractor_contexts
-        for doc in docs:
-            instruction_parts.append(f"<DOCUMENT>{doc}</DOCUMENT>")
-        instruction_parts.append(question)
-        instruction = "\n".join(instruction_parts)
+        """Create a new QA data point.
 
+        Chunk ids, when given, let the point be stored as references into a
+        chunk table (normalized output layout).
+        """
         return cls(
             id=str(uuid.uuid4()),
             type="api call" if doctype == "api" else "cot",
             question=question,
-            context=context,
+            context=None,
             oracle_context=oracle_context,
             cot_answer=cot_answer,
-            instruction=instruction,
+            instruction=None,
             doctype=doctype,
-            metadata=metadata or {},
+            metadata=metadata,
+            distractor_contexts=list(distractor_contexts),
+            oracle_chunk_id=oracle_chunk_id,
+            distractor_chunk_ids=list(distractor_chunk_ids) if distractor_chunk_ids is not None else None,
         )
 
-    def get_all_contexts(self) -> List[str]:
-        """Get all contexts (oracle + distractors) as a list."""
-        return self.context.split("\n\n")
+    @staticmethod
+    def render_context(oracle_context: str, distractor_contexts: List[str]) -> str:
+        """Combine oracle and distractor contexts into single string."""
+        return "\n\n".join([oracle_context, *distractor_contexts])
+
+    @staticmethod
+    def render_instruction(question: str, oracle_context: str, distractor_contexts: List[str]) -> str:
+        """Build instruction format with documents followed by the question."""
+        documents = [f"<DOCUMENT>{doc}</DOCUMENT>" for doc in [oracle_context, *distractor_contexts]]
+        return "\n".join([*documents, question])
+
+    @property
+    def context(self) -> str:
+        """Oracle and distractor contexts separated by blank lines."""
+        if self._context is not None:
+            return self._context
+        return self.render_context(self.oracle_context, self.distractor_contexts)
+
+    @context.setter
+    def context(self, value: str) -> None:
+        self._context = value
+
+    @property
+    def instruction(self) -> str:
+        """Documents wrapped in ``<DOCUMENT>`` tags followed by the question."""
+        if self._instruction is not None:
+            return self._instruction
+        return self.render_instruction(self.question, self.oracle_context, self.distractor_contexts)
+
+    @instruction.setter
+    def instruction(self, value: str) -> None:
+        self._instruction = value
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        """Additional metadata, allocated on first use."""
+        if self._metadata is None:
+            self._metadata = {}
+        return self._metadata
+
+    @metadata.setter
+    def metadata(self, value: Dict[str, Any]) -> None:
+        self._metadata = value
 
     @property
-    def distractor_contexts(self) -> List[str]:
-        """Get distractor contexts (all except oracle)."""
-        all_contexts = self.get_all_contexts()
-        return [ctx for ctx in all_contexts if ctx != self.oracle_context]
+    def has_chunk_refs(self) -> bool:
+        """Whether the point references its chunks by id."""
+        return self.oracle_chunk_id is not None and self.distractor_chunk_ids is not None
+
+    def get_all_contexts(self) -> List[str]:
+        """Get all contexts (oracle + distractors) as a list."""
+        return [self.oracle_context, *self.distractor_contexts]
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for serialization."""
@@ -199,6 +305,16 @@ class QADataPoint:
             doctype=data.get("doctype", "unknown"),
         )
 
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, QADataPoint):
+            return NotImplemented
+        return (self.to_dict(), self.doctype, self.metadata) == (other.to_dict(), other.doctype, other.metadata)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"QADataPoint(id={self.id!r}, type={self.type!r}, question={self.question!r}, doctype={self.doctype!r})"
+
 
 @dataclass
 class ProcessingJob:
@@ -242,6 +358,17 @@ class ProcessingResult:
     processing_time: float = 0.0
     token_usage: Dict[str, int] = field(default_factory=dict)
     error: Optional[str] = None
+    released_qa_points: int = 0  # QA data points dropped by release_qa_data_points
+
+    @property
+    def qa_count(self) -> int:
+        """Number of QA data points generated, including released ones."""
+        return len(self.qa_data_points) + self.released_qa_points
+
+    def release_qa_data_points(self) -> None:
+        """Drop the QA data points once they were written elsewhere, keeping their count."""
+        self.released_qa_points += len(self.qa_data_points)
+        self.qa_data_points = []
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for serialization."""
@@ -15,6 +15,7 @@ from .services.dataset_service import DatasetService
 from .services.document_service import DocumentService
 from .services.input_service import InputService
 from .services.llm_service import LLMService
+from .services.preview_service import PreviewService
 from .sources import SourceValidationError
 
 logger = logging.getLogger(__name__)
@@ -97,19 +98,30 @@ class RaftEngine:
             if not chunks:
                 raise ValueError("No chunks were created from the input documents")
 
-            # Step 3: Generate QA data points
+            # Step 3: Generate QA data points, streaming each result to the dataset as it completes
             logger.info("Step 3: Generating questions and answers")
-            results = self.llm_service.process_chunks_batch(chunks)
+            writer = self.dataset_service.open_writer(output_path, chunks=chunks)
+            try:
+                results = self.llm_service.process_chunks_batch(chunks, on_result=writer.write_result)
+            except BaseException:
+                writer.abort()
+                raise
 
-            # Step 4: Create and save dataset
-            logger.info("Step 4: Creating and saving dataset")
-            dataset = self.dataset_service.create_dataset_from_results(results)
-            self.dataset_service.save_dataset(dataset, output_path)
+            # Step 4: Finalize and convert dataset
+            logger.info("Step 4: Finalizing dataset")
+            self.dataset_service.finalize_dataset(writer)
 
             # Calculate statistics
             end_time = time.time()
             processing_time = float(end_time - start_time)
             stats = self._calculate_stats(results, processing_time)
+            # Records already present in an appended dataset are skipped by the writer
+            stats["duplicates_skipped"] = getattr(writer, "duplicates", 0)
+            try:
+                stats["dataset"] = self.dataset_service.get_output_stats(output_path)
+            except Exception as e:
+                logger.warning(f"Could not compute dataset statistics: {e}")
+                stats["dataset"] = None
 
             logger.info(f"RAFT dataset generation completed in {processing_time:.2f}s")
             logger.info(f"Generated {stats['total_qa_points']} QA data points")
@@ -138,17 +150,23 @@ class RaftEngine:
         else:
             token_usage["tokens_per_second"] = 0.0
 
-        # Get rate limiting statistics from LLM service
+        # Get rate limiting statistics from LLM service and embedding pacing
         rate_limit_stats = self.llm_service.get_rate_limit_statistics()
+        embedding_pacing_stats = self.input_service.get_pacing_statistics()
+        pacing_time = float(rate_limit_stats.get("total_wait_time", 0.0)) + float(
+            embedding_pacing_stats.get("total_wait_time", 0.0)
+        )
 
         return {
-            "total_qa_points": sum(len(r.qa_data_points) for r in successful_results),
+            "total_qa_points": sum(r.qa_count for r in successful_results),
             "successful_chunks": len(successful_results),
             "failed_chunks": len(failed_results),
             "total_processing_time": processing_time,
             "avg_time_per_chunk": processing_time / len(results) if results else 0,
             "token_usage": token_usage,
             "rate_limiting": rate_limit_stats,
+            "embedding_rate_limiting": embedding_pacing_stats,
+            "pacing_time": pacing_time,
             "input_source": self.input_service.get_source_info(),
             "config_used": {
                 "doctype": self.config.doctype,
@@ -228,7 +246,20 @@ class RaftEngine:
 
         preview["files_to_process"] = [str(f) for f in files]
 
-        # Rough estimation (this could be improved with actual file analysis)
+        estimate = None
+        if self.config.preview_sample_size > 0 and files:
+            try:
+                estimate = PreviewService(self.config, self.document_service).preview_files(files)
+            except Exception as e:
+                logger.warning(f"Sampled preview failed, using size heuristic: {e}")
+
+        if estimate is not None:
+            preview["estimate"] = estimate
+            preview["estimated_chunks"] = estimate["chunks"]["estimate"]
+            preview["estimated_qa_points"] = estimate["qa_points"]["estimate"]
+            return preview
+
+        # Rough estimation from file sizes
         if self.config.doctype == "api":
             # For API docs, estimate based on JSON structure
             preview["estimated_chunks"] = len(files)  # Assume one API per file
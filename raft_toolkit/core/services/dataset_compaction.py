@@ -0,0 +1,152 @@
+"""
+Compaction of appended datasets.
+
+Every append run adds at least one Arrow shard to the dataset and one shard
+to each export, so a dataset updated nightly accumulates small files.
+Compaction merges consecutive shards into shards of up to a target size and
+rewrites ``state.json`` and the export manifests. Shards that are already
+large enough are only renamed, and rows keep their order.
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Union
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+from .dataset_writer import (
+    ARROW_SHARD_BYTES,
+    JSONL_BUFFER_SIZE,
+    MANIFEST_SUFFIX,
+    ExportShard,
+    WrittenShard,
+    arrow_shard_paths,
+    finalize_arrow_shards,
+    finalize_shards,
+    pending_arrow_shard_path,
+    pending_shard_path,
+    read_arrow_schema,
+    read_manifest,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def plan_groups(sizes: List[int], target_bytes: int) -> List[List[int]]:
+    """Group consecutive shards so each group stays within ``target_bytes``, or holds a single larger shard."""
+    groups: List[List[int]] = []
+    current: List[int] = []
+    current_bytes = 0
+    for i, size in enumerate(sizes):
+        if current and current_bytes + size > target_bytes:
+            groups.append(current)
+            current, current_bytes = [], 0
+        current.append(i)
+        current_bytes += size
+    if current:
+        groups.append(current)
+    return groups
+
+
+def compact_arrow_shards(directory: Union[str, Path], target_bytes: int = ARROW_SHARD_BYTES) -> Dict[str, int]:
+    """Merge small Arrow shards of a ``save_to_disk`` dataset directory."""
+    directory = Path(directory)
+    shards = arrow_shard_paths(directory)
+    groups = plan_groups([path.stat().st_size for path in shards], target_bytes)
+    if len(groups) == len(shards):
+        return {"before": len(shards), "after": len(shards)}
+
+    schema = read_arrow_schema(shards[0])
+    compacted = []
+    for n, group in enumerate(groups):
+        if len(group) == 1:
+            compacted.append(shards[group[0]])
+            continue
+        path = pending_arrow_shard_path(directory, n, prefix="compact-")
+        with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_stream(sink, schema) as writer:
+            for i in group:
+                with pa.memory_map(str(shards[i])) as source:
+                    for batch in pa.ipc.open_stream(source):
+                        writer.write_batch(batch)
+        compacted.append(path)
+
+    # The merged shards replace the originals only once the new state is written
+    finalize_arrow_shards(directory, compacted, schema)
+    for group in groups:
+        if len(group) > 1:
+            for i in group:
+                shards[i].unlink()
+    return {"before": len(shards), "after": len(compacted)}
+
+
+def compact_export(output_file: Union[str, Path], target_bytes: int = ARROW_SHARD_BYTES) -> Dict[str, int]:
+    """Merge small shards of a sharded JSONL or Parquet export and rewrite its manifest."""
+    output_file = Path(output_file)
+    manifest = read_manifest(output_file)
+    if manifest is None:
+        raise ValueError(f"{output_file} has no shard manifest")
+    entries = manifest["shards"]
+    paths = [output_file.with_name(entry["filename"]) for entry in entries]
+    groups = plan_groups([entry["bytes"] for entry in entries], target_bytes)
+    if len(groups) == len(entries):
+        return {"before": len(entries), "after": len(entries)}
+
+    schema = pq.ParquetFile(str(paths[0])).schema_arrow if manifest["format"] == "parquet" else None
+    shards: List[Any] = []
+    for n, group in enumerate(groups):
+        if len(group) == 1:
+            shards.append(WrittenShard(paths[group[0]], entries[group[0]]))
+            continue
+        shard = ExportShard(pending_shard_path(output_file, n), manifest["format"], schema)
+        try:
+            for i in group:
+                if schema is None:
+                    with open(paths[i], "rb") as file:
+                        for block in iter(lambda: file.read(JSONL_BUFFER_SIZE), b""):
+                            shard.write_bytes(block, 0)
+                    shard.rows += entries[i]["rows"]
+                else:
+                    for batch in pq.ParquetFile(str(paths[i])).iter_batches():
+                        shard.write_table(pa.Table.from_batches([batch], schema=schema))
+        finally:
+            shard.close()
+        shards.append(shard)
+
+    finalize_shards(output_file, shards, manifest["max_shard_bytes"], manifest["max_shard_rows"])
+    for group in groups:
+        if len(group) > 1:
+            for i in group:
+                paths[i].unlink()
+    return {"before": len(entries), "after": len(shards)}
+
+
+def compact_dataset(directory: Union[str, Path], target_bytes: int = ARROW_SHARD_BYTES) -> Dict[str, Dict[str, int]]:
+    """
+    Compact the Arrow shards and every sharded export of a dataset directory.
+
+    Returns:
+        Dict[str, Dict[str, int]]: Shard counts before and after, per dataset file
+    """
+    if pa is None:
+        raise ImportError("pyarrow is required for dataset compaction. Install with: pip install raft-toolkit[ai]")
+    directory = Path(directory)
+    if not directory.is_dir():
+        raise FileNotFoundError(f"Dataset directory not found: {directory}")
+
+    result = {}
+    if arrow_shard_paths(directory):
+        result["arrow"] = compact_arrow_shards(directory, target_bytes)
+    for manifest_path in sorted(directory.glob(f"*{MANIFEST_SUFFIX}")):
+        with open(manifest_path, encoding="utf-8") as file:
+            output_type = json.load(file)["format"]
+        output_file = directory / f"{manifest_path.name[: -len(MANIFEST_SUFFIX)]}.{output_type}"
+        result[output_file.name] = compact_export(output_file, target_bytes)
+    for name, counts in result.items():
+        logger.info(f"Compacted {name} from {counts['before']} to {counts['after']} shard(s)")
+    return result
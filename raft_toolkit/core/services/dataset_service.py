@@ -4,7 +4,7 @@ Dataset service for formatting and exporting datasets.
 
 import logging
 from pathlib import Path
-from typing import Any, Dict, List, Literal
+from typing import Any, Dict, List, Literal, Optional, Sequence, Tuple, Union
 
 try:
     import datasets
@@ -19,29 +19,16 @@ except ImportError:
     pa = None
 
 from ..config import RaftConfig
-from ..models import ProcessingResult
+from ..models import DocumentChunk, ProcessingResult
+from .dataset_stats import compute_dataset_stats
+from .dataset_writer import ExportTarget, StreamingDatasetWriter, qa_record, read_manifest
+from .normalized_dataset import NormalizedDatasetWriter
 
 # Define type aliases
 DatasetFormat = Literal["hf", "completion", "chat", "eval"]
 OutputDatasetType = Literal["parquet", "jsonl"]
 
 
-# Define a base class for the converter
-class DatasetConverterBase:
-    def convert(self, **kwargs: Any) -> None:
-        pass
-
-
-# Try to import the real implementation
-try:
-    from ..formatters.dataset_converter import DatasetConverter
-except ImportError:
-    # Mock implementation for demo
-    class DatasetConverter(DatasetConverterBase):  # type: ignore[no-redef]
-        def convert(self, **kwargs: Any) -> None:
-            pass
-
-
 logger = logging.getLogger(__name__)
 
 
@@ -50,7 +37,6 @@ class DatasetService:
 
     def __init__(self, config: RaftConfig):
         self.config = config
-        self.converter = DatasetConverter()
 
     def create_dataset_from_results(self, results: List[ProcessingResult]) -> Dataset:
         """Create HuggingFace dataset from processing results."""
@@ -78,19 +64,7 @@ class DatasetService:
             return dataset
 
         # Convert QA data points to dictionary format
-        data_records = []
-        for qa_point in all_qa_points:
-            record = {
-                "id": qa_point.id,
-                "type": qa_point.type,
-                "question": qa_point.question,
-                "context": qa_point.context,
-                "oracle_context": qa_point.oracle_context,
-                "cot_answer": qa_point.cot_answer,
-                "answer": qa_point.cot_answer,  # Add 'answer' field for compatibility
-                "instruction": qa_point.instruction,
-            }
-            data_records.append(record)
+        data_records = [qa_record(qa_point) for qa_point in all_qa_points]
 
         # Create PyArrow table and Dataset
         table = pa.Table.from_pylist(data_records)
@@ -100,16 +74,87 @@ class DatasetService:
         return dataset
 
     def save_dataset(self, dataset: Dataset, output_path: str) -> None:
-        """Save dataset in multiple formats."""
-        output_path = str(Path(output_path).absolute())
+        """
+        Save dataset in multiple formats.
 
-        # Save as HuggingFace dataset (arrow format)
-        dataset.save_to_disk(output_path)
-        logger.info(f"Saved HuggingFace dataset to {output_path}")
+        Every configured export is written from a single scan of the dataset;
+        format transforms run on in-memory batches and create no Arrow cache
+        files.
+        """
+        output_path = str(Path(output_path).absolute())
 
-        # Convert and save in specified format
-        format_params = self._get_format_params()
+        if self.config.output_arrow and not self.config.output_append:
+            # Save as HuggingFace dataset (arrow format)
+            dataset.save_to_disk(output_path)
+            logger.info(f"Saved HuggingFace dataset to {output_path}")
+
+        # An in-memory dataset has no chunk references to normalize, so it is always saved flat.
+        # Appends go through the writer, which adds Arrow shards instead of rewriting the dataset.
+        write_arrow = self.config.output_arrow if self.config.output_append else False
+        writer = self._open_flat_writer(output_path, write_arrow=write_arrow)
+        try:
+            for batch in dataset.with_format("arrow").iter(batch_size=self.config.output_row_group_size):
+                writer.write_records(batch.to_pylist())
+        except BaseException:
+            writer.abort()
+            raise
+        writer.close()
+
+    def open_writer(
+        self,
+        output_path: str,
+        write_arrow: Optional[bool] = None,
+        chunks: Optional[Sequence[DocumentChunk]] = None,
+    ) -> Union[StreamingDatasetWriter, NormalizedDatasetWriter]:
+        """
+        Open a streaming writer that appends records as processing results complete.
+
+        The HuggingFace dataset is written as Arrow shards in ``output_path``
+        unless disabled with ``output_arrow``; every export target is written
+        alongside in the same pass.
+
+        With the ``normalized`` output layout, ``chunks`` are written once to a
+        chunk table and QA rows reference them by id instead; the flat formats
+        are materialized from it on demand with the dataset converter.
+        """
+        if self.config.output_layout == "normalized":
+            writer = NormalizedDatasetWriter(
+                Path(output_path).absolute(), row_group_size=self.config.output_row_group_size
+            )
+            if chunks:
+                writer.write_chunks(chunks)
+            return writer
+        return self._open_flat_writer(output_path, write_arrow)
+
+    def _open_flat_writer(self, output_path: str, write_arrow: Optional[bool] = None) -> StreamingDatasetWriter:
+        return StreamingDatasetWriter(
+            Path(output_path).absolute(),
+            exports=self.get_export_targets(),
+            params=self._get_format_params(),
+            write_arrow=self.config.output_arrow if write_arrow is None else write_arrow,
+            row_group_size=self.config.output_row_group_size,
+            append=self.config.output_append,
+        )
 
+    def finalize_dataset(self, writer: Union[StreamingDatasetWriter, NormalizedDatasetWriter]) -> Optional[Dataset]:
+        """Finalize a streamed dataset; returns it memory-mapped when flat Arrow output is enabled."""
+        return writer.close()
+
+    def get_export_targets(self) -> List[ExportTarget]:
+        """
+        Files to export: the configured output format and type as ``dataset.<type>``,
+        and each additional ``format:type`` of ``output_exports`` as ``dataset.<format>.<type>``.
+        """
+        output_format, output_type = self._output_settings()
+        targets = [ExportTarget(output_format, output_type, f"dataset.{output_type}")]
+        for export in self.config.output_exports:
+            export_format, export_type = export.split(":")
+            if not any(t.format == export_format and t.type == export_type for t in targets):
+                targets.append(ExportTarget(export_format, export_type, f"dataset.{export_format}.{export_type}"))
+        return targets
+
+    def _output_settings(self) -> Tuple[DatasetFormat, OutputDatasetType]:
+        """Configured output format and type, falling back to defaults when invalid."""
         # Cast string values to the expected types
         output_format = self.config.output_format
         output_type = self.config.output_type
@@ -126,28 +171,18 @@ class DatasetService:
         # Use type assertions to satisfy mypy
         format_val: DatasetFormat = output_format  # type: ignore
         type_val: OutputDatasetType = output_type  # type: ignore
-
-        self.converter.convert(
-            ds=dataset,
-            format=format_val,
-            output_path=output_path,
-            output_type=type_val,
-            params=format_params,
-        )
-
-        logger.info(f"Converted and saved dataset in {self.config.output_format} format as {self.config.output_type}")
+        return format_val, type_val
 
     def _get_format_params(self) -> Dict[str, Any]:
         """Get format-specific parameters."""
-        params = {}
+        params = {
+            "prompt_column": self.config.output_completion_prompt_column,
+            "completion_column": self.config.output_completion_completion_column,
+        }
 
         if self.config.output_chat_system_prompt:
             params["system_prompt"] = self.config.output_chat_system_prompt
 
-        if self.config.output_format == "completion":
-            params["prompt_column"] = self.config.output_completion_prompt_column
-            params["completion_column"] = self.config.output_completion_completion_column
-
         return params
 
     def load_dataset(self, input_path: str) -> Dataset:
@@ -155,22 +190,36 @@ class DatasetService:
         return Dataset.load_from_disk(input_path)
 
     def get_dataset_stats(self, dataset: Dataset) -> Dict[str, Any]:
-        """Get statistics about the dataset."""
-        stats = {
-            "total_records": len(dataset),
-            "columns": list(dataset.column_names),
-            "sample_record": dataset[0] if len(dataset) > 0 else None,
-        }
-
-        # Type distribution
-        if "type" in dataset.column_names:
-            type_counts: Dict[str, int] = {}
-            for record_type in dataset["type"]:
-                type_counts[record_type] = type_counts.get(record_type, 0) + 1
-            stats["type_distribution"] = type_counts
-
+        """
+        Get statistics about the dataset: value counts, character and token
+        length distributions and the duplicate question rate, computed batch by
+        batch with ``pyarrow.compute``.
+        """
+        stats = compute_dataset_stats(dataset)
+        stats["columns"] = list(dataset.column_names)
+        stats["sample_record"] = dataset[0] if len(dataset) > 0 else None
+        if "type" in stats["value_counts"]:
+            stats["type_distribution"] = stats["value_counts"]["type"]
         return stats
 
+    def get_output_stats(self, output_path: str) -> Dict[str, Any]:
+        """
+        Get statistics of a generated dataset, read back from ``output_path``
+        in batches: the QA table of the normalized layout, the Arrow shards, or
+        else the first export (its shards, after appends). Token lengths are
+        only counted with ``output_stats_tokens``.
+        """
+        path = Path(output_path).absolute()
+        source: Any = str(path)
+        if self.config.output_layout != "normalized" and not self.config.output_arrow:
+            path = path / self.get_export_targets()[0].filename
+            manifest = read_manifest(path)
+            if manifest is not None:
+                source = [str(path.parent / shard["filename"]) for shard in manifest["shards"]]
+            else:
+                source = str(path)
+        return compute_dataset_stats(source, count_tokens=self.config.output_stats_tokens)
+
     def _format_qa_point(self, qa_point: Any) -> Dict[str, Any]:
         """Format QA point based on output format."""
         if self.config.output_format == "hf":
@@ -0,0 +1,241 @@
+"""
+Dataset statistics computed with ``pyarrow.compute``.
+
+Statistics are accumulated one record batch at a time, so a dataset larger
+than memory is summarized in a single streaming pass:
+
+- value counts of categorical columns (``type``, ``doctype``);
+- character and token length distributions of the text columns, kept as a
+  count per distinct length from which exact percentiles and histograms are
+  derived;
+- the duplicate question rate, from 64-bit hashes of the normalized questions.
+"""
+
+import logging
+import math
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+
+try:
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    np = None  # type: ignore
+    pa = None
+    pc = None
+
+from ..utils.tokenizer import TiktokenTokenizer, Tokenizer, get_tokenizer
+from .normalized_dataset import QA_FILE, is_normalized_dataset
+
+logger = logging.getLogger(__name__)
+
+CATEGORY_COLUMNS = ("type", "doctype")
+DEFAULT_PERCENTILES = (50, 90, 95, 99)
+DEFAULT_BINS = 20
+STATS_BATCH_SIZE = 10_000
+
+# RegexTokenizer's pattern in RE2 syntax: RE2 has no lookahead, so a run of
+# whitespace before a word counts as one token instead of two. It is not a
+# credential, despite the name bandit matches on.
+_TOKEN_PATTERN = r"(?i)'(?:[sdmt]|ll|ve|re)| ?\pL{1,4}| ?\pN{1,3}| ?[^\s\pL\pN]+|\s+"  # nosec B105
+
+
+class LengthDistribution:
+    """Distribution of integer lengths, stored as a count per distinct length."""
+
+    def __init__(self) -> None:
+        self.counts: Dict[int, int] = {}
+
+    def add(self, lengths: "pa.Array") -> None:
+        """Count the non-null values of an integer array."""
+        counted = pc.value_counts(pc.drop_null(lengths))
+        for length, count in zip(counted.field("values").to_pylist(), counted.field("counts").to_pylist()):
+            self.counts[length] = self.counts.get(length, 0) + count
+
+    def summary(self, percentiles: Sequence[float] = DEFAULT_PERCENTILES, bins: int = DEFAULT_BINS) -> Dict[str, Any]:
+        """Count, min, max, mean, nearest-rank percentiles and an equal-width histogram."""
+        if not self.counts:
+            return {"count": 0}
+        values = np.array(sorted(self.counts), dtype=np.int64)
+        counts = np.array([self.counts[value] for value in values], dtype=np.int64)
+        total = int(counts.sum())
+        cumulative = np.cumsum(counts)
+        low, high = int(values[0]), int(values[-1])
+        histogram, edges = np.histogram(values, bins=min(bins, high - low + 1), range=(low, high + 1), weights=counts)
+        return {
+            "count": total,
+            "min": low,
+            "max": high,
+            "mean": float((values * counts).sum() / total),
+            "percentiles": {
+                f"p{p:g}": int(values[np.searchsorted(cumulative, max(1, math.ceil(p / 100 * total)))])
+                for p in percentiles
+            },
+            "histogram": {"edges": [float(edge) for edge in edges], "counts": [int(c) for c in histogram]},
+        }
+
+
+class DatasetStatsCollector:
+    """
+    Accumulates statistics over record batches.
+
+    Text columns default to every string column except ``id`` and the category
+    columns. Token lengths are counted with ``tokenizer`` (the default
+    tokenizer when not given); tiktoken encodes each batch with
+    ``encode_batch``, the approximate tokenizer is evaluated as an Arrow regex
+    kernel.
+    """
+
+    def __init__(
+        self,
+        text_columns: Optional[Sequence[str]] = None,
+        category_columns: Sequence[str] = CATEGORY_COLUMNS,
+        question_column: Optional[str] = "question",
+        tokenizer: Optional[Tokenizer] = None,
+        count_tokens: bool = True,
+        percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+        bins: int = DEFAULT_BINS,
+    ):
+        if pa is None or np is None:
+            raise ImportError("pyarrow is required for dataset statistics. Install with: pip install raft-toolkit[ai]")
+        self.text_columns = list(text_columns) if text_columns is not None else None
+        self.category_columns = list(category_columns)
+        self.question_column = question_column
+        self.tokenizer = (tokenizer or get_tokenizer()) if count_tokens else None
+        self.percentiles = percentiles
+        self.bins = bins
+
+        self.total_records = 0
+        self.columns: List[str] = []
+        self.value_counts: Dict[str, Dict[Any, int]] = {}
+        self.char_lengths: Dict[str, LengthDistribution] = {}
+        self.token_lengths: Dict[str, LengthDistribution] = {}
+        self.questions = 0
+        self._question_hashes: List["np.ndarray"] = []
+        self._hashed = 0
+
+    def _text_columns(self, schema: "pa.Schema") -> List[str]:
+        if self.text_columns is not None:
+            return [name for name in self.text_columns if name in schema.names]
+        excluded = {"id", *self.category_columns}
+        return [
+            field.name
+            for field in schema
+            if field.name not in excluded and (pa.types.is_string(field.type) or pa.types.is_large_string(field.type))
+        ]
+
+    def update(self, batch: Union["pa.RecordBatch", "pa.Table"]) -> None:
+        """Add the rows of a record batch or table."""
+        if not self.columns:
+            self.columns = list(batch.schema.names)
+        self.total_records += batch.num_rows
+
+        for name in self.category_columns:
+            if name in batch.schema.names:
+                counts = self.value_counts.setdefault(name, {})
+                counted = pc.value_counts(batch.column(name))
+                for value, count in zip(counted.field("values").to_pylist(), counted.field("counts").to_pylist()):
+                    counts[value] = counts.get(value, 0) + count
+
+        for name in self._text_columns(batch.schema):
+            column = batch.column(name)
+            self.char_lengths.setdefault(name, LengthDistribution()).add(pc.utf8_length(column))
+            if self.tokenizer is not None:
+                self.token_lengths.setdefault(name, LengthDistribution()).add(self._count_tokens(column))
+
+        if self.question_column in batch.schema.names:
+            self._add_questions(batch.column(self.question_column))
+
+    def _count_tokens(self, column: Any) -> "pa.Array":
+        if isinstance(self.tokenizer, TiktokenTokenizer):
+            texts = pc.drop_null(column).to_pylist()
+            encoded = self.tokenizer.encoding.encode_batch(texts, disallowed_special=())
+            return pa.array([len(tokens) for tokens in encoded], pa.int64())
+        return pc.count_substring_regex(column, _TOKEN_PATTERN)
+
+    def _add_questions(self, column: Any) -> None:
+        """Hash the distinct normalized questions of a batch."""
+        normalized = pc.drop_null(pc.utf8_lower(pc.utf8_trim_whitespace(column)))
+        self.questions += len(normalized)
+        unique = pc.unique(normalized).to_pylist()
+        self._question_hashes.append(np.fromiter((hash(q) for q in unique), dtype=np.int64, count=len(unique)))
+        self._hashed += len(unique)
+        if len(self._question_hashes) > 1 and self._hashed > 2 * max(1, len(self._question_hashes[0])):
+            # Keep one distinct hash per question
+            self._question_hashes = [np.unique(np.concatenate(self._question_hashes))]
+            self._hashed = len(self._question_hashes[0])
+
+    def result(self) -> Dict[str, Any]:
+        """The statistics of the rows added so far."""
+        distinct = len(np.unique(np.concatenate(self._question_hashes))) if self._question_hashes else 0
+        duplicates = self.questions - distinct
+
+        lengths: Dict[str, Dict[str, Any]] = {}
+        for name, distribution in self.char_lengths.items():
+            lengths[name] = {"chars": distribution.summary(self.percentiles, self.bins)}
+            if name in self.token_lengths:
+                lengths[name]["tokens"] = self.token_lengths[name].summary(self.percentiles, self.bins)
+
+        return {
+            "total_records": self.total_records,
+            "columns": self.columns,
+            "value_counts": self.value_counts,
+            "lengths": lengths,
+            "tokenizer": self.tokenizer.name if self.tokenizer is not None else None,
+            "duplicate_questions": duplicates,
+            "duplicate_question_rate": duplicates / self.questions if self.questions else 0.0,
+        }
+
+
+def iter_stats_batches(
+    source: Any, batch_size: int = STATS_BATCH_SIZE
+) -> Iterator[Union["pa.RecordBatch", "pa.Table"]]:
+    """
+    Record batches of a dataset: a ``datasets.Dataset``, an Arrow table, a
+    ``save_to_disk`` or normalized dataset directory, JSONL or Parquet files
+    (a path or glob pattern), or a list of these read in order.
+    """
+    from ..formatters.dataset_converter import iter_input_batches
+
+    if isinstance(source, (list, tuple)):
+        for part in source:
+            yield from iter_stats_batches(part, batch_size)
+        return
+    if isinstance(source, pa.Table):
+        yield from source.to_batches(max_chunksize=batch_size)
+        return
+    if not isinstance(source, (str, Path)):
+        # Memory-mapped datasets are read batch by batch, honouring selections and filters
+        yield from source.with_format("arrow").iter(batch_size=batch_size)
+        return
+
+    path = str(source)
+    if is_normalized_dataset(path):
+        yield from iter_input_batches(str(Path(path) / QA_FILE), "parquet", batch_size)
+    elif path.endswith((".jsonl", ".json")):
+        yield from iter_input_batches(path, "jsonl", batch_size)
+    elif path.endswith(".parquet"):
+        yield from iter_input_batches(path, "parquet", batch_size)
+    else:
+        yield from iter_input_batches(path, "arrow", batch_size)
+
+
+def compute_dataset_stats(source: Any, batch_size: int = STATS_BATCH_SIZE, **options: Any) -> Dict[str, Any]:
+    """
+    Compute statistics of a dataset in one pass over its record batches.
+
+    Args:
+        source: Dataset, Arrow table, dataset directory, JSONL/Parquet path,
+            or a list of these
+        batch_size: Rows per record batch
+        **options: Options of :class:`DatasetStatsCollector`
+
+    Returns:
+        Dict[str, Any]: Record count, columns, value counts, length
+        distributions and the duplicate question rate
+    """
+    collector = DatasetStatsCollector(**options)
+    for batch in iter_stats_batches(source, batch_size):
+        collector.update(batch)
+    return collector.result()
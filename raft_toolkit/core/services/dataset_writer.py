@@ -0,0 +1,956 @@
+"""
+Streaming dataset writers.
+
+QA records are appended to disk as processing results complete instead of
+being collected into one in-memory table at the end of a run. Records are
+buffered up to a row group and then written, in one pass, to:
+
+- optionally Arrow stream shards in the HuggingFace ``save_to_disk`` layout,
+  finalized into a loadable dataset once the run ends (the shards are
+  memory-mapped, not re-read into memory);
+- any number of exports, each an output format (hf, completion, chat, eval)
+  written as JSONL (serialized with ``orjson`` when available, from a
+  background thread) or Parquet (one row group per flush).
+
+``ShardedFileWriter`` writes JSONL or Parquet files split into shards bounded
+by size and/or row count, with a manifest of row counts and checksums.
+
+In append mode, a run adds new Arrow shards and export shards next to those
+of earlier runs and rewrites only the metadata and manifests. Records whose
+question and oracle chunk are already in the dataset are skipped, using an
+index of record keys kept in ``qa_keys.parquet``.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Union
+
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:
+    orjson = None  # type: ignore
+    HAS_ORJSON = False
+
+try:
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    np = None  # type: ignore
+    pa = None
+    pq = None
+
+try:
+    import datasets
+    from datasets import Dataset
+except ImportError:
+    datasets = None
+    Dataset = None
+
+try:
+    from ..formatters.record_formats import format_records, format_schema
+except ImportError:
+    # The formatters package needs the datasets library
+    format_records = None  # type: ignore
+    format_schema = None  # type: ignore
+
+from ..models import ProcessingResult, QADataPoint
+
+logger = logging.getLogger(__name__)
+
+# Columns of the raw (hf) dataset records
+RECORD_COLUMNS = ["id", "type", "question", "context", "oracle_context", "cot_answer", "answer", "instruction"]
+
+DEFAULT_ROW_GROUP_SIZE = 1000
+ARROW_SHARD_BYTES = 500 * 1024 * 1024  # Same default shard size as datasets' save_to_disk
+JSONL_BUFFER_SIZE = 1024 * 1024
+
+_SHARD_PREFIX = "data-"
+_PENDING_SUFFIX = ".arrow.tmp"
+STATE_FILE = "state.json"
+QA_KEYS_FILE = "qa_keys.parquet"
+
+
+def qa_record(qa_point: QADataPoint) -> Dict[str, Any]:
+    """Convert a QA data point to a raw dataset record."""
+    return {
+        "id": qa_point.id,
+        "type": qa_point.type,
+        "question": qa_point.question,
+        "context": qa_point.context,
+        "oracle_context": qa_point.oracle_context,
+        "cot_answer": qa_point.cot_answer,
+        "answer": qa_point.cot_answer,  # Add 'answer' field for compatibility
+        "instruction": qa_point.instruction,
+    }
+
+
+def record_schema() -> "pa.Schema":
+    """Arrow schema of raw dataset records, carrying HuggingFace feature metadata when available."""
+    schema = pa.schema([(column, pa.string()) for column in RECORD_COLUMNS])
+    if datasets is not None:
+        schema = datasets.Features.from_arrow_schema(schema).arrow_schema
+    return schema
+
+
+def dumps_jsonl(records: List[Dict[str, Any]]) -> bytes:
+    """Serialize records as JSON lines."""
+    if HAS_ORJSON:
+        return b"".join(orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE) for record in records)
+    return "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records).encode("utf-8")
+
+
+class JsonlStreamWriter:
+    """
+    Appends JSON lines to a file from a background thread.
+
+    Records are serialized by the caller and handed to the writer thread through
+    a bounded queue, so disk writes overlap with generation. Write errors are
+    raised on the next ``write`` or on ``close``.
+    """
+
+    def __init__(self, path: Union[str, Path], buffer_size: int = JSONL_BUFFER_SIZE, max_pending: int = 8):
+        self.path = Path(path)
+        self.rows = 0
+        self._file = open(self.path, "wb", buffering=buffer_size)
+        self._queue: "queue.Queue[Optional[bytes]]" = queue.Queue(maxsize=max_pending)
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._drain, name="raft-jsonl-writer", daemon=True)
+        self._thread.start()
+
+    def _drain(self) -> None:
+        while True:
+            data = self._queue.get()
+            if data is None:
+                return
+            if self._error is None:
+                try:
+                    self._file.write(data)
+                except BaseException as e:
+                    self._error = e
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            raise IOError(f"Failed to write {self.path}: {self._error}") from self._error
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        """Queue records for writing."""
+        self._raise_error()
+        self._queue.put(dumps_jsonl(records))
+        self.rows += len(records)
+
+    def close(self) -> None:
+        """Flush queued records and close the file."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._file.close()
+        self._raise_error()
+
+
+class ParquetStreamWriter:
+    """Writes record batches to a Parquet file, one row group per batch."""
+
+    def __init__(self, path: Union[str, Path], schema: "pa.Schema"):
+        self.path = Path(path)
+        self.schema = schema
+        self.rows = 0
+        self._writer = pq.ParquetWriter(str(self.path), schema)
+
+    def write_batch(self, batch: "pa.RecordBatch") -> None:
+        self._writer.write_batch(batch, row_group_size=max(1, batch.num_rows))
+        self.rows += batch.num_rows
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+class ArrowShardWriter:
+    """
+    Writes record batches to Arrow stream shards in the ``save_to_disk`` layout.
+
+    A new shard is started once the current one exceeds ``max_shard_bytes``.
+    Shards are written under temporary names and renamed to
+    ``data-XXXXX-of-YYYYY.arrow`` by ``finalize``, which also writes the
+    ``state.json`` and ``dataset_info.json`` metadata.
+
+    With ``append``, the shards of the dataset already in ``directory`` are
+    kept and the new shards are numbered after them.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        schema: "pa.Schema",
+        max_shard_bytes: int = ARROW_SHARD_BYTES,
+        append: bool = False,
+    ):
+        self.directory = Path(directory)
+        self.schema = schema
+        self.max_shard_bytes = max_shard_bytes
+        self.rows = 0
+        self._existing: List[Path] = []
+        self._shards: List[Path] = []
+        self._sink: Any = None
+        self._writer: Any = None
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if append:
+            self._existing = arrow_shard_paths(self.directory)
+            if self._existing:
+                existing_schema = read_arrow_schema(self._existing[0])
+                if not existing_schema.remove_metadata().equals(schema.remove_metadata()):
+                    raise ValueError(f"Cannot append to {self.directory}: its schema differs from the dataset records")
+        else:
+            self._remove_stale_shards()
+
+    def _remove_stale_shards(self) -> None:
+        """Remove shards of a previous dataset written to the same directory."""
+        for path in self.directory.glob(f"{_SHARD_PREFIX}*.arrow*"):
+            path.unlink()
+
+    def _open_shard(self) -> None:
+        path = pending_arrow_shard_path(self.directory, len(self._shards))
+        self._shards.append(path)
+        self._sink = pa.OSFile(str(path), "wb")
+        self._writer = pa.ipc.new_stream(self._sink, self.schema)
+
+    def _close_shard(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._sink.close()
+            self._writer = self._sink = None
+
+    def write_batch(self, batch: "pa.RecordBatch") -> None:
+        if self._writer is None:
+            self._open_shard()
+        self._writer.write_batch(batch)
+        self.rows += batch.num_rows
+        if self._sink.tell() >= self.max_shard_bytes:
+            self._close_shard()
+
+    def finalize(self) -> List[str]:
+        """Close the last shard, name shards by their final count and write dataset metadata."""
+        self._close_shard()
+        if not self._shards and not self._existing:
+            # An empty dataset still needs one shard carrying the schema
+            self._open_shard()
+            self._close_shard()
+        return finalize_arrow_shards(self.directory, self._existing + self._shards, self.schema)
+
+    def abort(self) -> None:
+        """Close and remove written shards."""
+        self._close_shard()
+        for path in self._shards:
+            path.unlink(missing_ok=True)
+
+
+def arrow_shard_paths(directory: Union[str, Path]) -> List[Path]:
+    """Arrow shards of a dataset directory, in the order listed by its ``state.json``."""
+    directory = Path(directory)
+    state_path = directory / STATE_FILE
+    if state_path.is_file():
+        with open(state_path, encoding="utf-8") as file:
+            state = json.load(file)
+        return [directory / data_file["filename"] for data_file in state["_data_files"]]
+    return sorted(directory.glob(f"{_SHARD_PREFIX}*.arrow"))
+
+
+def pending_arrow_shard_path(directory: Path, index: int, prefix: str = _SHARD_PREFIX) -> Path:
+    """Temporary name of an Arrow shard until the dataset state is written."""
+    return directory / f"{prefix}{index:05d}{_PENDING_SUFFIX}"
+
+
+def read_arrow_schema(path: Union[str, Path]) -> "pa.Schema":
+    """Schema of an Arrow stream shard."""
+    with pa.memory_map(str(path)) as source:
+        return pa.ipc.open_stream(source).schema
+
+
+def finalize_arrow_shards(directory: Path, shards: List[Path], schema: "pa.Schema") -> List[str]:
+    """Rename shards to ``data-XXXXX-of-YYYYY.arrow`` and write the ``save_to_disk`` metadata."""
+    filenames = []
+    for i, path in enumerate(shards):
+        filename = f"{_SHARD_PREFIX}{i:05d}-of-{len(shards):05d}.arrow"
+        path.rename(directory / filename)
+        filenames.append(filename)
+
+    if datasets is not None:
+        datasets.DatasetInfo(features=datasets.Features.from_arrow_schema(schema)).write_to_directory(str(directory))
+        fingerprint = datasets.fingerprint.generate_random_fingerprint()
+    else:
+        fingerprint = None
+    state = {
+        "_data_files": [{"filename": filename} for filename in filenames],
+        "_fingerprint": fingerprint,
+        "_format_columns": None,
+        "_format_kwargs": {},
+        "_format_type": None,
+        "_output_all_columns": False,
+        "_split": None,
+    }
+    with open(directory / STATE_FILE, "w", encoding="utf-8") as file:
+        json.dump(state, file, indent=2, sort_keys=True)
+    return filenames
+
+
+def qa_key(question: Optional[str], oracle_context: Optional[str]) -> int:
+    """Key of a QA record: a 64-bit hash of its normalized question and its oracle chunk."""
+    text = f"{(question or '').strip().lower()}\x1f{oracle_context or ''}"
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big", signed=True)
+
+
+def load_qa_keys(directory: Union[str, Path]) -> "np.ndarray":
+    """
+    Sorted keys of the records of a dataset directory, from its key index or,
+    for datasets written without one, from the question and oracle context
+    columns of its Arrow shards.
+    """
+    directory = Path(directory)
+    if (directory / QA_KEYS_FILE).is_file():
+        keys = pq.read_table(directory / QA_KEYS_FILE, columns=["key"])["key"].to_numpy()
+        return np.sort(keys)
+    shards = arrow_shard_paths(directory)
+    if not shards:
+        return np.array([], dtype=np.int64)
+
+    keys = []
+    for path in shards:
+        with pa.memory_map(str(path)) as source:
+            for batch in pa.ipc.open_stream(source):
+                questions = batch.column("question").to_pylist()
+                contexts = batch.column("oracle_context").to_pylist()
+                keys.extend(qa_key(question, context) for question, context in zip(questions, contexts))
+    logger.info(f"Indexed {len(keys)} existing records of {directory}")
+    return np.unique(np.array(keys, dtype=np.int64))
+
+
+def save_qa_keys(directory: Union[str, Path], keys: "np.ndarray") -> None:
+    """Write the key index of a dataset directory."""
+    pq.write_table(pa.table({"key": pa.array(np.unique(keys), pa.int64())}), Path(directory) / QA_KEYS_FILE)
+
+
+class ExportTarget(NamedTuple):
+    """One exported file: an output format written as an output type."""
+
+    format: str
+    type: str
+    filename: str
+
+
+class StreamingDatasetWriter:
+    """
+    Appends QA records to the dataset directory as processing results complete.
+
+    Records are buffered until ``row_group_size`` rows are pending and then
+    flushed as one batch to the Arrow shards and every export. Each export
+    transforms the batch in memory, so one scan of the records produces all
+    formats. Memory use is bounded by one row group regardless of the dataset
+    size. Safe to call from multiple threads.
+
+    With ``append``, the dataset already in ``output_path`` is kept: new Arrow
+    shards are added to it, each export gets a new shard listed in its
+    manifest, and records with the key of an existing record are skipped.
+    """
+
+    def __init__(
+        self,
+        output_path: Union[str, Path],
+        exports: Sequence[ExportTarget] = (),
+        params: Optional[Dict[str, str]] = None,
+        write_arrow: bool = True,
+        row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+        max_shard_bytes: int = ARROW_SHARD_BYTES,
+        append: bool = False,
+    ):
+        if pa is None or format_records is None:
+            raise ImportError(
+                "pyarrow and datasets are required for dataset output. Install with: pip install raft-toolkit[ai]"
+            )
+        for target in exports:
+            if target.type not in ("jsonl", "parquet"):
+                raise ValueError(f"Unsupported export type: {target.type}")
+
+        self.output_path = Path(output_path)
+        self.params = params or {}
+        self.row_group_size = max(1, row_group_size)
+        self.schema = record_schema()
+        self.rows = 0
+        self.skipped_results = 0
+        self.append = append
+        self.duplicates = 0
+
+        self._lock = threading.Lock()
+        self._pending: List[Dict[str, Any]] = []
+        self._closed = False
+        self.output_path.mkdir(parents=True, exist_ok=True)
+        self._shards = (
+            ArrowShardWriter(self.output_path, self.schema, max_shard_bytes, append=append) if write_arrow else None
+        )
+        # Keys of the records already in the dataset, and of those written by this writer
+        self._known_keys = load_qa_keys(self.output_path) if append else np.array([], dtype=np.int64)
+        if not append:
+            # The index of a dataset this one replaces, rewritten by ``close``
+            (self.output_path / QA_KEYS_FILE).unlink(missing_ok=True)
+        self._new_keys: set = set()
+        self._key_batches: List["np.ndarray"] = []
+
+        self.exports: Dict[ExportTarget, Path] = {}
+        self._sinks: Dict[ExportTarget, Union[JsonlStreamWriter, ParquetStreamWriter]] = {}
+        self._schemas: Dict[str, "pa.Schema"] = {}
+        try:
+            for target in exports:
+                path = self.output_path / target.filename
+                self.exports[target] = path
+                if append:
+                    # Appended as a new shard of the export by ``close``
+                    path = pending_shard_path(path, 0)
+                else:
+                    # Shards left by earlier appends to a dataset this one replaces
+                    remove_export_shards(path)
+                if target.type == "jsonl":
+                    self._sinks[target] = JsonlStreamWriter(path)
+                else:
+                    schema = self._schemas.setdefault(
+                        target.format, format_schema(target.format, self.params, self.schema)
+                    )
+                    self._sinks[target] = ParquetStreamWriter(path, schema)
+        except Exception:
+            self._close_sinks()
+            raise
+
+    def write_result(self, result: ProcessingResult) -> None:
+        """Append the QA data points of a processing result."""
+        if not result.success:
+            logger.warning(f"Skipping failed result for job {result.job_id}: {result.error}")
+            self.skipped_results += 1
+            return
+        self.write_records([qa_record(qa_point) for qa_point in result.qa_data_points])
+
+    def write_records(self, records: List[Dict[str, Any]]) -> None:
+        """Append raw dataset records."""
+        with self._lock:
+            if self._closed:
+                raise ValueError("Dataset writer is closed")
+            if self.append:
+                records = self._new_records(records)
+            self._pending.extend(records)
+            while len(self._pending) >= self.row_group_size:
+                batch, self._pending = self._pending[: self.row_group_size], self._pending[self.row_group_size :]
+                self._flush(batch)
+
+    def _new_records(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Drop records whose key is already in the dataset. Caller holds the lock."""
+        known = self._known_keys
+        new_records = []
+        for record in records:
+            key = qa_key(record.get("question"), record.get("oracle_context"))
+            index = int(np.searchsorted(known, key))
+            if key in self._new_keys or (index < len(known) and known[index] == key):
+                self.duplicates += 1
+                continue
+            self._new_keys.add(key)
+            new_records.append(record)
+        return new_records
+
+    def _flush(self, records: List[Dict[str, Any]]) -> None:
+        """Write one batch of records to every sink. Caller holds the lock."""
+        if not records:
+            return
+
+        formatted: Dict[str, List[Dict[str, Any]]] = {}
+        batches: Dict[str, "pa.RecordBatch"] = {}
+        for target, sink in self._sinks.items():
+            if target.format not in formatted:
+                formatted[target.format] = format_records(target.format, records, self.params)
+            rows = formatted[target.format]
+            if not rows:
+                continue
+            if isinstance(sink, JsonlStreamWriter):
+                sink.write(rows)
+            else:
+                if target.format not in batches:
+                    batches[target.format] = pa.RecordBatch.from_pylist(rows, schema=self._schemas[target.format])
+                sink.write_batch(batches[target.format])
+
+        if self._shards is not None:
+            self._shards.write_batch(pa.RecordBatch.from_pylist(records, schema=self.schema))
+        keys = (qa_key(record.get("question"), record.get("oracle_context")) for record in records)
+        self._key_batches.append(np.fromiter(keys, dtype=np.int64, count=len(records)))
+        self.rows += len(records)
+
+    def _close_sinks(self, raise_errors: bool = True) -> None:
+        """Close every export, raising the first error after all are closed unless ``raise_errors`` is off."""
+        error: Optional[Exception] = None
+        for sink in self._sinks.values():
+            try:
+                sink.close()
+            except Exception as e:
+                logger.warning(f"Failed to close {sink.path}: {e}")
+                error = error or e
+        if error is not None and raise_errors:
+            raise error
+
+    def close(self) -> Optional["Dataset"]:
+        """
+        Flush pending records, close the exports and finalize the dataset.
+
+        Returns:
+            The memory-mapped dataset, or None without Arrow output or ``datasets``
+        """
+        with self._lock:
+            if self._closed:
+                raise ValueError("Dataset writer is closed")
+            self._closed = True
+            try:
+                self._flush(self._pending)
+                self._pending = []
+            finally:
+                self._close_sinks()
+            shards = self._shards.finalize() if self._shards is not None else []
+            if self.append:
+                self._append_exports()
+            # The index lets later appends skip duplicates, also without Arrow output
+            save_qa_keys(self.output_path, np.concatenate([self._known_keys, *self._key_batches]))
+
+        for target, path in self.exports.items():
+            logger.info(f"Exported {self._sinks[target].rows} {target.format} rows to {path}")
+        if self.duplicates:
+            logger.info(f"Skipped {self.duplicates} records already in {self.output_path}")
+        if self._shards is None:
+            return None
+        logger.info(f"Wrote {self.rows} records to {len(shards)} dataset shard(s) in {self.output_path}")
+        if Dataset is None:
+            return None
+        return Dataset.load_from_disk(str(self.output_path))
+
+    def _append_exports(self) -> None:
+        """Add the exports written by this writer to the existing ones."""
+        for target, path in self.exports.items():
+            sink = self._sinks[target]
+            if sink.rows:
+                append_export_shard(path, sink.path)
+            else:
+                sink.path.unlink(missing_ok=True)
+
+    def abort(self) -> None:
+        """
+        Stop writing and remove the incomplete shards; exports are left as
+        written so far, except in append mode where they are removed too.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._pending = []
+            self._close_sinks(raise_errors=False)
+            if self._shards is not None:
+                self._shards.abort()
+            if self.append:
+                for sink in self._sinks.values():
+                    sink.path.unlink(missing_ok=True)
+
+
+MANIFEST_SUFFIX = ".manifest.json"
+_PENDING_SHARD_SUFFIX = ".tmp"
+
+
+class _HashingFile:
+    """Binary file that hashes and counts the bytes written to it."""
+
+    def __init__(self, path: Path):
+        self._file = open(path, "wb", buffering=JSONL_BUFFER_SIZE)
+        self._sha256 = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data: Any) -> int:
+        self._sha256.update(data)
+        self.size += len(data) if isinstance(data, bytes) else memoryview(data).nbytes
+        return self._file.write(data)
+
+    def tell(self) -> int:
+        return self.size
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def writable(self) -> bool:
+        return True
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    def close(self) -> None:
+        self._file.close()
+
+    def hexdigest(self) -> str:
+        return self._sha256.hexdigest()
+
+
+class ExportShard:
+    """One JSONL or Parquet shard, written under a temporary name."""
+
+    def __init__(self, path: Path, output_type: str, schema: Optional["pa.Schema"] = None):
+        self.path = path
+        self.output_type = output_type
+        self.rows = 0
+        self._file = _HashingFile(path)
+        self._parquet = pq.ParquetWriter(self._file, schema) if output_type == "parquet" else None
+
+    @property
+    def size(self) -> int:
+        """Bytes written so far."""
+        return self._file.size
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    def write_lines(self, lines: List[bytes]) -> None:
+        """Append serialized JSON lines, one row each."""
+        self.write_bytes(b"".join(lines), len(lines))
+
+    def write_bytes(self, data: bytes, rows: int) -> None:
+        """Append serialized JSON lines holding ``rows`` rows."""
+        self._file.write(data)
+        self.rows += rows
+
+    def write_table(self, table: "pa.Table") -> None:
+        """Append a table to a Parquet shard as one row group."""
+        if self._parquet is None:
+            raise ValueError(f"Cannot write a table to a {self.output_type} shard")
+        self._parquet.write_table(table, row_group_size=max(1, table.num_rows))
+        self.rows += table.num_rows
+
+    def close(self) -> None:
+        if self._parquet is not None:
+            self._parquet.close()
+        self._file.close()
+
+    def info(self, filename: str) -> Dict[str, Any]:
+        """Manifest entry of the closed shard under its final ``filename``."""
+        return {"filename": filename, "rows": self.rows, "bytes": self.size, "sha256": self._file.hexdigest()}
+
+
+class ShardedFileWriter:
+    """
+    Writes Arrow tables to JSONL or Parquet shards.
+
+    A new shard is started before a shard would exceed ``max_shard_rows``
+    rows or ``max_shard_bytes`` bytes. JSONL shards are split on line
+    boundaries and never exceed the byte limit unless a single line does;
+    Parquet shards are split on row groups sized from the average row size,
+    so their size is approximate. ``close`` names the shards
+    ``<stem>-XXXXX-of-YYYYY.<type>`` and writes ``<stem>.manifest.json`` with
+    the rows, bytes and SHA-256 of each shard, hashed as they are written.
+
+    The schema is taken from the first table unless given up front; an empty
+    Parquet export needs one.
+    """
+
+    def __init__(
+        self,
+        output_file: Union[str, Path],
+        max_shard_bytes: Optional[int] = None,
+        max_shard_rows: Optional[int] = None,
+        schema: Optional["pa.Schema"] = None,
+    ):
+        if pa is None:
+            raise ImportError("pyarrow is required for dataset output. Install with: pip install raft-toolkit[ai]")
+        self.output_file = Path(output_file)
+        self.output_type = self.output_file.suffix.lstrip(".")
+        if self.output_type not in ("jsonl", "parquet"):
+            raise ValueError(f"Unsupported export type: {self.output_type}")
+        if max_shard_bytes is not None and max_shard_bytes < 1:
+            raise ValueError("max_shard_bytes must be positive")
+        if max_shard_rows is not None and max_shard_rows < 1:
+            raise ValueError("max_shard_rows must be positive")
+        self.max_shard_bytes = max_shard_bytes
+        self.max_shard_rows = max_shard_rows
+        self.schema: Optional["pa.Schema"] = schema
+        self._shards: List[ExportShard] = []
+        self._current: Optional[ExportShard] = None
+        self.output_file.parent.mkdir(parents=True, exist_ok=True)
+        self._remove_stale_shards()
+
+    @property
+    def _stem(self) -> str:
+        return self.output_file.stem
+
+    def _remove_stale_shards(self) -> None:
+        """Remove shards and manifest of a previous export to the same path."""
+        remove_export_shards(self.output_file)
+
+    @property
+    def manifest_path(self) -> Path:
+        return manifest_path_of(self.output_file)
+
+    def set_schema(self, schema: "pa.Schema") -> None:
+        """Set the schema before any shard is started, e.g. for an empty export."""
+        if self._shards:
+            raise ValueError("Cannot set the schema after shards have been started")
+        self.schema = schema
+
+    def allocate_shards(self, count: int) -> List[ExportShard]:
+        """
+        Start ``count`` shards up front, for callers that know the shard
+        boundaries and fill the shards concurrently. Each returned shard must
+        be closed before :meth:`close`.
+        """
+        if count < 1:
+            raise ValueError("count must be positive")
+        return [self._new_shard() for _ in range(count)]
+
+    def _new_shard(self) -> ExportShard:
+        path = pending_shard_path(self.output_file, len(self._shards))
+        shard = ExportShard(path, self.output_type, self.schema)
+        self._shards.append(shard)
+        return shard
+
+    def _fits(self, rows: int, size: int, row_bytes: int) -> bool:
+        """Whether a row of ``row_bytes`` fits in a shard of ``rows`` rows and ``size`` bytes."""
+        if rows == 0:
+            return True  # An oversized row still gets a shard of its own
+        if self.max_shard_rows is not None and rows >= self.max_shard_rows:
+            return False
+        return self.max_shard_bytes is None or size + row_bytes <= self.max_shard_bytes
+
+    def _rotate(self) -> ExportShard:
+        if self._current is not None:
+            self._current.close()
+        self._current = self._new_shard()
+        return self._current
+
+    def write_table(self, table: "pa.Table") -> None:
+        """Append the rows of an Arrow table."""
+        if self.schema is None:
+            self.schema = table.schema
+        elif table.schema != self.schema:
+            table = table.cast(self.schema)
+        if self.output_type == "jsonl":
+            self._write_jsonl(table)
+        else:
+            self._write_parquet(table)
+
+    def _write_jsonl(self, table: "pa.Table") -> None:
+        # Lines are serialized one by one so shards split exactly on the limits
+        for batch in table.to_batches():
+            pending: List[bytes] = []
+            pending_bytes = 0
+            shard = self._current
+            for record in batch.to_pylist():
+                line = dumps_jsonl([record])
+                if shard is None or not self._fits(shard.rows + len(pending), shard.size + pending_bytes, len(line)):
+                    if shard is not None and pending:
+                        shard.write_lines(pending)
+                        pending, pending_bytes = [], 0
+                    shard = self._rotate()
+                pending.append(line)
+                pending_bytes += len(line)
+            if shard is not None and pending:
+                shard.write_lines(pending)
+
+    def _write_parquet(self, table: "pa.Table") -> None:
+        rows_per_group = table.num_rows or 1
+        if self.max_shard_bytes is not None and table.num_rows:
+            # Several row groups per shard, so a shard overshoots the limit by little
+            row_bytes = max(1, table.nbytes // table.num_rows)
+            rows_per_group = max(1, self.max_shard_bytes // (4 * row_bytes))
+        offset = 0
+        while offset < table.num_rows:
+            shard = self._current
+            if shard is None or not self._fits(shard.rows, shard.size, 0):
+                shard = self._rotate()
+            length = rows_per_group
+            if self.max_shard_rows is not None:
+                length = min(length, self.max_shard_rows - shard.rows)
+            shard.write_table(table.slice(offset, length))
+            offset += length
+            if self.max_shard_bytes is not None and shard.size >= self.max_shard_bytes:
+                shard.close()
+                self._current = None
+
+    def close(self) -> Dict[str, Any]:
+        """Close the shards, give them their final names and write the manifest."""
+        if not self._shards:
+            # No rows: one empty shard, so readers still find the files and the schema
+            if self.output_type == "parquet" and self.schema is None:
+                raise ValueError("Cannot write an empty Parquet export without a schema")
+            self._new_shard()
+        for shard in self._shards:
+            if not shard.closed:
+                shard.close()
+        return finalize_shards(self.output_file, self._shards, self.max_shard_bytes, self.max_shard_rows)
+
+    def abort(self) -> None:
+        """Close and remove the written shards."""
+        for shard in self._shards:
+            if not shard.closed:
+                shard.close()
+            shard.path.unlink(missing_ok=True)
+
+
+def pending_shard_path(output_file: Path, index: int) -> Path:
+    """Temporary name of a shard until its final count is known."""
+    return output_file.with_name(f"{output_file.stem}-{index:05d}{output_file.suffix}{_PENDING_SHARD_SUFFIX}")
+
+
+def remove_export_shards(output_file: Path) -> None:
+    """Remove the shards, pending shards and manifest of a sharded export."""
+    output_type = output_file.suffix.lstrip(".")
+    for pattern in (f"{output_file.stem}-?????-of-?????.{output_type}", f"{output_file.stem}-?????.*.tmp"):
+        for path in output_file.parent.glob(pattern):
+            path.unlink()
+    manifest_path_of(output_file).unlink(missing_ok=True)
+
+
+def manifest_path_of(output_file: Path) -> Path:
+    """Manifest of the shards of ``output_file``."""
+    return output_file.with_name(output_file.stem + MANIFEST_SUFFIX)
+
+
+def read_manifest(output_file: Union[str, Path]) -> Optional[Dict[str, Any]]:
+    """The shard manifest of an export, or None if it is not sharded."""
+    path = manifest_path_of(Path(output_file))
+    if not path.is_file():
+        return None
+    with open(path, encoding="utf-8") as file:
+        manifest: Dict[str, Any] = json.load(file)
+    return manifest
+
+
+class WrittenShard:
+    """A closed shard file described by its manifest entry."""
+
+    def __init__(self, path: Path, entry: Dict[str, Any]):
+        self.path = path
+        self.entry = entry
+
+    def info(self, filename: str) -> Dict[str, Any]:
+        """Manifest entry of the shard under its final ``filename``."""
+        return {**self.entry, "filename": filename}
+
+
+def describe_shard(path: Path) -> Dict[str, Any]:
+    """Rows, bytes and SHA-256 of a closed JSONL or Parquet file."""
+    sha256 = hashlib.sha256()
+    lines = 0
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(JSONL_BUFFER_SIZE), b""):
+            sha256.update(block)
+            lines += block.count(b"\n")
+    # Pending shards end with ".parquet.tmp"
+    rows = pq.ParquetFile(str(path)).metadata.num_rows if ".parquet" in path.suffixes else lines
+    return {"filename": path.name, "rows": rows, "bytes": path.stat().st_size, "sha256": sha256.hexdigest()}
+
+
+def append_export_shard(output_file: Union[str, Path], new_file: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Add a closed file as the last shard of an export.
+
+    The existing shards are only renamed to the new shard count; an export
+    written as a single file becomes the first shard.
+    """
+    output_file = Path(output_file)
+    manifest = read_manifest(output_file)
+    shards: List[Any] = []
+    limits: Dict[str, Any] = {"max_shard_bytes": None, "max_shard_rows": None}
+    if manifest is not None:
+        shards = [WrittenShard(output_file.with_name(entry["filename"]), entry) for entry in manifest["shards"]]
+        limits = {name: manifest[name] for name in limits}
+    elif output_file.is_file():
+        shards = [WrittenShard(output_file, describe_shard(output_file))]
+    new_file = Path(new_file)
+    shards.append(WrittenShard(new_file, describe_shard(new_file)))
+    return finalize_shards(output_file, shards, **limits)
+
+
+def finalize_shards(
+    output_file: Path, shards: Sequence[Any], max_shard_bytes: Optional[int], max_shard_rows: Optional[int]
+) -> Dict[str, Any]:
+    """Rename closed shards to ``<stem>-XXXXX-of-YYYYY.<type>`` and write their manifest."""
+    output_type = output_file.suffix.lstrip(".")
+    entries = []
+    for i, shard in enumerate(shards):
+        filename = f"{output_file.stem}-{i:05d}-of-{len(shards):05d}.{output_type}"
+        os.replace(shard.path, output_file.with_name(filename))
+        entries.append(shard.info(filename))
+
+    manifest = {
+        "format": output_type,
+        "total_rows": sum(entry["rows"] for entry in entries),
+        "total_bytes": sum(entry["bytes"] for entry in entries),
+        "max_shard_bytes": max_shard_bytes,
+        "max_shard_rows": max_shard_rows,
+        "shards": entries,
+    }
+    manifest_path = manifest_path_of(output_file)
+    with open(manifest_path, "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=2)
+    logger.info(f"Wrote {manifest['total_rows']} rows to {len(entries)} shard(s), manifest {manifest_path}")
+    return manifest
+
+
+def write_row_shards(
+    tables: Sequence["pa.Table"],
+    output_file: Union[str, Path],
+    max_shard_rows: Optional[int] = None,
+    workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Write one shard per table in parallel and record them in a manifest.
+
+    Used when shard boundaries are known up front (row-bounded shards of a
+    dataset), so each shard can be serialized by its own thread.
+    """
+    output_file = Path(output_file)
+    # Reuses the writer for naming, validation and stale shard removal
+    writer = ShardedFileWriter(output_file, max_shard_rows=max_shard_rows, schema=tables[0].schema if tables else None)
+    shards = writer.allocate_shards(max(1, len(tables)))
+
+    def write(pair: Any) -> None:
+        shard, table = pair
+        try:
+            if shard.output_type == "jsonl":
+                for batch in table.to_batches():
+                    shard.write_lines([dumps_jsonl([record]) for record in batch.to_pylist()])
+            else:
+                shard.write_table(table)
+        finally:
+            shard.close()
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers or min(32, (os.cpu_count() or 1) + 4)) as executor:
+            list(executor.map(write, zip(shards, tables)))
+        if not tables:
+            shards[0].close()
+    except BaseException:
+        writer.abort()
+        raise
+    return finalize_shards(output_file, shards, None, max_shard_rows)
+
+
+def write_sharded(
+    tables: Iterable["pa.Table"],
+    output_file: Union[str, Path],
+    max_shard_bytes: Optional[int] = None,
+    max_shard_rows: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Write a stream of Arrow tables to bounded shards and return the manifest."""
+    writer = ShardedFileWriter(output_file, max_shard_bytes=max_shard_bytes, max_shard_rows=max_shard_rows)
+    try:
+        for table in tables:
+            writer.write_table(table)
+    except BaseException:
+        writer.abort()
+        raise
+    return writer.close()
@@ -4,28 +4,28 @@ Document processing service for chunking and text extraction.
 
 import json
 import logging
-import re
-import time
+import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from math import ceil
 from pathlib import Path
-from typing import Any, List
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple, Union
 
 from ..config import RaftConfig
+from ..extractors import ExtractionCache, create_pdf_extractor, extract_pdf_text
+from ..extractors.buffer import BufferHandoff, BufferLike, DocumentBuffer
+from ..extractors.pdf import resolve_pdf_workers
 from ..models import DocumentChunk
-from .embedding_service import create_embedding_service
+from ..utils.tokenizer import TokenChunk, get_tokenizer, split_fixed, split_sentences
+from .embedding_service import create_embedding_rate_limiter, create_embedding_service, rate_limit_embeddings
 from .llm_service import LLMService
 
 try:
-    import pypdf
-except ImportError:
-    pypdf = None  # type: ignore
-
-try:
+    import pptx
     from pptx import Presentation
 
     HAS_PPTX = True
 except ImportError:
+    pptx = None  # type: ignore
     HAS_PPTX = False
 
     class Presentation:  # type: ignore[no-redef]
@@ -98,7 +98,19 @@ class DocumentService:
     def __init__(self, config: RaftConfig, llm_service: LLMService):
         self.config = config
         self.llm_service = llm_service
-        self.embedding_service = create_embedding_service(config)
+        self.embedding_rate_limiter = create_embedding_rate_limiter(config)
+        self.embedding_service = create_embedding_service(config, rate_limiter=self.embedding_rate_limiter)
+        self.tokenizer = get_tokenizer()
+        self.extraction_cache = (
+            ExtractionCache(config.extraction_cache_dir, fingerprint=config.extraction_cache_fingerprint)
+            if config.extraction_cache_dir
+            else None
+        )
+
+        # Shared across calls so clients and threads are created once per service
+        self._lock = threading.Lock()
+        self._embeddings: Any = None
+        self._executor: Optional[ThreadPoolExecutor] = None
 
     def process_documents(self, data_path: Path) -> List[DocumentChunk]:
         """Process documents and return chunks."""
@@ -114,6 +126,10 @@ class DocumentService:
         with open(data_path) as f:
             api_docs_json = json.load(f)
 
+        return self._api_chunks(api_docs_json, str(data_path))
+
+    def _api_chunks(self, api_docs_json: Any, source: str) -> List[DocumentChunk]:
+        """Create one chunk per API documentation entry."""
         required_fields = ["user_name", "api_name", "api_call", "api_version", "api_arguments", "functionality"]
         if api_docs_json and isinstance(api_docs_json[0], dict):
             for field in required_fields:
@@ -122,17 +138,13 @@ class DocumentService:
 
         chunks = []
         for i, api_doc in enumerate(api_docs_json):
-            chunk = DocumentChunk.create(
-                content=str(api_doc), source=str(data_path), metadata={"type": "api", "index": i}
-            )
+            chunk = DocumentChunk.create(content=str(api_doc), source=source, metadata={"type": "api", "index": i})
             chunks.append(chunk)
 
         return chunks
 
     def _process_regular_documents(self, data_path: Path) -> List[DocumentChunk]:
         """Process regular documents (PDF, TXT, JSON, PPTX)."""
-        embeddings = self._build_embeddings()
-
         # Get list of files to process
         file_paths = []
         if data_path.is_dir():
@@ -140,62 +152,199 @@ class DocumentService:
         else:
             file_paths = [data_path]
 
-        all_chunks = []
-        futures = []
+        return self.process_files(file_paths)
+
+    def process_files(self, file_paths: List[Path]) -> List[DocumentChunk]:
+        """
+        Process many files concurrently and embed all their chunks in one batch.
+
+        Files are chunked on the shared thread pool (PDF parsing additionally fans
+        out to the extraction process pool). Files that fail are logged and skipped.
+
+        Args:
+            file_paths: Files to process
+
+        Returns:
+            Chunks of all files, grouped by file in input order
+        """
+        if self.config.doctype == "api":
+            api_chunks: List[DocumentChunk] = []
+            for file_path in file_paths:
+                try:
+                    api_chunks.extend(self._process_api_documents(file_path))
+                except Exception as e:
+                    logger.error(f"Error processing file {file_path}: {e}")
+            return api_chunks
+
+        embeddings = self._get_embeddings()
+        executor = self._get_executor()
+        results: List[List[DocumentChunk]] = [[] for _ in file_paths]
+        total_chunks = 0
 
         with tqdm(total=len(file_paths), desc="Processing files", unit="file") as pbar:
-            with ThreadPoolExecutor(max_workers=self.config.embed_workers) as executor:
-                for file_path in file_paths:
-                    future = executor.submit(self._process_single_file, embeddings, file_path)
-                    futures.append(future)
-
-                    if self.config.pace:
-                        time.sleep(15)
-
-                for future in as_completed(futures):
-                    try:
-                        chunks = future.result()
-                        all_chunks.extend(chunks)
-                        pbar.set_postfix({"total_chunks": len(all_chunks)})
-                        pbar.update(1)
-                    except Exception as e:
-                        logger.error(f"Error processing file: {e}")
-                        pbar.update(1)
-
-        # Create embeddings using the embedding service with template
-        if self.config.embedding_prompt_template or True:  # Always use the embedding service for consistency
+            futures = {
+                executor.submit(self._process_single_file, embeddings, file_path): index
+                for index, file_path in enumerate(file_paths)
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    results[index] = future.result()
+                    total_chunks += len(results[index])
+                    pbar.set_postfix({"total_chunks": total_chunks})
+                except Exception as e:
+                    logger.error(f"Error processing file {file_paths[index]}: {e}")
+                pbar.update(1)
+
+        all_chunks = [chunk for file_chunks in results for chunk in file_chunks]
+
+        # Embed chunks of all files in one batched request
+        if all_chunks:
             all_chunks = self.embedding_service.create_embeddings_with_template(all_chunks)
 
         return all_chunks
 
+    def process_buffer(self, data: Union[BufferLike, BufferHandoff], name: str) -> List[DocumentChunk]:
+        """
+        Process one document held in memory, without writing it to disk.
+
+        Accepts bytes, bytearray, memoryview or a binary file object such as
+        BytesIO. Payloads above ``source_spill_threshold`` bytes are spilled to
+        a memory-mapped temporary file (removed afterwards); pass them in a
+        :class:`BufferHandoff` so the downloaded bytes are freed once spilled.
+
+        Args:
+            data: Raw document content in the configured doctype
+            name: Document name, used as the chunk source
+
+        Returns:
+            Embedded chunks of the document
+        """
+        logger.debug(f"Processing in-memory document: {name} ({self.config.doctype})")
+
+        with DocumentBuffer(data, name=name, spill_threshold=self.config.source_spill_threshold) as buffer:
+            if self.config.doctype == "api":
+                return self._api_chunks(json.loads(buffer.text()), name)
+
+            text = self._extract_text(buffer)
+
+        chunks = self._build_chunks(self._chunk_text(self._get_embeddings(), text), name)
+        if chunks:
+            chunks = self.embedding_service.create_embeddings_with_template(chunks)
+        return chunks
+
+    def measure_buffer(self, data: BufferLike, name: str) -> Tuple[int, List[int]]:
+        """
+        Measure a document without embedding it, for processing forecasts.
+
+        Text is extracted and split with the configured strategy. Semantic
+        chunking is not run; its chunk count is the token budget split that the
+        semantic chunker is configured with.
+
+        Returns:
+            Token count of the extracted text and the token count of each chunk
+        """
+        with DocumentBuffer(data, name=name, spill_threshold=self.config.source_spill_threshold) as buffer:
+            if self.config.doctype == "api":
+                counts = [self.tokenizer.count(str(entry)) for entry in json.loads(buffer.text())]
+                return sum(counts), counts
+            text = self._extract_text(buffer)
+
+        if self.config.chunking_strategy != "semantic":
+            return self.tokenizer.count(text), [count for _, count in self._chunk_text(None, text)]
+
+        total = self.tokenizer.count(text)
+        if not total:
+            return 0, []
+        num_chunks = self.config.chunking_params.get("number_of_chunks") or ceil(total / self.config.chunk_size)
+        return total, [total // num_chunks + (1 if i < total % num_chunks else 0) for i in range(num_chunks)]
+
+    def _get_embeddings(self) -> Any:
+        """Return the chunking embeddings client, building it once per service."""
+        with self._lock:
+            if self._embeddings is None:
+                self._embeddings = rate_limit_embeddings(self._build_embeddings(), self.embedding_rate_limiter)
+            return self._embeddings
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Return the shared file processing thread pool."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=max(1, self.config.embed_workers), thread_name_prefix="raft-docs"
+                )
+            return self._executor
+
+    def close(self) -> None:
+        """Shut down the shared thread pool."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+    def get_pacing_statistics(self) -> Dict[str, Any]:
+        """Get statistics of the embedding rate limiter, including time spent pacing."""
+        return self.embedding_rate_limiter.get_statistics()
+
     def _process_single_file(self, embeddings: Any, file_path: Path) -> List[DocumentChunk]:
         """Process a single file and return its chunks."""
         logger.debug(f"Processing file: {file_path}")
 
-        # Extract text based on document type
-        text = self._extract_text(file_path)
+        # Extract text based on document type, reusing cached text when available
+        text = self._extract_text_cached(file_path)
 
         # Split into chunks
-        chunk_contents = self._split_text(embeddings, text)
+        return self._build_chunks(self._chunk_text(embeddings, text), str(file_path))
 
-        # Create DocumentChunk objects
+    def _build_chunks(self, token_chunks: List[TokenChunk], source: str) -> List[DocumentChunk]:
+        """Create DocumentChunk objects for the chunks of one document."""
         chunks = []
-        for i, content in enumerate(chunk_contents):
+        for i, (content, token_count) in enumerate(token_chunks):
             chunk = DocumentChunk.create(
                 content=content,
-                source=str(file_path),
+                source=source,
                 metadata={
                     "type": self.config.doctype,
                     "chunk_index": i,
                     "chunking_strategy": self.config.chunking_strategy,
+                    "token_count": token_count,
                 },
             )
             chunks.append(chunk)
 
         return chunks
 
-    def _extract_text(self, file_path: Path) -> str:
-        """Extract text from a file based on its type."""
+    def _extract_text_cached(self, file_path: Path) -> str:
+        """Extract text, consulting the extraction cache for PDF and PPTX files."""
+        if self.extraction_cache is None or self.config.doctype not in ("pdf", "pptx"):
+            return self._extract_text(file_path)
+
+        extractor, version = self._extractor_identity()
+        key = self.extraction_cache.key(file_path, self.config.doctype, extractor, version)
+        text = self.extraction_cache.get(key)
+        if text is not None:
+            logger.debug(f"Extraction cache hit for {file_path}")
+            return text
+
+        text = self._extract_text(file_path)
+        try:
+            self.extraction_cache.put(key, text)
+        except OSError as e:
+            logger.warning(f"Could not write extraction cache entry for {file_path}: {e}")
+        return text
+
+    def _extractor_identity(self) -> Tuple[str, str]:
+        """Name and version of the extractor used for the configured doctype."""
+        if self.config.doctype == "pdf":
+            extractor = create_pdf_extractor(self.config.pdf_extractor)
+            return extractor.name, extractor.version
+        return "python-pptx", str(getattr(pptx, "__version__", "unknown"))
+
+    def _extract_text(self, file_path: Union[Path, DocumentBuffer]) -> str:
+        """Extract text from a file or in-memory buffer based on its type."""
+        if isinstance(file_path, DocumentBuffer):
+            return self._extract_text_from_buffer(file_path)
+
         if self.config.doctype == "json":
             with open(file_path, "r") as f:
                 data = json.load(f)
@@ -203,12 +352,12 @@ class DocumentService:
             return str(text_value)  # Ensure we return a string
 
         elif self.config.doctype == "pdf":
-            text = ""
-            with open(file_path, "rb") as file:
-                reader = pypdf.PdfReader(file)
-                for page in reader.pages:
-                    text += page.extract_text()
-            return text
+            return extract_pdf_text(
+                file_path,
+                extractor=self.config.pdf_extractor,
+                workers=resolve_pdf_workers(self.config.pdf_workers),
+                min_pages=self.config.pdf_parallel_min_pages,
+            )
 
         elif self.config.doctype == "txt":
             with open(file_path, "r", encoding="utf-8") as file:
@@ -220,11 +369,33 @@ class DocumentService:
         else:
             raise ValueError(f"Unsupported document type: {self.config.doctype}")
 
-    def _extract_text_from_pptx(self, file_path: Path) -> str:
-        """Extract text from PowerPoint file."""
+    def _extract_text_from_buffer(self, buffer: DocumentBuffer) -> str:
+        """Extract text from an in-memory document."""
+        if self.config.doctype == "json":
+            data = json.loads(buffer.text())
+            return str(data.get("text", str(data)))
+
+        elif self.config.doctype == "pdf":
+            return extract_pdf_text(
+                buffer.source(),
+                extractor=self.config.pdf_extractor,
+                workers=resolve_pdf_workers(self.config.pdf_workers),
+                min_pages=self.config.pdf_parallel_min_pages,
+            )
+
+        elif self.config.doctype == "txt":
+            return buffer.text("utf-8")
+
+        elif self.config.doctype == "pptx":
+            return self._extract_text_from_pptx(buffer.stream())
+
+        else:
+            raise ValueError(f"Unsupported document type: {self.config.doctype}")
+
+    def _extract_text_from_pptx(self, file_path: Union[Path, BinaryIO]) -> str:
+        """Extract text from PowerPoint file or binary stream."""
         # Convert Path to string for compatibility with Presentation
-        file_path_str = str(file_path)
-        prs = Presentation(file_path_str)
+        prs = Presentation(str(file_path) if isinstance(file_path, Path) else file_path)
         text_parts = []
 
         for slide in prs.slides:
@@ -240,15 +411,25 @@ class DocumentService:
 
     def _split_text(self, embeddings: Any, text: str) -> List[str]:
         """Split text into chunks based on the configured strategy."""
+        return [content for content, _ in self._chunk_text(embeddings, text)]
+
+    def _chunk_text(self, embeddings: Any, text: str) -> List[TokenChunk]:
+        """Split text into (content, token count) pairs based on the configured strategy."""
         if self.config.chunking_strategy == "semantic":
-            return self._semantic_chunking(embeddings, text)
+            return [(content, self.tokenizer.count(content)) for content in self._semantic_chunking(embeddings, text)]
         elif self.config.chunking_strategy == "fixed":
-            return self._fixed_chunking(text)
+            return split_fixed(text, self.tokenizer.token_offsets(text), self.config.chunk_size, self._chunk_overlap())
         elif self.config.chunking_strategy == "sentence":
-            return self._sentence_chunking(text)
+            return split_sentences(
+                text, self.tokenizer.token_offsets(text), self.config.chunk_size, self._chunk_overlap()
+            )
         else:
             raise ValueError(f"Unknown chunking strategy: {self.config.chunking_strategy}")
 
+    def _chunk_overlap(self) -> int:
+        """Token overlap between consecutive chunks."""
+        return int(self.config.chunking_params.get("overlap", self.config.chunk_overlap))
+
     def _semantic_chunking(self, embeddings: Any, text: str) -> List[str]:
         """Perform semantic chunking using embeddings."""
         if not HAS_SEMANTIC_CHUNKER:
@@ -257,7 +438,7 @@ class DocumentService:
 
         try:
             params = self.config.chunking_params
-            num_chunks = params.get("number_of_chunks") or ceil(len(text) / self.config.chunk_size)
+            num_chunks = params.get("number_of_chunks") or ceil(self.tokenizer.count(text) / self.config.chunk_size)
             min_chunk_size = params.get("min_chunk_size", 0)
 
             # Ensure we have a reasonable number of chunks
@@ -282,28 +463,14 @@ class DocumentService:
             return self._fixed_chunking(text)
 
     def _fixed_chunking(self, text: str) -> List[str]:
-        """Split text into fixed-size chunks."""
-        chunk_size = self.config.chunk_size
-        return [text[i : i + chunk_size] for i in range(0, len(text), chunk_size)]
+        """Split text into fixed-size chunks of ``chunk_size`` tokens."""
+        offsets = self.tokenizer.token_offsets(text)
+        return [content for content, _ in split_fixed(text, offsets, self.config.chunk_size, self._chunk_overlap())]
 
     def _sentence_chunking(self, text: str) -> List[str]:
-        """Split text by sentences, respecting chunk size limits."""
-        sentences = re.split(r"(?<=[.!?]) +", text)
-        chunks = []
-        current_chunk = ""
-
-        for sentence in sentences:
-            if len(current_chunk) + len(sentence) > self.config.chunk_size:
-                if current_chunk:
-                    chunks.append(current_chunk)
-                current_chunk = sentence
-            else:
-                current_chunk += (" " if current_chunk else "") + sentence
-
-        if current_chunk:
-            chunks.append(current_chunk)
-
-        return chunks
+        """Split text by sentences, packing them into chunks of at most ``chunk_size`` tokens."""
+        offsets = self.tokenizer.token_offsets(text)
+        return [content for content, _ in split_sentences(text, offsets, self.config.chunk_size, self._chunk_overlap())]
 
     def _build_embeddings(self) -> Any:
         """Build embeddings model for semantic chunking."""
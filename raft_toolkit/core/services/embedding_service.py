@@ -9,7 +9,10 @@ from typing import Any, Dict, List, Optional, Protocol
 from raft_toolkit.core.config import RaftConfig
 from raft_toolkit.core.models import DocumentChunk
 from raft_toolkit.core.services.langwatch_service import create_langwatch_service
+from raft_toolkit.core.utils.embedding_store import attach_embeddings
+from raft_toolkit.core.utils.rate_limiter import RateLimiter, create_rate_limiter_from_config
 from raft_toolkit.core.utils.template_loader import create_template_loader
+from raft_toolkit.core.utils.tokenizer import get_tokenizer
 
 
 # Define protocol for embeddings
@@ -65,13 +68,91 @@ except ImportError:
 logger = logging.getLogger(__name__)
 
 
+def create_embedding_rate_limiter(config: RaftConfig) -> RateLimiter:
+    """
+    Create the rate limiter used for embedding requests.
+
+    Pacing only applies when ``pace`` is on and an embedding RPM or TPM limit is
+    configured. The sliding window lets requests through until a budget is
+    nearly used up, so unlimited (e.g. local) endpoints are never slowed down.
+    """
+    rpm = config.embedding_rate_limit_requests_per_minute
+    tpm = config.embedding_rate_limit_tokens_per_minute
+    if not config.pace or not (rpm or tpm):
+        return create_rate_limiter_from_config(enabled=False)
+
+    logger.info(f"Pacing embedding requests (requests/min: {rpm or 'unlimited'}, tokens/min: {tpm or 'unlimited'})")
+    return create_rate_limiter_from_config(
+        enabled=True, strategy="sliding_window", requests_per_minute=rpm, tokens_per_minute=tpm
+    )
+
+
+class RateLimitedEmbeddings:
+    """
+    Embeddings model proxy that acquires from a rate limiter before each request.
+
+    Large ``embed_documents`` calls are split into batches of at most a tenth of
+    the TPM budget so throttling kicks in gradually rather than all at once.
+    """
+
+    def __init__(self, embeddings: Any, rate_limiter: RateLimiter):
+        self.embeddings = embeddings
+        self.rate_limiter = rate_limiter
+        self.tokenizer = get_tokenizer()
+        tokens_per_minute = rate_limiter.config.tokens_per_minute
+        self.max_batch_tokens = max(1, tokens_per_minute // 10) if tokens_per_minute else None
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors: List[List[float]] = []
+        for batch, batch_tokens in self._batches(texts):
+            self.rate_limiter.acquire(estimated_tokens=batch_tokens)
+            start_time = time.time()
+            vectors.extend(self.embeddings.embed_documents(batch))
+            self.rate_limiter.record_response(time.time() - start_time)
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        self.rate_limiter.acquire(estimated_tokens=self.tokenizer.count(text))
+        start_time = time.time()
+        embedding = self.embeddings.embed_query(text)
+        self.rate_limiter.record_response(time.time() - start_time)
+        return embedding  # type: ignore[no-any-return]
+
+    def _batches(self, texts: List[str]) -> List[Any]:
+        """Group texts into (batch, token count) pairs within the batch token budget."""
+        batches: List[Any] = []
+        batch: List[str] = []
+        batch_tokens = 0
+        for text in texts:
+            tokens = self.tokenizer.count(text)
+            if batch and self.max_batch_tokens and batch_tokens + tokens > self.max_batch_tokens:
+                batches.append((batch, batch_tokens))
+                batch, batch_tokens = [], 0
+            batch.append(text)
+            batch_tokens += tokens
+        if batch:
+            batches.append((batch, batch_tokens))
+        return batches
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.embeddings, name)
+
+
+def rate_limit_embeddings(embeddings: Any, rate_limiter: RateLimiter) -> Any:
+    """Wrap an embeddings model with pacing, or return it unchanged when pacing is off."""
+    if not rate_limiter.config.enabled:
+        return embeddings
+    return RateLimitedEmbeddings(embeddings, rate_limiter)
+
+
 class EmbeddingService:
     """Service for generating embeddings with custom prompts."""
 
-    def __init__(self, config: RaftConfig):
+    def __init__(self, config: RaftConfig, rate_limiter: Optional[RateLimiter] = None):
         self.config = config
+        self.rate_limiter = rate_limiter or create_embedding_rate_limiter(config)
         self.template_loader = create_template_loader(config)
-        self.embeddings_model = self._build_embeddings_model()
+        self.embeddings_model = rate_limit_embeddings(self._build_embeddings_model(), self.rate_limiter)
         self.embedding_template = self._load_embedding_template()
         self.langwatch_service = create_langwatch_service(config)
 
@@ -192,12 +273,13 @@ class EmbeddingService:
         try:
             embeddings = self.embeddings_model.embed_documents(formatted_texts)
 
-            # Add embeddings to chunks
-            for chunk, embedding in zip(chunks, embeddings):
-                chunk.embedding = embedding
+            # Store all vectors in one shared matrix; each chunk gets a row view
+            attach_embeddings(chunks, embeddings, dtype=self.config.embedding_dtype)
+
+            for chunk, formatted_text in zip(chunks, formatted_texts):
                 # Also store the formatted text used for embedding
                 chunk.metadata = chunk.metadata or {}
-                chunk.metadata["embedding_prompt"] = self._format_chunk_for_embedding(chunk)
+                chunk.metadata["embedding_prompt"] = formatted_text
 
             # Track embedding generation
             processing_time = time.time() - start_time
@@ -299,6 +381,6 @@ class EmbeddingService:
         }
 
 
-def create_embedding_service(config: RaftConfig) -> EmbeddingService:
+def create_embedding_service(config: RaftConfig, rate_limiter: Optional[RateLimiter] = None) -> EmbeddingService:
     """Create and return an embedding service instance."""
-    return EmbeddingService(config)
+    return EmbeddingService(config, rate_limiter=rate_limiter)
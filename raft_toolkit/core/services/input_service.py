@@ -3,16 +3,26 @@ Input source service for handling multiple input types (local, S3, SharePoint).
 Integrates with existing document processing pipeline.
 """
 
+import asyncio
 import logging
+from contextlib import aclosing
 from pathlib import Path
-from tempfile import NamedTemporaryFile
-from typing import Any, Dict, List
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
 
 from ..config import RaftConfig
+from ..extractors import BufferHandoff
 from ..models import DocumentChunk
-from ..sources import InputSourceConfig, InputSourceFactory, SourceDocument, SourceValidationError
+from ..sources import (
+    BlobCache,
+    InputSourceConfig,
+    InputSourceFactory,
+    SourceDocument,
+    SourceMetrics,
+    SourceValidationError,
+)
 from .document_service import DocumentService
 from .llm_service import LLMService
+from .preview_service import PreviewService
 
 logger = logging.getLogger(__name__)
 
@@ -51,11 +61,26 @@ class InputService:
             supported_types=[self.config.doctype] if self.config.doctype != "api" else ["json"],
             max_file_size=self.config.source_max_file_size,
             batch_size=self.config.source_batch_size,
+            max_concurrency=self.config.source_max_concurrency,
+            max_documents=self.config.source_max_documents,
+            options=self._source_options(),
             recursive=True,
         )
 
         return InputSourceFactory.create_source(source_config)
 
+    def _source_options(self) -> Dict[str, Any]:
+        """Source-specific options derived from the configuration."""
+        options: Dict[str, Any] = {}
+        if self.config.source_delta_state:
+            options["delta_state_path"] = self.config.source_delta_state
+        if self.config.source_cache_dir:
+            options["cache_dir"] = self.config.source_cache_dir
+            options["cache_max_size"] = self.config.source_cache_max_size
+        if self.config.source_walk_workers > 1:
+            options["walk_workers"] = self.config.source_walk_workers
+        return options
+
     async def validate_source(self) -> None:
         """Validate the input source configuration and connectivity."""
         try:
@@ -69,15 +94,31 @@ class InputService:
             raise SourceValidationError(f"Input source validation failed: {e}")
 
     async def get_processing_preview(self) -> Dict[str, Any]:
-        """Get a preview of what will be processed without actually processing."""
+        """
+        Get a preview of what will be processed without actually processing.
+
+        With ``preview_sample_size`` above zero, a stratified sample of the
+        documents is downloaded, extracted and chunked to estimate chunks,
+        tokens, cost and duration (see ``PreviewService``); otherwise chunks
+        are guessed from the document count.
+        """
         try:
-            preview_data = await self.input_source.get_processing_preview()
+            documents = None
+            if self.config.preview_sample_size > 0:
+                documents = await self.input_source.list_documents()
+
+            preview_data = await self.input_source.get_processing_preview(documents)
             preview: Dict[str, Any] = dict(preview_data)  # Ensure it's a dict
 
-            # Add estimated processing info
-            supported_docs = preview["supported_documents"]
-            estimated_chunks = max(1, supported_docs * 3)  # Rough estimate
-            estimated_qa_points = estimated_chunks * self.config.questions
+            estimate = await self._estimate_processing(documents) if documents else None
+            if estimate is not None:
+                estimated_chunks = estimate["chunks"]["estimate"]
+                estimated_qa_points = estimate["qa_points"]["estimate"]
+                preview["estimate"] = estimate
+            else:
+                supported_docs = preview["supported_documents"]
+                estimated_chunks = max(1, supported_docs * 3)  # Rough estimate
+                estimated_qa_points = estimated_chunks * self.config.questions
 
             preview.update(
                 {
@@ -96,150 +137,233 @@ class InputService:
             logger.error(f"Failed to get processing preview: {e}")
             raise
 
+    async def _estimate_processing(self, documents: List[SourceDocument]) -> Optional[Dict[str, Any]]:
+        """Estimate the run from a sample of the supported documents."""
+        supported = [doc for doc in documents if doc.is_supported_type(self.input_source.config.supported_types)]
+        semaphore = asyncio.Semaphore(self.config.source_max_concurrency)
+        preview_service = PreviewService(self.config, self.document_service)
+        return await preview_service.preview_documents(
+            supported, lambda doc: self.input_source.fetch_document(doc, semaphore)
+        )
+
     async def process_documents(self) -> List[DocumentChunk]:
-        """Process all documents from the input source."""
+        """
+        Process all documents from the input source.
+
+        Documents are processed in batches of ``source_batch_size`` as they are
+        listed; the next batch is listed while the current one is processed.
+        """
         try:
-            # Get list of documents
             logger.info("Listing documents from input source...")
-            documents = await self.input_source.list_documents()
+            all_chunks: List[DocumentChunk] = []
+            failed: List[SourceDocument] = []
+            total_documents = 0
+            batch_number = 0
+
+            async for batch in self._iter_document_batches():
+                batch_number += 1
+                total_documents += len(batch)
+                logger.info(f"Processing batch {batch_number} ({len(batch)} documents, {total_documents} so far)")
+
+                # Process documents based on source type
+                if self.config.source_type == "local":
+                    # For local sources, use existing file-based processing
+                    all_chunks.extend(await self._process_local_documents(batch))
+                else:
+                    # For remote sources, download and process
+                    all_chunks.extend(await self._process_remote_documents(batch, failed))
+
+            if failed:
+                # Advancing the cursor would skip the failed documents on later syncs
+                logger.warning(
+                    f"{len(failed)} documents failed to download or parse; keeping the previous sync state "
+                    "so they are retried on the next run"
+                )
+            else:
+                # All listed documents were processed; incremental sources may advance their cursor
+                await self.input_source.commit()
 
-            if not documents:
+            if not total_documents:
                 logger.warning("No documents found in input source")
                 return []
 
-            logger.info(f"Found {len(documents)} documents to process")
-
-            # Process documents based on source type
-            if self.config.source_type == "local":
-                # For local sources, use existing file-based processing
-                return await self._process_local_documents(documents)
-            else:
-                # For remote sources, download and process
-                return await self._process_remote_documents(documents)
+            logger.info(f"Processed {total_documents} documents into {len(all_chunks)} chunks")
+            self._log_source_throughput()
+            return all_chunks
 
         except Exception as e:
             logger.error(f"Failed to process documents: {e}")
             raise
 
-    async def _process_local_documents(self, documents: List[SourceDocument]) -> List[DocumentChunk]:
-        """Process local documents using existing document service."""
-        # For local documents, we can use the existing file-based processing
-        # Extract the paths and process them directly
+    async def _iter_document_batches(self) -> AsyncGenerator[List[SourceDocument], None]:
+        """
+        Group listed documents into batches of ``source_batch_size``.
 
-        all_chunks = []
+        Listing runs in a background task that stays up to two batches ahead of
+        the consumer, so listing overlaps with processing and memory stays bounded.
+        """
+        batch_size = self.config.source_batch_size
+        queue: asyncio.Queue = asyncio.Queue(maxsize=2)
 
-        for doc in documents:
+        async def produce() -> None:
             try:
-                file_path = Path(doc.source_path)
-
-                # Process single file using existing document service
-                chunks = self.document_service.process_documents(file_path)
-
-                # Update chunk metadata to include source information
-                for chunk in chunks:
-                    chunk.metadata.update(
-                        {
-                            "source_type": self.config.source_type,
-                            "source_uri": self.config.source_uri or str(self.config.datapath),
-                            "source_file_size": doc.size,
-                            "source_last_modified": doc.last_modified.isoformat() if doc.last_modified else None,
-                        }
-                    )
+                batch: List[SourceDocument] = []
+                documents = self.input_source.iter_documents(limit=self.config.source_max_documents)
+                async with aclosing(documents):
+                    async for doc in documents:
+                        batch.append(doc)
+                        if len(batch) >= batch_size:
+                            await queue.put(batch)
+                            batch = []
+                if batch:
+                    await queue.put(batch)
+                await queue.put(None)
+            except Exception as e:
+                await queue.put(e)
 
-                all_chunks.extend(chunks)
+        producer = asyncio.create_task(produce())
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            producer.cancel()
 
-            except Exception as e:
-                logger.error(f"Failed to process document {doc.name}: {e}")
+    async def _process_local_documents(self, documents: List[SourceDocument]) -> List[DocumentChunk]:
+        """Process local documents concurrently using the document service."""
+        file_paths = [Path(doc.source_path) for doc in documents]
+        documents_by_path = {str(path): doc for path, doc in zip(file_paths, documents)}
+
+        # Process all files in one call so they share the executor and one embedding batch
+        loop = asyncio.get_running_loop()
+        chunks = await loop.run_in_executor(None, self.document_service.process_files, file_paths)
+
+        # Update chunk metadata to include source information
+        source_uri = self.config.source_uri or str(self.config.datapath)
+        for chunk in chunks:
+            doc = documents_by_path.get(chunk.source)
+            if doc is None:
                 continue
+            chunk.metadata.update(
+                {
+                    "source_type": self.config.source_type,
+                    "source_uri": source_uri,
+                    "source_file_size": doc.size,
+                    "source_last_modified": doc.last_modified.isoformat() if doc.last_modified else None,
+                }
+            )
 
-        return all_chunks
+        return list(chunks)
 
-    async def _process_remote_documents(self, documents: List[SourceDocument]) -> List[DocumentChunk]:
-        """Process remote documents by downloading them first."""
+    async def _process_remote_documents(
+        self, documents: List[SourceDocument], failed: Optional[List[SourceDocument]] = None
+    ) -> List[DocumentChunk]:
+        """Process remote documents by downloading them first; documents that fail are added to ``failed``."""
         all_chunks = []
 
-        # Process documents in batches to manage memory
-        batch_size = min(self.config.source_batch_size, 10)  # Limit concurrent downloads
+        # Batches bound how much downloaded content is held in memory at once;
+        # within a batch, downloads run concurrently up to source_max_concurrency
+        batch_size = self.config.source_batch_size
 
         for i in range(0, len(documents), batch_size):
-            batch = documents[i : i + batch_size]
-            logger.info(f"Processing batch {i//batch_size + 1}/{(len(documents) + batch_size - 1)//batch_size}")
-
-            # Process batch
-            batch_chunks = await self._process_document_batch(batch)
+            batch_chunks, batch_failed = await self._process_document_batch(documents[i : i + batch_size])
             all_chunks.extend(batch_chunks)
+            if failed is not None:
+                failed.extend(batch_failed)
 
         return all_chunks
 
-    async def _process_document_batch(self, documents: List[SourceDocument]) -> List[DocumentChunk]:
-        """Process a batch of documents."""
-        batch_chunks = []
+    async def _process_document_batch(
+        self, documents: List[SourceDocument]
+    ) -> Tuple[List[DocumentChunk], List[SourceDocument]]:
+        """
+        Process a batch of documents.
+
+        Up to ``source_max_concurrency`` documents are in flight at once. Each
+        is parsed in a worker thread straight from memory as soon as its
+        download completes, so parsing overlaps with the other downloads and at
+        most ``source_max_concurrency`` payloads are held in memory. Chunks are
+        returned in document order, along with the documents that failed to
+        download or parse.
+        """
+        slots = asyncio.Semaphore(self.config.source_max_concurrency)
+        loop = asyncio.get_running_loop()
+
+        # Let the source resolve download metadata for the whole batch at once
+        try:
+            await self.input_source.prepare_documents(documents)
+        except Exception as e:
+            logger.warning(f"Failed to prepare document batch, downloading without it: {e}")
 
-        for doc in documents:
-            try:
-                # Download document content
+        async def download_and_process(doc: SourceDocument) -> Optional[List[DocumentChunk]]:
+            """Chunks of the document, or None if it failed."""
+            async with slots:
                 logger.debug(f"Downloading document: {doc.name}")
-                doc_with_content = await self.input_source.get_document(doc)
+                doc_with_content = await self.input_source.fetch_document(doc)
 
+                if doc_with_content is None:
+                    return None
                 if not doc_with_content.content:
                     logger.warning(f"No content retrieved for document: {doc.name}")
-                    continue
-
-                # Create temporary file for processing
-                with NamedTemporaryFile(suffix=doc.extension, delete=False) as temp_file:
-                    temp_file.write(doc_with_content.content)
-                    temp_file_path = Path(temp_file.name)
+                    return []
 
                 try:
-                    # Process using existing document service
-                    chunks = self.document_service.process_documents(temp_file_path)
-
-                    # Update chunk metadata with source information
-                    for chunk in chunks:
-                        chunk.metadata.update(
-                            {
-                                "source_type": self.config.source_type,
-                                "source_uri": self.config.source_uri,
-                                "source_path": doc.source_path,
-                                "source_file_size": doc.size,
-                                "source_last_modified": doc.last_modified.isoformat() if doc.last_modified else None,
-                                "original_filename": doc.name,
-                            }
-                        )
-
-                        # Add cloud-specific metadata
-                        if self.config.source_type == "s3":
-                            chunk.metadata.update(
-                                {
-                                    "s3_bucket": doc.metadata.get("s3_bucket"),
-                                    "s3_key": doc.metadata.get("s3_key"),
-                                    "etag": doc.metadata.get("etag"),
-                                }
-                            )
-                        elif self.config.source_type == "sharepoint":
-                            chunk.metadata.update(
-                                {
-                                    "sharepoint_item_id": doc.metadata.get("sharepoint_item_id"),
-                                    "author": doc.metadata.get("author"),
-                                    "version": doc.metadata.get("version"),
-                                }
-                            )
-
-                    batch_chunks.extend(chunks)
-                    logger.debug(f"Processed {doc.name}: {len(chunks)} chunks")
-
-                finally:
-                    # Clean up temporary file
-                    try:
-                        temp_file_path.unlink()
-                    except Exception as e:
-                        logger.warning(f"Failed to delete temporary file {temp_file_path}: {e}")
-
-            except Exception as e:
-                logger.error(f"Failed to process document {doc.name}: {e}")
-                continue
+                    return await loop.run_in_executor(None, self._process_downloaded_document, doc_with_content)
+                except Exception as e:
+                    logger.error(f"Failed to process document {doc.name}: {e}")
+                    return None
+
+        results = await asyncio.gather(*(download_and_process(doc) for doc in documents))
+        failed = [doc for doc, chunks in zip(documents, results) if chunks is None]
+        return [chunk for chunks in results if chunks for chunk in chunks], failed
+
+    def _process_downloaded_document(self, doc: SourceDocument) -> List[DocumentChunk]:
+        """Parse a downloaded document from memory and attach source metadata to its chunks."""
+        # Hand the only reference to the bytes over, so they are freed once spilled
+        content, doc.content = BufferHandoff(doc.content or b""), None
+        chunks = self.document_service.process_buffer(content, doc.source_path)
+
+        # Update chunk metadata with source information
+        for chunk in chunks:
+            chunk.metadata.update(
+                {
+                    "source_type": self.config.source_type,
+                    "source_uri": self.config.source_uri,
+                    "source_path": doc.source_path,
+                    "source_file_size": doc.size,
+                    "source_last_modified": doc.last_modified.isoformat() if doc.last_modified else None,
+                    "original_filename": doc.name,
+                }
+            )
 
-        return batch_chunks
+            # Add cloud-specific metadata
+            if self.config.source_type == "s3":
+                chunk.metadata.update(
+                    {
+                        "s3_bucket": doc.metadata.get("s3_bucket"),
+                        "s3_key": doc.metadata.get("s3_key"),
+                        "etag": doc.metadata.get("etag"),
+                    }
+                )
+            elif self.config.source_type == "sharepoint":
+                chunk.metadata.update(
+                    {
+                        "sharepoint_item_id": doc.metadata.get("sharepoint_item_id"),
+                        "author": doc.metadata.get("author"),
+                        "version": doc.metadata.get("version"),
+                    }
+                )
+
+        logger.debug(f"Processed {doc.name}: {len(chunks)} chunks")
+        return list(chunks)
+
+    def get_pacing_statistics(self) -> Dict[str, Any]:
+        """Get embedding pacing statistics from the document service."""
+        return self.document_service.get_pacing_statistics()
 
     def get_source_info(self) -> Dict[str, Any]:
         """Get information about the configured input source."""
@@ -249,6 +373,42 @@ class InputService:
             "supported_types": [self.config.doctype] if self.config.doctype != "api" else ["json"],
             "max_file_size_mb": self.config.source_max_file_size / (1024 * 1024),
             "batch_size": self.config.source_batch_size,
+            "max_concurrency": self.config.source_max_concurrency,
             "include_patterns": self.config.source_include_patterns,
             "exclude_patterns": self.config.source_exclude_patterns,
+            "throughput": self._source_throughput(),
+            "sync": self._source_sync_statistics(),
+            "cache": self._source_cache_statistics(),
         }
+
+    def _log_source_throughput(self) -> None:
+        """Log download throughput for remote sources."""
+        throughput = self._source_throughput()
+        if throughput.get("documents"):
+            logger.info(
+                f"Downloaded {throughput['documents']} documents "
+                f"({throughput['docs_per_second']} docs/s, {throughput['mb_per_second']} MB/s)"
+            )
+        cache = self._source_cache_statistics()
+        if cache.get("hits"):
+            logger.info(f"Served {cache['hits']} documents from the source cache")
+        if throughput.get("throttled_requests"):
+            logger.info(
+                f"Source throttled {throughput['throttled_requests']} requests, "
+                f"waited {throughput['throttle_wait_seconds']}s"
+            )
+
+    def _source_cache_statistics(self) -> Dict[str, Any]:
+        """Get blob cache statistics of the input source, if caching is enabled."""
+        cache = getattr(self.input_source, "blob_cache", None)
+        return cache.get_statistics() if isinstance(cache, BlobCache) else {}
+
+    def _source_sync_statistics(self) -> Dict[str, Any]:
+        """Get incremental-sync statistics of the input source, if any."""
+        statistics = self.input_source.get_sync_statistics()
+        return dict(statistics) if isinstance(statistics, dict) else {}
+
+    def _source_throughput(self) -> Dict[str, Any]:
+        """Get download throughput of the input source, if it tracks any."""
+        metrics = getattr(self.input_source, "metrics", None)
+        return metrics.as_dict() if isinstance(metrics, SourceMetrics) else {}
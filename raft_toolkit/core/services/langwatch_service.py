@@ -313,14 +313,11 @@ class LangWatchService:
             },
         ) as span:
             if span:
+                embedding = getattr(chunks[0], "embedding", None) if chunks else None
                 span.output = {
                     "embeddings_generated": len(chunks),
                     "success": True,
-                    "avg_embedding_dimension": (
-                        len(chunks[0].embedding)
-                        if chunks and hasattr(chunks[0], "embedding") and chunks[0].embedding
-                        else None
-                    ),
+                    "avg_embedding_dimension": len(embedding) if embedding is not None else None,
                 }
 
     def get_stats(self) -> Dict[str, Any]:
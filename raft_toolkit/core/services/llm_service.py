@@ -133,6 +133,51 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Token estimates used for rate limiting and run forecasts
+WORDS_TO_TOKENS_RATIO = 1.3
+SYSTEM_PROMPT_TOKENS = 100
+TOKENS_PER_QUESTION = 15
+EXPECTED_ANSWER_TOKENS = 150
+
+
+def resolve_rate_limit_settings(config: RaftConfig) -> Dict[str, Any]:
+    """
+    Build rate limiter settings from the configuration.
+
+    Starts from the configured preset, if any, and applies explicit overrides.
+    """
+    settings: Dict[str, Any] = {}
+    if config.rate_limit_preset:
+        presets = get_common_rate_limits()
+        if config.rate_limit_preset in presets:
+            settings = presets[config.rate_limit_preset].copy()
+        else:
+            logger.warning(f"Unknown rate limit preset: {config.rate_limit_preset}")
+
+    # Override with explicit configuration
+    settings.update(
+        {
+            "enabled": True,
+            "strategy": config.rate_limit_strategy,
+            "max_retries": config.rate_limit_max_retries,
+            "base_retry_delay": config.rate_limit_base_delay,
+            "burst_window_seconds": config.rate_limit_burst_window,
+        }
+    )
+
+    # Override with specific values if provided
+    if config.rate_limit_requests_per_minute is not None:
+        settings["requests_per_minute"] = config.rate_limit_requests_per_minute
+    if config.rate_limit_requests_per_hour is not None:
+        settings["requests_per_hour"] = config.rate_limit_requests_per_hour
+    if config.rate_limit_tokens_per_minute is not None:
+        settings["tokens_per_minute"] = config.rate_limit_tokens_per_minute
+    if config.rate_limit_tokens_per_hour is not None:
+        settings["tokens_per_hour"] = config.rate_limit_tokens_per_hour
+    if config.rate_limit_max_burst is not None:
+        settings["max_burst_requests"] = config.rate_limit_max_burst
+    return settings
+
 
 class LLMService:
     """Service for LLM-based question generation and answering."""
@@ -197,38 +242,9 @@ class LLMService:
             # Create a disabled rate limiter
             return create_rate_limiter_from_config(enabled=False)
 
-        # Start with preset configuration if specified
-        rate_limit_config = {}
-        if self.config.rate_limit_preset:
-            presets = get_common_rate_limits()
-            if self.config.rate_limit_preset in presets:
-                rate_limit_config = presets[self.config.rate_limit_preset].copy()
-                logger.info(f"Using rate limit preset: {self.config.rate_limit_preset}")
-            else:
-                logger.warning(f"Unknown rate limit preset: {self.config.rate_limit_preset}")
-
-        # Override with explicit configuration
-        rate_limit_config.update(
-            {
-                "enabled": True,
-                "strategy": self.config.rate_limit_strategy,
-                "max_retries": self.config.rate_limit_max_retries,
-                "base_retry_delay": self.config.rate_limit_base_delay,
-                "burst_window_seconds": self.config.rate_limit_burst_window,
-            }
-        )
-
-        # Override with specific values if provided
-        if self.config.rate_limit_requests_per_minute is not None:
-            rate_limit_config["requests_per_minute"] = self.config.rate_limit_requests_per_minute
-        if self.config.rate_limit_requests_per_hour is not None:
-            rate_limit_config["requests_per_hour"] = self.config.rate_limit_requests_per_hour
-        if self.config.rate_limit_tokens_per_minute is not None:
-            rate_limit_config["tokens_per_minute"] = self.config.rate_limit_tokens_per_minute
-        if self.config.rate_limit_tokens_per_hour is not None:
-            rate_limit_config["tokens_per_hour"] = self.config.rate_limit_tokens_per_hour
-        if self.config.rate_limit_max_burst is not None:
-            rate_limit_config["max_burst_requests"] = self.config.rate_limit_max_burst
+        rate_limit_config = resolve_rate_limit_settings(self.config)
+        if self.config.rate_limit_preset in get_common_rate_limits():
+            logger.info(f"Using rate limit preset: {self.config.rate_limit_preset}")
 
         rate_limiter = create_rate_limiter_from_config(**rate_limit_config)
 
@@ -240,8 +256,19 @@ class LLMService:
 
         return rate_limiter
 
-    def process_chunks_batch(self, chunks: List[DocumentChunk]) -> List[ProcessingResult]:
-        """Process multiple chunks in parallel with LangWatch tracking."""
+    def process_chunks_batch(
+        self, chunks: List[DocumentChunk], on_result: Optional[Callable[[ProcessingResult], None]] = None
+    ) -> List[ProcessingResult]:
+        """
+        Process multiple chunks in parallel with LangWatch tracking.
+
+        Args:
+            chunks: Chunks to generate QA data points for
+            on_result: Called with each result as soon as it completes, e.g. to stream it to disk.
+                Errors raised by the callback abort the batch. The QA data points of the returned
+                results are released after the callback, so memory does not grow with the dataset;
+                their counts, timings and token usage are kept.
+        """
         jobs = [
             ProcessingJob.create(
                 chunk=chunk,
@@ -271,6 +298,7 @@ class LLMService:
 
             results = []
             futures = []
+            qa_points = 0
 
             with tqdm(total=len(jobs), desc="Processing chunks", unit="chunk") as pbar:
                 if self.config.workers > 1:
@@ -283,31 +311,31 @@ class LLMService:
                             try:
                                 result = future.result()
                                 results.append(result)
-                                pbar.set_postfix(
-                                    {
-                                        "completed": len(results),
-                                        "qa_points": sum(len(r.qa_data_points) for r in results if r.success),
-                                    }
-                                )
+                                qa_points += result.qa_count if result.success else 0
+                                pbar.set_postfix({"completed": len(results), "qa_points": qa_points})
                                 pbar.update(1)
                             except Exception as e:
                                 logger.error(f"Error processing chunk: {e}")
                                 pbar.update(1)
+                                continue
+                            if on_result is not None:
+                                on_result(result)
+                                result.release_qa_data_points()
                 else:
                     for job in jobs:
                         try:
                             result = self._process_single_job(job, chunks)
                             results.append(result)
-                            pbar.set_postfix(
-                                {
-                                    "completed": len(results),
-                                    "qa_points": sum(len(r.qa_data_points) for r in results if r.success),
-                                }
-                            )
+                            qa_points += result.qa_count if result.success else 0
+                            pbar.set_postfix({"completed": len(results), "qa_points": qa_points})
                             pbar.update(1)
                         except Exception as e:
                             logger.error(f"Error processing chunk: {e}")
                             pbar.update(1)
+                            continue
+                        if on_result is not None:
+                            on_result(result)
+                            result.release_qa_data_points()
 
             # Track the complete QA dataset generation
             total_processing_time = time.time() - batch_start_time
@@ -317,6 +345,8 @@ class LLMService:
                 all_qa_points,
                 total_processing_time,
                 metadata={
+                    # Streamed results no longer hold their points
+                    "qa_pairs_count": qa_points,
                     "successful_jobs": sum(1 for r in results if r.success),
                     "failed_jobs": sum(1 for r in results if not r.success),
                     "total_token_usage": sum(r.token_usage.get("total_tokens", 0) for r in results if r.token_usage),
@@ -396,13 +426,8 @@ class LLMService:
 
     def _estimate_tokens_for_questions(self, chunk: DocumentChunk) -> int:
         """Estimate tokens needed for question generation."""
-        # Constants for token estimation
-        WORDS_TO_TOKENS_RATIO = 1.3
-        SYSTEM_PROMPT_TOKENS = 100
-        TOKENS_PER_QUESTION = 15
-
-        # Calculate components
-        chunk_tokens = len(chunk.content.split()) * WORDS_TO_TOKENS_RATIO
+        # Calculate components, preferring the token count measured during chunking
+        chunk_tokens = chunk.metadata.get("token_count") or len(chunk.content.split()) * WORDS_TO_TOKENS_RATIO
         prompt_tokens = SYSTEM_PROMPT_TOKENS
         output_tokens = self.config.questions * TOKENS_PER_QUESTION
 
@@ -594,7 +619,9 @@ class LLMService:
             oracle_chunk = secure_random.choice(available_chunks)
 
         # Generate answer
-        answer = self._generate_answer(question.text, oracle_chunk.content)
+        answer = self._generate_answer(
+            question.text, oracle_chunk.content, context_tokens=oracle_chunk.metadata.get("token_count")
+        )
 
         # Create QA data point
         return QADataPoint.create(
@@ -603,15 +630,17 @@ class LLMService:
             distractor_contexts=[chunk.content for chunk in distractor_chunks],
             cot_answer=answer,
             doctype=self.config.doctype,
+            oracle_chunk_id=oracle_chunk.id,
+            distractor_chunk_ids=[chunk.id for chunk in distractor_chunks],
         )
 
-    def _generate_answer(self, question: str, context: str) -> str:
+    def _generate_answer(self, question: str, context: str, context_tokens: Optional[int] = None) -> str:
         """Generate an answer for a question given context with rate limiting."""
         return self._rate_limited_api_call(  # type: ignore[no-any-return]
             self._generate_answer_impl,
             question,
             context,
-            estimated_tokens=self._estimate_tokens_for_answer(question, context),
+            estimated_tokens=self._estimate_tokens_for_answer(question, context, context_tokens),
         )
 
     def _generate_answer_impl(self, question: str, context: str) -> str:
@@ -632,18 +661,16 @@ class LLMService:
 
         return answer
 
-    def _estimate_tokens_for_answer(self, question: str, context: str) -> int:
+    def _estimate_tokens_for_answer(self, question: str, context: str, context_tokens: Optional[int] = None) -> int:
         """Estimate tokens needed for answer generation."""
-        # Constants for token estimation
-        WORDS_TO_TOKENS_RATIO = 1.3
-        SYSTEM_PROMPT_TOKENS = 100
-        EXPECTED_ANSWER_TOKENS = 150
-
         # Calculate components
         question_tokens = len(question.split()) * WORDS_TO_TOKENS_RATIO
-        context_tokens = len(context.split()) * WORDS_TO_TOKENS_RATIO
+        if context_tokens is not None:
+            context_estimate = float(context_tokens)
+        else:
+            context_estimate = len(context.split()) * WORDS_TO_TOKENS_RATIO
 
-        return int(question_tokens + context_tokens + SYSTEM_PROMPT_TOKENS + EXPECTED_ANSWER_TOKENS)
+        return int(question_tokens + context_estimate + SYSTEM_PROMPT_TOKENS + EXPECTED_ANSWER_TOKENS)
 
     def _generate_api_answer(self, question: str, context: str) -> str:
         """Generate answer for API question."""
@@ -0,0 +1,235 @@
+"""
+Normalized dataset layout.
+
+In the flat layout every QA record repeats the oracle text in
+``oracle_context``, ``context`` and ``instruction``, and each distractor
+twice, so one chunk is stored dozens of times. The normalized layout stores
+each chunk once and QA rows that reference chunks by id:
+
+- ``chunks.parquet``: ``chunk_id``, ``source``, ``content``
+- ``qa.parquet``: ``id``, ``type``, ``question``, ``cot_answer``,
+  ``oracle_chunk_id`` and ``distractor_chunk_ids``
+
+QA points created without chunk ids keep their texts inline in the nullable
+``oracle_context``, ``context`` and ``instruction`` columns. The materializer
+expands the layout back to the flat records on demand.
+"""
+
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+from ..models import DocumentChunk, ProcessingResult, QADataPoint
+from .dataset_writer import DEFAULT_ROW_GROUP_SIZE, ParquetStreamWriter
+
+logger = logging.getLogger(__name__)
+
+CHUNKS_FILE = "chunks.parquet"
+QA_FILE = "qa.parquet"
+
+# Inline text columns, only set for QA points without chunk references
+INLINE_COLUMNS = ["oracle_context", "context", "instruction"]
+
+
+def chunk_schema() -> "pa.Schema":
+    """Arrow schema of the chunk table."""
+    return pa.schema([("chunk_id", pa.string()), ("source", pa.string()), ("content", pa.string())])
+
+
+def qa_schema() -> "pa.Schema":
+    """Arrow schema of the QA table."""
+    columns = [(column, pa.string()) for column in ["id", "type", "question", "cot_answer", "oracle_chunk_id"]]
+    columns.append(("distractor_chunk_ids", pa.list_(pa.string())))
+    columns.extend((column, pa.string()) for column in INLINE_COLUMNS)
+    return pa.schema(columns)
+
+
+def normalized_qa_record(qa_point: QADataPoint) -> Dict[str, Any]:
+    """Convert a QA data point to a QA table row, referencing its chunks when their ids are known."""
+    referenced = qa_point.has_chunk_refs
+    return {
+        "id": qa_point.id,
+        "type": qa_point.type,
+        "question": qa_point.question,
+        "cot_answer": qa_point.cot_answer,
+        "oracle_chunk_id": qa_point.oracle_chunk_id if referenced else None,
+        "distractor_chunk_ids": qa_point.distractor_chunk_ids if referenced else None,
+        "oracle_context": None if referenced else qa_point.oracle_context,
+        "context": None if referenced else qa_point.context,
+        "instruction": None if referenced else qa_point.instruction,
+    }
+
+
+class NormalizedDatasetWriter:
+    """
+    Streams QA points to the normalized layout.
+
+    Chunks are written once, deduplicated by id; QA rows are buffered up to a
+    row group like ``StreamingDatasetWriter``. Safe to call from multiple threads.
+    """
+
+    def __init__(self, output_path: Union[str, Path], row_group_size: int = DEFAULT_ROW_GROUP_SIZE):
+        if pa is None:
+            raise ImportError("pyarrow is required for dataset output. Install with: pip install raft-toolkit[ai]")
+
+        self.output_path = Path(output_path)
+        self.row_group_size = max(1, row_group_size)
+        self.rows = 0
+        self.skipped_results = 0
+
+        self._lock = threading.Lock()
+        self._pending: List[Dict[str, Any]] = []
+        self._chunk_ids: set = set()
+        self._closed = False
+        self.output_path.mkdir(parents=True, exist_ok=True)
+        self._chunks = ParquetStreamWriter(self.output_path / CHUNKS_FILE, chunk_schema())
+        self._qa = ParquetStreamWriter(self.output_path / QA_FILE, qa_schema())
+
+    def write_chunks(self, chunks: Iterable[DocumentChunk]) -> None:
+        """Add chunks to the chunk table; chunks already written are skipped."""
+        with self._lock:
+            self._check_open()
+            rows = []
+            for chunk in chunks:
+                if chunk.id not in self._chunk_ids:
+                    self._chunk_ids.add(chunk.id)
+                    rows.append({"chunk_id": chunk.id, "source": chunk.source, "content": chunk.content})
+            for start in range(0, len(rows), self.row_group_size):
+                batch = rows[start : start + self.row_group_size]
+                self._chunks.write_batch(pa.RecordBatch.from_pylist(batch, schema=self._chunks.schema))
+
+    def write_result(self, result: ProcessingResult) -> None:
+        """Append the QA data points of a processing result."""
+        if not result.success:
+            logger.warning(f"Skipping failed result for job {result.job_id}: {result.error}")
+            self.skipped_results += 1
+            return
+        rows = [normalized_qa_record(qa_point) for qa_point in result.qa_data_points]
+        with self._lock:
+            self._check_open()
+            self._pending.extend(rows)
+            while len(self._pending) >= self.row_group_size:
+                batch, self._pending = self._pending[: self.row_group_size], self._pending[self.row_group_size :]
+                self._flush(batch)
+
+    def _check_open(self) -> None:
+        if self._closed:
+            raise ValueError("Dataset writer is closed")
+
+    def _flush(self, rows: List[Dict[str, Any]]) -> None:
+        """Write one row group of QA rows. Caller holds the lock."""
+        if rows:
+            self._qa.write_batch(pa.RecordBatch.from_pylist(rows, schema=self._qa.schema))
+            self.rows += len(rows)
+
+    def close(self) -> None:
+        """Flush pending QA rows and close both tables."""
+        with self._lock:
+            self._check_open()
+            self._closed = True
+            try:
+                self._flush(self._pending)
+                self._pending = []
+            finally:
+                self._qa.close()
+                self._chunks.close()
+        logger.info(
+            f"Wrote {self.rows} QA rows referencing {len(self._chunk_ids)} chunks "
+            f"to normalized dataset {self.output_path}"
+        )
+
+    def abort(self) -> None:
+        """Stop writing and remove the incomplete tables."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._pending = []
+            for sink in (self._qa, self._chunks):
+                try:
+                    sink.close()
+                except Exception as e:
+                    logger.warning(f"Failed to close {sink.path}: {e}")
+                sink.path.unlink(missing_ok=True)
+
+
+def is_normalized_dataset(path: Union[str, Path]) -> bool:
+    """Whether ``path`` is a directory in the normalized layout."""
+    path = Path(path)
+    return (path / CHUNKS_FILE).is_file() and (path / QA_FILE).is_file()
+
+
+def load_chunk_contents(path: Union[str, Path]) -> Dict[str, str]:
+    """Load the chunk table of a normalized dataset as a chunk id to content mapping."""
+    table = pq.read_table(Path(path) / CHUNKS_FILE, columns=["chunk_id", "content"])
+    return dict(zip(table.column("chunk_id").to_pylist(), table.column("content").to_pylist()))
+
+
+def iter_materialized_records(
+    path: Union[str, Path], batch_size: int = DEFAULT_ROW_GROUP_SIZE, chunks: Optional[Dict[str, str]] = None
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Expand a normalized dataset to flat dataset records, one batch at a time.
+
+    Only the chunk table is held in memory; QA rows are read in batches and
+    their ``context`` and ``instruction`` are rendered from the referenced chunks.
+
+    Raises:
+        KeyError: If a QA row references a chunk missing from the chunk table
+    """
+    if pa is None:
+        raise ImportError("pyarrow is required to read normalized datasets. Install with: pip install raft-toolkit[ai]")
+    if chunks is None:
+        chunks = load_chunk_contents(path)
+
+    qa_file = pq.ParquetFile(Path(path) / QA_FILE)
+    for batch in qa_file.iter_batches(batch_size=batch_size):
+        records = []
+        for row in batch.to_pylist():
+            if row["oracle_chunk_id"] is not None:
+                oracle_context = chunks[row["oracle_chunk_id"]]
+                distractor_contexts = [chunks[chunk_id] for chunk_id in row["distractor_chunk_ids"] or []]
+                context = QADataPoint.render_context(oracle_context, distractor_contexts)
+                instruction = QADataPoint.render_instruction(row["question"], oracle_context, distractor_contexts)
+            else:
+                oracle_context, context, instruction = row["oracle_context"], row["context"], row["instruction"]
+            records.append(
+                {
+                    "id": row["id"],
+                    "type": row["type"],
+                    "question": row["question"],
+                    "context": context,
+                    "oracle_context": oracle_context,
+                    "cot_answer": row["cot_answer"],
+                    "answer": row["cot_answer"],
+                    "instruction": instruction,
+                }
+            )
+        yield records
+
+
+def materialize(path: Union[str, Path], writer: Any, batch_size: int = DEFAULT_ROW_GROUP_SIZE) -> int:
+    """
+    Stream a normalized dataset into a flat dataset writer.
+
+    Args:
+        path: Directory of the normalized dataset
+        writer: A ``StreamingDatasetWriter`` (or anything with ``write_records``)
+        batch_size: QA rows expanded per batch
+
+    Returns:
+        Number of records written
+    """
+    count = 0
+    for records in iter_materialized_records(path, batch_size):
+        writer.write_records(records)
+        count += len(records)
+    return count
@@ -0,0 +1,349 @@
+"""
+Sampling-based processing preview and run forecast.
+
+A stratified sample of the listed documents is extracted and chunked with the
+configured strategy, without embedding or LLM calls. Chunk and token totals
+are extrapolated to all documents with a separate ratio estimator on document
+size per stratum, and reported with 95% confidence intervals. The totals drive
+a forecast of LLM calls, tokens, cost and run duration from the configured
+questions per chunk, worker count and rate limits.
+"""
+
+import asyncio
+import logging
+import math
+import random
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from ..config import RaftConfig
+from ..sources import SourceDocument
+from .document_service import DocumentService
+from .llm_service import EXPECTED_ANSWER_TOKENS, SYSTEM_PROMPT_TOKENS, TOKENS_PER_QUESTION, resolve_rate_limit_settings
+
+logger = logging.getLogger(__name__)
+
+CONFIDENCE_LEVEL = 0.95
+Z_SCORE = 1.959964  # Two-sided normal quantile for CONFIDENCE_LEVEL
+
+# Maximum number of size buckets per document type
+SIZE_BUCKETS = 4
+
+# Mean latency of one completion call, used for the worker-bound duration
+ASSUMED_CALL_SECONDS = 3.0
+
+# Fixed seed so repeated previews of the same listing sample the same documents
+SAMPLE_SEED = 0
+
+# Per-document measurement: (size, document tokens, chunks, chunk tokens)
+Measurement = Tuple[int, int, int, int]
+_DOCUMENT_TOKENS, _CHUNKS, _CHUNK_TOKENS = 1, 2, 3
+
+
+@dataclass
+class Interval:
+    """Point estimate with confidence bounds."""
+
+    estimate: float
+    low: float
+    high: float
+
+    def as_dict(self, digits: int = 0) -> Dict[str, float]:
+        """Round the estimate and bounds; whole numbers when ``digits`` is 0."""
+        if digits:
+            return {
+                "estimate": round(self.estimate, digits),
+                "low": round(self.low, digits),
+                "high": round(self.high, digits),
+            }
+        return {"estimate": round(self.estimate), "low": math.floor(self.low), "high": math.ceil(self.high)}
+
+
+@dataclass
+class Stratum:
+    """Documents of one type and size bucket, with the sample drawn from them."""
+
+    key: str
+    documents: List[SourceDocument]
+    sample: List[SourceDocument] = field(default_factory=list)
+    measurements: List[Measurement] = field(default_factory=list)
+
+    @property
+    def total_size(self) -> int:
+        return sum(_size(doc) for doc in self.documents)
+
+
+def _size(document: SourceDocument) -> int:
+    # Unknown and empty sizes count as 1 byte so every document carries weight
+    return max(document.size or 0, 1)
+
+
+def stratify(documents: Sequence[SourceDocument], sample_size: int, seed: int = SAMPLE_SEED) -> List[Stratum]:
+    """
+    Split documents into strata by type and size, and draw a sample from each.
+
+    Each document type is cut into up to ``SIZE_BUCKETS`` equal-count size
+    buckets, fewer when the sample is too small to cover them. The sample is
+    allocated in proportion to stratum bytes with at least one document per
+    stratum while the sample size allows.
+    """
+    by_type: Dict[str, List[SourceDocument]] = {}
+    for doc in documents:
+        by_type.setdefault(doc.extension.lower() or "(none)", []).append(doc)
+
+    sample_size = min(sample_size, len(documents))
+    buckets = max(1, min(SIZE_BUCKETS, sample_size // max(1, len(by_type))))
+
+    strata = []
+    for doc_type, docs in sorted(by_type.items()):
+        docs = sorted(docs, key=lambda doc: (_size(doc), doc.source_path))
+        count = min(buckets, len(docs))
+        for i in range(count):
+            group = docs[i * len(docs) // count : (i + 1) * len(docs) // count]
+            strata.append(Stratum(f"{doc_type}:{i}", group))
+
+    rng = random.Random(seed)  # nosec B311 - Used for preview sampling, not cryptographic purposes
+    for stratum, allocated in zip(strata, _allocate(strata, sample_size)):
+        stratum.sample = rng.sample(stratum.documents, allocated)
+    return strata
+
+
+def _allocate(strata: List[Stratum], sample_size: int) -> List[int]:
+    """Proportional-to-bytes allocation, at least one per stratum, capped by stratum size."""
+    weights = [stratum.total_size for stratum in strata]
+    total = sum(weights) or 1
+    shares = [sample_size * weight / total for weight in weights]
+    allocation = [0] * len(strata)
+
+    remaining = sample_size
+    for i in sorted(range(len(strata)), key=lambda i: -weights[i]):
+        if remaining == 0:
+            break
+        allocation[i] = 1
+        remaining -= 1
+
+    while remaining > 0:
+        open_strata = [i for i, stratum in enumerate(strata) if allocation[i] < len(stratum.documents)]
+        if not open_strata:
+            break
+        i = max(open_strata, key=lambda i: shares[i] - allocation[i])
+        allocation[i] += 1
+        remaining -= 1
+    return allocation
+
+
+def estimate_total(strata: Sequence[Stratum], metric: int) -> Interval:
+    """
+    Separate ratio estimate of a metric's total over all stratum documents.
+
+    Within a stratum the metric is assumed proportional to document size, with
+    the variance estimated from the ratio residuals. Strata with a single
+    measurement borrow the relative variance pooled over the whole sample, and
+    strata without measurements use the pooled ratio.
+    """
+    samples = [(m[0], m[metric]) for stratum in strata for m in stratum.measurements]
+    if not samples:
+        return Interval(0.0, 0.0, 0.0)
+
+    pooled_ratio = sum(y for _, y in samples) / sum(x for x, _ in samples)
+    if pooled_ratio > 0 and len(samples) > 1:
+        deviations = [(y / x) / pooled_ratio - 1 for x, y in samples]
+        pooled_cv2 = sum(d * d for d in deviations) / (len(samples) - 1)
+    else:
+        pooled_cv2 = 1.0
+
+    total = variance = measured = 0.0
+    for stratum in strata:
+        population = len(stratum.documents)
+        n = len(stratum.measurements)
+        sum_x = sum(m[0] for m in stratum.measurements)
+        sum_y = sum(m[metric] for m in stratum.measurements)
+        ratio = sum_y / sum_x if n else pooled_ratio
+        stratum_total = ratio * stratum.total_size
+        total += stratum_total
+        measured += sum_y
+
+        if n >= population:
+            continue  # Every document measured
+        mean = stratum_total / population
+        if n >= 2:
+            residual_var = sum((m[metric] - ratio * m[0]) ** 2 for m in stratum.measurements) / (n - 1)
+        else:
+            residual_var = pooled_cv2 * mean * mean
+        variance += population * population * (1 - n / population) * residual_var / max(n, 1)
+
+    margin = Z_SCORE * math.sqrt(variance)
+    return Interval(total, max(measured, total - margin), total + margin)
+
+
+def _rate_limit_seconds(limit: float, per_seconds: int, uses_tokens: bool) -> Callable[[float, float], float]:
+    """Seconds needed for (calls, tokens) under one request or token rate limit."""
+    return lambda calls, tokens: (tokens if uses_tokens else calls) * per_seconds / limit
+
+
+class PreviewService:
+    """Estimates chunks, tokens, cost and duration of a run from a document sample."""
+
+    def __init__(self, config: RaftConfig, document_service: DocumentService):
+        self.config = config
+        self.document_service = document_service
+
+    async def preview_documents(
+        self,
+        documents: Sequence[SourceDocument],
+        fetch: Callable[[SourceDocument], Awaitable[Optional[SourceDocument]]],
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Sample and measure source documents loaded with ``fetch``.
+
+        Returns:
+            The estimate, or None if no sampled document could be measured
+        """
+
+        async def measure(document: SourceDocument) -> Optional[Measurement]:
+            loaded = await fetch(document)
+            if loaded is None or loaded.content is None:
+                return None
+            try:
+                content, loaded.content = loaded.content, None
+                return await asyncio.to_thread(self._measure, document, content)
+            except Exception as e:
+                logger.warning(f"Failed to measure {document.name} for preview: {e}")
+                return None
+
+        strata = stratify(documents, self.config.preview_sample_size)
+        results = await asyncio.gather(*(asyncio.gather(*map(measure, stratum.sample)) for stratum in strata))
+        for stratum, measurements in zip(strata, results):
+            stratum.measurements = [m for m in measurements if m is not None]
+        return self._summarize(strata)
+
+    def preview_files(self, files: Sequence[Path]) -> Optional[Dict[str, Any]]:
+        """Sample and measure local files."""
+        documents = [
+            SourceDocument(name=path.name, source_path=str(path), content_type="", size=path.stat().st_size)
+            for path in files
+        ]
+
+        def measure(document: SourceDocument) -> Optional[Measurement]:
+            try:
+                with open(document.source_path, "rb") as file:
+                    return self._measure(document, file)
+            except Exception as e:
+                logger.warning(f"Failed to measure {document.name} for preview: {e}")
+                return None
+
+        strata = stratify(documents, self.config.preview_sample_size)
+        with ThreadPoolExecutor(max_workers=max(1, self.config.embed_workers)) as executor:
+            for stratum in strata:
+                stratum.measurements = [m for m in executor.map(measure, stratum.sample) if m is not None]
+        return self._summarize(strata)
+
+    def _measure(self, document: SourceDocument, data: Any) -> Measurement:
+        document_tokens, chunk_tokens = self.document_service.measure_buffer(data, document.name)
+        return _size(document), document_tokens, len(chunk_tokens), sum(chunk_tokens)
+
+    def _summarize(self, strata: List[Stratum]) -> Optional[Dict[str, Any]]:
+        sampled = sum(len(stratum.sample) for stratum in strata)
+        measured = sum(len(stratum.measurements) for stratum in strata)
+        if not measured:
+            if sampled:
+                logger.warning("No sampled document could be measured; preview falls back to a size heuristic")
+            return None
+
+        document_tokens = estimate_total(strata, _DOCUMENT_TOKENS)
+        chunks = estimate_total(strata, _CHUNKS)
+        chunk_tokens = estimate_total(strata, _CHUNK_TOKENS)
+
+        estimate: Dict[str, Any] = {
+            "method": "stratified_sample",
+            "confidence": CONFIDENCE_LEVEL,
+            "documents": sum(len(stratum.documents) for stratum in strata),
+            "sampled_documents": measured,
+            "failed_documents": sampled - measured,
+            "strata": len(strata),
+            "document_tokens": document_tokens.as_dict(),
+            "chunks": chunks.as_dict(),
+            "chunk_tokens": chunk_tokens.as_dict(),
+        }
+        estimate.update(self.forecast(chunks, chunk_tokens, document_tokens))
+        return estimate
+
+    def forecast(self, chunks: Interval, chunk_tokens: Interval, document_tokens: Interval) -> Dict[str, Any]:
+        """
+        Forecast LLM calls, tokens, cost and duration from chunk and token totals.
+
+        Every chunk takes one question generation call and one answer call per
+        question; each call sends the chunk with the system prompt.
+        """
+        questions = self.config.questions
+        semantic = self.config.chunking_strategy == "semantic"
+
+        def bounds(fn: Callable[[float, float, float], float]) -> Interval:
+            return Interval(
+                fn(chunks.estimate, chunk_tokens.estimate, document_tokens.estimate),
+                fn(chunks.low, chunk_tokens.low, document_tokens.low),
+                fn(chunks.high, chunk_tokens.high, document_tokens.high),
+            )
+
+        def calls(c: float, t: float, d: float) -> float:
+            return c * (1 + questions)
+
+        def prompt_tokens(c: float, t: float, d: float) -> float:
+            return (1 + questions) * (t + c * SYSTEM_PROMPT_TOKENS) + questions * c * TOKENS_PER_QUESTION
+
+        def completion_tokens(c: float, t: float, d: float) -> float:
+            return c * questions * (TOKENS_PER_QUESTION + EXPECTED_ANSWER_TOKENS)
+
+        def embedding_tokens(c: float, t: float, d: float) -> float:
+            # Semantic chunking embeds the document text before the chunks
+            return t + (d if semantic else 0)
+
+        def cost(c: float, t: float, d: float) -> float:
+            return (
+                prompt_tokens(c, t, d) * (self.config.prompt_token_price or 0)
+                + completion_tokens(c, t, d) * (self.config.completion_token_price or 0)
+                + embedding_tokens(c, t, d) * (self.config.embedding_token_price or 0)
+            ) / 1_000_000
+
+        duration, bottleneck = self._duration(
+            bounds(calls), bounds(lambda c, t, d: prompt_tokens(c, t, d) + completion_tokens(c, t, d))
+        )
+        prices = (self.config.prompt_token_price, self.config.completion_token_price, self.config.embedding_token_price)
+
+        return {
+            "qa_points": bounds(lambda c, t, d: c * questions).as_dict(),
+            "llm_calls": bounds(calls).as_dict(),
+            "prompt_tokens": bounds(prompt_tokens).as_dict(),
+            "completion_tokens": bounds(completion_tokens).as_dict(),
+            "embedding_tokens": bounds(embedding_tokens).as_dict(),
+            "cost_usd": bounds(cost).as_dict(digits=2) if any(p is not None for p in prices) else None,
+            "duration_seconds": duration.as_dict(),
+            "bottleneck": bottleneck,
+        }
+
+    def _duration(self, calls: Interval, tokens: Interval) -> Tuple[Interval, str]:
+        """Run duration as the slowest of worker throughput and each configured rate limit."""
+        limits: List[Tuple[str, Callable[[float, float], float]]] = [
+            ("workers", lambda c, t: c * ASSUMED_CALL_SECONDS / max(1, self.config.workers))
+        ]
+        if self.config.rate_limit_enabled:
+            settings = resolve_rate_limit_settings(self.config)
+            for key, per_seconds, uses_tokens in (
+                ("requests_per_minute", 60, False),
+                ("requests_per_hour", 3600, False),
+                ("tokens_per_minute", 60, True),
+                ("tokens_per_hour", 3600, True),
+            ):
+                limit = settings.get(key)
+                if limit:
+                    limits.append((key, _rate_limit_seconds(limit, per_seconds, uses_tokens)))
+
+        bottleneck, slowest = max(limits, key=lambda item: item[1](calls.estimate, tokens.estimate))
+        duration = Interval(
+            slowest(calls.estimate, tokens.estimate),
+            max(fn(calls.low, tokens.low) for _, fn in limits),
+            max(fn(calls.high, tokens.high) for _, fn in limits),
+        )
+        return duration, bottleneck
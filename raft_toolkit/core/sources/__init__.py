@@ -5,19 +5,24 @@ This module provides an extensible system for handling different input sources
 including local files, S3 buckets, and SharePoint sites.
 """
 
-from .base import BaseInputSource, InputSourceConfig, SourceDocument, SourceValidationError
+from .base import BaseInputSource, InputSourceConfig, SourceDocument, SourceMetrics, SourceValidationError
+from .cache import BlobCache
 from .factory import InputSourceFactory
 from .local import LocalInputSource
 from .s3 import S3InputSource
 from .sharepoint import SharePointInputSource
+from .sync_state import SyncState
 
 __all__ = [
     "BaseInputSource",
+    "BlobCache",
     "InputSourceConfig",
     "SourceDocument",
+    "SourceMetrics",
     "SourceValidationError",
     "LocalInputSource",
     "S3InputSource",
     "SharePointInputSource",
     "InputSourceFactory",
+    "SyncState",
 ]
@@ -2,13 +2,21 @@
 Base classes and interfaces for input sources.
 """
 
+import asyncio
 import logging
 import mimetypes
+import threading
+import time
 from abc import ABC, abstractmethod
+from contextlib import aclosing
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 from typing import Any, AsyncGenerator, Dict, List, Optional
+from urllib.parse import unquote
+
+from .cache import DEFAULT_CACHE_MAX_SIZE, BlobCache
+from .patterns import PathMatcher
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +27,105 @@ class SourceValidationError(Exception):
     pass
 
 
+class SourceMetrics:
+    """
+    Download throughput and transport counters for an input source.
+
+    Elapsed time is measured from the first download start to the latest
+    download end, so concurrent downloads are not double counted. Sources
+    that use a dedicated request pool, batch requests or get throttled also
+    record pool depth, batch fill and time spent honouring ``Retry-After``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.documents = 0
+        self.bytes = 0
+        self.failures = 0
+        self._started: Optional[float] = None
+        self._finished: Optional[float] = None
+
+        self.pool_size = 0
+        self.pool_depth = 0
+        self.max_pool_depth = 0
+        self.batches = 0
+        self.batched_requests = 0
+        self.batch_capacity = 0
+        self.throttled = 0
+        self.throttle_wait = 0.0
+
+    def start(self) -> float:
+        """Mark the start of a download and return its start time."""
+        now = time.monotonic()
+        with self._lock:
+            if self._started is None:
+                self._started = now
+        return now
+
+    def record(self, size: int) -> None:
+        """Record a completed download of ``size`` bytes."""
+        with self._lock:
+            self.documents += 1
+            self.bytes += size
+            self._finished = time.monotonic()
+
+    def record_failure(self) -> None:
+        """Record a failed download."""
+        with self._lock:
+            self.failures += 1
+            self._finished = time.monotonic()
+
+    def pool_enter(self) -> None:
+        """Record a request submitted to the source's request pool."""
+        with self._lock:
+            self.pool_depth += 1
+            self.max_pool_depth = max(self.max_pool_depth, self.pool_depth)
+
+    def pool_exit(self) -> None:
+        """Record a request leaving the source's request pool."""
+        with self._lock:
+            self.pool_depth -= 1
+
+    def record_batch(self, size: int, capacity: int) -> None:
+        """Record a batch request carrying ``size`` of at most ``capacity`` sub-requests."""
+        with self._lock:
+            self.batches += 1
+            self.batched_requests += size
+            self.batch_capacity += capacity
+
+    def record_throttle(self, wait: float) -> None:
+        """Record a throttled response and the time waited before retrying."""
+        with self._lock:
+            self.throttled += 1
+            self.throttle_wait += wait
+
+    @property
+    def elapsed(self) -> float:
+        """Wall-clock seconds spent downloading."""
+        with self._lock:
+            if self._started is None or self._finished is None:
+                return 0.0
+            return self._finished - self._started
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Get throughput statistics."""
+        elapsed = self.elapsed
+        return {
+            "documents": self.documents,
+            "bytes": self.bytes,
+            "failures": self.failures,
+            "elapsed_seconds": round(elapsed, 3),
+            "docs_per_second": round(self.documents / elapsed, 2) if elapsed > 0 else 0.0,
+            "mb_per_second": round(self.bytes / (1024 * 1024) / elapsed, 2) if elapsed > 0 else 0.0,
+            "pool_size": self.pool_size,
+            "max_pool_depth": self.max_pool_depth,
+            "batches": self.batches,
+            "batch_fill_ratio": round(self.batched_requests / self.batch_capacity, 3) if self.batch_capacity else 0.0,
+            "throttled_requests": self.throttled,
+            "throttle_wait_seconds": round(self.throttle_wait, 3),
+        }
+
+
 @dataclass
 class SourceDocument:
     """Represents a document from an input source."""
@@ -99,6 +206,8 @@ class InputSourceConfig:
     recursive: bool = True
     max_file_size: int = 50 * 1024 * 1024  # 50MB
     batch_size: int = 100
+    max_concurrency: int = 8  # Concurrent downloads for remote sources
+    max_documents: Optional[int] = None  # Stop listing after this many documents (None = no limit)
 
     # Additional options
     options: Dict[str, Any] = field(default_factory=dict)
@@ -113,6 +222,10 @@ class InputSourceConfig:
             raise ValueError("max_file_size must be positive")
         if self.batch_size <= 0:
             raise ValueError("batch_size must be positive")
+        if self.max_concurrency <= 0:
+            raise ValueError("max_concurrency must be positive")
+        if self.max_documents is not None and self.max_documents <= 0:
+            raise ValueError("max_documents must be positive")
 
 
 class BaseInputSource(ABC):
@@ -123,6 +236,16 @@ class BaseInputSource(ABC):
         self.config = config
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
         self._validated = False
+        self.metrics = SourceMetrics()
+        self.path_matcher = PathMatcher(config.include_patterns, config.exclude_patterns)
+
+        # Local content cache for remote documents, keyed by their listed version
+        options = config.options or {}
+        self.blob_cache = (
+            BlobCache(options["cache_dir"], options.get("cache_max_size") or DEFAULT_CACHE_MAX_SIZE)
+            if options.get("cache_dir")
+            else None
+        )
 
     @abstractmethod
     async def validate(self) -> None:
@@ -134,18 +257,65 @@ class BaseInputSource(ABC):
         """
         pass
 
-    @abstractmethod
     async def list_documents(self) -> List[SourceDocument]:
         """
         List all documents in the input source.
 
+        Collects :meth:`iter_documents`, honouring ``config.max_documents``.
+        Prefer :meth:`iter_documents` for large sources.
+
         Returns:
             List of SourceDocument objects (metadata only, no content)
 
         Raises:
             SourceValidationError: If source is not validated or accessible
         """
-        pass
+        return [doc async for doc in self.iter_documents(limit=self.config.max_documents)]
+
+    async def iter_documents(self, limit: Optional[int] = None) -> AsyncGenerator[SourceDocument, None]:
+        """
+        Yield filtered documents as the source lists them.
+
+        Work can start on the first page of a large listing instead of waiting
+        for the whole listing to complete.
+
+        Args:
+            limit: Stop after yielding this many documents (None = no limit)
+
+        Yields:
+            SourceDocument objects (metadata only, no content)
+
+        Raises:
+            SourceValidationError: If source is not validated or accessible
+        """
+        if not self._validated:
+            await self.validate()
+
+        listed = 0
+        yielded = 0
+        # aclosing stops the listing (and any pending requests) as soon as the limit is reached
+        async with aclosing(self._list_pages()) as pages:
+            async for page in pages:
+                listed += len(page)
+                for doc in self._filter_documents(page):
+                    yield doc
+                    yielded += 1
+                    if limit is not None and yielded >= limit:
+                        self.logger.info(f"Stopped listing after {limit} documents (limit reached)")
+                        return
+
+        self.logger.info(f"Found {listed} total files, {yielded} after filtering")
+
+    async def _list_pages(self) -> AsyncGenerator[List[SourceDocument], None]:
+        """
+        Yield unfiltered documents one listing page at a time.
+
+        Sources override this to stream their listing. The default supports
+        sources that only implement :meth:`list_documents`.
+        """
+        if type(self).list_documents is BaseInputSource.list_documents:
+            raise NotImplementedError(f"{type(self).__name__} must implement _list_pages() or list_documents()")
+        yield await self.list_documents()
 
     @abstractmethod
     async def get_document(self, document: SourceDocument) -> SourceDocument:
@@ -163,34 +333,116 @@ class BaseInputSource(ABC):
         """
         pass
 
-    async def get_documents(self, documents: List[SourceDocument]) -> AsyncGenerator[SourceDocument, None]:
+    async def get_documents(
+        self, documents: List[SourceDocument], max_concurrency: Optional[int] = None
+    ) -> AsyncGenerator[SourceDocument, None]:
         """
-        Retrieve multiple documents efficiently.
+        Retrieve multiple documents concurrently.
+
+        At most ``max_concurrency`` downloads (default ``config.max_concurrency``)
+        are in flight at once. Documents are yielded as they complete, so the
+        order may differ from ``documents``; failed downloads are logged and
+        skipped.
 
         Args:
             documents: List of SourceDocument objects to retrieve
+            max_concurrency: Maximum number of concurrent downloads
 
         Yields:
             SourceDocument objects with content loaded
         """
-        for doc in documents:
+        await self.prepare_documents(documents)
+        semaphore = asyncio.Semaphore(max_concurrency or self.config.max_concurrency)
+        tasks = [asyncio.ensure_future(self.fetch_document(doc, semaphore)) for doc in documents]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                if result is not None:
+                    yield result
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def fetch_document(
+        self, document: SourceDocument, semaphore: Optional[asyncio.Semaphore] = None
+    ) -> Optional[SourceDocument]:
+        """
+        Download one document under ``semaphore`` and record throughput.
+
+        Returns:
+            SourceDocument with content loaded, or None if the download failed
+        """
+        semaphore = semaphore or asyncio.Semaphore(1)
+        async with semaphore:
+            if await self._load_cached(document):
+                return document
+
+            self.metrics.start()
             try:
-                yield await self.get_document(doc)
+                loaded = await self.get_document(document)
             except Exception as e:
-                self.logger.error(f"Failed to retrieve document {doc.name}: {e}")
-                continue
+                self.metrics.record_failure()
+                self.logger.error(f"Failed to retrieve document {document.name}: {e}")
+                return None
+        self.metrics.record(len(loaded.content or b""))
+        await self._store_cached(loaded)
+        return loaded
+
+    def cache_version(self, document: SourceDocument) -> Optional[str]:
+        """
+        Content version of a listed document, such as an ETag.
 
-    async def get_processing_preview(self) -> Dict[str, Any]:
+        The version is part of the blob cache key, so a cached entry is only
+        served while the listing reports the same version. Sources without a
+        reliable version return None and are never cached.
+        """
+        return None
+
+    def blob_cache_key(self, document: SourceDocument) -> Optional[str]:
+        """Blob cache key of a document, or None when caching does not apply."""
+        if self.blob_cache is None:
+            return None
+        version = self.cache_version(document)
+        return BlobCache.key(document.source_path, version) if version else None
+
+    async def _load_cached(self, document: SourceDocument) -> bool:
+        """Fill ``document`` from the blob cache; returns whether it was a hit."""
+        key = self.blob_cache_key(document)
+        if key is None or self.blob_cache is None:
+            return False
+        content = await asyncio.get_running_loop().run_in_executor(None, self.blob_cache.get, key)
+        if content is None:
+            return False
+        document.content = content
+        document.size = len(content)
+        document.metadata["cache_hit"] = True
+        return True
+
+    async def _store_cached(self, document: SourceDocument) -> None:
+        """Store downloaded content in the blob cache."""
+        key = self.blob_cache_key(document)
+        if key is None or self.blob_cache is None or document.content is None:
+            return
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self.blob_cache.put, key, document.content)
+        except OSError as e:
+            self.logger.warning(f"Failed to cache {document.name}: {e}")
+
+    async def get_processing_preview(self, documents: Optional[List[SourceDocument]] = None) -> Dict[str, Any]:
         """
         Get a preview of what would be processed without loading content.
 
+        Args:
+            documents: Already listed documents; the source is listed when omitted
+
         Returns:
             Dictionary with processing statistics and file information
         """
         if not self._validated:
             await self.validate()
 
-        documents = await self.list_documents()
+        if documents is None:
+            documents = await self.list_documents()
 
         # Filter by supported types
         supported_docs = [doc for doc in documents if doc.is_supported_type(self.config.supported_types)]
@@ -229,27 +481,56 @@ class BaseInputSource(ABC):
                 self.logger.debug(f"Skipping {doc.name}: unsupported type {doc.extension}")
                 continue
 
-            # Apply include/exclude patterns
-            # If no include patterns or include patterns match, and no exclude patterns match
-            include_match = (
-                not self.config.include_patterns
-                or self.config.include_patterns == ["**/*"]
-                or any(pattern in doc.source_path or pattern == "**/*" for pattern in self.config.include_patterns)
-            )
-            exclude_match = any(pattern in doc.source_path for pattern in self.config.exclude_patterns)
-
-            if include_match and not exclude_match:
+            # Apply include/exclude glob patterns to the path below the source root
+            if self.path_matcher.matches(self._relative_path(doc)):
                 filtered.append(doc)
             else:
                 self.logger.debug(f"Skipping {doc.name}: filtered by patterns")
 
         return filtered
 
+    def _relative_path(self, document: SourceDocument) -> str:
+        """Path of a document relative to the source root, as matched by include/exclude patterns."""
+        relative = document.metadata.get("relative_path")
+        if relative:
+            return str(relative)
+        root = unquote(self.config.source_uri).rstrip("/") + "/"
+        source_path = unquote(document.source_path)
+        if source_path.startswith(root):
+            return source_path[len(root) :]
+        return document.name
+
     async def __aenter__(self):
         """Async context manager entry."""
         await self.validate()
         return self
 
+    async def prepare_documents(self, documents: List[SourceDocument]) -> None:
+        """
+        Prepare a batch of listed documents for download.
+
+        Called before a batch is downloaded so sources can resolve per-document
+        metadata (e.g. download URLs) in bulk rather than one request each.
+        """
+        pass
+
+    async def commit(self) -> None:
+        """
+        Persist incremental-sync state once listed documents were processed.
+
+        Sources that sync incrementally only advance their cursor here, so a
+        failed run is retried from the previous cursor.
+        """
+        pass
+
+    def get_sync_statistics(self) -> Dict[str, Any]:
+        """Get incremental-sync statistics (empty for sources that always list everything)."""
+        return {}
+
+    async def close(self) -> None:
+        """Release resources held by the source (connections, thread pools)."""
+        pass
+
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit."""
-        pass
+        await self.close()
@@ -0,0 +1,158 @@
+"""
+Local content cache for remote source documents.
+
+Downloaded blobs are stored keyed by source path and the content version
+reported by the listing (S3 ETag, SharePoint cTag). A listed version that
+matches a cached entry proves the content is unchanged, so the document is
+served from disk without a download. The cache is bounded in size and evicts
+least recently used entries; access order survives restarts via file mtimes.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Bump when the on-disk layout changes
+CACHE_FORMAT_VERSION = "1"
+
+DEFAULT_CACHE_MAX_SIZE = 10 * 1024 * 1024 * 1024  # 10GB
+
+_ENTRY_SUFFIX = ".blob"
+
+
+class BlobCache:
+    """
+    Size-bounded, LRU-evicted cache of document content on local disk.
+
+    Entries are written atomically, so concurrent workers and interrupted runs
+    never observe partial files.
+    """
+
+    def __init__(self, cache_dir: Union[str, Path], max_size: int = DEFAULT_CACHE_MAX_SIZE):
+        if max_size <= 0:
+            raise ValueError("max_size must be positive")
+
+        self.cache_dir = Path(cache_dir)
+        self.max_size = max_size
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._load_index()
+
+    def _load_index(self) -> None:
+        """Index existing entries from least to most recently used."""
+        entries = []
+        for entry in self.cache_dir.glob(f"*/*{_ENTRY_SUFFIX}"):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, entry.stem, stat.st_size))
+
+        for _, key, size in sorted(entries):
+            self._entries[key] = size
+            self.size += size
+        self._evict()
+
+    @staticmethod
+    def key(source_path: str, version: str) -> str:
+        """Build the cache key for a document path and content version."""
+        parts = [CACHE_FORMAT_VERSION, source_path, version]
+        return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}{_ENTRY_SUFFIX}"
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return cached content for ``key``, or None on a miss."""
+        entry = self._entry_path(key)
+        try:
+            data: Optional[bytes] = entry.read_bytes()
+            os.utime(entry)
+        except FileNotFoundError:
+            data = None
+        except OSError as e:
+            logger.warning(f"Discarding unreadable blob cache entry {entry}: {e}")
+            entry.unlink(missing_ok=True)
+            data = None
+
+        with self._lock:
+            if data is None:
+                self.misses += 1
+                self.size -= self._entries.pop(key, 0)
+            else:
+                self.hits += 1
+                if key not in self._entries:
+                    # Written by another process since the index was loaded
+                    self._entries[key] = len(data)
+                    self.size += len(data)
+                self._entries.move_to_end(key)
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """Store content for ``key``, evicting least recently used entries to stay within ``max_size``."""
+        if len(data) > self.max_size:
+            logger.debug(f"Not caching blob of {len(data)} bytes: larger than cache size {self.max_size}")
+            return
+
+        entry = self._entry_path(key)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=entry.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(temp_path, entry)
+        except Exception:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+
+        with self._lock:
+            self.size += len(data) - self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            self._evict()
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until the cache fits ``max_size``. Caller holds the lock."""
+        while self.size > self.max_size and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._entry_path(key).unlink(missing_ok=True)
+            self.size -= size
+            self.evictions += 1
+
+    def clear(self) -> int:
+        """Remove all cache entries and return how many were deleted."""
+        with self._lock:
+            removed = 0
+            for entry in self.cache_dir.glob(f"*/*{_ENTRY_SUFFIX}"):
+                entry.unlink(missing_ok=True)
+                removed += 1
+            self._entries.clear()
+            self.size = 0
+            return removed
+
+    def get_statistics(self) -> Dict[str, int]:
+        """Get hit/miss/eviction counters and the cached size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "size_bytes": self.size,
+            }
@@ -2,10 +2,13 @@
 Local filesystem input source implementation.
 """
 
+import asyncio
+import itertools
 import os
+from contextlib import aclosing
 from datetime import datetime
 from pathlib import Path
-from typing import List
+from typing import AsyncGenerator, Dict, Iterator, List
 
 from .base import BaseInputSource, SourceDocument, SourceValidationError
 
@@ -39,37 +42,122 @@ class LocalInputSource(BaseInputSource):
         self._validated = True
         self.logger.info(f"Validated local source: {path}")
 
-    async def list_documents(self) -> List[SourceDocument]:
-        """List all documents in the local path."""
-        if not self._validated:
-            await self.validate()
+    async def _list_pages(self) -> AsyncGenerator[List[SourceDocument], None]:
+        """
+        List documents in the local path, one page of ``batch_size`` files at a time.
 
+        Directories are walked with :func:`os.scandir`. Excluded directories are
+        pruned before they are entered, and files are filtered by extension
+        and glob patterns before they are stat-ed. With ``options["walk_workers"]``
+        above 1, top-level subtrees are walked in parallel and pages arrive in
+        completion order; otherwise files are listed in sorted path order.
+        """
         path = Path(self.config.source_uri).resolve()
-        documents = []
 
         if path.is_file():
             # Single file
-            documents.append(self._create_document_from_path(path))
+            yield [self._create_document_from_path(path)]
+            return
+
+        root = str(path)
+        workers = max(1, int((self.config.options or {}).get("walk_workers", 1)))
+        if workers == 1 or not self.config.recursive:
+            walkers = iter([self._walk(root, "", self.config.recursive)])
         else:
-            # Directory - recursively find files
-            if self.config.recursive:
-                pattern = "**/*"
-            else:
-                pattern = "*"
-
-            for file_path in path.glob(pattern):
-                if file_path.is_file():
-                    try:
-                        documents.append(self._create_document_from_path(file_path))
-                    except Exception as e:
-                        self.logger.warning(f"Error processing {file_path}: {e}")
-                        continue
-
-        # Apply filtering
-        filtered_documents = self._filter_documents(documents)
-
-        self.logger.info(f"Found {len(documents)} total files, {len(filtered_documents)} after filtering")
-        return filtered_documents
+            loop = asyncio.get_running_loop()
+            subtrees = await loop.run_in_executor(None, self._subtrees, root)
+            walkers = itertools.chain(
+                [self._walk(root, "", recursive=False)],
+                (self._walk(os.path.join(root, name), name, recursive=True) for name in subtrees),
+            )
+
+        async with aclosing(self._walk_pages(walkers, workers)) as pages:
+            async for page in pages:
+                yield page
+
+    async def _walk_pages(
+        self, walkers: Iterator[Iterator[SourceDocument]], workers: int
+    ) -> AsyncGenerator[List[SourceDocument], None]:
+        """Pull pages from up to ``workers`` walkers at once, each in its own executor thread."""
+        loop = asyncio.get_running_loop()
+        running: Dict[asyncio.Future, Iterator[SourceDocument]] = {}
+
+        def submit(walker: Iterator[SourceDocument]) -> None:
+            running[loop.run_in_executor(None, self._next_page, walker)] = walker
+
+        for walker in itertools.islice(walkers, workers):
+            submit(walker)
+
+        try:
+            while running:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    walker = running.pop(future)
+                    page = future.result()
+                    if page:
+                        submit(walker)
+                        yield page
+                    else:
+                        next_walker = next(walkers, None)
+                        if next_walker is not None:
+                            submit(next_walker)
+        finally:
+            for future in running:
+                future.cancel()
+
+    def _next_page(self, documents: Iterator[SourceDocument]) -> List[SourceDocument]:
+        """Take the next ``batch_size`` documents from a walker."""
+        return list(itertools.islice(documents, self.config.batch_size))
+
+    def _subtrees(self, root: str) -> List[str]:
+        """Names of the top-level directories of ``root`` that are not excluded."""
+        with os.scandir(root) as entries:
+            return sorted(
+                entry.name
+                for entry in entries
+                if entry.is_dir(follow_symlinks=False) and not self.path_matcher.excludes_directory(entry.name)
+            )
+
+    def _scan(self, directory: str) -> Iterator[os.DirEntry]:
+        """Entries of ``directory`` sorted by name; unreadable directories are skipped."""
+        try:
+            with os.scandir(directory) as iterator:
+                return iter(sorted(iterator, key=lambda entry: entry.name))
+        except OSError as e:
+            self.logger.warning(f"Cannot read directory {directory}: {e}")
+            return iter(())
+
+    def _walk(self, directory: str, relative: str, recursive: bool) -> Iterator[SourceDocument]:
+        """
+        Yield documents below ``directory`` in sorted path order.
+
+        ``relative`` is the path of ``directory`` below the source root. Symbolic
+        links to directories are not followed.
+        """
+        extensions = {f".{ext.lower().lstrip('.')}" for ext in self.config.supported_types}
+        stack = [(self._scan(directory), relative)]
+
+        while stack:
+            entries, current_relative = stack[-1]
+            entry = next(entries, None)
+            if entry is None:
+                stack.pop()
+                continue
+
+            relative_path = f"{current_relative}/{entry.name}" if current_relative else entry.name
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive and not self.path_matcher.excludes_directory(relative_path):
+                        stack.append((self._scan(entry.path), relative_path))
+                    continue
+
+                if os.path.splitext(entry.name)[1].lower() not in extensions:
+                    continue
+                if not self.path_matcher.matches(relative_path) or not entry.is_file():
+                    continue
+                yield self._create_document(entry.path, entry.name, relative_path, entry.stat())
+            except OSError as e:
+                self.logger.warning(f"Error processing {entry.path}: {e}")
 
     async def get_document(self, document: SourceDocument) -> SourceDocument:
         """Retrieve document content from local filesystem."""
@@ -95,23 +183,29 @@ class LocalInputSource(BaseInputSource):
     def _create_document_from_path(self, file_path: Path) -> SourceDocument:
         """Create a SourceDocument from a local file path."""
         try:
-            stat = file_path.stat()
-
-            return SourceDocument(
-                name=file_path.name,
-                source_path=str(file_path.absolute()),
-                content_type="",  # Will be inferred in __post_init__
-                size=stat.st_size,
-                last_modified=datetime.fromtimestamp(stat.st_mtime),
-                metadata={
-                    "full_path": str(file_path.absolute()),
-                    "relative_path": self._get_safe_relative_path(file_path),
-                    "permissions": oct(stat.st_mode)[-3:],
-                },
-            )
+            relative_path = self._get_safe_relative_path(file_path)
+            if relative_path == ".":
+                # The source is the file itself
+                relative_path = file_path.name
+            return self._create_document(str(file_path.absolute()), file_path.name, relative_path, file_path.stat())
         except Exception as e:
             raise SourceValidationError(f"Failed to get file info for {file_path}: {e}")
 
+    def _create_document(self, full_path: str, name: str, relative_path: str, stat: os.stat_result) -> SourceDocument:
+        """Create a SourceDocument from an already-known path and stat result."""
+        return SourceDocument(
+            name=name,
+            source_path=full_path,
+            content_type="",  # Will be inferred in __post_init__
+            size=stat.st_size,
+            last_modified=datetime.fromtimestamp(stat.st_mtime),
+            metadata={
+                "full_path": full_path,
+                "relative_path": relative_path,
+                "permissions": oct(stat.st_mode)[-3:],
+            },
+        )
+
     def _get_safe_relative_path(self, file_path: Path) -> str:
         """Get relative path safely, handling path resolution issues."""
         try:
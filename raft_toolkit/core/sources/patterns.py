@@ -0,0 +1,96 @@
+"""
+Glob include/exclude matching for source paths.
+
+Patterns are matched against ``/``-separated paths relative to the source
+root, with the following semantics:
+
+- ``*`` matches within one path segment, ``?`` one character and ``[...]``
+  a character class (``[!...]`` negates).
+- ``**`` matches any number of segments, including none (``docs/**/*.pdf``
+  matches ``docs/a.pdf`` and ``docs/x/y/a.pdf``).
+- A pattern without a ``/`` matches at any depth (``*.tmp``, ``node_modules``);
+  a pattern with one is anchored at the source root (``build/*``).
+- A pattern that matches a directory matches everything below it, so
+  excluded directories can be pruned without being walked.
+
+All patterns of a list are compiled into one regular expression.
+"""
+
+import re
+from typing import Iterable, List, Optional, Pattern
+
+# Patterns that include everything; matching is skipped for them
+MATCH_ALL_PATTERNS = ("**/*", "**", "*")
+
+
+def translate_glob(pattern: str) -> str:
+    """Translate a glob pattern into a regular expression matching whole relative paths."""
+    pattern = pattern.strip().replace("\\", "/")
+    anchored = "/" in pattern.rstrip("/")
+    pattern = pattern.strip("/")
+
+    parts: List[str] = [] if anchored or pattern.startswith("**") else ["(?:.*/)?"]
+    i, n = 0, len(pattern)
+    while i < n:
+        char = pattern[i]
+        if char == "*":
+            if pattern.startswith("**/", i):
+                parts.append("(?:.*/)?")
+                i += 3
+                continue
+            if pattern.startswith("**", i):
+                parts.append(".*")
+                i += 2
+                continue
+            parts.append("[^/]*")
+        elif char == "?":
+            parts.append("[^/]")
+        elif char == "[":
+            end = pattern.find("]", i + 2 if pattern.startswith("[!", i) else i + 1)
+            if end == -1:
+                parts.append(re.escape(char))
+            else:
+                body = pattern[i + 1 : end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                parts.append("[" + body.replace("\\", "\\\\") + "]")
+                i = end
+        else:
+            parts.append(re.escape(char))
+        i += 1
+
+    # Matching a directory matches its contents
+    return "".join(parts) + "(?:/.*)?"
+
+
+def compile_globs(patterns: Iterable[str]) -> Optional[Pattern[str]]:
+    """Compile glob patterns into one regular expression, or None when there are none."""
+    translated = [translate_glob(pattern) for pattern in patterns if pattern and pattern.strip()]
+    if not translated:
+        return None
+    return re.compile("(?:" + "|".join(translated) + r")\Z", re.DOTALL)
+
+
+class PathMatcher:
+    """Include/exclude filter for relative source paths."""
+
+    def __init__(self, include_patterns: Optional[List[str]] = None, exclude_patterns: Optional[List[str]] = None):
+        include = [p for p in include_patterns or [] if p not in MATCH_ALL_PATTERNS]
+        # An include list containing a match-all pattern includes everything
+        if include_patterns and len(include) < len(include_patterns):
+            include = []
+        self.include = compile_globs(include)
+        self.exclude = compile_globs(exclude_patterns or [])
+
+    def matches(self, relative_path: str) -> bool:
+        """Whether a file at ``relative_path`` is included and not excluded."""
+        if self.exclude is not None and self.exclude.match(relative_path):
+            return False
+        return self.include is None or self.include.match(relative_path) is not None
+
+    def excludes_directory(self, relative_path: str) -> bool:
+        """Whether everything below the directory at ``relative_path`` is excluded."""
+        if self.exclude is None:
+            return False
+        # ``dir/`` also catches patterns such as ``build/**`` that only match paths below the directory
+        return bool(self.exclude.match(relative_path) or self.exclude.match(relative_path + "/"))
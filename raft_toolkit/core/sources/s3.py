@@ -4,10 +4,13 @@ Amazon S3 input source implementation.
 
 import asyncio
 import re
-from typing import List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple, Union
 
 try:
     import boto3
+    from botocore.config import Config as BotoConfig
     from botocore.exceptions import ClientError, NoCredentialsError
 
     BOTO3_AVAILABLE = True
@@ -16,9 +19,36 @@ except ImportError:
 
 from .base import BaseInputSource, SourceDocument, SourceValidationError
 
+# Keys per ListObjectsV2 request (the S3 maximum)
+LIST_PAGE_SIZE = 1000
+
+# Objects at least this large are downloaded as concurrent byte ranges
+DEFAULT_MULTIPART_THRESHOLD = 16 * 1024 * 1024
+DEFAULT_PART_SIZE = 8 * 1024 * 1024
+DEFAULT_PART_CONCURRENCY = 4
+
+_DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+_LISTING_DONE = object()
+
 
 class S3InputSource(BaseInputSource):
-    """Input source for Amazon S3 buckets."""
+    """
+    Input source for Amazon S3 buckets.
+
+    Listing fans out across the common prefixes below the source prefix, and
+    large objects are downloaded as concurrent byte ranges. All S3 calls share
+    one client and a dedicated thread pool sized to its connection pool.
+
+    Tuning options (``InputSourceConfig.options``):
+        max_pool_connections: HTTP connections of the shared client
+            (default: ``max_concurrency * part_concurrency``, at least 10)
+        multipart_threshold: Minimum object size for ranged downloads (16MB)
+        part_size: Byte range size (8MB)
+        part_concurrency: Concurrent ranges per object (4)
+
+    ``credentials["endpoint_url"]`` points the client at an S3-compatible
+    endpoint such as MinIO or a moto server.
+    """
 
     def __init__(self, config):
         """Initialize S3 input source."""
@@ -30,6 +60,19 @@ class S3InputSource(BaseInputSource):
         # Parse S3 URI
         self.bucket_name, self.prefix = self._parse_s3_uri(config.source_uri)
 
+        options = config.options or {}
+        self.part_concurrency = int(options.get("part_concurrency", DEFAULT_PART_CONCURRENCY))
+        self.part_size = int(options.get("part_size", DEFAULT_PART_SIZE))
+        self.multipart_threshold = int(options.get("multipart_threshold", DEFAULT_MULTIPART_THRESHOLD))
+        self.max_pool_connections = int(
+            options.get("max_pool_connections", max(10, config.max_concurrency * self.part_concurrency))
+        )
+        if min(self.part_concurrency, self.part_size, self.multipart_threshold, self.max_pool_connections) <= 0:
+            raise SourceValidationError("S3 transfer options must be positive")
+
+        # Dedicated pool for blocking boto3 calls, one thread per connection
+        self._executor: Optional[ThreadPoolExecutor] = None
+
         # Initialize S3 client
         self.s3_client = None
         self._setup_s3_client()
@@ -86,22 +129,47 @@ class S3InputSource(BaseInputSource):
             if "region_name" in self.config.credentials:
                 session_kwargs["region_name"] = self.config.credentials["region_name"]
 
+        client_kwargs: Dict[str, Any] = {
+            "config": BotoConfig(
+                max_pool_connections=self.max_pool_connections,
+                retries={"max_attempts": 5, "mode": "adaptive"},
+            )
+        }
+        endpoint_url = (self.config.credentials or {}).get("endpoint_url")
+        if endpoint_url:
+            client_kwargs["endpoint_url"] = endpoint_url
+
         try:
             session = boto3.Session(**session_kwargs)
-            self.s3_client = session.client("s3")
+            # botocore clients are thread-safe; one client is shared by all listing and download threads
+            self.s3_client = session.client("s3", **client_kwargs)
         except Exception as e:
             raise SourceValidationError(f"Failed to create S3 client: {e}")
 
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Return the thread pool used for S3 calls."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_pool_connections, thread_name_prefix="raft-s3")
+        return self._executor
+
+    async def _call(self, method: str, **kwargs: Any) -> Any:
+        """Run an S3 client method on the S3 thread pool."""
+        if self.s3_client is None:
+            raise ValueError("S3 client is not initialized")
+        function = getattr(self.s3_client, method)
+        return await asyncio.get_running_loop().run_in_executor(self._get_executor(), lambda: function(**kwargs))
+
+    async def close(self) -> None:
+        """Shut down the S3 thread pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
     async def validate(self) -> None:
         """Validate S3 bucket access and credentials."""
         try:
             # Test bucket access by listing objects with limit
-            if self.s3_client is None:
-                raise ValueError("S3 client is not initialized")
-            s3_client = self.s3_client  # Create local reference for lambda
-            await asyncio.get_event_loop().run_in_executor(
-                None, lambda: s3_client.list_objects_v2(Bucket=self.bucket_name, Prefix=self.prefix, MaxKeys=1)
-            )
+            await self._call("list_objects_v2", Bucket=self.bucket_name, Prefix=self.prefix, MaxKeys=1)
 
             self._validated = True
             self.logger.info(f"Validated S3 source: s3://{self.bucket_name}/{self.prefix}")
@@ -122,76 +190,115 @@ class S3InputSource(BaseInputSource):
         except Exception as e:
             raise SourceValidationError(f"Unexpected error during S3 validation: {e}")
 
-    async def list_documents(self) -> List[SourceDocument]:
-        """List all documents in the S3 bucket/prefix."""
-        if not self._validated:
-            await self.validate()
-
-        documents = []
-        continuation_token = None
+    async def _list_pages(self) -> AsyncGenerator[List[SourceDocument], None]:
+        """
+        List objects in the S3 bucket/prefix.
 
+        The first level below the prefix is discovered with a ``/`` delimiter;
+        its objects are yielded directly and each common prefix is then listed
+        in parallel (up to ``max_concurrency`` at once), pages being yielded in
+        arrival order.
+        """
         try:
-            while True:
-                # Prepare list_objects_v2 parameters
-                list_params = {"Bucket": self.bucket_name, "Prefix": self.prefix, "MaxKeys": self.config.batch_size}
-
-                if continuation_token:
-                    list_params["ContinuationToken"] = continuation_token
-
-                # List objects
-                if self.s3_client is None:
-                    raise ValueError("S3 client is not initialized")
-                s3_client = self.s3_client  # Create local reference for lambda
-                response = await asyncio.get_event_loop().run_in_executor(
-                    None, lambda: s3_client.list_objects_v2(**list_params)
-                )
-
-                # Process objects
-                for obj in response.get("Contents", []):
-                    # Skip directories (objects ending with /)
-                    if obj["Key"].endswith("/"):
-                        continue
-
-                    try:
-                        doc = self._create_document_from_s3_object(obj)
-                        documents.append(doc)
-                    except Exception as e:
-                        self.logger.warning(f"Error processing S3 object {obj['Key']}: {e}")
-                        continue
-
-                # Check for more objects
-                if not response.get("IsTruncated", False):
-                    break
-
-                continuation_token = response.get("NextContinuationToken")
-
-                # Safety check to prevent infinite loops
-                if len(documents) > 10000:  # Configurable limit
-                    self.logger.warning("Limiting to first 10000 objects from S3")
-                    break
-
+            prefixes: List[str] = []
+            async with aclosing(self._paginate(self.prefix, delimiter="/")) as responses:
+                async for response in responses:
+                    prefixes.extend(common["Prefix"] for common in response.get("CommonPrefixes", []))
+                    yield self._documents_from_response(response)
+
+            if not self.config.recursive or not prefixes:
+                return
+
+            self.logger.debug(f"Listing {len(prefixes)} prefixes under s3://{self.bucket_name}/{self.prefix}")
+            async with aclosing(self._list_prefixes(prefixes)) as pages:
+                async for page in pages:
+                    yield page
+
+        except SourceValidationError:
+            raise
         except Exception as e:
             raise SourceValidationError(f"Failed to list S3 objects: {e}")
 
-        # Apply filtering
-        filtered_documents = self._filter_documents(documents)
-
-        self.logger.info(f"Found {len(documents)} total objects, {len(filtered_documents)} after filtering")
-        return filtered_documents
+    async def _list_prefixes(self, prefixes: List[str]) -> AsyncGenerator[List[SourceDocument], None]:
+        """List several prefixes concurrently, yielding pages as they arrive."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.config.max_concurrency * 2)
+        semaphore = asyncio.Semaphore(self.config.max_concurrency)
+
+        async def list_prefix(prefix: str) -> None:
+            async with semaphore:
+                async with aclosing(self._paginate(prefix)) as responses:
+                    async for response in responses:
+                        await queue.put(self._documents_from_response(response))
+
+        async def list_all() -> None:
+            try:
+                await asyncio.gather(*(list_prefix(prefix) for prefix in prefixes))
+                await queue.put(_LISTING_DONE)
+            except Exception as e:
+                await queue.put(e)
+
+        producer = asyncio.create_task(list_all())
+        try:
+            while True:
+                item = await queue.get()
+                if item is _LISTING_DONE:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            producer.cancel()
+
+    async def _paginate(self, prefix: str, delimiter: Optional[str] = None) -> AsyncGenerator[Dict[str, Any], None]:
+        """Yield ListObjectsV2 responses for ``prefix``."""
+        list_params: Dict[str, Any] = {"Bucket": self.bucket_name, "Prefix": prefix, "MaxKeys": LIST_PAGE_SIZE}
+        if delimiter:
+            list_params["Delimiter"] = delimiter
+
+        while True:
+            response = await self._call("list_objects_v2", **list_params)
+            yield response
+
+            # Check for more objects
+            if not response.get("IsTruncated", False):
+                break
+            list_params["ContinuationToken"] = response.get("NextContinuationToken")
+
+    def _documents_from_response(self, response: Dict[str, Any]) -> List[SourceDocument]:
+        """Create documents for the objects of one listing response."""
+        documents = []
+        for obj in response.get("Contents", []):
+            # Skip directories (objects ending with /)
+            if obj["Key"].endswith("/"):
+                continue
+
+            try:
+                documents.append(self._create_document_from_s3_object(obj))
+            except Exception as e:
+                self.logger.warning(f"Error processing S3 object {obj['Key']}: {e}")
+                continue
+        return documents
+
+    def cache_version(self, document: SourceDocument) -> Optional[str]:
+        """The listed ETag identifies the object content."""
+        return document.metadata.get("etag") or None
 
     async def get_document(self, document: SourceDocument) -> SourceDocument:
-        """Retrieve document content from S3."""
+        """Retrieve document content from S3, using ranged requests for large objects."""
+        key = document.metadata["s3_key"]
+        content: Union[bytes, bytearray]
         try:
-            # Download object content
-            if self.s3_client is None:
-                raise ValueError("S3 client is not initialized")
-            s3_client = self.s3_client  # Create local reference for lambda
-            response = await asyncio.get_event_loop().run_in_executor(
-                None, lambda: s3_client.get_object(Bucket=self.bucket_name, Key=document.metadata["s3_key"])
-            )
-
-            # Read content
-            content = response["Body"].read()
+            if document.size and document.size >= self.multipart_threshold:
+                try:
+                    content, response = await self._download_ranges(key, document.size, document.metadata.get("etag"))
+                except ClientError as e:
+                    # The object changed since it was listed; fetch the current version whole
+                    if e.response["Error"]["Code"] not in ("PreconditionFailed", "InvalidRange"):
+                        raise
+                    self.logger.debug(f"Ranged download of {key} failed ({e}), downloading whole object")
+                    content, response = await self._download_whole(key)
+            else:
+                content, response = await self._download_whole(key)
 
             # Update document with content
             document.content = content
@@ -213,14 +320,61 @@ class S3InputSource(BaseInputSource):
         except ClientError as e:
             error_code = e.response["Error"]["Code"]
             if error_code == "NoSuchKey":
-                raise SourceValidationError(f"S3 object not found: {document.metadata['s3_key']}")
+                raise SourceValidationError(f"S3 object not found: {key}")
             elif error_code == "AccessDenied":
-                raise SourceValidationError(f"Access denied to S3 object: {document.metadata['s3_key']}")
+                raise SourceValidationError(f"Access denied to S3 object: {key}")
             else:
                 raise SourceValidationError(f"Failed to download S3 object: {e}")
         except Exception as e:
             raise SourceValidationError(f"Unexpected error downloading S3 object: {e}")
 
+    async def _download_whole(self, key: str) -> Tuple[bytes, Dict[str, Any]]:
+        """Download an object with a single GET."""
+        response = await self._call("get_object", Bucket=self.bucket_name, Key=key)
+        body = response["Body"]
+        content = await asyncio.get_running_loop().run_in_executor(self._get_executor(), body.read)
+        return content, response
+
+    async def _download_ranges(self, key: str, size: int, etag: Optional[str]) -> Tuple[bytearray, Dict[str, Any]]:
+        """
+        Download an object as concurrent byte ranges into a preallocated buffer.
+
+        Every range is conditional on the listed ETag so that a concurrent
+        overwrite cannot produce a mixed buffer.
+        """
+        buffer = bytearray(size)
+        view = memoryview(buffer)
+        semaphore = asyncio.Semaphore(self.part_concurrency)
+        loop = asyncio.get_running_loop()
+        condition = {"IfMatch": f'"{etag}"'} if etag else {}
+
+        async def fetch(start: int) -> Dict[str, Any]:
+            end = min(start + self.part_size, size) - 1
+            async with semaphore:
+                response: Dict[str, Any] = await self._call(
+                    "get_object", Bucket=self.bucket_name, Key=key, Range=f"bytes={start}-{end}", **condition
+                )
+                received = await loop.run_in_executor(
+                    self._get_executor(), self._read_into, response["Body"], view[start : end + 1]
+                )
+            if received != end + 1 - start:
+                raise SourceValidationError(f"Short read for {key} range {start}-{end}: {received} bytes")
+            return response
+
+        responses = await asyncio.gather(*(fetch(start) for start in range(0, size, self.part_size)))
+        return buffer, responses[0]
+
+    @staticmethod
+    def _read_into(body: Any, target: memoryview) -> int:
+        """Stream a response body into ``target`` and return the bytes written."""
+        written = 0
+        for chunk in body.iter_chunks(_DOWNLOAD_CHUNK_SIZE):
+            if written + len(chunk) > len(target):
+                raise ValueError("Response body is larger than the requested range")
+            target[written : written + len(chunk)] = chunk
+            written += len(chunk)
+        return written
+
     def _create_document_from_s3_object(self, s3_object: dict) -> SourceDocument:
         """Create a SourceDocument from an S3 object metadata."""
         key = s3_object["Key"]
@@ -0,0 +1,79 @@
+"""
+Persisted state for incremental source synchronisation.
+"""
+
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Bump when the file layout changes; older files are ignored
+SYNC_STATE_VERSION = 1
+
+
+class SyncState:
+    """
+    Delta cursor and known items of one source, stored as a JSON file.
+
+    Changes are staged in memory and only written by :meth:`save`, so a run
+    that fails before its documents are processed resumes from the previous
+    cursor instead of skipping changes.
+    """
+
+    def __init__(self, path: Union[str, Path], source_key: str):
+        self.path = Path(path)
+        self.source_key = source_key
+        self.delta_link: Optional[str] = None
+        self.items: Dict[str, Dict[str, Any]] = {}
+        self.extra: Dict[str, Any] = {}
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable sync state {self.path}: {e}")
+            return
+
+        if data.get("version") != SYNC_STATE_VERSION or data.get("source") != self.source_key:
+            logger.info(f"Sync state {self.path} belongs to another source or version; starting a full sync")
+            return
+
+        self.delta_link = data.get("delta_link")
+        self.items = data.get("items", {})
+        self.extra = data.get("extra", {})
+
+    @property
+    def is_initial(self) -> bool:
+        """Whether no previous sync has been recorded."""
+        return not self.delta_link
+
+    def reset(self) -> None:
+        """Forget the cursor and known items, forcing a full sync."""
+        self.delta_link = None
+        self.items = {}
+
+    def save(self) -> None:
+        """Write the state atomically."""
+        payload = {
+            "version": SYNC_STATE_VERSION,
+            "source": self.source_key,
+            "delta_link": self.delta_link,
+            "items": self.items,
+            "extra": self.extra,
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump(payload, file)
+            os.replace(temp_path, self.path)
+        except Exception:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
@@ -3,7 +3,7 @@ Shared utility functions and helpers.
 """
 
 from .env_config import get_env_variable, load_env_file, read_env_config, set_env
-from .file_utils import extract_random_jsonl_rows, split_jsonl_file
+from .file_utils import extract_random_jsonl_rows, reservoir_sample_jsonl, split_jsonl_dataset, split_jsonl_file
 from .identity_utils import get_azure_openai_token
 
 __all__ = [
@@ -14,4 +14,6 @@ __all__ = [
     "get_azure_openai_token",
     "split_jsonl_file",
     "extract_random_jsonl_rows",
+    "reservoir_sample_jsonl",
+    "split_jsonl_dataset",
 ]
@@ -0,0 +1,259 @@
+"""
+Compact storage and serialization for chunk embeddings.
+
+Embeddings are held in contiguous float32 (or float16) NumPy blocks and every
+chunk keeps a row view into its block instead of a list of boxed Python floats.
+Serialization helpers emit base64 for single vectors, ``.npz`` archives for
+bulk storage and Arrow fixed-size-list columns for tabular outputs.
+"""
+
+import base64
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+try:
+    import numpy as np
+
+    HAS_NUMPY = True
+except ImportError:
+    np = None  # type: ignore
+    HAS_NUMPY = False
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_EMBEDDING_DTYPES = ("float32", "float16")
+DEFAULT_BLOCK_ROWS = 4096
+
+
+def _check_dtype(dtype: str) -> str:
+    if dtype not in SUPPORTED_EMBEDDING_DTYPES:
+        raise ValueError(f"Unsupported embedding dtype: {dtype}. Use one of {SUPPORTED_EMBEDDING_DTYPES}")
+    return dtype
+
+
+class EmbeddingMatrix:
+    """
+    Growable embedding matrix that hands out per-row views.
+
+    Rows are stored in fixed-size contiguous blocks so that views handed out
+    earlier stay valid when the matrix grows (no reallocation of filled blocks).
+    """
+
+    def __init__(self, dim: int, dtype: str = "float32", block_rows: int = DEFAULT_BLOCK_ROWS):
+        if not HAS_NUMPY:
+            raise ImportError("numpy is required for EmbeddingMatrix. Install with: pip install numpy")
+        if dim <= 0:
+            raise ValueError("Embedding dimension must be positive")
+        if block_rows <= 0:
+            raise ValueError("block_rows must be positive")
+
+        self.dim = dim
+        self.dtype = _check_dtype(dtype)
+        self.block_rows = block_rows
+        self._blocks: List[Any] = []
+        self._rows = 0
+
+    def __len__(self) -> int:
+        return self._rows
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes allocated by all blocks."""
+        return sum(block.nbytes for block in self._blocks)
+
+    @classmethod
+    def from_vectors(
+        cls, vectors: Sequence[Sequence[float]], dtype: str = "float32"
+    ) -> Tuple["EmbeddingMatrix", List[Any]]:
+        """
+        Build a matrix sized exactly for the given vectors.
+
+        Returns:
+            The matrix and the list of row views, in input order
+        """
+        if len(vectors) == 0:
+            raise ValueError("Cannot build an embedding matrix from no vectors")
+        data = np.asarray(vectors, dtype=_check_dtype(dtype))
+        if data.ndim != 2:
+            raise ValueError(f"Embeddings must be a 2D array, got shape {data.shape}")
+
+        matrix = cls(data.shape[1], dtype=dtype, block_rows=max(1, data.shape[0]))
+        return matrix, matrix.extend(data)
+
+    def append(self, vector: Sequence[float]) -> Any:
+        """Append one vector and return its row view."""
+        return self.extend([vector])[0]
+
+    def extend(self, vectors: Union[Sequence[Sequence[float]], Any]) -> List[Any]:
+        """Append vectors and return their row views."""
+        data = np.asarray(vectors, dtype=self.dtype)
+        if data.size == 0:
+            return []
+        if data.ndim != 2 or data.shape[1] != self.dim:
+            raise ValueError(f"Expected vectors of dimension {self.dim}, got shape {data.shape}")
+
+        views: List[Any] = []
+        offset = 0
+        while offset < data.shape[0]:
+            block_index, row_in_block = divmod(self._rows, self.block_rows)
+            if block_index == len(self._blocks):
+                self._blocks.append(np.empty((self.block_rows, self.dim), dtype=self.dtype))
+            block = self._blocks[block_index]
+
+            count = min(self.block_rows - row_in_block, data.shape[0] - offset)
+            block[row_in_block : row_in_block + count] = data[offset : offset + count]
+            views.extend(block[row_in_block + i] for i in range(count))
+
+            offset += count
+            self._rows += count
+
+        return views
+
+    def to_numpy(self) -> Any:
+        """Return all rows as a single contiguous ``(rows, dim)`` array."""
+        if not self._blocks:
+            return np.empty((0, self.dim), dtype=self.dtype)
+        if len(self._blocks) == 1:
+            return self._blocks[0][: self._rows]
+        return np.concatenate(self._blocks)[: self._rows]
+
+
+def attach_embeddings(chunks: Sequence[Any], vectors: Sequence[Sequence[float]], dtype: str = "float32") -> None:
+    """
+    Store embeddings for chunks in one shared matrix and assign row views.
+
+    Falls back to plain lists when NumPy is not installed.
+    """
+    if len(chunks) != len(vectors):
+        raise ValueError(f"Got {len(vectors)} embeddings for {len(chunks)} chunks")
+    if not chunks:
+        return
+
+    if not HAS_NUMPY:
+        for chunk, vector in zip(chunks, vectors):
+            chunk.embedding = list(vector)
+        return
+
+    _, views = EmbeddingMatrix.from_vectors(vectors, dtype=dtype)
+    for chunk, view in zip(chunks, views):
+        chunk.embedding = view
+
+
+def encode_embedding(embedding: Any) -> Any:
+    """
+    Encode a single embedding for JSON serialization.
+
+    NumPy vectors become ``{"dtype", "dim", "data"}`` with base64 raw bytes;
+    plain lists (and None) are returned unchanged.
+    """
+    if embedding is None or not HAS_NUMPY or not isinstance(embedding, np.ndarray):
+        return embedding
+
+    data = np.ascontiguousarray(embedding)
+    return {
+        "dtype": str(data.dtype),
+        "dim": int(data.shape[-1]),
+        "data": base64.b64encode(data.tobytes()).decode("ascii"),
+    }
+
+
+def decode_embedding(value: Any, dtype: Optional[str] = None) -> Any:
+    """
+    Decode an embedding produced by :func:`encode_embedding`.
+
+    Accepts the legacy list-of-floats format as well. Lists are converted to a
+    compact array when NumPy is available.
+    """
+    if value is None:
+        return None
+
+    if isinstance(value, dict):
+        if not HAS_NUMPY:
+            raise ImportError("numpy is required to decode binary embeddings")
+        raw = base64.b64decode(value["data"])
+        vector = np.frombuffer(raw, dtype=value.get("dtype", "float32"))
+        return vector.astype(dtype) if dtype and dtype != str(vector.dtype) else vector
+
+    if HAS_NUMPY:
+        return np.asarray(value, dtype=_check_dtype(dtype or "float32"))
+    return list(value)
+
+
+def save_embeddings_npz(chunks: Iterable[Any], path: Union[str, Path], dtype: str = "float32") -> int:
+    """
+    Save chunk embeddings to a compressed ``.npz`` archive.
+
+    The archive holds an ``ids`` array and an ``embeddings`` matrix in the same
+    order. Chunks without embeddings are skipped.
+
+    Returns:
+        Number of embeddings written
+    """
+    if not HAS_NUMPY:
+        raise ImportError("numpy is required to save embeddings. Install with: pip install numpy")
+
+    ids = []
+    rows = []
+    for chunk in chunks:
+        if chunk.embedding is not None:
+            ids.append(chunk.id)
+            rows.append(chunk.embedding)
+
+    matrix = np.asarray(rows, dtype=_check_dtype(dtype)) if rows else np.empty((0, 0), dtype=dtype)
+    np.savez_compressed(path, ids=np.asarray(ids, dtype=str), embeddings=matrix)
+    logger.debug(f"Saved {len(ids)} embeddings to {path}")
+    return len(ids)
+
+
+def load_embeddings_npz(path: Union[str, Path]) -> Dict[str, Any]:
+    """Load an archive written by :func:`save_embeddings_npz` as ``{chunk_id: row view}``."""
+    if not HAS_NUMPY:
+        raise ImportError("numpy is required to load embeddings. Install with: pip install numpy")
+
+    with np.load(path, allow_pickle=False) as archive:
+        ids = archive["ids"]
+        matrix = archive["embeddings"]
+    return {str(chunk_id): matrix[i] for i, chunk_id in enumerate(ids)}
+
+
+def embeddings_to_arrow(chunks: Sequence[Any], dtype: str = "float32") -> Any:
+    """
+    Build an Arrow ``FixedSizeListArray`` column with one embedding per chunk.
+
+    Chunks without embeddings produce null entries.
+    """
+    if pa is None or not HAS_NUMPY:
+        raise ImportError("pyarrow and numpy are required for Arrow embedding columns")
+
+    dim = next((len(chunk.embedding) for chunk in chunks if chunk.embedding is not None), 0)
+    if dim == 0:
+        return pa.nulls(len(chunks), type=pa.list_(pa.from_numpy_dtype(np.dtype(dtype)), 1))
+
+    matrix = np.zeros((len(chunks), dim), dtype=_check_dtype(dtype))
+    mask = np.zeros(len(chunks), dtype=bool)
+    for i, chunk in enumerate(chunks):
+        if chunk.embedding is None:
+            mask[i] = True
+        else:
+            matrix[i] = chunk.embedding
+
+    values = pa.array(matrix.reshape(-1))
+    return pa.FixedSizeListArray.from_arrays(values, dim, mask=pa.array(mask) if mask.any() else None)
+
+
+def embeddings_from_arrow(column: Any) -> Any:
+    """Convert a ``FixedSizeListArray`` column back into a ``(rows, dim)`` NumPy matrix."""
+    if pa is None or not HAS_NUMPY:
+        raise ImportError("pyarrow and numpy are required for Arrow embedding columns")
+
+    if isinstance(column, pa.ChunkedArray):
+        column = column.combine_chunks()
+    dim = column.type.list_size
+    values = column.values.slice(column.offset * dim, len(column) * dim)
+    return values.to_numpy(zero_copy_only=False).reshape(-1, dim)
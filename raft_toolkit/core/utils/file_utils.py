@@ -1,12 +1,25 @@
+import hashlib
+import json
+import math
 import os
 import random
 from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:
+    orjson = None  # type: ignore
+    HAS_ORJSON = False
 
 from ..security import SecurityConfig
 
 
 def split_jsonl_file(file_path, max_size=199_000_000):
     """Splits a .jsonl file into multiple parts, each not exceeding max_size bytes.
+    The parts are written next to the input file.
 
     Args:
         file_path (str): Path to the .jsonl file to split.
@@ -31,10 +44,10 @@ def split_jsonl_file(file_path, max_size=199_000_000):
     file_path = str(normalized_path)
 
     filename = os.path.splitext(os.path.basename(file_path))[0]
+    directory = os.path.dirname(file_path)
     file_number = 1
     file_size = 0
     part_file = None
-    part_file_name = f"{filename}_part_{file_number}.jsonl"
     created_files = []
 
     with open(file_path, "r", encoding="utf-8") as infile:
@@ -43,7 +56,7 @@ def split_jsonl_file(file_path, max_size=199_000_000):
             if file_size + line_size > max_size or part_file is None:
                 if part_file:
                     part_file.close()
-                part_file_name = f"{filename}_part_{file_number}.jsonl"
+                part_file_name = os.path.join(directory, f"{filename}_part_{file_number}.jsonl")
                 created_files.append(part_file_name)
                 part_file = open(part_file_name, "w", encoding="utf-8")
                 file_number += 1
@@ -56,46 +69,228 @@ def split_jsonl_file(file_path, max_size=199_000_000):
     return created_files
 
 
+def _resolve_safe_path(path, must_exist=False):
+    """Validates a path with the security checks before and after resolving it.
+
+    Args:
+        path (str): Path to validate.
+        must_exist (bool): Whether the path must exist.
+
+    Returns:
+        Path: The resolved path.
+    """
+    if not SecurityConfig.validate_file_path(str(path)):
+        raise ValueError(f"File path is unsafe: {path}")
+    resolved = Path(path).resolve()
+    if must_exist and not resolved.exists():
+        raise FileNotFoundError(f"File not found: {path}")
+    if not SecurityConfig.validate_file_path(str(resolved)):
+        raise ValueError(f"Resolved file path is unsafe: {resolved}")
+    return resolved
+
+
+def _field_getter(*fields):
+    """Returns a function extracting the values of ``fields`` from a JSON line, or None without fields."""
+    if not any(fields):
+        return None
+
+    def get(line):
+        record = _loads(line)
+        return tuple(record.get(field) if field else None for field in fields)
+
+    return get
+
+
+def _loads(line):
+    return orjson.loads(line) if HAS_ORJSON else json.loads(line)
+
+
+def _iter_jsonl_lines(path):
+    """Yields the non-blank lines of a .jsonl file as bytes."""
+    with open(path, "rb") as infile:
+        for line in infile:
+            if line.strip():
+                yield line
+
+
+def reservoir_sample_jsonl(file_path, num_rows, output_file, seed=None, stratify_by=None):
+    """Samples rows of a .jsonl file uniformly with reservoir sampling.
+
+    Only the sampled lines are kept in memory, so files of any size can be
+    sampled. With ``stratify_by``, the sample is allocated to the values of
+    that field in proportion to their row counts. The file is then read twice:
+    a first pass counts the rows of each value, and the second keeps one
+    reservoir per value sized to its allocation. Memory is bounded by
+    ``num_rows`` lines plus one counter per distinct value. Sampled rows are
+    written in their original order.
+
+    Args:
+        file_path (str): Path to the .jsonl file to sample from.
+        num_rows (int): Number of rows to sample.
+        output_file (str): Path to the output file to save the sampled rows.
+        seed (int, optional): Seed of the random generator, for reproducible samples.
+        stratify_by (str, optional): Field to stratify the sample by, e.g. ``type``.
+
+    Returns:
+        dict: Number of rows read and sampled, and rows sampled per stratum.
+    """
+    if num_rows < 0:
+        raise ValueError("num_rows must not be negative")
+    input_path = _resolve_safe_path(file_path, must_exist=True)
+    output_path = _resolve_safe_path(output_file)
+
+    rng = random.Random(seed)  # nosec B311 - Used for data sampling, not cryptographic purposes
+    get_stratum = _field_getter(stratify_by)
+    counts: Dict[Any, int] = {}
+    if get_stratum:
+        for line in _iter_jsonl_lines(input_path):
+            stratum = get_stratum(line)[0]
+            counts[stratum] = counts.get(stratum, 0) + 1
+        total = sum(counts.values())
+    else:
+        total = None
+
+    if total is not None and num_rows > total:
+        raise ValueError(f"Requested {num_rows} rows, but file only contains {total} lines.")
+    allocation = _allocate(num_rows, counts) if get_stratum else {None: num_rows}
+
+    # Per stratum: rows seen and the (line number, line) reservoir
+    seen: Dict[Any, int] = {}
+    reservoirs: Dict[Any, List[Tuple[int, bytes]]] = {stratum: [] for stratum in allocation}
+    read = 0
+    for line in _iter_jsonl_lines(input_path):
+        stratum = get_stratum(line)[0] if get_stratum else None
+        size = allocation[stratum]
+        count = seen.get(stratum, 0)
+        reservoir = reservoirs[stratum]
+        if count < size:
+            reservoir.append((read, line))
+        else:
+            slot = rng.randrange(count + 1)
+            if slot < size:
+                reservoir[slot] = (read, line)
+        seen[stratum] = count + 1
+        read += 1
+
+    if num_rows > read:
+        raise ValueError(f"Requested {num_rows} rows, but file only contains {read} lines.")
+
+    sampled = sorted(entry for reservoir in reservoirs.values() for entry in reservoir)
+    with open(output_path, "wb") as outfile:
+        for _, line in sampled:
+            outfile.write(line if line.endswith(b"\n") else line + b"\n")
+    return {"rows_read": read, "rows_sampled": len(sampled), "strata": allocation}
+
+
+def _allocate(num_rows, counts):
+    """Splits ``num_rows`` across strata in proportion to ``counts`` with the largest remainder method."""
+    total = sum(counts.values())
+    if not total:
+        return {stratum: 0 for stratum in counts}
+    quotas = {stratum: num_rows * count / total for stratum, count in counts.items()}
+    allocation = {stratum: int(quota) for stratum, quota in quotas.items()}
+    remainder = num_rows - sum(allocation.values())
+    for stratum in sorted(quotas, key=lambda s: allocation[s] - quotas[s])[:remainder]:
+        allocation[stratum] += 1
+    return allocation
+
+
 def extract_random_jsonl_rows(file_path, num_rows, output_file):
     """Extracts a given number of random rows from a .jsonl file and saves them to another file.
 
+    The file is streamed with reservoir sampling, so only the sampled rows are
+    held in memory.
+
     Args:
         file_path (str): Path to the .jsonl file to sample from.
         num_rows (int): Number of random rows to extract.
         output_file (str): Path to the output file to save the sampled rows.
     """
-    # Security validation for input file path
-    if not SecurityConfig.validate_file_path(file_path):
-        raise ValueError(f"Input file path is unsafe: {file_path}")
+    reservoir_sample_jsonl(file_path, num_rows, output_file)
+    print(f"Extracted {num_rows} random rows to {output_file}.")
 
-    # Security validation for output file path
-    if not SecurityConfig.validate_file_path(output_file):
-        raise ValueError(f"Output file path is unsafe: {output_file}")
 
-    # Normalize and validate input path
-    normalized_input_path = Path(file_path).resolve()
-    if not normalized_input_path.exists():
-        raise FileNotFoundError(f"File not found: {file_path}")
+DEFAULT_SPLIT_RATIOS = {"train": 0.8, "validation": 0.1, "test": 0.1}
 
-    # Re-validate after normalization
-    if not SecurityConfig.validate_file_path(str(normalized_input_path)):
-        raise ValueError(f"Resolved input file path is unsafe: {normalized_input_path}")
 
-    # Normalize output path and validate its directory exists
-    normalized_output_path = Path(output_file).resolve()
-    if not SecurityConfig.validate_file_path(str(normalized_output_path)):
-        raise ValueError(f"Resolved output file path is unsafe: {normalized_output_path}")
+def _hash_unit(value, seed):
+    """Maps a value to a deterministic float in [0, 1)."""
+    digest = hashlib.blake2b(value, digest_size=8, key=str(seed).encode("utf-8")).digest()
+    return int.from_bytes(digest, "big") / 2**64
 
-    file_path = str(normalized_input_path)
-    output_file = str(normalized_output_path)
-    with open(file_path, "r", encoding="utf-8") as infile:
-        lines = infile.readlines()
-    if num_rows > len(lines):
-        raise ValueError(f"Requested {num_rows} rows, but file only contains {len(lines)} lines.")
-    sampled_lines = random.sample(lines, num_rows)  # nosec B311 - Used for data sampling, not cryptographic purposes
-    with open(output_file, "w", encoding="utf-8") as outfile:
-        outfile.writelines(sampled_lines)
-    print(f"Extracted {num_rows} random rows to {output_file}.")
+
+def split_jsonl_dataset(file_path, ratios=None, output_dir=None, seed=0, key=None, stratify_by=None):
+    """Splits a .jsonl file into train/validation/test files in a single streaming pass.
+
+    Each row is assigned by a hash of ``key`` (the whole line by default), so
+    the assignment is deterministic for a given ``seed``, needs no shuffle and
+    holds no rows in memory: files of any size can be split. Rows appended
+    later keep the assignment of the rows already split. Rows sharing the
+    ``key`` value land in the same split, so passing a source field such as
+    ``oracle_context`` keeps every question about a chunk out of the other
+    splits.
+
+    With ``stratify_by``, rows whose hash points to a split that already holds
+    its share of the row's stratum go to the split furthest below its share,
+    so every stratum, e.g. each ``type``, is split in the given ratios to
+    within one row. Rows sharing a key may then be separated.
+
+    Args:
+        file_path (str): Path to the .jsonl file to split.
+        ratios (dict, optional): Split names and fractions summing to 1. Defaults to 0.8/0.1/0.1
+            train/validation/test.
+        output_dir (str, optional): Directory of the split files. Defaults to the input's directory.
+        seed (int): Seed of the hash assignment.
+        key (str, optional): Field whose value assigns rows to splits.
+        stratify_by (str, optional): Field to stratify the splits by, e.g. ``type``.
+
+    Returns:
+        dict: Path and row count of each split file, named ``<stem>.<split>.jsonl``.
+    """
+    ratios = dict(DEFAULT_SPLIT_RATIOS if ratios is None else ratios)
+    if not ratios or any(ratio < 0 for ratio in ratios.values()) or abs(sum(ratios.values()) - 1) > 1e-6:
+        raise ValueError(f"Split ratios must be non-negative and sum to 1: {ratios}")
+    input_path = _resolve_safe_path(file_path, must_exist=True)
+    directory = _resolve_safe_path(output_dir) if output_dir else input_path.parent
+    directory.mkdir(parents=True, exist_ok=True)
+
+    names = list(ratios)
+    bounds = []
+    cumulative = 0.0
+    for name in names:
+        cumulative += ratios[name]
+        bounds.append(cumulative)
+    get_fields = _field_getter(key, stratify_by)
+    # Per stratum: rows assigned to each split
+    assigned: Dict[Any, List[int]] = {}
+
+    paths = {name: directory / f"{input_path.stem}.{name}.jsonl" for name in names}
+    files = {name: open(path, "wb", buffering=1024 * 1024) for name, path in paths.items()}
+    rows = {name: 0 for name in names}
+    try:
+        with open(input_path, "rb") as infile:
+            for line in infile:
+                if not line.strip():
+                    continue
+                key_value, stratum = get_fields(line) if get_fields else (None, None)
+                hashed = line.rstrip(b"\r\n") if key is None else json.dumps(key_value, sort_keys=True).encode("utf-8")
+                unit = _hash_unit(hashed, seed)
+                index = next((i for i, bound in enumerate(bounds) if unit < bound), len(names) - 1)
+
+                if stratify_by:
+                    counts = assigned.setdefault(stratum, [0] * len(names))
+                    size = sum(counts) + 1
+                    if counts[index] + 1 > math.ceil(ratios[names[index]] * size):
+                        index = max(range(len(names)), key=lambda i: ratios[names[i]] * size - counts[i])
+                    counts[index] += 1
+
+                name = names[index]
+                files[name].write(line if line.endswith(b"\n") else line + b"\n")
+                rows[name] += 1
+    finally:
+        for file in files.values():
+            file.close()
+    return {name: {"path": str(paths[name]), "rows": rows[name]} for name in names}
 
 
 def format_file_path(path):
@@ -0,0 +1,183 @@
+"""
+Tokenizer helpers and token-budget chunking.
+
+Chunk sizes are expressed in tokens. Texts are tokenized once to obtain the
+character offset of every token; chunkers then work on token indices and
+slice the original text, so no chunk is re-tokenized to be measured.
+"""
+
+import logging
+import re
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Any, List, Tuple
+
+try:
+    import tiktoken
+
+    HAS_TIKTOKEN = True
+except ImportError:
+    tiktoken = None  # type: ignore
+    HAS_TIKTOKEN = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENCODING = "cl100k_base"
+
+# Approximates cl100k pre-tokenization; long letter runs are cut into short
+# pieces so counts track BPE token counts (~1.3 tokens per English word).
+_FALLBACK_PATTERN = re.compile(
+    r"'(?:[sdmt]|ll|ve|re)| ?[^\W\d_]{1,4}| ?\d{1,3}| ?(?:[^\s\w]|_)+|\s+(?!\S)|\s+", re.IGNORECASE
+)
+
+# Sentence ends: terminal punctuation followed by whitespace
+_SENTENCE_END = re.compile(r"[.!?](?=\s)")
+
+# (chunk text, token count)
+TokenChunk = Tuple[str, int]
+
+
+class Tokenizer(ABC):
+    """Tokenizer interface used for chunking and token estimates."""
+
+    name = "base"
+
+    @abstractmethod
+    def token_offsets(self, text: str) -> List[int]:
+        """Return the character offset at which each token of ``text`` starts."""
+        pass
+
+    def count(self, text: str) -> int:
+        """Return the number of tokens in ``text``."""
+        return len(self.token_offsets(text))
+
+
+class TiktokenTokenizer(Tokenizer):
+    """BPE tokenizer backed by tiktoken."""
+
+    def __init__(self, encoding: Any):
+        self.encoding = encoding
+        self.name = f"tiktoken:{encoding.name}"
+
+    def token_offsets(self, text: str) -> List[int]:
+        tokens = self.encoding.encode(text, disallowed_special=())
+        _, offsets = self.encoding.decode_with_offsets(tokens)
+        return list(offsets)
+
+    def count(self, text: str) -> int:
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+
+class RegexTokenizer(Tokenizer):
+    """Dependency-free approximation of a BPE tokenizer."""
+
+    name = "regex"
+
+    def token_offsets(self, text: str) -> List[int]:
+        return [match.start() for match in _FALLBACK_PATTERN.finditer(text)]
+
+
+@lru_cache(maxsize=None)
+def get_tokenizer(encoding_name: str = DEFAULT_ENCODING) -> Tokenizer:
+    """
+    Get a tokenizer for ``encoding_name``.
+
+    Falls back to :class:`RegexTokenizer` when tiktoken is not installed or the
+    encoding cannot be loaded (e.g. no network access to fetch it).
+    """
+    if HAS_TIKTOKEN:
+        try:
+            return TiktokenTokenizer(tiktoken.get_encoding(encoding_name))
+        except Exception as e:
+            logger.warning(f"Could not load tiktoken encoding {encoding_name} ({e}), using approximate tokenizer")
+    return RegexTokenizer()
+
+
+def _slice(text: str, offsets: List[int], start: int, end: int) -> str:
+    """Text covered by tokens ``[start, end)``."""
+    end_char = offsets[end] if end < len(offsets) else len(text)
+    return text[offsets[start] : end_char]
+
+
+def split_fixed(text: str, offsets: List[int], chunk_size: int, overlap: int = 0) -> List[TokenChunk]:
+    """
+    Split text into windows of ``chunk_size`` tokens.
+
+    Consecutive windows share ``overlap`` tokens.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    if not 0 <= overlap < chunk_size:
+        raise ValueError("overlap must be between 0 and chunk_size - 1")
+
+    total = len(offsets)
+    step = chunk_size - overlap
+    chunks = []
+    for start in range(0, total, step):
+        end = min(start + chunk_size, total)
+        chunks.append((_slice(text, offsets, start, end), end - start))
+        if end == total:
+            break
+    return chunks
+
+
+def _sentence_spans(text: str, offsets: List[int]) -> List[Tuple[int, int]]:
+    """Token index ranges of the sentences in ``text``."""
+    total = len(offsets)
+    bounds = [0]
+    for match in _SENTENCE_END.finditer(text):
+        index = bisect_left(offsets, match.end())
+        if bounds[-1] < index < total:
+            bounds.append(index)
+    bounds.append(total)
+    return [(bounds[i], bounds[i + 1]) for i in range(len(bounds) - 1) if bounds[i] < bounds[i + 1]]
+
+
+def split_sentences(text: str, offsets: List[int], chunk_size: int, overlap: int = 0) -> List[TokenChunk]:
+    """
+    Pack whole sentences into chunks of at most ``chunk_size`` tokens.
+
+    Sentences longer than the budget are split at token boundaries. Overlap
+    carries trailing whole sentences of the previous chunk, up to ``overlap``
+    tokens, into the next one.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    if not 0 <= overlap < chunk_size:
+        raise ValueError("overlap must be between 0 and chunk_size - 1")
+
+    # Break over-long sentences into budget-sized pieces
+    spans: List[Tuple[int, int]] = []
+    for start, end in _sentence_spans(text, offsets):
+        spans.extend((s, min(s + chunk_size, end)) for s in range(start, end, chunk_size))
+
+    chunks: List[TokenChunk] = []
+    current: List[Tuple[int, int]] = []
+    current_tokens = 0
+
+    def emit() -> None:
+        content = _slice(text, offsets, current[0][0], current[-1][1]).strip()
+        if content:
+            chunks.append((content, current[-1][1] - current[0][0]))
+
+    for span in spans:
+        length = span[1] - span[0]
+        if current and current_tokens + length > chunk_size:
+            emit()
+            # Keep trailing sentences that fit the overlap and leave room for this one
+            carried: List[Tuple[int, int]] = []
+            carried_tokens = 0
+            for previous in reversed(current):
+                size = previous[1] - previous[0]
+                if carried_tokens + size > overlap or carried_tokens + size + length > chunk_size:
+                    break
+                carried.insert(0, previous)
+                carried_tokens += size
+            current, current_tokens = carried, carried_tokens
+        current.append(span)
+        current_tokens += length
+
+    if current:
+        emit()
+    return chunks
@@ -39,6 +39,7 @@ class ProcessingRequest(BaseModel):
     p: float = Field(1.0, ge=0.0, le=1.0)
     questions: int = Field(5, ge=1, le=20)
     chunk_size: int = Field(512, ge=100, le=2048)
+    chunk_overlap: int = Field(0, ge=0, le=1024)
     doctype: str = "pdf"  # Will be converted to DocType
     chunking_strategy: str = "semantic"  # Will be converted to ChunkingStrategy
     chunking_params: Dict[str, Any] = Field(default_factory=dict)
@@ -352,6 +353,7 @@ async def start_processing(
         config.p = request.p
         config.questions = request.questions
         config.chunk_size = request.chunk_size
+        config.chunk_overlap = request.chunk_overlap
         config.chunking_strategy = request.chunking_strategy  # String used directly
         config.chunking_params = request.chunking_params
         config.completion_model = request.completion_model
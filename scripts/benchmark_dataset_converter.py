@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark DatasetConverter formatters for RAFT Toolkit.
+
+Formats a synthetic raw RAFT dataset (default 100k rows) to the completion,
+chat and eval formats with the previous per-row ``Dataset.filter``/``map``
+formatters, the batched Python fallback formatters, and the vectorized
+``pyarrow.compute`` formatters, and reports rows/s for each.
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pyarrow as pa  # noqa: E402
+from datasets import Dataset, disable_progress_bars  # noqa: E402
+
+from raft_toolkit.core.formatters.dataset_converter import (  # noqa: E402
+    EvalDatasetFormatter,
+    OpenAiChatDatasetFormatter,
+    OpenAiCompletionDatasetFormatter,
+    _remove_all_columns_but,
+    extract_context,
+    extract_final_answer,
+)
+
+FORMATTERS = {
+    "completion": OpenAiCompletionDatasetFormatter,
+    "chat": OpenAiChatDatasetFormatter,
+    "eval": EvalDatasetFormatter,
+}
+
+
+def previous_completion(ds: Dataset, params: Dict[str, str]) -> Dataset:
+    """The completion formatter before vectorization."""
+    stop = params.get("stop", "<STOP>")
+    newds = ds.filter(lambda example: example["cot_answer"] and example["instruction"])
+    newds = newds.rename_columns(column_mapping={"instruction": "prompt"})
+    newds = newds.map(lambda examples: {"completion": [a + stop for a in examples["cot_answer"]]}, batched=True)
+    return _remove_all_columns_but(newds, ["prompt", "completion"])
+
+
+def previous_chat(ds: Dataset, params: Dict[str, str]) -> Dataset:
+    """The chat formatter before vectorization."""
+    newds = previous_completion(ds, params)
+
+    def format_messages(row):
+        messages = [{"role": "system", "content": params["system_prompt"]}] if "system_prompt" in params else []
+        messages.extend(
+            [{"role": "user", "content": row["prompt"]}, {"role": "assistant", "content": row["completion"]}]
+        )
+        return {"messages": messages}
+
+    return _remove_all_columns_but(newds.map(format_messages), ["messages"])
+
+
+def previous_eval(ds: Dataset, params: Dict[str, str]) -> Dataset:
+    """The eval formatter before vectorization."""
+    newds = ds.filter(lambda example: example["cot_answer"] and example["instruction"] and example["context"])
+    newds = newds.rename_columns({"context": "context_sentences"})
+    newds = newds.map(
+        lambda examples: {"gold_final_answer": [extract_final_answer(a) for a in examples["cot_answer"]]}, batched=True
+    )
+    newds = newds.map(
+        lambda examples: {"final_answer": [extract_final_answer(a) for a in examples["answer"]]}, batched=True
+    )
+    newds = newds.map(lambda examples: {"context": [extract_context(i) for i in examples["instruction"]]}, batched=True)
+    return _remove_all_columns_but(newds, ["question", "answer", "gold_final_answer", "final_answer", "context"])
+
+
+PREVIOUS = {"completion": previous_completion, "chat": previous_chat, "eval": previous_eval}
+
+
+def build_dataset(rows: int, distractors: int, chunk_chars: int, seed: int = 0, batch_size: int = 10_000) -> Dataset:
+    """A raw RAFT dataset with ``distractors`` + 1 documents per row, built in Arrow batches."""
+    rng = random.Random(seed)
+    words = ["retrieval", "augmented", "fine", "tuning", "dataset", "chunk", "oracle", "distractor", "question"]
+    chunks = [" ".join(rng.choice(words) for _ in range(chunk_chars // 8)) for _ in range(200)]
+    batches = []
+    for start in range(0, rows, batch_size):
+        records: Dict[str, list] = {"question": [], "context": [], "cot_answer": [], "answer": [], "instruction": []}
+        for i in range(start, min(rows, start + batch_size)):
+            documents = rng.sample(chunks, distractors + 1)
+            question = f"Question {i}?"
+            answer = f"Reasoning for question {i}. <ANSWER>: answer {i}" if i % 50 else ""
+            records["question"].append(question)
+            records["context"].append("\n\n".join(documents))
+            records["cot_answer"].append(answer)
+            records["answer"].append(answer)
+            records["instruction"].append("\n".join([f"<DOCUMENT>{doc}</DOCUMENT>" for doc in documents] + [question]))
+        batches.append(pa.RecordBatch.from_pydict(records))
+    return Dataset(pa.Table.from_batches(batches))
+
+
+def rate(rows: int, fn: Callable[[], Dataset]) -> float:
+    start = time.perf_counter()
+    fn()
+    return rows / (time.perf_counter() - start)
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark DatasetConverter formatters")
+    parser.add_argument("--rows", type=int, default=100_000, help="Rows of the synthetic dataset")
+    parser.add_argument("--distractors", type=int, default=4, help="Distractor documents per row")
+    parser.add_argument("--chunk-chars", type=int, default=500, help="Approximate characters per document")
+    parser.add_argument("--num-proc", type=int, default=None, help="Processes for the Python formatters")
+    args = parser.parse_args()
+
+    disable_progress_bars()
+    ds = build_dataset(args.rows, args.distractors, args.chunk_chars)
+    params = {"system_prompt": "You are a helpful assistant.", "stop": "<STOP>"}
+    print(f"{args.rows} rows, {args.distractors + 1} documents of ~{args.chunk_chars} chars per row")
+    print(f"{'format':<12} {'previous rows/s':>16} {'python rows/s':>14} {'arrow rows/s':>13} {'speedup':>8}")
+
+    for name, formatter_class in FORMATTERS.items():
+        formatter = formatter_class(num_proc=args.num_proc)
+        previous = rate(args.rows, lambda: PREVIOUS[name](ds, params))
+        python = rate(args.rows, lambda: formatter.format_python(ds, params))
+        arrow = rate(args.rows, lambda: formatter.format(ds, params))
+        print(f"{name:<12} {previous:>16,.0f} {python:>14,.0f} {arrow:>13,.0f} {arrow / previous:>7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark PDF extraction backends for RAFT Toolkit.
+
+Times every installed extractor backend, in-process and with the page-parallel
+process pool, on the PDF fixtures (or any PDFs passed on the command line).
+When no PDFs are found a synthetic multi-page document is generated.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from raft_toolkit.core.extractors import (  # noqa: E402
+    available_pdf_extractors,
+    create_pdf_extractor,
+    extract_pdf_text,
+    shutdown_pdf_process_pool,
+)
+
+FIXTURES_DIR = Path(__file__).resolve().parent.parent / "tests" / "fixtures"
+
+
+def build_synthetic_pdf(path: Path, pages: int, lines_per_page: int = 40) -> None:
+    """Write a text-only PDF with ``pages`` pages of Helvetica lines."""
+    count = pages
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids ["
+        + b" ".join(f"{4 + 2 * i} 0 R".encode() for i in range(count))
+        + f"] /Count {count} >>".encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i in range(count):
+        lines = [
+            f"({'Page %d line %d: retrieval augmented fine tuning benchmark text.' % (i, n)}) Tj 0 -16 Td"
+            for n in range(lines_per_page)
+        ]
+        stream = ("BT /F1 10 Tf 40 760 Td " + " ".join(lines) + " ET").encode("latin-1")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {5 + 2 * i} 0 R "
+            f"/Resources << /Font << /F1 3 0 R >> >> >>".encode()
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    path.write_bytes(bytes(out))
+
+
+def find_pdfs(paths: List[str]) -> List[Path]:
+    """Collect PDF files from the given files/directories (default: test fixtures)."""
+    candidates = [Path(p) for p in paths] if paths else [FIXTURES_DIR]
+    pdfs: List[Path] = []
+    for candidate in candidates:
+        if candidate.is_dir():
+            pdfs.extend(sorted(candidate.rglob("*.pdf")))
+        elif candidate.suffix.lower() == ".pdf" and candidate.exists():
+            pdfs.append(candidate)
+    return pdfs
+
+
+def benchmark(pdf: Path, extractor: str, workers: int, repeat: int) -> float:
+    """Return the median extraction time in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        extract_pdf_text(pdf, extractor=extractor, workers=workers, min_pages=1 if workers > 1 else 0)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark PDF extraction backends")
+    parser.add_argument("paths", nargs="*", help="PDF files or directories (default: tests/fixtures)")
+    parser.add_argument("--pages", type=int, default=200, help="Pages in the synthetic PDF if none are found")
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1, help="Process count for the parallel measurement"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (median is reported)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        pdfs = find_pdfs(args.paths)
+        if not pdfs:
+            synthetic = Path(temp_dir) / f"synthetic_{args.pages}p.pdf"
+            build_synthetic_pdf(synthetic, args.pages)
+            print(f"No PDF fixtures found, using synthetic {args.pages}-page document")
+            pdfs = [synthetic]
+
+        extractors = available_pdf_extractors()
+        print(f"Extractors: {', '.join(extractors)}")
+        print(f"{'file':<32} {'extractor':<12} {'workers':>7} {'pages':>6} {'seconds':>9} {'pages/s':>9}")
+
+        try:
+            for pdf in pdfs:
+                for extractor in extractors:
+                    pages = create_pdf_extractor(extractor).page_count(pdf)
+                    for workers in sorted({1, args.workers}):
+                        # Warm up the pool so process start-up is not measured
+                        if workers > 1:
+                            benchmark(pdf, extractor, workers, 1)
+                        seconds = benchmark(pdf, extractor, workers, args.repeat)
+                        rate = pages / seconds if seconds else float("inf")
+                        print(
+                            f"{pdf.name[:32]:<32} {extractor:<12} {workers:>7} {pages:>6} {seconds:>9.3f} {rate:>9.1f}"
+                        )
+        finally:
+            shutdown_pdf_process_pool()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
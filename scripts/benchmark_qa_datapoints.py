@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Benchmark QADataPoint memory and build time for RAFT Toolkit.
+
+Builds N QA points (default 100k) over a shared pool of chunks, as a run with
+``--questions`` questions per chunk and ``--distractors`` distractors does,
+once with the compact QADataPoint and once with the previous dataclass that
+concatenated ``context`` and ``instruction`` eagerly. Reports build time,
+retained memory and the time to serialize every point to a record.
+"""
+
+import argparse
+import gc
+import random
+import sys
+import time
+import tracemalloc
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from raft_toolkit.core.models import QADataPoint  # noqa: E402
+from raft_toolkit.core.services.dataset_writer import qa_record  # noqa: E402
+
+
+@dataclass
+class EagerQADataPoint:
+    """The QADataPoint before it became compact, for comparison."""
+
+    id: str
+    type: str
+    question: str
+    context: str
+    oracle_context: str
+    cot_answer: str
+    instruction: str
+    doctype: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def create(
+        cls,
+        question: str,
+        oracle_context: str,
+        distractor_contexts: List[str],
+        cot_answer: str,
+        doctype: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        oracle_chunk_id: Optional[str] = None,
+        distractor_chunk_ids: Optional[List[str]] = None,
+    ) -> "EagerQADataPoint":
+        context = "\n\n".join([oracle_context, *distractor_contexts])
+        instruction = "\n".join([f"<DOCUMENT>{doc}</DOCUMENT>" for doc in [oracle_context, *distractor_contexts]])
+        return cls(
+            id=str(uuid.uuid4()),
+            type="cot",
+            question=question,
+            context=context,
+            oracle_context=oracle_context,
+            cot_answer=cot_answer,
+            instruction=instruction + "\n" + question,
+            doctype=doctype,
+            metadata=metadata or {},
+        )
+
+
+def build_chunks(count: int, chunk_chars: int, seed: int = 0) -> List[Tuple[str, str]]:
+    """Chunk ids and texts of roughly ``chunk_chars`` characters."""
+    rng = random.Random(seed)
+    words = ["retrieval", "augmented", "fine", "tuning", "dataset", "chunk", "oracle", "distractor", "question"]
+    chunks = []
+    for _ in range(count):
+        text = " ".join(rng.choice(words) for _ in range(chunk_chars // 8))
+        chunks.append((str(uuid.uuid4()), text))
+    return chunks
+
+
+def build_points(
+    factory: Callable[..., Any], chunks: List[Tuple[str, str]], points: int, questions: int, distractors: int
+) -> List[Any]:
+    """Create ``points`` QA points, ``questions`` per oracle chunk."""
+    rng = random.Random(1)
+    result = []
+    for i in range(points):
+        oracle_id, oracle = chunks[(i // questions) % len(chunks)]
+        picked = rng.sample(chunks, distractors)
+        result.append(
+            factory(
+                question=f"Question {i} about the oracle chunk?",
+                oracle_context=oracle,
+                distractor_contexts=[text for _, text in picked],
+                cot_answer=f"Reasoning for question {i}. <ANSWER>: answer {i}",
+                doctype="pdf",
+                oracle_chunk_id=oracle_id,
+                distractor_chunk_ids=[chunk_id for chunk_id, _ in picked],
+            )
+        )
+    return result
+
+
+def measure(name: str, factory: Callable[..., Any], chunks: List[Tuple[str, str]], args: argparse.Namespace) -> None:
+    """Print build time, retained memory and serialization time of one representation."""
+    gc.collect()
+    start = time.perf_counter()
+    points = build_points(factory, chunks, args.points, args.questions, args.distractors)
+    build_seconds = time.perf_counter() - start
+    del points
+
+    # Memory is traced on a second build since tracing slows allocation down
+    gc.collect()
+    tracemalloc.start()
+    points = build_points(factory, chunks, args.points, args.questions, args.distractors)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for point in points:
+        qa_record(point)
+    serialize_seconds = time.perf_counter() - start
+
+    per_100k = 100_000 / args.points
+    print(
+        f"{name:<10} {build_seconds * per_100k:>12.2f} {retained * per_100k / 2**20:>14.1f} "
+        f"{retained / args.points:>10.0f} {serialize_seconds * per_100k:>15.2f}"
+    )
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark QADataPoint memory and build time")
+    parser.add_argument("--points", type=int, default=100_000, help="QA points to build")
+    parser.add_argument("--chunks", type=int, default=2_000, help="Distinct chunks the points reference")
+    parser.add_argument("--chunk-chars", type=int, default=2_000, help="Approximate characters per chunk")
+    parser.add_argument("--questions", type=int, default=5, help="Questions per oracle chunk")
+    parser.add_argument("--distractors", type=int, default=4, help="Distractors per point")
+    args = parser.parse_args()
+
+    chunks = build_chunks(args.chunks, args.chunk_chars)
+    print(
+        f"{args.points} points, {args.chunks} chunks of ~{args.chunk_chars} chars, "
+        f"{args.questions} questions/chunk, {args.distractors} distractors (figures scaled to 100k points)"
+    )
+    print(f"{'model':<10} {'build s':>12} {'retained MiB':>14} {'B/point':>10} {'serialize s':>15}")
+    measure("eager", EagerQADataPoint.create, chunks, args)
+    measure("compact", QADataPoint.create, chunks, args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
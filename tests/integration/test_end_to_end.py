@@ -69,7 +69,7 @@ class TestEndToEnd:
         with (
             patch("raft_toolkit.core.services.llm_service.ChatCompleter") as mock_completer,
             patch("raft_toolkit.core.services.llm_service.build_openai_client"),
-            patch("raft_toolkit.core.services.document_service.pypdf") as mock_pypdf,
+            patch("raft_toolkit.core.extractors.pdf.pypdf") as mock_pypdf,
         ):
 
             # Mock PDF reading
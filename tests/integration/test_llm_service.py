@@ -200,6 +200,25 @@ class TestLLMServiceIntegration:
         failed_results = [r for r in results if not r.success]
         assert len(failed_results) >= 0
 
+    def test_streamed_results_release_qa_points(self, llm_service, sample_document_chunk):
+        """Test that results passed to on_result keep only their counters."""
+        qa_point = Mock()
+        streamed = []
+
+        def process(job, chunks):
+            return ProcessingResult(
+                job_id=job.id, success=True, qa_data_points=[qa_point, qa_point], token_usage={"total_tokens": 5}
+            )
+
+        with patch.object(llm_service, "_process_single_job", side_effect=process):
+            results = llm_service.process_chunks_batch(
+                [sample_document_chunk] * 3, on_result=lambda result: streamed.append(len(result.qa_data_points))
+            )
+
+        assert streamed == [2, 2, 2]
+        assert [(len(r.qa_data_points), r.qa_count) for r in results] == [(0, 2)] * 3
+        assert results[0].token_usage == {"total_tokens": 5}
+
     def test_parallel_processing(self, llm_service):
         """Test that parallel processing is configured correctly."""
         # This test verifies the service is set up for parallel processing
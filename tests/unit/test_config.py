@@ -153,6 +153,19 @@ RAFT_CHUNK_SIZE=1024
             with pytest.raises(ValueError, match="Invalid chunking strategy"):
                 config.validate()
 
+    def test_config_append_requires_flat_layout(self):
+        """Test config validation of append mode with the normalized layout."""
+        with tempfile.NamedTemporaryFile(suffix=".pdf") as temp_file:
+            config = RaftConfig(
+                datapath=Path(temp_file.name),
+                output="output_dir",
+                openai_key="demo_key_for_testing",
+                output_layout="normalized",
+                output_append=True,
+            )
+            with pytest.raises(ValueError, match="Append mode is only supported"):
+                config.validate()
+
 
 class TestGetConfig:
     """Test get_config function."""
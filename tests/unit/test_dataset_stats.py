@@ -0,0 +1,120 @@
+"""
+Tests for Arrow-compute dataset statistics.
+"""
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+datasets = pytest.importorskip("datasets")
+
+from raft_toolkit.core.config import RaftConfig  # noqa: E402
+from raft_toolkit.core.services.dataset_service import DatasetService  # noqa: E402
+from raft_toolkit.core.services.dataset_stats import (  # noqa: E402
+    DatasetStatsCollector,
+    LengthDistribution,
+    compute_dataset_stats,
+)
+from raft_toolkit.core.utils.tokenizer import RegexTokenizer  # noqa: E402
+
+
+@pytest.fixture
+def table():
+    """Records with repeated questions, a null and non-ASCII text."""
+    return pa.table(
+        {
+            "id": [f"id{i}" for i in range(6)],
+            "type": ["cot", "cot", "cot", "general", "cot", None],
+            "question": ["What is RAFT?", "what is raft? ", "Where is Paris?", "Où est Paris?", "Why?", None],
+            "cot_answer": ["a" * 10, "b" * 20, "c" * 30, "é" * 40, "", "d" * 50],
+        }
+    )
+
+
+@pytest.mark.unit
+class TestLengthDistribution:
+    """Test length distributions."""
+
+    def test_summary(self):
+        """Percentiles use the nearest rank and the histogram covers every value."""
+        distribution = LengthDistribution()
+        distribution.add(pa.array(list(range(1, 51))))
+        distribution.add(pa.array(list(range(51, 101)) + [None]))
+
+        summary = distribution.summary(percentiles=(50, 90, 100), bins=10)
+
+        assert summary["count"] == 100
+        assert (summary["min"], summary["max"], summary["mean"]) == (1, 100, 50.5)
+        assert summary["percentiles"] == {"p50": 50, "p90": 90, "p100": 100}
+        assert summary["histogram"]["counts"] == [10] * 10
+        assert summary["histogram"]["edges"][0] == 1.0
+
+    def test_empty(self):
+        """An empty distribution only reports its count."""
+        assert LengthDistribution().summary() == {"count": 0}
+
+
+@pytest.mark.unit
+class TestDatasetStats:
+    """Test the statistics engine."""
+
+    def test_counts_and_lengths(self, table):
+        """Value counts, character lengths and duplicate questions are computed per batch."""
+        stats = compute_dataset_stats(table, batch_size=2, tokenizer=RegexTokenizer())
+
+        assert stats["total_records"] == 6
+        assert stats["value_counts"]["type"] == {"cot": 4, "general": 1, None: 1}
+        assert set(stats["lengths"]) == {"question", "cot_answer"}
+        chars = stats["lengths"]["cot_answer"]["chars"]
+        assert (chars["count"], chars["min"], chars["max"]) == (6, 0, 50)
+        assert chars["percentiles"]["p50"] == 20
+        assert stats["duplicate_questions"] == 1
+        assert stats["duplicate_question_rate"] == pytest.approx(1 / 5)
+        assert stats["tokenizer"] == "regex"
+
+    def test_token_lengths_match_tokenizer(self, table):
+        """Vectorized token counts agree with the approximate tokenizer on plain text."""
+        questions = ["What is RAFT?", "Retrieval augmented fine-tuning, 2024 edition.", "It's 12 words."]
+        stats = compute_dataset_stats(pa.table({"question": questions}), tokenizer=RegexTokenizer())
+
+        tokenizer = RegexTokenizer()
+        expected = sorted(tokenizer.count(question) for question in questions)
+        tokens = stats["lengths"]["question"]["tokens"]
+        assert (tokens["min"], tokens["percentiles"]["p50"], tokens["max"]) == tuple(expected)
+
+    def test_without_tokens(self, table):
+        """Token counting can be disabled."""
+        stats = compute_dataset_stats(table, count_tokens=False)
+
+        assert "tokens" not in stats["lengths"]["question"]
+        assert stats["tokenizer"] is None
+
+    def test_files_in_batches(self, table, tmp_path):
+        """JSONL and Parquet files are read batch by batch with the same results."""
+        pq.write_table(table, tmp_path / "data.parquet")
+        datasets.Dataset(table).to_json(str(tmp_path / "data.jsonl"))
+
+        from_table = compute_dataset_stats(table, tokenizer=RegexTokenizer())
+        assert compute_dataset_stats(str(tmp_path / "data.parquet"), tokenizer=RegexTokenizer()) == from_table
+        assert compute_dataset_stats(str(tmp_path / "data.jsonl"), batch_size=2, tokenizer=RegexTokenizer()) == (
+            from_table
+        )
+
+    def test_collector_merges_batches(self, table):
+        """Adding batches one at a time equals a single pass."""
+        collector = DatasetStatsCollector(tokenizer=RegexTokenizer())
+        for batch in table.to_batches(max_chunksize=1):
+            collector.update(batch)
+
+        assert collector.result() == compute_dataset_stats(table, tokenizer=RegexTokenizer())
+
+    def test_service_stats(self, table):
+        """The dataset service keeps its type distribution and adds the length statistics."""
+        service = DatasetService(RaftConfig(openai_key="test-key"))
+
+        stats = service.get_dataset_stats(datasets.Dataset(table).select([0, 1, 3]))
+
+        assert stats["total_records"] == 3
+        assert stats["type_distribution"] == {"cot": 2, "general": 1}
+        assert stats["sample_record"]["id"] == "id0"
+        assert stats["duplicate_questions"] == 1
@@ -0,0 +1,347 @@
+"""
+Tests for the streaming dataset writer.
+"""
+
+import hashlib
+import json
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+datasets = pytest.importorskip("datasets")
+
+from raft_toolkit.core.config import RaftConfig  # noqa: E402
+from raft_toolkit.core.formatters.dataset_converter import DatasetConverter  # noqa: E402
+from raft_toolkit.core.models import ProcessingResult, QADataPoint  # noqa: E402
+from raft_toolkit.core.services.dataset_compaction import compact_dataset  # noqa: E402
+from raft_toolkit.core.services.dataset_service import DatasetService  # noqa: E402
+from raft_toolkit.core.services.dataset_writer import (  # noqa: E402
+    QA_KEYS_FILE,
+    RECORD_COLUMNS,
+    ExportTarget,
+    JsonlStreamWriter,
+    StreamingDatasetWriter,
+    load_qa_keys,
+    read_manifest,
+)
+
+HF_JSONL = ExportTarget("hf", "jsonl", "dataset.jsonl")
+HF_PARQUET = ExportTarget("hf", "parquet", "dataset.parquet")
+HF_EXPORT = ExportTarget("hf", "parquet", "dataset.hf.parquet")
+
+
+def _result(job_id, count, success=True):
+    points = [
+        QADataPoint.create(
+            question=f"{job_id} question {i}?",
+            oracle_context=f"{job_id} context {i}",
+            distractor_contexts=["distractor"],
+            cot_answer=f"reasoning <ANSWER>: {i}",
+            doctype="pdf",
+        )
+        for i in range(count)
+    ]
+    return ProcessingResult(job_id=job_id, success=success, qa_data_points=points, error=None if success else "boom")
+
+
+@pytest.mark.unit
+class TestStreamingDatasetWriter:
+    """Test streaming dataset output."""
+
+    def test_jsonl_stream_matches_dataset(self, tmp_path):
+        """Records are written in order to the shards and the JSONL export across row groups."""
+        writer = StreamingDatasetWriter(tmp_path / "out", exports=[HF_JSONL], row_group_size=3)
+        results = [_result(f"job{i}", 2) for i in range(4)]
+        for result in results:
+            writer.write_result(result)
+
+        dataset = writer.close()
+
+        expected = [qa.question for result in results for qa in result.qa_data_points]
+        assert dataset["question"] == expected
+        assert dataset.column_names == RECORD_COLUMNS
+        lines = (tmp_path / "out" / "dataset.jsonl").read_text(encoding="utf-8").splitlines()
+        assert [json.loads(line)["question"] for line in lines] == expected
+        assert datasets.Dataset.load_from_disk(str(tmp_path / "out"))["id"] == dataset["id"]
+
+    def test_parquet_row_groups(self, tmp_path):
+        """Each flush becomes one Parquet row group."""
+        writer = StreamingDatasetWriter(tmp_path / "out", exports=[HF_PARQUET], row_group_size=4)
+        writer.write_result(_result("job", 10))
+        writer.close()
+
+        parquet = pq.ParquetFile(tmp_path / "out" / "dataset.parquet")
+        assert parquet.metadata.num_rows == 10
+        assert [parquet.metadata.row_group(i).num_rows for i in range(parquet.num_row_groups)] == [4, 4, 2]
+
+    def test_shard_rotation(self, tmp_path):
+        """Shards are rotated by size and named by their final count."""
+        writer = StreamingDatasetWriter(tmp_path / "out", row_group_size=2, max_shard_bytes=1)
+        writer.write_result(_result("job", 5))
+        dataset = writer.close()
+
+        shards = sorted(path.name for path in (tmp_path / "out").glob("data-*.arrow"))
+        assert shards == [f"data-0000{i}-of-00003.arrow" for i in range(3)]
+        assert len(dataset) == 5
+
+    def test_empty_dataset(self, tmp_path):
+        """A run without QA points still produces a loadable dataset with the record schema."""
+        dataset = StreamingDatasetWriter(tmp_path / "out", exports=[HF_JSONL]).close()
+        assert len(dataset) == 0
+        assert dataset.column_names == RECORD_COLUMNS
+
+    def test_failed_results_skipped(self, tmp_path):
+        """Failed processing results contribute no records."""
+        writer = StreamingDatasetWriter(tmp_path / "out")
+        writer.write_result(_result("ok", 2))
+        writer.write_result(_result("failed", 3, success=False))
+        assert len(writer.close()) == 2
+        assert writer.skipped_results == 1
+
+    def test_stale_shards_replaced(self, tmp_path):
+        """Writing to an existing dataset directory replaces its shards."""
+        first = StreamingDatasetWriter(tmp_path / "out", max_shard_bytes=1, row_group_size=1)
+        first.write_result(_result("old", 3))
+        first.close()
+
+        second = StreamingDatasetWriter(tmp_path / "out")
+        second.write_result(_result("new", 1))
+        dataset = second.close()
+
+        assert dataset["question"] == ["new question 0?"]
+        assert len(list((tmp_path / "out").glob("data-*.arrow"))) == 1
+
+    def test_abort_removes_shards(self, tmp_path):
+        """An aborted run leaves no partial dataset shards."""
+        writer = StreamingDatasetWriter(tmp_path / "out", row_group_size=1)
+        writer.write_result(_result("job", 2))
+        writer.abort()
+
+        assert not list((tmp_path / "out").glob("data-*"))
+        with pytest.raises(ValueError):
+            writer.write_result(_result("job", 1))
+
+    def test_jsonl_write_error_surfaces(self, tmp_path):
+        """Errors of the writer thread are raised to the caller."""
+        writer = JsonlStreamWriter(tmp_path / "out.jsonl")
+        writer._file.close()
+        writer.write([{"a": 1}])
+        with pytest.raises(IOError):
+            writer.close()
+
+    def test_service_exports_all_formats_in_one_pass(self, tmp_path):
+        """Every configured export is written by the streaming writer."""
+        config = RaftConfig(
+            openai_key="test-key",
+            output_format="completion",
+            output_type="jsonl",
+            output_exports=["chat:parquet", "eval:jsonl", "completion:jsonl"],
+        )
+        service = DatasetService(config)
+
+        writer = service.open_writer(str(tmp_path / "out"))
+        writer.write_result(_result("job", 3))
+        service.finalize_dataset(writer)
+
+        out = tmp_path / "out"
+        assert sorted(path.name for path in out.glob("dataset.*")) == [
+            "dataset.chat.parquet",
+            "dataset.eval.jsonl",
+            "dataset.jsonl",
+        ]
+        completion = [json.loads(line) for line in (out / "dataset.jsonl").read_text(encoding="utf-8").splitlines()]
+        assert set(completion[0]) == {"prompt", "completion"}
+        assert pq.read_table(out / "dataset.chat.parquet").num_rows == 3
+        assert not list(out.glob("cache-*.arrow"))
+
+    def test_without_arrow_output(self, tmp_path):
+        """Arrow dataset output is optional."""
+        config = RaftConfig(openai_key="test-key", output_arrow=False)
+        service = DatasetService(config)
+
+        writer = service.open_writer(str(tmp_path / "out"))
+        writer.write_result(_result("job", 2))
+        assert service.finalize_dataset(writer) is None
+
+        assert not list((tmp_path / "out").glob("data-*"))
+        assert len((tmp_path / "out" / "dataset.jsonl").read_text(encoding="utf-8").splitlines()) == 2
+
+    @pytest.mark.parametrize("output_format", ["hf", "completion", "chat", "eval"])
+    def test_rows_match_dataset_converter(self, tmp_path, output_format):
+        """Streamed exports contain the same rows as the Dataset-based converter."""
+        results = [_result("job", 3)]
+        results[0].qa_data_points[1].cot_answer = ""  # Filtered out by completion, chat and eval
+        params = {"system_prompt": "Be helpful"} if output_format == "chat" else {}
+
+        writer = StreamingDatasetWriter(
+            tmp_path / "stream", exports=[ExportTarget(output_format, "jsonl", "out.jsonl")], params=params
+        )
+        for result in results:
+            writer.write_result(result)
+        dataset = writer.close()
+
+        DatasetConverter().convert(
+            ds=dataset,
+            format=output_format,
+            output_path=str(tmp_path / "converted"),
+            output_type="jsonl",
+            params=params,
+        )
+
+        streamed = [json.loads(line) for line in (tmp_path / "stream" / "out.jsonl").read_text().splitlines()]
+        converted = [json.loads(line) for line in (tmp_path / "converted.jsonl").read_text().splitlines()]
+        assert streamed == converted
+
+    def test_save_dataset_single_pass(self, tmp_path):
+        """Saving an in-memory dataset writes the Arrow dataset and every export."""
+        config = RaftConfig(openai_key="test-key", output_format="eval", output_exports=["hf:parquet"])
+        service = DatasetService(config)
+        dataset = service.create_dataset_from_results([_result("job", 4)])
+
+        service.save_dataset(dataset, str(tmp_path / "out"))
+
+        out = tmp_path / "out"
+        assert len(datasets.Dataset.load_from_disk(str(out))) == 4
+        assert len((out / "dataset.jsonl").read_text(encoding="utf-8").splitlines()) == 4
+        assert pq.read_table(out / "dataset.hf.parquet").column_names == RECORD_COLUMNS
+
+
+@pytest.mark.unit
+class TestAppendMode:
+    """Test appending to an existing dataset and compacting it."""
+
+    def _write(self, out, *results, append=True, **kwargs):
+        writer = StreamingDatasetWriter(out, exports=[HF_JSONL, HF_EXPORT], append=append, **kwargs)
+        for result in results:
+            writer.write_result(result)
+        return writer, writer.close()
+
+    def _check_manifest(self, out, filename):
+        manifest = read_manifest(out / filename)
+        for shard in manifest["shards"]:
+            data = (out / shard["filename"]).read_bytes()
+            assert (len(data), hashlib.sha256(data).hexdigest()) == (shard["bytes"], shard["sha256"])
+        return manifest
+
+    def test_append_adds_shards(self, tmp_path):
+        """Appends add Arrow shards and export shards without rewriting the existing ones."""
+        out = tmp_path / "out"
+        self._write(out, _result("first", 3), append=False)
+        first_shard = (out / "data-00000-of-00001.arrow").read_bytes()
+
+        writer, dataset = self._write(out, _result("second", 2))
+
+        assert writer.duplicates == 0
+        assert len(dataset) == 5
+        assert dataset["question"][3:] == ["second question 0?", "second question 1?"]
+        assert (out / "data-00000-of-00002.arrow").read_bytes() == first_shard
+        for filename in ("dataset.jsonl", "dataset.hf.parquet"):
+            manifest = self._check_manifest(out, filename)
+            assert [shard["rows"] for shard in manifest["shards"]] == [3, 2]
+        assert not (out / "dataset.jsonl").exists()
+        assert len(load_qa_keys(out)) == 5
+
+    def test_duplicates_skipped(self, tmp_path):
+        """Records with a question and oracle chunk already in the dataset are not appended."""
+        out = tmp_path / "out"
+        self._write(out, _result("first", 3), append=False)
+        repeated = _result("first", 2)
+        repeated.qa_data_points[0].question = "  FIRST question 0?"
+
+        writer, dataset = self._write(out, repeated, _result("first", 4))
+
+        assert writer.duplicates == 5
+        assert len(dataset) == 4
+        assert dataset["question"][3] == "first question 3?"
+        assert (out / QA_KEYS_FILE).is_file()
+
+        writer, dataset = self._write(out, _result("first", 4))
+        assert (writer.duplicates, len(dataset)) == (4, 4)
+        assert read_manifest(out / "dataset.jsonl")["total_rows"] == 4
+
+    def test_rewrite_removes_appended_shards(self, tmp_path):
+        """A normal run replaces the export shards and manifests left by earlier appends."""
+        out = tmp_path / "out"
+        self._write(out, _result("first", 3), append=False)
+        self._write(out, _result("second", 2))
+        self._write(out, _result("third", 3), append=False)
+
+        assert not list(out.glob("*.manifest.json"))
+        assert not list(out.glob("dataset-*"))
+        assert len((out / "dataset.jsonl").read_text(encoding="utf-8").splitlines()) == 3
+
+        _, dataset = self._write(out, _result("fourth", 1))
+        manifest = self._check_manifest(out, "dataset.jsonl")
+        assert manifest["total_rows"] == len(dataset) == 4
+        assert not (out / "dataset.jsonl").exists()
+
+    def test_duplicates_skipped_without_arrow_output(self, tmp_path):
+        """The key index is written by every run, so appends without Arrow shards skip duplicates too."""
+        out = tmp_path / "out"
+        self._write(out, _result("job", 3), append=False, write_arrow=False)
+
+        writer, _ = self._write(out, _result("job", 3), write_arrow=False)
+
+        assert writer.duplicates == 3
+        assert len((out / "dataset.jsonl").read_text(encoding="utf-8").splitlines()) == 3
+        assert read_manifest(out / "dataset.jsonl") is None
+        assert len(load_qa_keys(out)) == 3
+
+    def test_schema_mismatch(self, tmp_path):
+        """Appending to a dataset with other columns is refused."""
+        datasets.Dataset.from_dict({"text": ["a"]}).save_to_disk(str(tmp_path / "out"))
+
+        with pytest.raises(ValueError, match="schema differs"):
+            StreamingDatasetWriter(tmp_path / "out", append=True)
+
+    def test_compaction(self, tmp_path):
+        """Compaction merges appended shards and keeps rows, order and checksums."""
+        out = tmp_path / "out"
+        self._write(out, _result("job0", 2), append=False)
+        for i in range(1, 4):
+            self._write(out, _result(f"job{i}", 2))
+        expected = datasets.Dataset.load_from_disk(str(out))["question"]
+        jsonl_rows = [shard.read_text() for shard in sorted(out.glob("dataset-*.jsonl"))]
+
+        result = compact_dataset(out)
+
+        assert result == {
+            "arrow": {"before": 4, "after": 1},
+            "dataset.jsonl": {"before": 4, "after": 1},
+            "dataset.hf.parquet": {"before": 4, "after": 1},
+        }
+        assert sorted(path.name for path in out.glob("data-*")) == ["data-00000-of-00001.arrow"]
+        assert datasets.Dataset.load_from_disk(str(out))["question"] == expected
+        assert self._check_manifest(out, "dataset.jsonl")["total_rows"] == 8
+        assert (out / "dataset-00000-of-00001.jsonl").read_text() == "".join(jsonl_rows)
+        parquet = self._check_manifest(out, "dataset.hf.parquet")["shards"][0]["filename"]
+        assert pq.read_table(out / parquet)["question"].to_pylist() == expected
+        assert compact_dataset(out)["arrow"] == {"before": 1, "after": 1}
+
+    def test_service_append(self, tmp_path):
+        """Saving with append mode adds to the dataset instead of replacing it."""
+        config = RaftConfig(openai_key="test-key", output_append=True)
+        service = DatasetService(config)
+        service.save_dataset(service.create_dataset_from_results([_result("a", 2)]), str(tmp_path / "out"))
+        service.save_dataset(service.create_dataset_from_results([_result("b", 2)]), str(tmp_path / "out"))
+
+        assert len(datasets.Dataset.load_from_disk(str(tmp_path / "out"))) == 4
+        assert read_manifest(tmp_path / "out" / "dataset.jsonl")["total_rows"] == 4
+
+    @pytest.mark.parametrize("count_tokens", [True, False])
+    def test_output_stats_after_append_without_arrow(self, tmp_path, count_tokens):
+        """Output statistics read the export shards listed in the manifest after an append."""
+        config = RaftConfig(
+            openai_key="test-key", output_append=True, output_arrow=False, output_stats_tokens=count_tokens
+        )
+        service = DatasetService(config)
+        service.save_dataset(service.create_dataset_from_results([_result("a", 2)]), str(tmp_path / "out"))
+        service.save_dataset(service.create_dataset_from_results([_result("b", 3)]), str(tmp_path / "out"))
+
+        stats = service.get_output_stats(str(tmp_path / "out"))
+
+        assert not (tmp_path / "out" / "dataset.jsonl").exists()
+        assert stats["total_records"] == 5
+        assert (stats["tokenizer"] is not None) == count_tokens
+        assert ("tokens" in stats["lengths"]["question"]) == count_tokens
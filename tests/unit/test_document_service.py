@@ -74,24 +74,54 @@ class TestDocumentService:
             temp_path.unlink()
 
     def test_fixed_chunking(self, document_service):
-        """Test fixed chunking strategy."""
-        text = "A" * 1000
+        """Test fixed chunking strategy splits on token budgets."""
+        text = " ".join(f"word{i}" for i in range(500))
         document_service.config.chunk_size = 100
+        tokenizer = document_service.tokenizer
 
         chunks = document_service._fixed_chunking(text)
 
-        assert len(chunks) == 10
-        assert all(len(chunk) == 100 for chunk in chunks)
+        assert "".join(chunks) == text
+        assert all(tokenizer.count(chunk) <= 100 for chunk in chunks)
+        assert len(chunks) == -(-tokenizer.count(text) // 100)
+
+    def test_fixed_chunking_overlap(self, document_service):
+        """Test that consecutive fixed chunks share overlapping tokens."""
+        text = " ".join(f"word{i}" for i in range(500))
+        document_service.config.chunk_size = 100
+        document_service.config.chunk_overlap = 20
+
+        chunks = document_service._fixed_chunking(text)
+
+        assert chunks[0][-20:] in chunks[1]
+        assert chunks[-1].endswith("word499")
 
     def test_sentence_chunking(self, document_service):
         """Test sentence chunking strategy."""
         text = "First sentence. Second sentence. Third sentence."
-        document_service.config.chunk_size = 30
+        document_service.config.chunk_size = 8
 
         chunks = document_service._sentence_chunking(text)
 
-        assert len(chunks) >= 1
-        assert all(len(chunk) <= 30 for chunk in chunks)
+        assert len(chunks) >= 2
+        assert all(document_service.tokenizer.count(chunk) <= 8 for chunk in chunks)
+        assert all(chunk.endswith(".") for chunk in chunks)
+
+    def test_chunk_metadata_token_count(self, document_service):
+        """Test that chunks carry their token counts."""
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".txt", delete=False) as f:
+            f.write("One sentence here. Another sentence there. " * 20)
+            temp_path = Path(f.name)
+
+        try:
+            document_service.config.doctype = "txt"
+            chunks = document_service._process_single_file(None, temp_path)
+
+            assert chunks
+            for chunk in chunks:
+                assert chunk.metadata["token_count"] == document_service.tokenizer.count(chunk.content)
+        finally:
+            temp_path.unlink()
 
     @patch("raft_toolkit.core.services.document_service.HAS_SEMANTIC_CHUNKER", False)
     def test_semantic_chunking_fallback(self, document_service):
@@ -138,3 +168,45 @@ class TestDocumentService:
 
         with pytest.raises(ValueError, match="Unsupported document type"):
             document_service._extract_text(Path("test.unsupported"))
+
+
+@pytest.mark.unit
+class TestDocumentServiceProcessFiles:
+    """Test cross-file processing."""
+
+    @pytest.fixture
+    def document_service(self):
+        """Create DocumentService with a pass-through embedding service."""
+        config = RaftConfig(doctype="txt", chunking_strategy="fixed", embed_workers=4, openai_key="test-key")
+        with patch("raft_toolkit.core.services.document_service.create_embedding_service") as mock_create:
+            mock_create.return_value.create_embeddings_with_template.side_effect = lambda chunks: chunks
+            service = DocumentService(config, Mock())
+        yield service
+        service.close()
+
+    def test_process_files_batches_embeddings(self, document_service, tmp_path):
+        """Test that all files share one embeddings client and one embedding batch."""
+        paths = []
+        for i in range(6):
+            path = tmp_path / f"doc{i}.txt"
+            path.write_text(f"Document number {i}.")
+            paths.append(path)
+
+        with patch.object(document_service, "_build_embeddings", return_value=Mock()) as mock_build:
+            chunks = document_service.process_files(paths)
+            document_service.process_files(paths[:1])
+
+        assert [chunk.source for chunk in chunks] == [str(path) for path in paths]
+        mock_build.assert_called_once()
+        document_service.embedding_service.create_embeddings_with_template.assert_any_call(chunks)
+        assert document_service.embedding_service.create_embeddings_with_template.call_count == 2
+
+    def test_process_files_skips_failed_files(self, document_service, tmp_path):
+        """Test that one unreadable file does not abort the batch."""
+        good = tmp_path / "good.txt"
+        good.write_text("Readable text.")
+
+        with patch.object(document_service, "_build_embeddings", return_value=Mock()):
+            chunks = document_service.process_files([tmp_path / "missing.txt", good])
+
+        assert [chunk.source for chunk in chunks] == [str(good)]
@@ -0,0 +1,125 @@
+"""
+Tests for compact embedding storage.
+"""
+
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from raft_toolkit.core.models import DocumentChunk  # noqa: E402
+from raft_toolkit.core.utils.embedding_store import (  # noqa: E402
+    EmbeddingMatrix,
+    attach_embeddings,
+    decode_embedding,
+    embeddings_from_arrow,
+    embeddings_to_arrow,
+    encode_embedding,
+    load_embeddings_npz,
+    save_embeddings_npz,
+)
+
+
+@pytest.mark.unit
+class TestEmbeddingMatrix:
+    """Test EmbeddingMatrix storage."""
+
+    def test_rows_are_views_into_shared_block(self):
+        """Test that returned rows share memory with the matrix."""
+        matrix, views = EmbeddingMatrix.from_vectors([[0.1, 0.2], [0.3, 0.4]])
+
+        assert len(matrix) == 2
+        assert all(view.dtype == np.float32 for view in views)
+        assert all(np.shares_memory(view, matrix.to_numpy()) for view in views)
+
+    def test_growth_keeps_existing_views_valid(self):
+        """Test that growing past a block does not move earlier rows."""
+        matrix = EmbeddingMatrix(dim=3, block_rows=2)
+        first = matrix.extend([[1, 2, 3], [4, 5, 6]])
+        second = matrix.extend([[7, 8, 9]])
+
+        assert len(matrix) == 3
+        np.testing.assert_array_equal(first[0], [1, 2, 3])
+        np.testing.assert_array_equal(second[0], [7, 8, 9])
+        np.testing.assert_array_equal(matrix.to_numpy()[2], [7, 8, 9])
+
+    def test_float16_storage(self):
+        """Test half precision storage."""
+        matrix, views = EmbeddingMatrix.from_vectors([[0.5, 0.25]], dtype="float16")
+
+        assert views[0].dtype == np.float16
+        assert matrix.nbytes == 4
+
+    def test_dimension_mismatch(self):
+        """Test that mismatched vectors are rejected."""
+        matrix = EmbeddingMatrix(dim=2)
+        with pytest.raises(ValueError, match="dimension"):
+            matrix.extend([[1.0, 2.0, 3.0]])
+
+    def test_invalid_dtype(self):
+        """Test unsupported dtype."""
+        with pytest.raises(ValueError, match="Unsupported embedding dtype"):
+            EmbeddingMatrix(dim=2, dtype="float64")
+
+
+@pytest.mark.unit
+class TestEmbeddingSerialization:
+    """Test embedding serialization helpers."""
+
+    @pytest.fixture
+    def chunks(self):
+        chunks = [DocumentChunk.create(content=f"chunk {i}", source="test.txt") for i in range(3)]
+        attach_embeddings(chunks, [[0.1, 0.2, 0.3], [0.4, 0.5, 0.6], [0.7, 0.8, 0.9]])
+        return chunks
+
+    def test_encode_decode_roundtrip(self, chunks):
+        """Test base64 encoding of a single vector."""
+        encoded = encode_embedding(chunks[0].embedding)
+
+        assert encoded["dtype"] == "float32"
+        assert encoded["dim"] == 3
+        np.testing.assert_array_equal(decode_embedding(encoded), chunks[0].embedding)
+
+    def test_decode_legacy_list(self):
+        """Test that list-of-floats embeddings are still accepted."""
+        decoded = decode_embedding([0.1, 0.2, 0.3])
+
+        assert decoded.dtype == np.float32
+        np.testing.assert_allclose(decoded, [0.1, 0.2, 0.3], rtol=1e-6)
+
+    def test_chunk_dict_roundtrip(self, chunks):
+        """Test DocumentChunk.to_dict/from_dict with array embeddings."""
+        data = json.loads(json.dumps(chunks[1].to_dict()))
+        restored = DocumentChunk.from_dict(data)
+
+        np.testing.assert_array_equal(restored.embedding, chunks[1].embedding)
+
+    def test_chunk_from_legacy_dict(self):
+        """Test loading a chunk serialized with a list embedding."""
+        restored = DocumentChunk.from_dict(
+            {"id": "c1", "content": "text", "source": "a.txt", "metadata": {}, "embedding": [1.0, 2.0]}
+        )
+
+        np.testing.assert_array_equal(restored.embedding, [1.0, 2.0])
+
+    def test_npz_roundtrip(self, chunks, tmp_path):
+        """Test bulk .npz save and load."""
+        path = tmp_path / "embeddings.npz"
+
+        assert save_embeddings_npz(chunks, path) == 3
+        loaded = load_embeddings_npz(path)
+
+        assert set(loaded) == {chunk.id for chunk in chunks}
+        np.testing.assert_array_equal(loaded[chunks[2].id], chunks[2].embedding)
+
+    def test_arrow_roundtrip(self, chunks):
+        """Test Arrow fixed-size-list column."""
+        pytest.importorskip("pyarrow")
+        chunks.append(DocumentChunk.create(content="no embedding", source="test.txt"))
+
+        column = embeddings_to_arrow(chunks)
+
+        assert column.type.list_size == 3
+        assert column.null_count == 1
+        np.testing.assert_array_equal(embeddings_from_arrow(column)[:3], np.stack([c.embedding for c in chunks[:3]]))
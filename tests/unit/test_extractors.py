@@ -0,0 +1,347 @@
+"""
+Tests for PDF extraction backends, page-parallel extraction, in-memory buffers and the text cache.
+"""
+
+import io
+import json
+import os
+import weakref
+from unittest.mock import Mock, patch
+
+import pytest
+
+pytest.importorskip("pypdf")
+
+from raft_toolkit.core.config import RaftConfig  # noqa: E402
+from raft_toolkit.core.extractors import (  # noqa: E402
+    BufferHandoff,
+    DocumentBuffer,
+    ExtractionCache,
+    ExtractorUnavailableError,
+    PdfExtractor,
+    PypdfExtractor,
+    available_pdf_extractors,
+    create_pdf_extractor,
+    extract_pdf_text,
+    file_fingerprint,
+    register_pdf_extractor,
+    shutdown_pdf_process_pool,
+)
+from raft_toolkit.core.extractors.pdf import PDF_EXTRACTORS, split_page_ranges  # noqa: E402
+
+
+class PidTaggingExtractor(PypdfExtractor):
+    """Custom backend that tags each page with the id of the extracting process."""
+
+    name = "pid-tagging-test"
+
+    def extract_pages(self, path, start, end):
+        return [f"<{os.getpid()}>{text}" for text in super().extract_pages(path, start, end)]
+
+
+@pytest.mark.unit
+class TestPdfExtractorRegistry:
+    """Test extractor backend registry."""
+
+    def test_pypdf_is_default_and_available(self):
+        """Test that the pypdf backend is always registered."""
+        assert "pypdf" in available_pdf_extractors()
+        assert create_pdf_extractor().name == "pypdf"
+
+    def test_unknown_extractor(self):
+        """Test that unknown backends are rejected."""
+        with pytest.raises(ExtractorUnavailableError, match="Unknown PDF extractor"):
+            create_pdf_extractor("nope")
+
+    def test_uninstalled_extractor(self):
+        """Test that backends without their library are rejected."""
+        with patch.object(PDF_EXTRACTORS["pymupdf"], "is_available", return_value=False):
+            with pytest.raises(ExtractorUnavailableError, match="not installed"):
+                create_pdf_extractor("pymupdf")
+
+    def test_register_custom_extractor(self):
+        """Test registering a custom backend."""
+
+        class UpperExtractor(PdfExtractor):
+            name = "upper-test"
+            version = "1"
+
+            def page_count(self, path):
+                return 2
+
+            def extract_pages(self, path, start, end):
+                return [f"PAGE{i}" for i in range(start, end)]
+
+        register_pdf_extractor(UpperExtractor)
+        try:
+            assert extract_pdf_text("unused.pdf", extractor="upper-test") == "PAGE0PAGE1"
+        finally:
+            PDF_EXTRACTORS.pop("upper-test")
+
+
+@pytest.mark.unit
+class TestPageRanges:
+    """Test page range splitting."""
+
+    def test_ranges_cover_all_pages_in_order(self):
+        """Test that ranges are contiguous and complete."""
+        ranges = split_page_ranges(101, workers=4)
+
+        assert ranges[0][0] == 0
+        assert ranges[-1][1] == 101
+        assert all(prev[1] == cur[0] for prev, cur in zip(ranges, ranges[1:]))
+        assert len(ranges) <= 8
+
+    def test_small_documents_are_not_over_split(self):
+        """Test the minimum pages per task."""
+        assert split_page_ranges(6, workers=8) == [(0, 3), (3, 6)]
+        assert split_page_ranges(0, workers=4) == []
+
+
+@pytest.mark.unit
+class TestExtractPdfText:
+    """Test PDF text extraction."""
+
+    def test_in_process_extraction(self, make_pdf):
+        """Test extraction of a small PDF without the pool."""
+        path = make_pdf(["First page", "Second page"])
+
+        text = extract_pdf_text(path, workers=4, min_pages=16)
+
+        assert text.index("First page") < text.index("Second page")
+
+    def test_parallel_matches_serial(self, make_pdf):
+        """Test that page-parallel extraction returns the same text in page order."""
+        path = make_pdf([f"Page number {i}" for i in range(24)])
+
+        try:
+            parallel = extract_pdf_text(path, workers=2, min_pages=4)
+        finally:
+            shutdown_pdf_process_pool()
+        serial = extract_pdf_text(path, workers=1)
+
+        assert parallel == serial
+        assert parallel.index("Page number 3") < parallel.index("Page number 23")
+
+    def test_parallel_custom_extractor(self, make_pdf):
+        """Test that backends registered in the parent process run in pool workers."""
+        path = make_pdf([f"Page number {i}" for i in range(24)])
+        register_pdf_extractor(PidTaggingExtractor)
+        try:
+            text = extract_pdf_text(path, extractor=PidTaggingExtractor.name, workers=2, min_pages=4)
+        finally:
+            shutdown_pdf_process_pool()
+            PDF_EXTRACTORS.pop(PidTaggingExtractor.name)
+
+        assert text.count("<") == 24
+        assert f"<{os.getpid()}>" not in text
+        assert text.index("Page number 3") < text.index("Page number 23")
+
+    def test_parallel_local_extractor_runs_in_process(self, make_pdf):
+        """Test that backends workers cannot import fall back to in-process extraction."""
+
+        class LocalExtractor(PidTaggingExtractor):
+            name = "local-test"
+
+        path = make_pdf([f"Page number {i}" for i in range(24)])
+        register_pdf_extractor(LocalExtractor)
+        try:
+            text = extract_pdf_text(path, extractor="local-test", workers=2, min_pages=4)
+        finally:
+            PDF_EXTRACTORS.pop("local-test")
+
+        assert text.count(f"<{os.getpid()}>") == 24
+
+    def test_document_service_uses_configured_extractor(self, make_pdf):
+        """Test DocumentService delegates PDF extraction."""
+        from raft_toolkit.core.services.document_service import DocumentService
+
+        path = make_pdf(["Hello extractor"])
+        config = RaftConfig(doctype="pdf", pdf_workers=1, openai_key="test-key")
+
+        with patch("raft_toolkit.core.services.document_service.create_embedding_service"):
+            service = DocumentService(config, Mock())
+
+        assert "Hello extractor" in service._extract_text(path)
+
+    def test_invalid_extractor_config(self):
+        """Test config validation of the extractor name."""
+        config = RaftConfig(pdf_extractor="bogus", openai_key="test-key")
+
+        with pytest.raises(ValueError, match="Invalid PDF extractor"):
+            config.validate()
+
+
+@pytest.mark.unit
+class TestExtractionCache:
+    """Test the extracted-text cache."""
+
+    def test_roundtrip_and_statistics(self, tmp_path):
+        """Test put/get and hit/miss counters."""
+        source = tmp_path / "doc.pdf"
+        source.write_bytes(b"content")
+        cache = ExtractionCache(tmp_path / "cache")
+        key = cache.key(source, "pdf", "pypdf", "1.0")
+
+        assert cache.get(key) is None
+        cache.put(key, "extracted text \u00e9")
+
+        assert cache.get(key) == "extracted text \u00e9"
+        assert cache.get_statistics() == {"hits": 1, "misses": 1}
+        assert cache.clear() == 1
+
+    def test_key_changes_with_file_and_extractor(self, tmp_path):
+        """Test that file changes and extractor versions invalidate entries."""
+        source = tmp_path / "doc.pdf"
+        source.write_bytes(b"v1")
+        cache = ExtractionCache(tmp_path / "cache")
+        original = cache.key(source, "pdf", "pypdf", "1.0")
+
+        assert cache.key(source, "pdf", "pypdf", "2.0") != original
+        assert cache.key(source, "pdf", "pymupdf", "1.0") != original
+        source.write_bytes(b"v2 longer")
+        assert cache.key(source, "pdf", "pypdf", "1.0") != original
+
+    def test_hash_fingerprint_ignores_location(self, tmp_path):
+        """Test that content fingerprints are path independent."""
+        first = tmp_path / "a.pdf"
+        second = tmp_path / "b.pdf"
+        first.write_bytes(b"same")
+        second.write_bytes(b"same")
+
+        assert file_fingerprint(first, "hash") == file_fingerprint(second, "hash")
+        assert file_fingerprint(first, "stat") != file_fingerprint(second, "stat")
+
+    def test_corrupt_entry_is_discarded(self, tmp_path):
+        """Test that unreadable entries count as misses."""
+        cache = ExtractionCache(tmp_path / "cache")
+        cache.put("ab" * 32, "text")
+        next((tmp_path / "cache").glob("*/*.txt.z")).write_bytes(b"not zlib")
+
+        assert cache.get("ab" * 32) is None
+
+    def test_document_service_skips_parsing_on_hit(self, make_pdf, tmp_path):
+        """Test that _process_single_file reuses cached text."""
+        from raft_toolkit.core.services.document_service import DocumentService
+
+        path = make_pdf(["Cached page text"])
+        config = RaftConfig(
+            doctype="pdf",
+            pdf_workers=1,
+            chunking_strategy="fixed",
+            extraction_cache_dir=str(tmp_path / "cache"),
+            openai_key="test-key",
+        )
+        with patch("raft_toolkit.core.services.document_service.create_embedding_service"):
+            service = DocumentService(config, Mock())
+
+        first = service._process_single_file(None, path)
+        with patch.object(service, "_extract_text", side_effect=AssertionError("should not parse")):
+            second = service._process_single_file(None, path)
+
+        assert [c.content for c in first] == [c.content for c in second]
+        assert service.extraction_cache.get_statistics()["hits"] == 1
+
+
+@pytest.mark.unit
+class TestDocumentBuffer:
+    """Test in-memory document buffers."""
+
+    def test_small_payload_stays_in_memory(self):
+        """Test that payloads below the threshold are not spilled."""
+        with DocumentBuffer(bytearray(b"hello world"), spill_threshold=1024) as buffer:
+            stream = buffer.stream()
+
+            assert not buffer.spilled
+            assert stream.read(5) == b"hello"
+            stream.seek(-5, io.SEEK_END)
+            assert stream.read() == b"world"
+            assert buffer.text() == "hello world"
+
+    def test_large_payload_spills_to_mmap(self):
+        """Test that large payloads are memory-mapped and the spill file is removed."""
+        payload = b"x" * 4096
+
+        with DocumentBuffer(memoryview(payload), name="big.txt", spill_threshold=1024) as buffer:
+            path = buffer.path
+            assert buffer.spilled and path.suffix == ".txt"
+            assert buffer.stream().read() == payload
+
+        assert not path.exists()
+
+    @pytest.mark.parametrize("threshold, freed", [(1024, True), (1 << 20, False)])
+    def test_handoff_payload_freed_after_spill(self, threshold, freed):
+        """Test that a handed-off payload is released once spilled, and kept when wrapped."""
+
+        class Payload(bytearray):
+            pass
+
+        payload = Payload(b"x" * 4096)
+        ref = weakref.ref(payload)
+        handoff = BufferHandoff(payload)
+        del payload
+
+        with DocumentBuffer(handoff, spill_threshold=threshold) as buffer:
+            assert (ref() is None) == freed
+            assert buffer.stream().read() == b"x" * 4096
+
+        with pytest.raises(ValueError, match="already been taken"):
+            handoff.take()
+
+    def test_pdf_from_stream_matches_path(self, make_pdf):
+        """Test that PDF extraction from memory matches extraction from disk."""
+        path = make_pdf(["In memory page", "Second page"])
+
+        with DocumentBuffer(io.BytesIO(path.read_bytes()), spill_threshold=1 << 20) as buffer:
+            from_memory = extract_pdf_text(buffer.source(), workers=4, min_pages=1)
+
+        assert from_memory == extract_pdf_text(path, workers=1)
+
+    @pytest.fixture
+    def make_service(self):
+        """Build a DocumentService for a doctype with mocked embeddings."""
+        from raft_toolkit.core.services.document_service import DocumentService
+
+        def build(doctype, **overrides):
+            config = RaftConfig(
+                doctype=doctype, chunking_strategy="fixed", pdf_workers=1, openai_key="test-key", **overrides
+            )
+            with patch("raft_toolkit.core.services.document_service.create_embedding_service") as mock_create:
+                mock_create.return_value.create_embeddings_with_template.side_effect = lambda chunks: chunks
+                return DocumentService(config, Mock())
+
+        return build
+
+    @pytest.mark.parametrize("threshold", [1 << 20, 0])
+    def test_process_buffer_pdf(self, make_service, make_pdf, tmp_path, threshold):
+        """Test processing PDF bytes in memory and spilled."""
+        service = make_service("pdf", source_spill_threshold=threshold)
+        data = make_pdf(["Quarterly revenue grew"]).read_bytes()
+
+        with patch("tempfile.tempdir", str(tmp_path)):
+            chunks = service.process_buffer(data, "reports/q1.pdf")
+
+        assert "Quarterly revenue grew" in chunks[0].content
+        assert chunks[0].source == "reports/q1.pdf"
+        assert not list(tmp_path.glob("raft-spill-*"))
+
+    def test_process_buffer_text_and_json(self, make_service):
+        """Test processing txt and json payloads from memory."""
+        txt_chunks = make_service("txt").process_buffer("Plain text \u00e9".encode("utf-8"), "a.txt")
+        json_chunks = make_service("json").process_buffer(json.dumps({"text": "Json body"}).encode(), "a.json")
+
+        assert txt_chunks[0].content == "Plain text \u00e9"
+        assert json_chunks[0].content == "Json body"
+
+    def test_process_buffer_pptx(self, make_service):
+        """Test processing a presentation from memory."""
+        pptx = pytest.importorskip("pptx")
+        presentation = pptx.Presentation()
+        slide = presentation.slides.add_slide(presentation.slide_layouts[5])
+        slide.shapes.title.text = "Slide from memory"
+        stream = io.BytesIO()
+        presentation.save(stream)
+
+        chunks = make_service("pptx").process_buffer(stream.getvalue(), "deck.pptx")
+
+        assert "Slide from memory" in chunks[0].content
@@ -2,10 +2,14 @@
 Unit tests for dataset formatters.
 """
 
+import hashlib
 import json
 import tempfile
 from pathlib import Path
+from unittest.mock import patch
 
+import pyarrow as pa
+import pyarrow.parquet as pq
 import pytest
 from datasets import Dataset
 
@@ -17,11 +21,14 @@ from raft_toolkit.core.formatters.dataset_converter import (
     OpenAiChatDatasetFormatter,
     OpenAiCompletionDatasetFormatter,
     ParquetDatasetExporter,
+    _iter_jsonl_batches,
     append_extension,
     extract_context,
     extract_final_answer,
+    stream_convert,
 )
 from raft_toolkit.core.models import QADataPoint
+from raft_toolkit.core.services.dataset_writer import ShardedFileWriter
 
 
 class TestDatasetConverter:
@@ -246,6 +253,70 @@ class TestDatasetFormatters:
         assert "final_answer" in result.column_names
 
 
+class TestVectorizedFormatters:
+    """Test the Arrow-compute formatters against the Python formatters."""
+
+    FORMATTERS = [OpenAiCompletionDatasetFormatter, OpenAiChatDatasetFormatter, EvalDatasetFormatter]
+
+    @pytest.fixture
+    def edge_case_dataset(self):
+        """Create a dataset with empty values, missing markers and multi-line documents."""
+        data = {
+            "question": ["Q1?", "Q2?", "Q3?", "Q4?", "Q5?"],
+            "context": ["C1\n\nmore", "C2", "", "C4", None],
+            "cot_answer": ["A<ANSWER>: x<ANSWER>: y", "no marker", "A3<ANSWER>: 3", None, "A5<ANSWER>: 5"],
+            "answer": ["A<ANSWER>: x<ANSWER>: y", None, "A3<ANSWER>: 3", "", "A5<ANSWER>: 5"],
+            "instruction": ["<DOCUMENT>D\n\nE</DOCUMENT>\nQ1?", "single line", "I3\nQ3?", "I4\nQ4?", "I5\n"],
+        }
+        return Dataset.from_dict(data)
+
+    @pytest.mark.parametrize("formatter_class", FORMATTERS)
+    @pytest.mark.parametrize("system_prompt", [None, "Be brief."])
+    def test_matches_python_formatter(self, edge_case_dataset, formatter_class, system_prompt):
+        """Vectorized and Python formatters produce the same rows."""
+        params = {"stop": "<END>"}
+        if system_prompt:
+            params["system_prompt"] = system_prompt
+        formatter = formatter_class()
+
+        vectorized = formatter.format(edge_case_dataset, params)
+        python = formatter.format_python(edge_case_dataset, params)
+
+        assert vectorized.column_names == python.column_names
+        assert vectorized.to_list() == python.to_list()
+
+    def test_eval_without_answer_column(self, edge_case_dataset):
+        """Without an answer column the final answer is null."""
+        ds = edge_case_dataset.remove_columns("answer")
+        formatter = EvalDatasetFormatter()
+
+        vectorized = formatter.format(ds, {})
+
+        assert vectorized.to_list() == formatter.format_python(ds, {}).to_list()
+        assert vectorized["final_answer"] == [None, None]
+
+    def test_large_string_columns(self, edge_case_dataset):
+        """Large string columns are formatted like regular ones."""
+        table = edge_case_dataset.with_format("arrow")[:]
+        ds = Dataset(table.cast(pa.schema([(name, pa.large_string()) for name in table.column_names])))
+        params = {"system_prompt": "Be brief."}
+
+        for formatter_class in self.FORMATTERS:
+            formatter = formatter_class()
+            assert formatter.format(ds, params).to_list() == formatter.format_python(ds, params).to_list()
+
+    def test_fallback_to_python(self, edge_case_dataset):
+        """Missing Arrow kernels fall back to the Python formatter."""
+        formatter = OpenAiCompletionDatasetFormatter(num_proc=2)
+        with patch(
+            "raft_toolkit.core.formatters.dataset_converter.format_table",
+            side_effect=pa.ArrowNotImplementedError("no kernel"),
+        ):
+            result = formatter.format(edge_case_dataset, {})
+
+        assert result.to_list() == OpenAiCompletionDatasetFormatter().format(edge_case_dataset, {}).to_list()
+
+
 class TestUtilityFunctions:
     """Test utility functions."""
 
@@ -346,3 +417,189 @@ class TestExporters:
             final_path = output_path + ".parquet"
             if Path(final_path).exists():
                 Path(final_path).unlink()
+
+
+class TestStreamingConversion:
+    """Test batch-wise conversion with constant memory."""
+
+    @pytest.fixture
+    def raw_dataset(self):
+        """Create a raw dataset with a few empty answers."""
+        data = {
+            "id": [f"id{i}" for i in range(25)],
+            "question": [f"Q{i}?" for i in range(25)],
+            "context": [f"Doc {i}\n\nmore" for i in range(25)],
+            "cot_answer": ["" if i % 7 == 0 else f"Reasoning {i}<ANSWER>: {i}" for i in range(25)],
+            "answer": [None if i % 5 == 0 else f"Reasoning {i}<ANSWER>: {i}" for i in range(25)],
+            "instruction": [f"<DOCUMENT>Doc {i}</DOCUMENT>\nQ{i}?" for i in range(25)],
+        }
+        return Dataset.from_dict(data)
+
+    def _expected(self, ds, output_format, params, tmp_path):
+        DatasetConverter().convert(
+            ds=ds, format=output_format, output_path=str(tmp_path / "expected"), output_type="jsonl", params=params
+        )
+        return [json.loads(line) for line in (tmp_path / "expected.jsonl").read_text().splitlines()]
+
+    @pytest.mark.parametrize("output_format", ["hf", "completion", "chat", "eval"])
+    def test_jsonl_matches_converter(self, raw_dataset, tmp_path, output_format):
+        """Streaming a JSONL input gives the rows of the in-memory conversion."""
+        raw_dataset.to_json(str(tmp_path / "raw.jsonl"))
+        params = {"system_prompt": "Be brief."} if output_format == "chat" else {}
+
+        stats = stream_convert(
+            str(tmp_path / "raw.jsonl"), "jsonl", output_format, str(tmp_path / "out"), "jsonl", params, batch_size=4
+        )
+
+        rows = [json.loads(line) for line in (tmp_path / "out.jsonl").read_text().splitlines()]
+        assert rows == self._expected(raw_dataset, output_format, params, tmp_path)
+        assert stats["rows_read"] == 25
+        assert stats["rows_written"] == len(rows)
+
+    def test_jsonl_blocks_split_lines(self, raw_dataset, tmp_path):
+        """Lines straddling read blocks are parsed whole."""
+        raw_dataset.to_json(str(tmp_path / "raw.jsonl"))
+
+        batches = list(_iter_jsonl_batches(str(tmp_path / "raw.jsonl"), batch_size=3, block_bytes=100))
+
+        assert pa.Table.from_batches(batches)["id"].to_pylist() == raw_dataset["id"]
+        assert max(batch.num_rows for batch in batches) <= 3
+
+    def test_parquet_to_parquet(self, raw_dataset, tmp_path):
+        """Parquet input is read in batches and written as Parquet."""
+        raw_dataset.to_parquet(str(tmp_path / "raw.parquet"))
+
+        stream_convert(str(tmp_path / "raw.parquet"), "parquet", "completion", str(tmp_path / "out"), "parquet", {})
+
+        table = pq.read_table(tmp_path / "out.parquet")
+        assert table.column_names == ["prompt", "completion"]
+        assert table.to_pylist() == self._expected(raw_dataset, "completion", {}, tmp_path)
+
+    def test_saved_arrow_dataset(self, raw_dataset, tmp_path):
+        """A dataset directory saved with save_to_disk is read from its Arrow shards."""
+        raw_dataset.save_to_disk(str(tmp_path / "saved"))
+
+        stats = stream_convert(str(tmp_path / "saved"), "arrow", "eval", str(tmp_path / "out"), "jsonl", {})
+
+        rows = [json.loads(line) for line in (tmp_path / "out.jsonl").read_text().splitlines()]
+        assert rows == self._expected(raw_dataset, "eval", {}, tmp_path)
+        assert stats["rows_read"] == 25
+
+    def test_empty_input(self, tmp_path):
+        """An empty input yields an empty output with the schema of the format."""
+        (tmp_path / "raw.jsonl").write_text("")
+
+        stream_convert(str(tmp_path / "raw.jsonl"), "jsonl", "chat", str(tmp_path / "out"), "parquet", {})
+
+        assert pq.read_table(tmp_path / "out.parquet").column_names == ["messages"]
+
+
+class TestShardedExport:
+    """Test size- and row-bounded output shards with a manifest."""
+
+    @pytest.fixture
+    def dataset(self):
+        """Create a dataset with rows of varying length."""
+        return Dataset.from_dict({"id": list(range(40)), "text": ["x" * (i * 7 % 50) for i in range(40)]})
+
+    def _read(self, tmp_path, manifest):
+        rows = []
+        for shard in manifest["shards"]:
+            path = tmp_path / shard["filename"]
+            data = path.read_bytes()
+            assert len(data) == shard["bytes"]
+            assert hashlib.sha256(data).hexdigest() == shard["sha256"]
+            if manifest["format"] == "jsonl":
+                shard_rows = [json.loads(line) for line in data.decode("utf-8").splitlines()]
+            else:
+                shard_rows = pq.read_table(path).to_pylist()
+            assert len(shard_rows) == shard["rows"]
+            rows.extend(shard_rows)
+        return rows
+
+    @pytest.mark.parametrize("output_type", ["jsonl", "parquet"])
+    def test_row_bounded_shards(self, dataset, tmp_path, output_type):
+        """Row-bounded shards hold at most the row limit and are listed in the manifest."""
+        manifest = DatasetConverter(max_shard_rows=15, num_proc=2).convert(
+            ds=dataset, format="hf", output_path=str(tmp_path / "out"), output_type=output_type, params={}
+        )
+
+        assert [shard["rows"] for shard in manifest["shards"]] == [15, 15, 10]
+        assert manifest["shards"][0]["filename"] == f"out-00000-of-00003.{output_type}"
+        assert json.loads((tmp_path / "out.manifest.json").read_text()) == manifest
+        assert self._read(tmp_path, manifest) == dataset.to_list()
+        assert not (tmp_path / f"out.{output_type}").exists()
+
+    def test_byte_bounded_jsonl_shards(self, dataset, tmp_path):
+        """JSONL shards stay within the byte limit and split on lines."""
+        manifest = JsonlDatasetExporter(max_shard_bytes=300).export(dataset, str(tmp_path / "out"))
+
+        assert len(manifest["shards"]) > 1
+        assert all(shard["bytes"] <= 300 for shard in manifest["shards"])
+        assert manifest["total_rows"] == 40
+        assert self._read(tmp_path, manifest) == dataset.to_list()
+
+    def test_byte_and_row_bounded_parquet_shards(self, dataset, tmp_path):
+        """Parquet shards honour the row limit alongside the byte limit."""
+        manifest = ParquetDatasetExporter(max_shard_bytes=1_000_000, max_shard_rows=8).export(
+            dataset, str(tmp_path / "out")
+        )
+
+        assert [shard["rows"] for shard in manifest["shards"]] == [8] * 5
+        assert self._read(tmp_path, manifest) == dataset.to_list()
+
+    def test_stale_shards_replaced(self, dataset, tmp_path):
+        """Re-exporting to the same path removes the shards of the previous export."""
+        JsonlDatasetExporter(max_shard_rows=5).export(dataset, str(tmp_path / "out"))
+        manifest = JsonlDatasetExporter(max_shard_rows=20).export(dataset, str(tmp_path / "out"))
+
+        assert sorted(path.name for path in tmp_path.glob("out-*")) == [
+            "out-00000-of-00002.jsonl",
+            "out-00001-of-00002.jsonl",
+        ]
+        assert manifest["total_rows"] == 40
+
+    def test_streaming_shards(self, dataset, tmp_path):
+        """Streaming conversion writes the same shards across input batches."""
+        dataset.to_json(str(tmp_path / "raw.jsonl"))
+
+        stream_convert(
+            str(tmp_path / "raw.jsonl"),
+            "jsonl",
+            "hf",
+            str(tmp_path / "out"),
+            "jsonl",
+            {},
+            batch_size=6,
+            max_shard_rows=15,
+        )
+
+        manifest = json.loads((tmp_path / "out.manifest.json").read_text())
+        assert [shard["rows"] for shard in manifest["shards"]] == [15, 15, 10]
+        assert self._read(tmp_path, manifest) == dataset.to_list()
+
+    def test_streaming_empty_parquet_shards(self, tmp_path):
+        """An empty sharded Parquet conversion writes one empty shard with the schema of the format."""
+        (tmp_path / "raw.jsonl").write_text("")
+
+        stream_convert(
+            str(tmp_path / "raw.jsonl"), "jsonl", "chat", str(tmp_path / "out"), "parquet", {}, max_shard_rows=10
+        )
+
+        manifest = json.loads((tmp_path / "out.manifest.json").read_text())
+        assert [shard["rows"] for shard in manifest["shards"]] == [0]
+        assert pq.read_table(tmp_path / manifest["shards"][0]["filename"]).column_names == ["messages"]
+
+    def test_writer_schema_fixed_once_shards_start(self, dataset, tmp_path):
+        """The schema can only be set before a shard is started."""
+        writer = ShardedFileWriter(tmp_path / "out.jsonl", max_shard_rows=10)
+        writer.write_table(dataset.data.table)
+
+        with pytest.raises(ValueError, match="after shards have been started"):
+            writer.set_schema(dataset.data.table.schema)
+        writer.abort()
+
+    def test_invalid_limit(self, dataset, tmp_path):
+        """Non-positive limits are rejected."""
+        with pytest.raises(ValueError, match="max_shard_bytes"):
+            JsonlDatasetExporter(max_shard_bytes=0).export(dataset, str(tmp_path / "out"))
@@ -2,13 +2,18 @@
 Tests for input service.
 """
 
+import asyncio
+import weakref
 from pathlib import Path
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
 from raft_toolkit.core.config import RaftConfig
+from raft_toolkit.core.extractors import DocumentBuffer
+from raft_toolkit.core.models import DocumentChunk
 from raft_toolkit.core.services.input_service import InputService
+from raft_toolkit.core.sources import BaseInputSource, InputSourceConfig, SourceDocument
 
 
 @pytest.mark.unit
@@ -40,6 +45,14 @@ class TestInputService:
             return_value={"total_documents": 5, "supported_documents": 4, "unsupported_documents": 1}
         )
         mock_source.list_documents = AsyncMock(return_value=[])
+        mock_source.commit = AsyncMock()
+        mock_source.get_sync_statistics.return_value = {}
+
+        async def iter_documents(limit=None):
+            for doc in await mock_source.list_documents():
+                yield doc
+
+        mock_source.iter_documents = iter_documents
         return mock_source
 
     @pytest.fixture
@@ -113,12 +126,14 @@ class TestInputService:
         mock_input_source.list_documents.return_value = [mock_doc]
 
         # Mock document service
-        mock_chunks = [Mock()]
-        input_service.document_service.process_documents.return_value = mock_chunks
+        mock_chunk = Mock(source="/path/test.pdf", metadata={})
+        input_service.document_service.process_files.return_value = [mock_chunk]
 
         result = await input_service.process_documents()
 
         assert len(result) == 1
+        input_service.document_service.process_files.assert_called_once_with([Path("/path/test.pdf")])
+        assert result[0].metadata["source_file_size"] == 1000
 
     def test_get_source_info(self, input_service):
         """Test getting source information."""
@@ -149,3 +164,170 @@ class TestInputService:
         with patch("raft_toolkit.core.services.input_service.DocumentService"):
             with pytest.raises(ValueError, match="source_uri is required"):
                 InputService(config, mock_llm_service)
+
+
+class Payload(bytearray):
+    """Downloaded bytes that support weak references."""
+
+
+class SlowInputSource(BaseInputSource):
+    """In-memory source with fixed download latency that tracks concurrency."""
+
+    def __init__(self, config, latency=0.05, fail=(), documents=()):
+        super().__init__(config)
+        self.latency = latency
+        self.fail = set(fail)
+        self.documents = list(documents)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.commits = 0
+
+    async def validate(self):
+        self._validated = True
+
+    async def list_documents(self):
+        return self.documents
+
+    async def commit(self):
+        self.commits += 1
+
+    async def get_document(self, document):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+            if document.name in self.fail:
+                raise ConnectionError("download failed")
+            document.content = document.name.encode() * 100
+            return document
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.mark.unit
+class TestRemoteDocumentProcessing:
+    """Test concurrent downloads for remote sources."""
+
+    @pytest.fixture
+    def config(self):
+        """Create S3 test config."""
+        return RaftConfig(
+            openai_key="test-key",
+            doctype="txt",
+            source_type="s3",
+            source_uri="s3://bucket/docs",
+            source_max_concurrency=4,
+        )
+
+    @pytest.fixture
+    def documents(self):
+        return [SourceDocument(name=f"doc{i}.txt", source_path=f"docs/doc{i}.txt", content_type="") for i in range(12)]
+
+    def make_service(self, config, source):
+        with (
+            patch("raft_toolkit.core.services.input_service.DocumentService"),
+            patch("raft_toolkit.core.services.input_service.InputSourceFactory.create_source", return_value=source),
+        ):
+            service = InputService(config, Mock())
+
+        def process(content, name):
+            return [DocumentChunk.create(bytes(content.take()).decode().split(".")[0], name)]
+
+        service.document_service.process_buffer.side_effect = process
+        return service
+
+    @pytest.mark.asyncio
+    async def test_downloads_are_bounded_and_concurrent(self, config, documents):
+        """Test that downloads overlap up to source_max_concurrency."""
+        source = SlowInputSource(InputSourceConfig(source_type="s3", source_uri="s3://bucket/docs"))
+        service = self.make_service(config, source)
+
+        chunks = await service._process_remote_documents(documents)
+
+        assert source.max_in_flight == 4
+        assert [chunk.content for chunk in chunks] == [f"doc{i}" for i in range(12)]
+        assert chunks[0].metadata["original_filename"] == "doc0.txt"
+        # 12 documents at 50 ms each would take 0.6 s serially
+        assert source.metrics.elapsed < 0.45
+
+    @pytest.mark.asyncio
+    async def test_failed_downloads_are_skipped(self, config, documents):
+        """Test that a failed download does not abort the batch."""
+        source = SlowInputSource(
+            InputSourceConfig(source_type="s3", source_uri="s3://bucket/docs"), latency=0.0, fail={"doc3.txt"}
+        )
+        service = self.make_service(config, source)
+
+        chunks = await service._process_remote_documents(documents)
+
+        assert len(chunks) == 11
+        assert source.metrics.failures == 1
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("fail, commits", [((), 1), ({"doc3.txt"}, 0)])
+    async def test_sync_state_committed_only_without_failures(self, config, documents, fail, commits):
+        """Test that a failed document keeps the sync cursor so it is retried on the next run."""
+        source = SlowInputSource(
+            InputSourceConfig(source_type="s3", source_uri="s3://bucket/docs"),
+            latency=0.0,
+            fail=fail,
+            documents=documents,
+        )
+        service = self.make_service(config, source)
+
+        chunks = await service.process_documents()
+
+        assert len(chunks) == 12 - len(fail)
+        assert source.commits == commits
+
+    def test_spilled_download_is_freed_before_parsing(self, config, documents):
+        """Test that the downloaded bytes are freed once the document buffer has spilled them."""
+        source = SlowInputSource(InputSourceConfig(source_type="s3", source_uri="s3://bucket/docs"))
+        service = self.make_service(config, source)
+        doc = documents[0]
+        doc.content = Payload(b"spilled. " * 100)
+        content = weakref.ref(doc.content)
+
+        def process(data, name):
+            with DocumentBuffer(data, name=name, spill_threshold=0) as buffer:
+                assert buffer.spilled and content() is None
+                return [DocumentChunk.create(buffer.text().split(".")[0], name)]
+
+        service.document_service.process_buffer.side_effect = process
+        chunks = service._process_downloaded_document(doc)
+
+        assert chunks[0].content == "spilled"
+        assert doc.content is None
+
+    @pytest.mark.asyncio
+    async def test_throughput_in_source_info(self, config, documents):
+        """Test that download throughput is reported."""
+        source = SlowInputSource(InputSourceConfig(source_type="s3", source_uri="s3://bucket/docs"), latency=0.01)
+        service = self.make_service(config, source)
+
+        await service._process_remote_documents(documents)
+        throughput = service.get_source_info()["throughput"]
+
+        assert throughput["documents"] == 12
+        assert throughput["bytes"] == sum(len(doc.name) * 100 for doc in documents)
+        assert throughput["docs_per_second"] > 0
+        assert throughput["mb_per_second"] > 0
+
+    @pytest.mark.asyncio
+    async def test_base_get_documents_is_concurrent(self, documents):
+        """Test that BaseInputSource.get_documents fans out downloads."""
+        source = SlowInputSource(
+            InputSourceConfig(source_type="s3", source_uri="s3://bucket/docs", max_concurrency=3), fail={"doc0.txt"}
+        )
+
+        loaded = [doc async for doc in source.get_documents(documents)]
+
+        assert source.max_in_flight == 3
+        assert sorted(doc.name for doc in loaded) == sorted(doc.name for doc in documents[1:])
+
+    def test_invalid_concurrency(self):
+        """Test validation of the concurrency limit."""
+        with pytest.raises(ValueError, match="source_max_concurrency"):
+            RaftConfig(openai_key="test-key", source_max_concurrency=0).validate()
+        with pytest.raises(ValueError, match="max_concurrency"):
+            InputSourceConfig(source_type="s3", source_uri="s3://bucket", max_concurrency=0)
@@ -108,6 +108,94 @@ class TestQADataPoint:
         assert "London is in England." in all_contexts
         assert "Berlin is in Germany." in all_contexts
 
+    def test_contexts_with_blank_lines(self):
+        """Chunks containing blank lines are kept whole."""
+        qa_point = QADataPoint.create(
+            question="What is the capital?",
+            oracle_context="Paris\n\nis the capital of France.",
+            distractor_contexts=["London\n\nis in England."],
+            cot_answer="The capital is Paris.",
+            doctype="pdf",
+        )
+
+        assert qa_point.get_all_contexts() == ["Paris\n\nis the capital of France.", "London\n\nis in England."]
+        assert qa_point.distractor_contexts == ["London\n\nis in England."]
+
+    def test_lazy_rendering(self):
+        """Context and instruction are rendered from the chunks unless set explicitly."""
+        qa_point = QADataPoint.create(
+            question="What is the capital?",
+            oracle_context="Paris is the capital of France.",
+            distractor_contexts=["London is in England."],
+            cot_answer="The capital is Paris.",
+            doctype="pdf",
+            oracle_chunk_id="c1",
+            distractor_chunk_ids=["c2"],
+        )
+
+        assert qa_point.context == "Paris is the capital of France.\n\nLondon is in England."
+        assert qa_point.instruction == (
+            "<DOCUMENT>Paris is the capital of France.</DOCUMENT>\n"
+            "<DOCUMENT>London is in England.</DOCUMENT>\n"
+            "What is the capital?"
+        )
+        assert qa_point.has_chunk_refs
+        assert not hasattr(qa_point, "__dict__")
+
+        qa_point.instruction = "Custom instruction"
+        assert qa_point.instruction == "Custom instruction"
+
+    def test_from_dict_round_trip(self):
+        """Serialized points load back with their documents recovered from the instruction."""
+        qa_point = QADataPoint.create(
+            question="What is the capital?",
+            oracle_context="Paris\n\nis the capital of France.",
+            distractor_contexts=["London is in England."],
+            cot_answer="The capital is Paris.",
+            doctype="pdf",
+        )
+
+        loaded = QADataPoint.from_dict(qa_point.to_dict())
+
+        assert loaded.to_dict() == qa_point.to_dict()
+        assert loaded.distractor_contexts == ["London is in England."]
+        assert not loaded.has_chunk_refs
+
+    def test_explicit_fields_kept(self):
+        """Points built from arbitrary strings keep them as given."""
+        qa_point = QADataPoint(
+            id="qa1",
+            type="cot",
+            question="Q?",
+            context="C",
+            oracle_context="Oracle",
+            cot_answer="A",
+            instruction="Answer the question",
+            doctype="pdf",
+        )
+
+        assert qa_point.context == "C"
+        assert qa_point.instruction == "Answer the question"
+        assert qa_point.get_all_contexts() == ["Oracle", "C"]
+
+    def test_distractors_from_context_without_rendered_instruction(self):
+        """Distractors are split from the context when the instruction is not the rendered template."""
+        qa_point = QADataPoint(
+            id="qa1",
+            type="cot",
+            question="Q?",
+            context="oracle text\n\ndistractor one",
+            oracle_context="oracle text",
+            cot_answer="A",
+            instruction="custom prompt",
+            doctype="pdf",
+        )
+
+        assert qa_point.distractor_contexts == ["distractor one"]
+        assert qa_point.get_all_contexts() == ["oracle text", "distractor one"]
+        assert qa_point.context == "oracle text\n\ndistractor one"
+        assert qa_point.instruction == "custom prompt"
+
 
 @pytest.mark.unit
 class TestProcessingJob:
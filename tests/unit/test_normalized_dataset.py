@@ -0,0 +1,120 @@
+"""
+Tests for the normalized dataset layout and its materializer.
+"""
+
+import json
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+pytest.importorskip("datasets")
+
+from raft_toolkit.core.config import RaftConfig  # noqa: E402
+from raft_toolkit.core.formatters.dataset_converter import materialize_normalized  # noqa: E402
+from raft_toolkit.core.models import DocumentChunk, ProcessingResult, QADataPoint  # noqa: E402
+from raft_toolkit.core.services.dataset_service import DatasetService  # noqa: E402
+from raft_toolkit.core.services.dataset_writer import qa_record  # noqa: E402
+from raft_toolkit.core.services.normalized_dataset import (  # noqa: E402
+    CHUNKS_FILE,
+    QA_FILE,
+    NormalizedDatasetWriter,
+    iter_materialized_records,
+)
+
+
+@pytest.fixture
+def chunks():
+    """Chunks whose content includes blank lines."""
+    return [DocumentChunk.create(f"chunk {i}\n\nsecond paragraph {i}", f"doc{i % 2}.txt") for i in range(4)]
+
+
+def _points(chunks, questions=3):
+    points = []
+    for i, oracle in enumerate(chunks):
+        distractors = [chunk for chunk in chunks if chunk is not oracle][:2]
+        for q in range(questions):
+            points.append(
+                QADataPoint.create(
+                    question=f"question {i}.{q}?",
+                    oracle_context=oracle.content,
+                    distractor_contexts=[chunk.content for chunk in distractors],
+                    cot_answer=f"reasoning <ANSWER>: {q}",
+                    doctype="txt",
+                    oracle_chunk_id=oracle.id,
+                    distractor_chunk_ids=[chunk.id for chunk in distractors],
+                )
+            )
+    return points
+
+
+@pytest.mark.unit
+class TestNormalizedDataset:
+    """Test writing and materializing the normalized layout."""
+
+    def test_round_trip_matches_flat_records(self, tmp_path, chunks):
+        """Materialized records equal the flat records of the same QA points."""
+        points = _points(chunks)
+        writer = NormalizedDatasetWriter(tmp_path / "out", row_group_size=5)
+        writer.write_chunks(chunks)
+        writer.write_result(ProcessingResult(job_id="job", success=True, qa_data_points=points))
+        writer.close()
+
+        materialized = [
+            record for batch in iter_materialized_records(tmp_path / "out", batch_size=4) for record in batch
+        ]
+        assert materialized == [qa_record(point) for point in points]
+
+    def test_chunks_stored_once(self, tmp_path, chunks):
+        """Each chunk is stored once and QA rows carry no chunk text."""
+        writer = NormalizedDatasetWriter(tmp_path / "out")
+        writer.write_chunks(chunks)
+        writer.write_chunks(chunks[:2])
+        writer.write_result(ProcessingResult(job_id="job", success=True, qa_data_points=_points(chunks)))
+        writer.close()
+
+        assert pq.read_table(tmp_path / "out" / CHUNKS_FILE).num_rows == len(chunks)
+        qa = pq.read_table(tmp_path / "out" / QA_FILE)
+        assert qa.num_rows == 12
+        assert qa.column("context").null_count == qa.num_rows
+
+    def test_points_without_chunk_ids_stay_inline(self, tmp_path):
+        """QA points created without chunk ids keep their texts inline."""
+        point = QADataPoint.create("q?", "oracle", ["distractor"], "a <ANSWER>: b", "txt")
+        writer = NormalizedDatasetWriter(tmp_path / "out")
+        writer.write_result(ProcessingResult(job_id="job", success=True, qa_data_points=[point]))
+        writer.close()
+
+        assert next(iter_materialized_records(tmp_path / "out")) == [qa_record(point)]
+
+    def test_abort_removes_tables(self, tmp_path, chunks):
+        """An aborted run leaves no partial tables."""
+        writer = NormalizedDatasetWriter(tmp_path / "out")
+        writer.write_chunks(chunks)
+        writer.abort()
+
+        assert not list((tmp_path / "out").glob("*.parquet"))
+        with pytest.raises(ValueError):
+            writer.write_chunks(chunks)
+
+    def test_service_normalized_layout(self, tmp_path, chunks):
+        """The service writes the normalized layout and the converter materializes it."""
+        config = RaftConfig(openai_key="test-key", output_layout="normalized", output_format="completion")
+        service = DatasetService(config)
+        points = _points(chunks, questions=1)
+
+        writer = service.open_writer(str(tmp_path / "out"), chunks=chunks)
+        writer.write_result(ProcessingResult(job_id="job", success=True, qa_data_points=points))
+        assert service.finalize_dataset(writer) is None
+        assert sorted(path.name for path in (tmp_path / "out").iterdir()) == [CHUNKS_FILE, QA_FILE]
+
+        count = materialize_normalized(str(tmp_path / "out"), "completion", str(tmp_path / "flat"), "jsonl", {})
+
+        rows = [json.loads(line) for line in (tmp_path / "flat.jsonl").read_text(encoding="utf-8").splitlines()]
+        assert count == len(rows) == len(points)
+        assert rows[0] == {"prompt": points[0].instruction, "completion": points[0].cot_answer + "<STOP>"}
+
+    def test_invalid_layout(self):
+        """Unknown layouts are rejected by validation."""
+        with pytest.raises(ValueError, match="output layout"):
+            RaftConfig(openai_key="test-key", output_layout="nested").validate()
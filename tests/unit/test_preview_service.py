@@ -0,0 +1,212 @@
+"""
+Tests for the sampling-based processing preview.
+"""
+
+from unittest.mock import Mock, patch
+
+import pytest
+
+from raft_toolkit.core.config import RaftConfig
+from raft_toolkit.core.services.document_service import DocumentService
+from raft_toolkit.core.services.input_service import InputService
+from raft_toolkit.core.services.preview_service import (
+    ASSUMED_CALL_SECONDS,
+    Interval,
+    PreviewService,
+    Stratum,
+    estimate_total,
+    stratify,
+)
+from raft_toolkit.core.sources import SourceDocument
+
+
+def _documents(sizes, extension="txt"):
+    return [
+        SourceDocument(name=f"doc{i}.{extension}", source_path=f"/data/doc{i}.{extension}", content_type="", size=size)
+        for i, size in enumerate(sizes)
+    ]
+
+
+@pytest.mark.unit
+class TestStratifiedSampling:
+    """Test stratification and the ratio estimator."""
+
+    def test_sample_covers_types_and_sizes(self):
+        """Every stratum gets a document and the sample size is respected."""
+        documents = _documents(range(1, 41)) + _documents([500, 600], extension="pdf")
+        strata = stratify(documents, 10)
+
+        assert sum(len(stratum.sample) for stratum in strata) == 10
+        assert all(stratum.sample for stratum in strata)
+        assert {stratum.key.split(":")[0] for stratum in strata} == {".pdf", ".txt"}
+        assert sum(len(stratum.documents) for stratum in strata) == len(documents)
+
+    def test_sample_is_deterministic(self):
+        """The same listing yields the same sample."""
+        documents = _documents(range(1, 101))
+        first = [doc.source_path for stratum in stratify(documents, 12) for doc in stratum.sample]
+        second = [doc.source_path for stratum in stratify(documents, 12) for doc in stratum.sample]
+        assert first == second
+
+    def test_sample_larger_than_population(self):
+        """A sample size above the document count measures every document."""
+        documents = _documents([10, 20, 30])
+        strata = stratify(documents, 30)
+        assert sorted(doc.source_path for stratum in strata for doc in stratum.sample) == sorted(
+            doc.source_path for doc in documents
+        )
+
+    def test_census_is_exact(self):
+        """Measuring every document gives the exact total with no interval width."""
+        stratum = Stratum("txt:0", _documents([100, 200]))
+        stratum.measurements = [(100, 0, 2, 0), (200, 0, 5, 0)]
+        interval = estimate_total([stratum], 2)
+        assert interval.estimate == interval.low == interval.high == 7
+
+    def test_ratio_estimate_extrapolates_by_size(self):
+        """Unmeasured documents are estimated in proportion to their size."""
+        stratum = Stratum("txt:0", _documents([100, 100, 100, 300]))
+        stratum.measurements = [(100, 0, 1, 0), (100, 0, 3, 0)]
+        interval = estimate_total([stratum], 2)
+
+        assert interval.estimate == pytest.approx(12)
+        assert interval.low >= 4  # Never below what was measured
+        assert interval.low < interval.estimate < interval.high
+
+    def test_unmeasured_stratum_uses_pooled_ratio(self):
+        """A stratum whose sample failed borrows the ratio of the others."""
+        measured = Stratum("txt:0", _documents([100]))
+        measured.measurements = [(100, 0, 2, 0)]
+        failed = Stratum("pdf:0", _documents([50, 50], extension="pdf"))
+        interval = estimate_total([measured, failed], 2)
+        assert interval.estimate == pytest.approx(4)
+        assert interval.high > interval.estimate
+
+
+@pytest.mark.unit
+class TestPreviewService:
+    """Test measuring samples and forecasting runs."""
+
+    @pytest.fixture
+    def config(self, tmp_path):
+        """Create test config."""
+        return RaftConfig(
+            datapath=tmp_path,
+            output="output",
+            openai_key="test-key",
+            doctype="txt",
+            chunk_size=32,
+            chunking_strategy="fixed",
+            questions=2,
+            workers=2,
+        )
+
+    @pytest.fixture
+    def document_service(self, config):
+        """Create DocumentService instance."""
+        with patch("raft_toolkit.core.services.document_service.create_embedding_service"):
+            return DocumentService(config, Mock())
+
+    @pytest.fixture
+    def files(self, tmp_path):
+        """Create text files of varying length."""
+        paths = []
+        for i in range(6):
+            path = tmp_path / f"doc{i}.txt"
+            path.write_text(" ".join(f"word{j}" for j in range(40 * (i + 1))))
+            paths.append(path)
+        return paths
+
+    def test_preview_files_census(self, config, document_service, files):
+        """With every file sampled, the estimate equals the measured chunk count."""
+        expected = sum(len(document_service.measure_buffer(path.read_bytes(), path.name)[1]) for path in files)
+
+        estimate = PreviewService(config, document_service).preview_files(files)
+
+        assert estimate["sampled_documents"] == len(files)
+        assert estimate["chunks"] == {"estimate": expected, "low": expected, "high": expected}
+        assert estimate["qa_points"]["estimate"] == expected * 2
+        assert estimate["llm_calls"]["estimate"] == expected * 3
+        assert estimate["cost_usd"] is None
+
+    def test_preview_files_sample(self, config, document_service, files):
+        """A partial sample reports an interval around the estimate."""
+        config.preview_sample_size = 3
+        estimate = PreviewService(config, document_service).preview_files(files)
+
+        assert estimate["sampled_documents"] == 3
+        assert estimate["documents"] == len(files)
+        assert estimate["chunks"]["low"] <= estimate["chunks"]["estimate"] <= estimate["chunks"]["high"]
+
+    def test_unreadable_sample_returns_none(self, config, document_service, tmp_path):
+        """Nothing measurable yields no estimate so callers can fall back."""
+        missing = tmp_path / "gone.txt"
+        missing.write_text("text")
+        with patch.object(document_service, "measure_buffer", side_effect=ValueError("bad")):
+            assert PreviewService(config, document_service).preview_files([missing]) is None
+
+    def test_forecast_cost_and_worker_duration(self, config, document_service):
+        """Cost uses the per-million prices; without rate limits workers bound the duration."""
+        config.prompt_token_price = 1.0
+        config.completion_token_price = 2.0
+        forecast = PreviewService(config, document_service).forecast(
+            Interval(10, 10, 10), Interval(1000, 1000, 1000), Interval(1000, 1000, 1000)
+        )
+
+        assert forecast["llm_calls"]["estimate"] == 30
+        expected_cost = (
+            forecast["prompt_tokens"]["estimate"] * 1.0 + forecast["completion_tokens"]["estimate"] * 2.0
+        ) / 1e6
+        assert forecast["cost_usd"]["estimate"] == round(expected_cost, 2)
+        assert forecast["bottleneck"] == "workers"
+        assert forecast["duration_seconds"]["estimate"] == round(30 * ASSUMED_CALL_SECONDS / 2)
+
+    def test_forecast_rate_limited_duration(self, config, document_service):
+        """A tight request rate limit becomes the bottleneck."""
+        config.rate_limit_enabled = True
+        config.rate_limit_requests_per_minute = 6
+        forecast = PreviewService(config, document_service).forecast(
+            Interval(10, 8, 12), Interval(1000, 800, 1200), Interval(1000, 800, 1200)
+        )
+
+        assert forecast["bottleneck"] == "requests_per_minute"
+        assert forecast["duration_seconds"] == {"estimate": 300, "low": 240, "high": 360}
+
+    @pytest.mark.asyncio
+    async def test_input_service_preview(self, config, files, tmp_path):
+        """The input service preview attaches the sampled forecast."""
+        config.source_uri = str(tmp_path)
+        with patch("raft_toolkit.core.services.document_service.create_embedding_service"):
+            service = InputService(config, Mock())
+
+        preview = await service.get_processing_preview()
+
+        assert preview["supported_documents"] == len(files)
+        assert preview["estimate"]["sampled_documents"] == len(files)
+        assert preview["estimated_chunks"] == preview["estimate"]["chunks"]["estimate"]
+
+    @pytest.mark.asyncio
+    async def test_input_service_preview_without_sampling(self, config, files, tmp_path):
+        """A sample size of zero keeps the document count heuristic."""
+        config.source_uri = str(tmp_path)
+        config.preview_sample_size = 0
+        with patch("raft_toolkit.core.services.document_service.create_embedding_service"):
+            service = InputService(config, Mock())
+
+        preview = await service.get_processing_preview()
+
+        assert "estimate" not in preview
+        assert preview["estimated_chunks"] == len(files) * 3
+
+    def test_engine_local_preview(self, config, files, tmp_path):
+        """The legacy local preview keeps its keys and adds the forecast."""
+        from raft_toolkit.core.raft_engine import RaftEngine
+
+        with patch("raft_toolkit.core.services.document_service.create_embedding_service"):
+            engine = RaftEngine(config)
+
+        preview = engine.get_processing_preview(tmp_path)
+
+        assert len(preview["files_to_process"]) == len(files)
+        assert preview["estimate"]["documents"] == len(files)
+        assert preview["estimated_qa_points"] == preview["estimate"]["qa_points"]["estimate"]
@@ -113,6 +113,7 @@ class TestRaftEngine:
 
         mock_services["llm_service"].process_chunks_batch.return_value = [mock_result]
         mock_services["llm_service"].get_rate_limit_statistics.return_value = {}
+        mock_services["input_service"].get_pacing_statistics.return_value = {}
         mock_services["dataset_service"].create_dataset_from_results.return_value = [{}]
         mock_services["dataset_service"].save_dataset.return_value = None
 
@@ -177,6 +178,7 @@ class TestRaftEngine:
         ]
 
         mock_services["llm_service"].get_rate_limit_statistics.return_value = {}
+        mock_services["input_service"].get_pacing_statistics.return_value = {}
         mock_services["input_service"].get_source_info.return_value = {}
 
         stats = raft_engine._calculate_stats(results, 2.0)
@@ -186,3 +188,4 @@ class TestRaftEngine:
         assert stats["failed_chunks"] == 1
         assert stats["total_processing_time"] == 2.0
         assert stats["token_usage"]["total_tokens"] == 100
+        assert stats["pacing_time"] == 0.0
@@ -237,3 +237,84 @@ class TestRateLimiterIntegration:
         assert len(wait_times) == 10
         assert all(isinstance(wt, (int, float)) for wt in wait_times)
         assert all(wt >= 0 for wt in wait_times)
+
+
+@pytest.mark.unit
+class TestEmbeddingPacing:
+    """Test token-aware pacing of embedding requests."""
+
+    def test_pacing_disabled_without_limits(self):
+        """Test that pace alone does not throttle."""
+        from raft_toolkit.core.config import RaftConfig
+        from raft_toolkit.core.services.embedding_service import create_embedding_rate_limiter
+
+        assert create_embedding_rate_limiter(RaftConfig(pace=True)).config.enabled is False
+        assert (
+            create_embedding_rate_limiter(
+                RaftConfig(pace=False, embedding_rate_limit_tokens_per_minute=1000)
+            ).config.enabled
+            is False
+        )
+
+    def test_rate_limited_embeddings_batches_by_token_budget(self):
+        """Test that requests are batched and only throttled near the budget."""
+        from unittest.mock import Mock
+
+        from raft_toolkit.core.config import RaftConfig
+        from raft_toolkit.core.services.embedding_service import create_embedding_rate_limiter, rate_limit_embeddings
+
+        limiter = create_embedding_rate_limiter(RaftConfig(pace=True, embedding_rate_limit_tokens_per_minute=100000))
+        model = Mock()
+        model.embed_documents.side_effect = lambda texts: [[0.0] for _ in texts]
+        embeddings = rate_limit_embeddings(model, limiter)
+        texts = [" ".join(["token"] * 500)] * 50
+
+        with patch("raft_toolkit.core.utils.rate_limiter.time.sleep") as mock_sleep:
+            vectors = embeddings.embed_documents(texts)
+
+        assert len(vectors) == 50
+        assert model.embed_documents.call_count > 1
+        assert all(len(call.args[0]) * 500 <= 10000 for call in model.embed_documents.call_args_list)
+        mock_sleep.assert_not_called()
+        assert limiter.get_statistics()["total_wait_time"] == 0.0
+
+    def test_rate_limited_embeddings_waits_when_exhausted(self):
+        """Test that exhausting the token budget records pacing time."""
+        from unittest.mock import Mock
+
+        from raft_toolkit.core.config import RaftConfig
+        from raft_toolkit.core.services.embedding_service import create_embedding_rate_limiter, rate_limit_embeddings
+
+        limiter = create_embedding_rate_limiter(RaftConfig(pace=True, embedding_rate_limit_tokens_per_minute=1000))
+        model = Mock()
+        model.embed_documents.side_effect = lambda texts: [[0.0] for _ in texts]
+        embeddings = rate_limit_embeddings(model, limiter)
+
+        with patch("raft_toolkit.core.utils.rate_limiter.time.sleep"):
+            embeddings.embed_documents([" ".join(["token"] * 100)] * 15)
+
+        stats = limiter.get_statistics()
+        assert stats["rate_limit_hits"] > 0
+        assert stats["total_wait_time"] > 0
+
+    def test_document_processing_does_not_sleep(self, tmp_path):
+        """Test that pace no longer adds a fixed sleep per file."""
+        from unittest.mock import Mock
+
+        from raft_toolkit.core.config import RaftConfig
+        from raft_toolkit.core.services.document_service import DocumentService
+
+        for i in range(5):
+            (tmp_path / f"doc{i}.txt").write_text("Some text. More text.")
+        config = RaftConfig(doctype="txt", chunking_strategy="fixed", pace=True, openai_key="test-key")
+
+        with patch("raft_toolkit.core.services.document_service.create_embedding_service") as mock_create:
+            mock_create.return_value.create_embeddings_with_template.side_effect = lambda chunks: chunks
+            service = DocumentService(config, Mock())
+
+        start = time.time()
+        chunks = service.process_documents(tmp_path)
+
+        assert len(chunks) == 5
+        assert time.time() - start < 5
+        assert service.get_pacing_statistics()["total_wait_time"] == 0.0
@@ -2,9 +2,14 @@
 Unit tests for input sources.
 """
 
+import asyncio
+import json
+import os
 import tempfile
+import threading
+import time
 from pathlib import Path
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
@@ -236,3 +241,816 @@ class TestInputSourceFactory:
             assert config.include_patterns == include_patterns
         if hasattr(config, "exclude_patterns"):
             assert config.exclude_patterns == exclude_patterns
+
+
+@pytest.mark.unit
+class TestStreamingListing:
+    """Test page-by-page document listing."""
+
+    @staticmethod
+    def s3_pages(total, page_size=1000):
+        """Fake ListObjectsV2 responses for ``total`` objects."""
+        pages = []
+        for start in range(0, total, page_size):
+            end = min(start + page_size, total)
+            pages.append(
+                {
+                    "Contents": [{"Key": f"docs/file{i}.txt", "Size": 10} for i in range(start, end)],
+                    "IsTruncated": end < total,
+                    "NextContinuationToken": str(end),
+                }
+            )
+        return pages
+
+    @pytest.fixture
+    def s3_source(self):
+        pytest.importorskip("boto3")
+        from raft_toolkit.core.sources.s3 import S3InputSource
+
+        source = S3InputSource(
+            InputSourceConfig(source_type="s3", source_uri="s3://bucket/docs", supported_types=["txt"])
+        )
+        source._validated = True
+        source.s3_client = Mock()
+        return source
+
+    @pytest.mark.asyncio
+    async def test_s3_lists_beyond_ten_thousand(self, s3_source):
+        """Test that S3 listing is no longer capped at 10,000 objects."""
+        s3_source.s3_client.list_objects_v2.side_effect = self.s3_pages(12_500)
+
+        documents = await s3_source.list_documents()
+
+        assert len(documents) == 12_500
+        assert s3_source.s3_client.list_objects_v2.call_count == 13
+
+    @pytest.mark.asyncio
+    async def test_s3_limit_stops_listing_early(self, s3_source):
+        """Test that a limit stops requesting further pages."""
+        s3_source.s3_client.list_objects_v2.side_effect = self.s3_pages(50_000)
+
+        documents = [doc async for doc in s3_source.iter_documents(limit=1500)]
+
+        assert len(documents) == 1500
+        assert s3_source.s3_client.list_objects_v2.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_sharepoint_yields_pages(self):
+        """Test that SharePoint listing follows nextLink pages without a cap."""
+        pytest.importorskip("msal")
+        from raft_toolkit.core.sources.sharepoint import SharePointInputSource
+
+        source = SharePointInputSource(
+            InputSourceConfig(
+                source_type="sharepoint",
+                source_uri="https://contoso.sharepoint.com/sites/team/Documents",
+                supported_types=["txt"],
+            )
+        )
+        source._validated = True
+
+        def page(index, last):
+            response = Mock(status_code=200)
+            items = [
+                {
+                    "id": f"{index}-{i}",
+                    "file": {"mimeType": "text/plain"},
+                    "fields": {"FileLeafRef": f"f{index}-{i}.txt"},
+                }
+                for i in range(3)
+            ]
+            response.json.return_value = {"value": items, **({} if last else {"@odata.nextLink": f"next{index}"})}
+            return response
+
+        source.session = Mock()
+        source.session.get.side_effect = [page(i, i == 3) for i in range(4)]
+
+        documents = [doc async for doc in source.iter_documents()]
+
+        assert len(documents) == 12
+        assert source.session.get.call_count == 4
+
+    @pytest.mark.asyncio
+    async def test_local_iter_documents_limit(self, tmp_path):
+        """Test streaming local listing with a limit."""
+        for i in range(7):
+            (tmp_path / f"doc{i}.txt").write_text("content")
+        source = LocalInputSource(
+            InputSourceConfig(source_type="local", source_uri=str(tmp_path), batch_size=2, max_documents=5)
+        )
+
+        assert len([doc async for doc in source.iter_documents()]) == 7
+        assert len(await source.list_documents()) == 5
+
+    @pytest.mark.asyncio
+    async def test_processing_starts_before_listing_completes(self):
+        """Test that InputService processes batches while the source is still listing."""
+        from raft_toolkit.core.config import RaftConfig
+        from raft_toolkit.core.services.input_service import InputService
+
+        events = []
+
+        async def iter_documents(limit=None):
+            for i in range(6):
+                events.append(f"listed {i}")
+                await asyncio.sleep(0)
+                yield Mock(source_path=f"/docs/{i}.txt")
+
+        async def process(batch):
+            events.append(f"processed {len(batch)}")
+            return []
+
+        config = RaftConfig(openai_key="test-key", source_type="local", source_uri="/docs", source_batch_size=2)
+        with (
+            patch("raft_toolkit.core.services.input_service.DocumentService"),
+            patch("raft_toolkit.core.services.input_service.InputSourceFactory.create_source"),
+        ):
+            service = InputService(config, Mock())
+        service.input_source.iter_documents = iter_documents
+        service.input_source.commit = AsyncMock()
+
+        with patch.object(service, "_process_local_documents", side_effect=process):
+            await service.process_documents()
+
+        assert events.index("processed 2") < events.index("listed 5")
+        assert events.count("processed 2") == 3
+
+
+@pytest.mark.unit
+class TestLocalWalker:
+    """Test the pruned local directory walker and glob filtering."""
+
+    @pytest.fixture
+    def tree(self, tmp_path):
+        """Create a small monorepo-like tree."""
+        for relative in [
+            "readme.txt",
+            "notes.tmp",
+            "docs/a.pdf",
+            "docs/guide/b.pdf",
+            "docs/guide/c.txt",
+            "src/node_modules/pkg/d.txt",
+            "node_modules/e.txt",
+            "build/out/f.txt",
+            "temp/g.txt",
+            "src/temp/h.txt",
+        ]:
+            path = tmp_path / relative
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(relative)
+        return tmp_path
+
+    def make_source(self, root, include=None, exclude=None, **options):
+        return LocalInputSource(
+            InputSourceConfig(
+                source_type="local",
+                source_uri=str(root),
+                supported_types=["txt", "pdf"],
+                include_patterns=include or ["**/*"],
+                exclude_patterns=exclude or [],
+                batch_size=2,
+                options=options,
+            )
+        )
+
+    @staticmethod
+    def relative(documents):
+        return [doc.metadata["relative_path"] for doc in documents]
+
+    @pytest.mark.asyncio
+    async def test_lists_supported_files_in_sorted_order(self, tree):
+        """Test sequential listing order and extension filtering."""
+        documents = await self.make_source(tree).list_documents()
+
+        assert self.relative(documents) == sorted(self.relative(documents))
+        assert "notes.tmp" not in self.relative(documents)
+        assert len(documents) == 9
+        assert documents[0].source_path == str(tree.resolve() / documents[0].metadata["relative_path"])
+
+    @pytest.mark.asyncio
+    async def test_glob_include_and_exclude(self, tree):
+        """Test that patterns are globs rather than substrings."""
+        source = self.make_source(
+            tree, include=["docs/**/*.pdf", "*.txt"], exclude=["node_modules", "build/**", "temp/*"]
+        )
+
+        documents = await source.list_documents()
+
+        assert sorted(self.relative(documents)) == [
+            "docs/a.pdf",
+            "docs/guide/b.pdf",
+            "docs/guide/c.txt",
+            "readme.txt",
+            "src/temp/h.txt",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_excluded_directories_are_not_walked(self, tree):
+        """Test that excluded directories are pruned before descending."""
+        source = self.make_source(tree, exclude=["node_modules", "build/**"])
+        scanned = []
+        real_scandir = os.scandir
+
+        def recording_scandir(path):
+            scanned.append(os.path.relpath(path, tree.resolve()))
+            return real_scandir(path)
+
+        with patch("raft_toolkit.core.sources.local.os.scandir", side_effect=recording_scandir):
+            await source.list_documents()
+
+        assert not any("node_modules" in path or path.startswith("build") for path in scanned)
+        assert "src/temp" in scanned
+
+    @pytest.mark.asyncio
+    async def test_parallel_walk_lists_same_files(self, tree):
+        """Test that walking top-level subtrees in parallel finds the same documents."""
+        sequential = await self.make_source(tree, exclude=["temp"]).list_documents()
+        parallel = await self.make_source(tree, exclude=["temp"], walk_workers=3).list_documents()
+
+        assert sorted(self.relative(parallel)) == self.relative(sequential)
+
+    @pytest.mark.asyncio
+    async def test_non_recursive_lists_top_level_only(self, tree):
+        """Test that recursion can be disabled."""
+        source = self.make_source(tree)
+        source.config.recursive = False
+
+        assert self.relative(await source.list_documents()) == ["readme.txt"]
+
+    def test_remote_paths_are_matched_relative_to_source_root(self):
+        """Test that S3-style documents are matched below the source URI."""
+        from raft_toolkit.core.sources.base import SourceDocument
+
+        source = self.make_source(".", include=["reports/*.txt"])
+        source.config.source_uri = "s3://bucket/docs/"
+        documents = [
+            SourceDocument(name="a.txt", source_path="s3://bucket/docs/reports/a.txt", content_type="text/plain"),
+            SourceDocument(name="b.txt", source_path="s3://bucket/docs/other/reports/b.txt", content_type="text/plain"),
+        ]
+
+        assert [doc.name for doc in source._filter_documents(documents)] == ["a.txt"]
+
+
+@pytest.mark.unit
+class TestS3Transfers:
+    """Test S3 prefix fan-out listing and ranged downloads against moto."""
+
+    @pytest.fixture
+    def bucket(self, monkeypatch):
+        """Create a mocked bucket with objects spread over several prefixes."""
+        moto = pytest.importorskip("moto")
+        import boto3
+
+        monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+        monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+        monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+
+        with moto.mock_aws():
+            client = boto3.client("s3", region_name="us-east-1")
+            client.create_bucket(Bucket="corpus")
+            client.put_object(Bucket="corpus", Key="docs/readme.txt", Body=b"top level")
+            for team in ("alpha", "beta", "gamma"):
+                for i in range(5):
+                    client.put_object(Bucket="corpus", Key=f"docs/{team}/nested/file{i}.txt", Body=b"text")
+            client.put_object(Bucket="corpus", Key="docs/alpha/", Body=b"")
+            yield client
+
+    def make_source(self, **options):
+        from raft_toolkit.core.sources.s3 import S3InputSource
+
+        return S3InputSource(
+            InputSourceConfig(
+                source_type="s3",
+                source_uri="s3://corpus/docs/",
+                supported_types=["txt", "pdf"],
+                max_concurrency=2,
+                options=options,
+            )
+        )
+
+    @pytest.mark.asyncio
+    async def test_fanout_lists_every_object_once(self, bucket):
+        """Test that prefix fan-out finds top-level and nested objects exactly once."""
+        source = self.make_source()
+
+        documents = await source.list_documents()
+        await source.close()
+
+        keys = sorted(doc.metadata["s3_key"] for doc in documents)
+        assert len(keys) == 16 and len(set(keys)) == 16
+        assert "docs/readme.txt" in keys
+        assert "docs/gamma/nested/file4.txt" in keys
+
+    @pytest.mark.asyncio
+    async def test_fanout_lists_prefixes_concurrently(self, bucket):
+        """Test that discovered prefixes are listed in parallel."""
+        source = self.make_source()
+        real_call = source._call
+        in_flight = {"now": 0, "max": 0}
+
+        async def tracking_call(method, **kwargs):
+            if method == "list_objects_v2" and "Delimiter" not in kwargs:
+                in_flight["now"] += 1
+                in_flight["max"] = max(in_flight["max"], in_flight["now"])
+                await asyncio.sleep(0.02)
+                try:
+                    return await real_call(method, **kwargs)
+                finally:
+                    in_flight["now"] -= 1
+            return await real_call(method, **kwargs)
+
+        source._call = tracking_call
+        await source.list_documents()
+
+        assert in_flight["max"] == 2
+
+    @pytest.mark.asyncio
+    async def test_ranged_download_matches_object(self, bucket):
+        """Test that concurrent byte-range GETs reassemble the object exactly."""
+        payload = bytes(range(256)) * 4000 + b"tail"
+        bucket.put_object(Bucket="corpus", Key="docs/large.pdf", Body=payload)
+        source = self.make_source(multipart_threshold=1024, part_size=100_000, part_concurrency=3)
+
+        documents = [doc for doc in await source.list_documents() if doc.name == "large.pdf"]
+        ranged_calls = []
+        real_call = source._call
+
+        async def recording_call(method, **kwargs):
+            if "Range" in kwargs:
+                ranged_calls.append(kwargs["Range"])
+            return await real_call(method, **kwargs)
+
+        source._call = recording_call
+        document = await source.get_document(documents[0])
+
+        assert bytes(document.content) == payload
+        assert len(ranged_calls) == 11
+        assert document.metadata["etag"]
+
+    @pytest.mark.asyncio
+    async def test_ranged_download_falls_back_when_object_changes(self, bucket):
+        """Test that an overwritten object is fetched whole instead of mixing versions."""
+        bucket.put_object(Bucket="corpus", Key="docs/large.pdf", Body=b"a" * 5000)
+        source = self.make_source(multipart_threshold=1024, part_size=1000)
+        document = [doc for doc in await source.list_documents() if doc.name == "large.pdf"][0]
+        bucket.put_object(Bucket="corpus", Key="docs/large.pdf", Body=b"b" * 3000)
+
+        document = await source.get_document(document)
+
+        assert bytes(document.content) == b"b" * 3000
+
+    def test_client_pool_is_sized_for_concurrency(self, bucket):
+        """Test that the shared client's connection pool covers all parallel ranges."""
+        source = self.make_source(part_concurrency=8)
+
+        assert source.max_pool_connections == 16
+        assert source.s3_client.meta.config.max_pool_connections == 16
+
+    @pytest.mark.asyncio
+    async def test_blob_cache_skips_unchanged_objects(self, bucket, tmp_path):
+        """Test that unchanged objects are served from the cache and changed ones downloaded again."""
+        cache_dir = str(tmp_path / "blobs")
+        first = self.make_source(cache_dir=cache_dir)
+        fetched = [doc async for doc in first.get_documents(await first.list_documents())]
+        await first.close()
+        bucket.put_object(Bucket="corpus", Key="docs/readme.txt", Body=b"changed")
+
+        second = self.make_source(cache_dir=cache_dir)
+        second.get_document = AsyncMock(wraps=second.get_document)
+        refetched = {doc.source_path: doc async for doc in second.get_documents(await second.list_documents())}
+        await second.close()
+
+        assert len(fetched) == len(refetched) == 16
+        assert second.get_document.await_count == 1
+        assert refetched["s3://corpus/docs/readme.txt"].content == b"changed"
+        assert second.blob_cache.get_statistics()["hits"] == 15
+
+
+@pytest.mark.unit
+class TestBlobCache:
+    """Test the size-bounded source blob cache."""
+
+    def test_key_depends_on_version(self):
+        """Test that a new version never matches an old entry."""
+        from raft_toolkit.core.sources import BlobCache
+
+        assert BlobCache.key("s3://b/a.txt", "etag-1") != BlobCache.key("s3://b/a.txt", "etag-2")
+        assert BlobCache.key("s3://b/a.txt", "etag-1") != BlobCache.key("s3://b/b.txt", "etag-1")
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        """Test that reads refresh entries and the oldest unread entry is evicted."""
+        from raft_toolkit.core.sources import BlobCache
+
+        cache = BlobCache(tmp_path, max_size=250)
+        cache.put("a" * 64, b"a" * 100)
+        cache.put("b" * 64, b"b" * 100)
+        assert cache.get("a" * 64) == b"a" * 100
+        cache.put("c" * 64, b"c" * 100)
+
+        assert cache.get("b" * 64) is None
+        assert cache.get("a" * 64) == b"a" * 100
+        stats = cache.get_statistics()
+        assert stats["evictions"] == 1 and stats["size_bytes"] == 200
+
+    def test_index_survives_restart(self, tmp_path):
+        """Test that entries and their order are reloaded and the bound enforced."""
+        from raft_toolkit.core.sources import BlobCache
+
+        cache = BlobCache(tmp_path, max_size=1000)
+        cache.put("a" * 64, b"x" * 100)
+        cache.put("b" * 64, b"y" * 100)
+
+        reopened = BlobCache(tmp_path, max_size=1000)
+        assert "a" * 64 in reopened and reopened.size == 200
+        assert BlobCache(tmp_path, max_size=150).get_statistics()["entries"] == 1
+
+    def test_oversized_blobs_are_not_cached(self, tmp_path):
+        """Test that a blob larger than the cache is skipped."""
+        from raft_toolkit.core.sources import BlobCache
+
+        cache = BlobCache(tmp_path, max_size=10)
+        cache.put("a" * 64, b"x" * 11)
+
+        assert "a" * 64 not in cache
+
+
+class FakeGraph:
+    """Minimal Graph API stand-in serving drive delta pages."""
+
+    DRIVE_URL = "https://graph.microsoft.com/v1.0/sites/site-1/lists/lib-1/drive"
+    FOLDER_URL = "https://graph.microsoft.com/v1.0/drives/drive-1/root:/Reports"
+    ROOT_DELTA = "https://graph.microsoft.com/v1.0/drives/drive-1/root/delta"
+
+    def __init__(self):
+        self.routes = {self.DRIVE_URL: [{"id": "drive-1"}], self.FOLDER_URL: [{"id": "reports"}]}
+        self.requests = []
+
+    def serve(self, url, *pages, status=200):
+        """Serve ``pages`` from ``url``, chained with nextLinks."""
+        self.routes[url] = (status, list(pages))
+
+    def get(self, url, params=None):
+        self.requests.append(url)
+        route = self.routes[url]
+        if isinstance(route, list):
+            return self._response(200, route[0])
+        status, pages = route
+        return self._response(status, pages[0] if pages else {})
+
+    @staticmethod
+    def _response(status, body):
+        response = Mock(status_code=status, text=str(body))
+        response.json.return_value = body
+        return response
+
+    @staticmethod
+    def item(item_id, name, ctag, parent="reports", **extra):
+        """A file as the delta API returns it: the parent reference has an id but no path."""
+        return {
+            "id": item_id,
+            "name": name,
+            "cTag": ctag,
+            "size": 10,
+            "file": {"mimeType": "text/plain"},
+            "parentReference": {"driveId": "drive-1", "id": parent},
+            "@microsoft.graph.downloadUrl": f"https://download/{item_id}",
+            **extra,
+        }
+
+    @staticmethod
+    def folder(item_id, name, parent="root"):
+        return {"id": item_id, "name": name, "folder": {}, "parentReference": {"driveId": "drive-1", "id": parent}}
+
+    ROOT = {"id": "root", "name": "root", "root": {}, "folder": {}, "parentReference": {"driveId": "drive-1"}}
+
+
+@pytest.mark.unit
+class TestSharePointDeltaSync:
+    """Test incremental SharePoint sync with the drive delta API."""
+
+    @pytest.fixture
+    def make_source(self, tmp_path):
+        pytest.importorskip("msal")
+        from raft_toolkit.core.sources.sharepoint import SharePointInputSource
+
+        def build(graph):
+            source = SharePointInputSource(
+                InputSourceConfig(
+                    source_type="sharepoint",
+                    source_uri="https://contoso.sharepoint.com/sites/team/Documents/Reports",
+                    supported_types=["txt"],
+                    options={"delta_state_path": str(tmp_path / "delta.json")},
+                )
+            )
+            source._validated = True
+            source.site_id, source.library_id = "site-1", "lib-1"
+            source.session = graph
+            return source
+
+        return build
+
+    @pytest.fixture
+    def first_sync(self, make_source):
+        """Run an initial full sync and commit it."""
+
+        async def run():
+            graph = FakeGraph()
+            graph.serve(
+                FakeGraph.ROOT_DELTA,
+                {
+                    "value": [
+                        FakeGraph.ROOT,
+                        FakeGraph.folder("reports", "Reports"),
+                        FakeGraph.folder("archive", "Archive"),
+                        FakeGraph.item("1", "a.txt", "c1"),
+                        FakeGraph.item("2", "b.txt", "c2", parent="4"),
+                        FakeGraph.item("3", "other.txt", "c3", parent="archive"),
+                        FakeGraph.folder("4", "2024", parent="reports"),
+                    ],
+                    "@odata.nextLink": "page-2",
+                },
+            )
+            graph.serve(
+                "page-2",
+                {"value": [FakeGraph.item("5", "c.txt", "c5")], "@odata.deltaLink": "delta-1"},
+            )
+            source = make_source(graph)
+            documents = await source.list_documents()
+            await source.commit()
+            return documents
+
+        return run
+
+    @pytest.mark.asyncio
+    async def test_initial_sync_lists_scoped_files_and_saves_state(self, first_sync, tmp_path):
+        """Test that the first run enumerates every file in the folder and persists the delta link."""
+        documents = await first_sync()
+
+        assert sorted(doc.name for doc in documents) == ["a.txt", "b.txt", "c.txt"]
+        assert documents[0].metadata["drive_id"] == "drive-1"
+        paths = {doc.name: doc.source_path for doc in documents}
+        assert paths["b.txt"] == "https://contoso.sharepoint.com/sites/team/Documents/Reports/2024/b.txt"
+        state = json.loads((tmp_path / "delta.json").read_text())
+        assert state["delta_link"] == "delta-1"
+        assert set(state["items"]) == {"1", "2", "5"}
+        assert state["extra"]["folders"]["4"] == ["reports", "2024"]
+
+    @pytest.mark.asyncio
+    async def test_incremental_sync_returns_only_content_changes(self, first_sync, make_source, tmp_path):
+        """Test that later runs fetch changes only and skip metadata-only edits."""
+        await first_sync()
+        graph = FakeGraph()
+        graph.serve(
+            "delta-1",
+            {
+                "value": [
+                    FakeGraph.item("1", "a-renamed.txt", "c1"),
+                    FakeGraph.item("2", "b.txt", "c2-new", parent="4"),
+                    FakeGraph.item("6", "new.txt", "c6"),
+                    FakeGraph.item("7", "archived.txt", "c7", parent="archive"),
+                    {"id": "5", "deleted": {"state": "deleted"}},
+                ],
+                "@odata.deltaLink": "delta-2",
+            },
+        )
+        source = make_source(graph)
+
+        documents = await source.list_documents()
+        await source.commit()
+
+        assert sorted(doc.name for doc in documents) == ["b.txt", "new.txt"]
+        assert [item["id"] for item in source.removed_items] == ["5"]
+        assert source.get_sync_statistics()["unchanged"] == 1
+        assert FakeGraph.ROOT_DELTA not in graph.requests
+        state = json.loads((tmp_path / "delta.json").read_text())
+        assert state["delta_link"] == "delta-2"
+        assert set(state["items"]) == {"1", "2", "6"}
+
+    @pytest.mark.asyncio
+    async def test_folder_moved_out_of_scope(self, first_sync, make_source):
+        """Test that files under a folder moved out of the library folder are removed."""
+        await first_sync()
+        graph = FakeGraph()
+        graph.serve(
+            "delta-1",
+            {"value": [FakeGraph.folder("4", "2024", parent="archive")], "@odata.deltaLink": "delta-2"},
+        )
+        source = make_source(graph)
+
+        assert await source.list_documents() == []
+        assert [item["id"] for item in source.removed_items] == ["2"]
+
+    @pytest.mark.asyncio
+    async def test_files_listed_before_their_folder(self, make_source):
+        """Test that files whose folder arrives on a later page are scoped at the end of the listing."""
+        graph = FakeGraph()
+        graph.serve(
+            FakeGraph.ROOT_DELTA,
+            {
+                "value": [FakeGraph.ROOT, FakeGraph.item("1", "late.txt", "c1", parent="9")],
+                "@odata.nextLink": "page-2",
+            },
+        )
+        graph.serve(
+            "page-2",
+            {
+                "value": [FakeGraph.folder("reports", "Reports"), FakeGraph.folder("9", "2025", parent="reports")],
+                "@odata.deltaLink": "delta-1",
+            },
+        )
+
+        documents = await make_source(graph).list_documents()
+
+        assert [doc.source_path for doc in documents] == [
+            "https://contoso.sharepoint.com/sites/team/Documents/Reports/2025/late.txt"
+        ]
+
+    @pytest.mark.asyncio
+    async def test_uncommitted_listing_is_not_persisted(self, make_source, tmp_path):
+        """Test that the cursor only advances on commit."""
+        graph = FakeGraph()
+        graph.serve(FakeGraph.ROOT_DELTA, {"value": [FakeGraph.item("1", "a.txt", "c1")], "@odata.deltaLink": "d"})
+
+        await make_source(graph).list_documents()
+
+        assert not (tmp_path / "delta.json").exists()
+
+    @pytest.mark.asyncio
+    async def test_expired_delta_link_triggers_full_resync(self, first_sync, make_source):
+        """Test 410 Gone handling and skipping of unchanged items on resync."""
+        await first_sync()
+        graph = FakeGraph()
+        graph.serve("delta-1", {}, status=410)
+        graph.serve(
+            FakeGraph.ROOT_DELTA,
+            {
+                "value": [
+                    FakeGraph.ROOT,
+                    FakeGraph.folder("reports", "Reports"),
+                    FakeGraph.folder("4", "2024", parent="reports"),
+                    FakeGraph.item("1", "a.txt", "c1"),
+                    FakeGraph.item("2", "b.txt", "c2b", parent="4"),
+                ],
+                "@odata.deltaLink": "delta-3",
+            },
+        )
+        source = make_source(graph)
+
+        documents = await source.list_documents()
+
+        assert [doc.name for doc in documents] == ["b.txt"]
+        assert [item["id"] for item in source.removed_items] == ["5"]
+        assert source.get_sync_statistics()["full_sync"] is True
+
+
+class FakeBatchGraph(FakeGraph):
+    """Graph stand-in that also answers JSON $batch requests for drive items."""
+
+    def __init__(self, throttle_first=0, retry_after="0"):
+        super().__init__()
+        self.batches = []
+        self.throttle_first = throttle_first
+        self.retry_after = retry_after
+
+    def post(self, url, json=None):
+        assert url.endswith("/$batch")
+        self.batches.append(json["requests"])
+        responses = []
+        for request in json["requests"]:
+            if self.throttle_first:
+                self.throttle_first -= 1
+                responses.append({"id": request["id"], "status": 429, "headers": {"Retry-After": self.retry_after}})
+                continue
+            item_id = request["url"].split("/items/")[1].split("?")[0]
+            body = {"id": item_id, "@microsoft.graph.downloadUrl": f"https://download/{item_id}"}
+            responses.append({"id": request["id"], "status": 200, "body": body})
+        return self._response(200, {"responses": responses})
+
+
+@pytest.mark.unit
+class TestSharePointRequests:
+    """Test batched Graph lookups, throttling and the request pool."""
+
+    @pytest.fixture
+    def make_source(self):
+        pytest.importorskip("msal")
+        from raft_toolkit.core.sources.sharepoint import SharePointInputSource
+
+        def build(session, **options):
+            source = SharePointInputSource(
+                InputSourceConfig(
+                    source_type="sharepoint",
+                    source_uri="https://contoso.sharepoint.com/sites/team/Documents",
+                    supported_types=["txt"],
+                    max_concurrency=4,
+                    options=options,
+                )
+            )
+            source._validated = True
+            source.site_id, source.library_id = "site-1", "lib-1"
+            source.session = session
+            return source
+
+        return build
+
+    @staticmethod
+    def listed(count, download_url=None):
+        from raft_toolkit.core.sources.base import SourceDocument
+
+        return [
+            SourceDocument(
+                name=f"doc{i}.txt",
+                source_path=f"https://contoso.sharepoint.com/sites/team/Documents/doc{i}.txt",
+                content_type="text/plain",
+                metadata={"drive_item_id": f"item-{i}", "download_url": download_url, "listed_at": 0},
+            )
+            for i in range(count)
+        ]
+
+    @pytest.mark.asyncio
+    async def test_download_urls_resolved_in_batches_of_twenty(self, make_source):
+        """Test that 45 lookups are sent as three $batch calls."""
+        graph = FakeBatchGraph()
+        source = make_source(graph)
+        documents = self.listed(45, download_url="https://expired")
+
+        await source.prepare_documents(documents)
+
+        assert [len(batch) for batch in sorted(graph.batches, key=len, reverse=True)] == [20, 20, 5]
+        assert all(doc.metadata["download_url"] == f"https://download/item-{i}" for i, doc in enumerate(documents))
+        stats = source.metrics.as_dict()
+        assert stats["batches"] == 3
+        assert stats["batch_fill_ratio"] == pytest.approx(0.75)
+
+    @pytest.mark.asyncio
+    async def test_fresh_download_urls_are_not_looked_up(self, make_source):
+        """Test that recently listed URLs are used as-is."""
+        graph = FakeBatchGraph()
+        source = make_source(graph)
+        documents = self.listed(3, download_url="https://fresh")
+        for doc in documents:
+            doc.metadata["listed_at"] = time.time()
+
+        await source.prepare_documents(documents)
+
+        assert graph.batches == []
+
+    @pytest.mark.asyncio
+    async def test_throttled_batch_items_are_retried(self, make_source):
+        """Test that throttled sub-requests are retried after their Retry-After."""
+        graph = FakeBatchGraph(throttle_first=2, retry_after="3")
+        source = make_source(graph)
+        documents = self.listed(5)
+
+        with patch("raft_toolkit.core.sources.sharepoint.asyncio.sleep", new=AsyncMock()) as sleep:
+            await source.prepare_documents(documents)
+
+        sleep.assert_awaited_once_with(3.0)
+        assert [len(batch) for batch in graph.batches] == [5, 2]
+        assert all(doc.metadata["download_url"] for doc in documents)
+        assert source.metrics.as_dict()["throttled_requests"] == 1
+
+    @pytest.mark.asyncio
+    async def test_429_honours_retry_after(self, make_source):
+        """Test that a throttled download waits for Retry-After before retrying."""
+        throttled = Mock(status_code=429, headers={"Retry-After": "2"})
+        ok = Mock(status_code=200, content=b"payload")
+        session = Mock()
+        session.get.side_effect = [throttled, ok]
+        source = make_source(session)
+        document = self.listed(1, download_url="https://download/item-0")[0]
+
+        with patch("raft_toolkit.core.sources.sharepoint.asyncio.sleep", new=AsyncMock()) as sleep:
+            result = await source.get_document(document)
+
+        assert result.content == b"payload"
+        sleep.assert_awaited_once_with(2.0)
+        stats = source.metrics.as_dict()
+        assert stats["throttled_requests"] == 1
+        assert stats["throttle_wait_seconds"] == 2.0
+
+    @pytest.mark.asyncio
+    async def test_downloads_run_on_bounded_pool(self, make_source):
+        """Test that downloads use the dedicated pool and report its size and depth."""
+        threads = set()
+
+        def get(url, **kwargs):
+            threads.add(threading.current_thread().name)
+            time.sleep(0.01)
+            return Mock(status_code=200, content=url.encode())
+
+        session = Mock()
+        session.get.side_effect = get
+        source = make_source(session, request_workers=2)
+        documents = self.listed(8, download_url="https://download/x")
+        for doc in documents:
+            doc.metadata["listed_at"] = time.time()
+
+        fetched = [doc async for doc in source.get_documents(documents)]
+        await source.close()
+
+        assert len(fetched) == 8
+        assert len(threads) <= 2 and all(name.startswith("raft-sharepoint") for name in threads)
+        stats = source.metrics.as_dict()
+        assert stats["pool_size"] == 2
+        assert 1 <= stats["max_pool_depth"] <= 4
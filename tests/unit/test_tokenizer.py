@@ -0,0 +1,100 @@
+"""
+Tests for tokenizer helpers and token-budget chunking.
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from raft_toolkit.core.utils.tokenizer import RegexTokenizer, get_tokenizer, split_fixed, split_sentences
+
+
+@pytest.mark.unit
+class TestTokenizer:
+    """Test tokenizer selection and offsets."""
+
+    def test_regex_offsets_cover_text(self):
+        """Test that fallback tokens start at increasing offsets covering the text."""
+        text = "Hello, world! Tokenization_is approximately 1234567 tokens."
+        offsets = RegexTokenizer().token_offsets(text)
+
+        assert offsets[0] == 0
+        assert offsets == sorted(set(offsets))
+        assert RegexTokenizer().count(text) == len(offsets)
+
+    def test_regex_approximates_bpe_ratio(self):
+        """Test that the fallback yields roughly 1.3 tokens per English word."""
+        text = "The quick brown fox jumps over the lazy dog near the riverbank " * 10
+
+        ratio = RegexTokenizer().count(text) / len(text.split())
+
+        assert 1.0 <= ratio <= 2.0
+
+    def test_fallback_when_encoding_unavailable(self):
+        """Test that get_tokenizer falls back when tiktoken cannot load."""
+        get_tokenizer.cache_clear()
+        try:
+            with patch("raft_toolkit.core.utils.tokenizer.tiktoken") as mock_tiktoken:
+                mock_tiktoken.get_encoding.side_effect = OSError("offline")
+                assert isinstance(get_tokenizer("cl100k_base"), RegexTokenizer)
+        finally:
+            get_tokenizer.cache_clear()
+
+
+@pytest.mark.unit
+class TestTokenChunking:
+    """Test fixed and sentence chunkers on token offsets."""
+
+    @pytest.fixture
+    def tokenizer(self):
+        return RegexTokenizer()
+
+    def test_split_fixed_counts_and_overlap(self, tokenizer):
+        """Test window sizes and overlap."""
+        text = " ".join(f"w{i}" for i in range(100))
+        offsets = tokenizer.token_offsets(text)
+
+        chunks = split_fixed(text, offsets, chunk_size=30, overlap=10)
+
+        assert [count for _, count in chunks[:-1]] == [30] * (len(chunks) - 1)
+        shared = text[offsets[20] : offsets[30]]
+        assert chunks[0][0].endswith(shared) and chunks[1][0].startswith(shared)
+        assert chunks[-1][0].endswith("w99")
+        assert sum(count for _, count in chunks) - 10 * (len(chunks) - 1) == len(offsets)
+
+    def test_split_fixed_rejects_bad_overlap(self, tokenizer):
+        """Test overlap validation."""
+        with pytest.raises(ValueError, match="overlap"):
+            split_fixed("text", tokenizer.token_offsets("text"), chunk_size=5, overlap=5)
+
+    def test_split_sentences_packs_whole_sentences(self, tokenizer):
+        """Test that sentences are packed up to the budget without being cut."""
+        text = "Alpha beta gamma. Delta epsilon zeta. Eta theta iota. Kappa lambda mu."
+        offsets = tokenizer.token_offsets(text)
+
+        chunks = split_sentences(text, offsets, chunk_size=12)
+
+        assert len(chunks) > 1
+        assert all(content.endswith(".") for content, _ in chunks)
+        assert all(count <= 12 for _, count in chunks)
+        assert " ".join(content for content, _ in chunks) == text
+
+    def test_split_sentences_overlap_repeats_trailing_sentence(self, tokenizer):
+        """Test sentence-level overlap."""
+        text = "One two. Three four. Five six. Seven eight."
+        offsets = tokenizer.token_offsets(text)
+        sentence_tokens = tokenizer.count(" Three four.")
+
+        chunks = split_sentences(text, offsets, chunk_size=2 * sentence_tokens, overlap=sentence_tokens)
+
+        assert chunks[0][0].split(". ")[-1].rstrip(".") in chunks[1][0]
+
+    def test_split_sentences_splits_long_sentence(self, tokenizer):
+        """Test that a sentence over the budget is split at token boundaries."""
+        text = " ".join(["word"] * 50) + "."
+        offsets = tokenizer.token_offsets(text)
+
+        chunks = split_sentences(text, offsets, chunk_size=10)
+
+        assert len(chunks) == 6
+        assert all(count <= 10 for _, count in chunks)
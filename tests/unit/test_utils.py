@@ -11,7 +11,12 @@ from unittest.mock import Mock, patch
 import pytest
 
 from raft_toolkit.core.utils.env_config import read_env_config, set_env
-from raft_toolkit.core.utils.file_utils import extract_random_jsonl_rows, split_jsonl_file
+from raft_toolkit.core.utils.file_utils import (
+    extract_random_jsonl_rows,
+    reservoir_sample_jsonl,
+    split_jsonl_dataset,
+    split_jsonl_file,
+)
 from raft_toolkit.core.utils.identity_utils import (
     AZURE_AVAILABLE,
     get_azure_openai_token,
@@ -50,6 +55,7 @@ class TestFileUtils:
         for split_file in split_files:
             split_path = Path(split_file)
             assert split_path.exists()
+            assert split_path.parent == test_file.resolve().parent
 
             with open(split_path) as f:
                 for line in f:
@@ -93,6 +99,99 @@ class TestFileUtils:
         extracted_ids = {record["id"] for record in extracted_data}
         assert extracted_ids.issubset(original_ids)
 
+    @pytest.mark.unit
+    def test_extract_too_many_rows(self, temp_directory):
+        """Test requesting more rows than the file holds."""
+        test_file = temp_directory / "test.jsonl"
+        test_file.write_text("".join(json.dumps({"id": i}) + "\n" for i in range(3)))
+
+        with pytest.raises(ValueError, match="only contains 3 lines"):
+            extract_random_jsonl_rows(str(test_file), 5, str(temp_directory / "output.jsonl"))
+
+    @pytest.mark.unit
+    def test_reservoir_sample_stratified(self, temp_directory):
+        """Test stratified reservoir sampling keeps file order and stratum proportions."""
+        test_file = temp_directory / "test.jsonl"
+        output_file = temp_directory / "sample.jsonl"
+        types = ["cot"] * 75 + ["general"] * 25
+        test_file.write_text("".join(json.dumps({"id": i, "type": t}) + "\n" for i, t in enumerate(types)))
+
+        result = reservoir_sample_jsonl(str(test_file), 20, str(output_file), seed=1, stratify_by="type")
+
+        sampled = [json.loads(line) for line in output_file.read_text().splitlines()]
+        assert result == {"rows_read": 100, "rows_sampled": 20, "strata": {"cot": 15, "general": 5}}
+        assert [record["id"] for record in sampled] == sorted(record["id"] for record in sampled)
+        assert sum(record["type"] == "general" for record in sampled) == 5
+
+        # The same seed gives the same sample
+        reservoir_sample_jsonl(str(test_file), 20, str(temp_directory / "again.jsonl"), seed=1, stratify_by="type")
+        assert (temp_directory / "again.jsonl").read_text() == output_file.read_text()
+
+    @pytest.mark.unit
+    def test_reservoir_sample_many_strata(self, temp_directory):
+        """Test that stratifying by a high-cardinality field keeps only the requested rows."""
+        test_file = temp_directory / "test.jsonl"
+        output_file = temp_directory / "sample.jsonl"
+        test_file.write_text("".join(json.dumps({"id": i, "doc": f"doc{i % 50}"}) + "\n" for i in range(200)))
+
+        result = reservoir_sample_jsonl(str(test_file), 10, str(output_file), seed=3, stratify_by="doc")
+
+        assert result["rows_sampled"] == 10
+        assert len(result["strata"]) == 50
+        assert sum(result["strata"].values()) == 10
+        sampled = [json.loads(line) for line in output_file.read_text().splitlines()]
+        assert len({record["doc"] for record in sampled}) == 10
+
+    @pytest.mark.unit
+    def test_split_jsonl_dataset(self, temp_directory):
+        """Test hash-based splits are deterministic and cover every row once."""
+        test_file = temp_directory / "data.jsonl"
+        test_file.write_text("".join(json.dumps({"id": i, "text": f"Record {i}"}) + "\n" for i in range(1000)))
+
+        splits = split_jsonl_dataset(str(test_file), seed=3)
+
+        assert set(splits) == {"train", "validation", "test"}
+        ids = []
+        for name, split in splits.items():
+            assert Path(split["path"]) == temp_directory.resolve() / f"data.{name}.jsonl"
+            ids.extend(json.loads(line)["id"] for line in Path(split["path"]).read_text().splitlines())
+        assert sorted(ids) == list(range(1000))
+        assert 700 < splits["train"]["rows"] < 900
+        assert split_jsonl_dataset(str(test_file), seed=3) == splits
+
+    @pytest.mark.unit
+    def test_split_jsonl_dataset_grouped_and_stratified(self, temp_directory):
+        """Test rows sharing a key stay together and strata are split in the given ratios."""
+        test_file = temp_directory / "data.jsonl"
+        records = [{"id": i, "source": f"doc{i % 40}", "type": "cot" if i % 4 else "general"} for i in range(400)]
+        test_file.write_text("".join(json.dumps(record) + "\n" for record in records))
+
+        splits = split_jsonl_dataset(str(test_file), ratios={"train": 0.5, "test": 0.5}, key="source")
+        sources = {
+            name: {json.loads(line)["source"] for line in Path(split["path"]).read_text().splitlines()}
+            for name, split in splits.items()
+        }
+        assert not sources["train"] & sources["test"]
+
+        splits = split_jsonl_dataset(
+            str(test_file),
+            ratios={"train": 0.8, "test": 0.2},
+            output_dir=str(temp_directory / "out"),
+            stratify_by="type",
+        )
+        test_rows = [json.loads(line) for line in Path(splits["test"]["path"]).read_text().splitlines()]
+        assert sum(row["type"] == "general" for row in test_rows) == 20
+        assert sum(row["type"] == "cot" for row in test_rows) == 60
+
+    @pytest.mark.unit
+    def test_split_invalid_ratios(self, temp_directory):
+        """Test ratios that do not sum to one are rejected."""
+        test_file = temp_directory / "data.jsonl"
+        test_file.write_text('{"id": 1}\n')
+
+        with pytest.raises(ValueError, match="sum to 1"):
+            split_jsonl_dataset(str(test_file), ratios={"train": 0.5, "test": 0.2})
+
 
 @pytest.mark.unit
 class TestEnvConfig: